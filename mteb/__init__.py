@@ -5,7 +5,7 @@ from importlib.metadata import version
 from mteb.abstasks import AbsTask
 from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.encoder_interface import Encoder
-from mteb.evaluation import MTEB
+from mteb.evaluation import MTEB, RetrievalPipeline
 from mteb.load_results import BenchmarkResults, load_results
 from mteb.load_results.task_results import TaskResult
 from mteb.models import (
@@ -35,6 +35,7 @@ __all__ = [
     "BenchmarkResults",
     "BENCHMARK_REGISTRY",
     "MTEB",
+    "RetrievalPipeline",
     "TaskResult",
     "TaskMetadata",
     "Encoder",
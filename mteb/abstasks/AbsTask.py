@@ -23,6 +23,16 @@ from mteb.languages import LanguageScripts
 
 logger = logging.getLogger(__name__)
 
+# the attributes in which the tasks store their loaded data
+_DATA_ATTRIBUTES = (
+    "dataset",
+    "corpus",
+    "queries",
+    "relevant_docs",
+    "instructions",
+    "top_ranked",
+)
+
 ScoresDict = dict[str, Any]
 # ^ e.g {'main_score': 0.5, 'hf_subset': 'en-de', 'languages': ['eng-Latn', 'deu-Latn']}
 
@@ -85,6 +95,8 @@ class AbsTask(ABC):
     superseded_by: str | None = None
     dataset: dict[HFSubset, DatasetDict] | None = None  # type: ignore
     data_loaded: bool = False
+    # the subsets loaded for every split after a partial load, None if the data of all the subsets is loaded
+    _loaded_subsets: dict[str, list[HFSubset]] | None = None
     hf_subsets: list[HFSubset] | None = None
     fast_loading: bool = False
 
@@ -133,8 +145,7 @@ class AbsTask(ABC):
             encode_kwargs: Additional keyword arguments that are passed to the model's `encode` method.
             kwargs: Additional keyword arguments that are passed to the _evaluate_subset method.
         """
-        if not self.data_loaded:
-            self.load_data()
+        self._load_data_to_evaluate(split, subsets_to_run)
 
         self.dataset: dict[HFSubset, DatasetDict]
 
@@ -230,25 +241,94 @@ class AbsTask(ABC):
 
         This is the main loading function for Task. Do not overwrite this, instead we recommend using `dataset_transform`, which is called after the
         dataset is loaded using `datasets.load_dataset`.
+
+        Args:
+            subsets_to_load: The subsets to evaluate per split, e.g. the missing subsets when resuming a partially evaluated
+                task. Only the configs of these subsets are loaded and transformed, which are then the only subsets of the
+                loaded data. All the splits are loaded, as e.g. classification tasks are trained on the train split. Defaults
+                to all the `hf_subsets` of the task.
+            **kwargs: Additional arguments, ignored by the default implementation.
         """
-        if self.data_loaded:
+        subsets_to_load = kwargs.get("subsets_to_load")
+        if self._is_data_loaded(subsets_to_load):
             return
-        if self.metadata.is_multilingual:
-            if self.fast_loading:
-                self.fast_load()
+        subsets_to_load = self._subsets_to_reload(subsets_to_load)
+        all_hf_subsets = self.hf_subsets
+        # narrowed while loading, as `fast_load` and `dataset_transform` iterate over the subsets
+        self.hf_subsets = self._hf_subsets_to_load(subsets_to_load)
+        try:
+            if self.metadata.is_multilingual:
+                if self.fast_loading:
+                    self.fast_load()
+                else:
+                    self.dataset = {}
+                    for hf_subset in self.hf_subsets:
+                        self.dataset[hf_subset] = datasets.load_dataset(
+                            name=hf_subset,
+                            **self.metadata.dataset,
+                        )
             else:
-                self.dataset = {}
-                for hf_subset in self.hf_subsets:
-                    self.dataset[hf_subset] = datasets.load_dataset(
-                        name=hf_subset,
-                        **self.metadata.dataset,
-                    )
-        else:
-            # some of monolingual datasets explicitly adding the split name to the dataset name
-            self.dataset = datasets.load_dataset(**self.metadata.dataset)  # type: ignore
-        self.dataset_transform()
+                # some of monolingual datasets explicitly adding the split name to the dataset name
+                self.dataset = datasets.load_dataset(**self.metadata.dataset)  # type: ignore
+            self.dataset_transform()
+        finally:
+            self.hf_subsets = all_hf_subsets
+        # all the subsets of monolingual tasks are loaded
+        self._loaded_subsets = (
+            subsets_to_load if self.metadata.is_multilingual else None
+        )
         self.data_loaded = True
 
+    def _is_data_loaded(
+        self, subsets_to_load: dict[str, list[HFSubset]] | None = None
+    ) -> bool:
+        """Whether the data of the subsets of every split in `subsets_to_load` is loaded, all the subsets if None."""
+        if not self.data_loaded:
+            return False
+        if self._loaded_subsets is None:
+            return True
+        if subsets_to_load is None:
+            return False
+        return all(
+            set(subsets) <= set(self._loaded_subsets.get(split, []))
+            for split, subsets in subsets_to_load.items()
+        )
+
+    def _subsets_to_reload(
+        self, subsets_to_load: dict[str, list[HFSubset]] | None
+    ) -> dict[str, list[HFSubset]] | None:
+        """The subsets to load when `subsets_to_load` are requested, which after a partial load are the loaded subsets and the
+        requested ones, such that the data of the earlier load is kept.
+        """
+        if subsets_to_load is None or not self.data_loaded:
+            return subsets_to_load
+        merged = {
+            split: list(subsets) for split, subsets in self._loaded_subsets.items()
+        }
+        for split, subsets in subsets_to_load.items():
+            merged[split] = list(dict.fromkeys([*merged.get(split, []), *subsets]))
+        return merged
+
+    def _load_data_to_evaluate(
+        self, split: str, subsets_to_run: list[HFSubset] | None
+    ) -> None:
+        """Loads the subsets of the split to evaluate, unless they are loaded, e.g. by a load for other subsets."""
+        hf_subsets = subsets_to_run if subsets_to_run is not None else self.hf_subsets
+        subsets_to_load = {split: list(hf_subsets)} if hf_subsets is not None else None
+        if not self._is_data_loaded(subsets_to_load):
+            self.load_data(subsets_to_load=subsets_to_load)
+
+    def _hf_subsets_to_load(
+        self, subsets_to_load: dict[str, list[HFSubset]] | None
+    ) -> list[HFSubset]:
+        """The subsets of the task requested in `subsets_to_load` for any split, in the order of `hf_subsets`."""
+        if subsets_to_load is None or not self.metadata.is_multilingual:
+            return self.hf_subsets
+        requested = {
+            hf_subset for subsets in subsets_to_load.values() for hf_subset in subsets
+        }
+        return [hf_subset for hf_subset in self.hf_subsets if hf_subset in requested]
+
     def fast_load(self, **kwargs):
         """Load all subsets at once, then group by language with Polars. Using fast loading has two requirements:
         - Each row in the dataset should have a 'lang' feature giving the corresponding language/language pair
@@ -269,6 +349,18 @@ class AbsTask(ABC):
         for lang, subset in self.dataset.items():
             self.dataset[lang] = datasets.DatasetDict(subset)
 
+    def unload_data(self) -> None:
+        """Releases the loaded data, e.g. the dataset or the corpus, queries and relevant documents of retrieval tasks.
+
+        Used by `MTEB.run` once the task is evaluated, such that the memory does not grow with the number of evaluated tasks.
+        The data is loaded again by `load_data`.
+        """
+        for attribute in _DATA_ATTRIBUTES:
+            # fall back to the defaults of the class
+            self.__dict__.pop(attribute, None)
+        self._loaded_subsets = None
+        self.data_loaded = False
+
     def calculate_metadata_metrics(
         self, overwrite_results: bool = False
     ) -> dict[str, DescriptiveStatistics | dict[str, DescriptiveStatistics]]:
@@ -290,20 +382,11 @@ class AbsTask(ABC):
             pbar_split.set_postfix_str(f"Split: {split}")
             logger.info(f"Processing metadata for split {split}")
             if self.metadata.is_multilingual:
-                descriptive_stats[split] = self._calculate_metrics_from_split(
-                    split, compute_overall=True
+                overall, per_subset = self._calculate_metrics_from_subsets(
+                    split, self.metadata.hf_subsets
                 )
-                descriptive_stats[split][hf_subset_stat] = {}
-
-                pbar_subsets = tqdm.tqdm(
-                    self.metadata.hf_subsets,
-                    desc="Processing Languages...",
-                )
-                for hf_subset in pbar_subsets:
-                    pbar_subsets.set_postfix_str(f"Huggingface subset: {hf_subset}")
-                    logger.info(f"Processing metadata for subset {hf_subset}")
-                    split_details = self._calculate_metrics_from_split(split, hf_subset)
-                    descriptive_stats[split][hf_subset_stat][hf_subset] = split_details
+                descriptive_stats[split] = overall
+                descriptive_stats[split][hf_subset_stat] = per_subset
             else:
                 split_details = self._calculate_metrics_from_split(split)
                 descriptive_stats[split] = split_details
@@ -319,6 +402,23 @@ class AbsTask(ABC):
     ) -> DescriptiveStatistics:
         raise NotImplementedError
 
+    def _calculate_metrics_from_subsets(
+        self, split: str, hf_subsets: list[HFSubset]
+    ) -> tuple[DescriptiveStatistics, dict[HFSubset, DescriptiveStatistics]]:
+        """Calculates the descriptive statistics of a split over all the subsets and of every subset.
+
+        By default, the statistics are calculated by `_calculate_metrics_from_split` once overall and once for every subset.
+        Tasks can override it to calculate all of them in a single pass over the data.
+        """
+        overall = self._calculate_metrics_from_split(split, compute_overall=True)
+        per_subset = {}
+        pbar_subsets = tqdm.tqdm(hf_subsets, desc="Processing Languages...")
+        for hf_subset in pbar_subsets:
+            pbar_subsets.set_postfix_str(f"Huggingface subset: {hf_subset}")
+            logger.info(f"Processing metadata for subset {hf_subset}")
+            per_subset[hf_subset] = self._calculate_metrics_from_split(split, hf_subset)
+        return overall, per_subset
+
     @property
     def languages(self) -> list[str]:
         """Returns the languages of the task"""
@@ -439,7 +539,7 @@ class AbsTask(ABC):
         Args:
             repo_name: The name of the repository to push the dataset to.
         """
-        if not self.data_loaded:
+        if not self._is_data_loaded():
             self.load_data()
 
         self._push_dataset_to_hub(repo_name)
@@ -70,8 +70,7 @@ class AbsTaskBitextMining(AbsTask):
         encode_kwargs: dict[str, Any],
         **kwargs: Any,
     ) -> dict[HFSubset, ScoresDict]:
-        if not self.data_loaded:
-            self.load_data()
+        self._load_data_to_evaluate(split, subsets_to_run)
 
         hf_subsets = self.hf_subsets
 
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-from collections import Counter, defaultdict
 from typing import Any
 
 import numpy as np
@@ -15,6 +14,14 @@ from ..evaluation.evaluators import (
 )
 from ..load_results.task_results import HFSubset, ScoresDict
 from .AbsTask import AbsTask
+from .sampling import undersample_indices
+from .text_statistics import (
+    intersection_sizes,
+    label_statistics,
+    subsets_frame,
+    text_statistics,
+    to_series,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -85,8 +92,7 @@ class AbsTaskClassification(AbsTask):
         encode_kwargs: dict[str, Any],
         **kwargs: Any,
     ) -> dict[HFSubset, ScoresDict]:
-        if not self.data_loaded:
-            self.load_data()
+        self._load_data_to_evaluate(split, subsets_to_run)
 
         scores = {}
         hf_subsets = self.hf_subsets
@@ -183,76 +189,102 @@ class AbsTaskClassification(AbsTask):
         rng_state = np.random.default_rng(self.seed)
         rng_state.shuffle(idxs)
 
-        label_counter = defaultdict(int)
-        sampled_idxs = []
-
-        for i in idxs:
-            label = dataset[i]["label"]
-            if label_counter[label] < samples_per_label:
-                sampled_idxs.append(i)
-                label_counter[label] += 1
-
+        sampled_idxs = undersample_indices(dataset["label"], idxs, samples_per_label)
         return dataset.select(sampled_idxs), idxs
 
     def _calculate_metrics_from_split(
         self, split: str, hf_subset: str | None = None, compute_overall: bool = False
     ) -> ClassificationDescriptiveStatistics:
-        train_text = []
         if hf_subset:
-            text = self.dataset[hf_subset][split]["text"]
-            label = self.dataset[hf_subset][split]["label"]
-            if split != "train":
-                train_text = self.dataset[hf_subset]["train"]["text"]
+            _, per_subset = self._calculate_metrics_from_subsets(split, [hf_subset])
+            return per_subset[hf_subset]
         elif compute_overall:
-            text = []
-            label = []
-            for hf_subset in self.metadata.eval_langs:
-                text.extend(self.dataset[hf_subset][split]["text"])
-                label.extend(self.dataset[hf_subset][split]["label"])
-                if split != "train":
-                    train_text.extend(self.dataset[hf_subset]["train"]["text"])
-        else:
-            text = self.dataset[split]["text"]
-            label = self.dataset[split]["label"]
-            if split != "train":
-                train_text = self.dataset["train"]["text"]
-
-        text_len = [len(t) for t in text]
-        total_text_len = sum(text_len)
-        if isinstance(label[0], int):
-            label_len = [1] * len(label)
-            total_label_len = len(label)
-            total_labels = label
-        else:
-            # multilabel classification
-            label_len = [len(l) for l in label]
-            total_label_len = sum(label_len)
-            total_labels = []
-            for l in label:
-                total_labels.extend(l if len(l) > 0 else [None])
-        label_count = Counter(total_labels)
-        num_texts_in_train = (
-            len(set(text) & set(train_text)) if split != "train" else None
+            overall, _ = self._calculate_metrics_from_subsets(
+                split, list(self.metadata.eval_langs)
+            )
+            return overall
+        overall, _ = self._calculate_metrics_from_datasets(
+            split, {"default": self.dataset}
+        )
+        return overall
+
+    def _calculate_metrics_from_subsets(
+        self, split: str, hf_subsets: list[HFSubset]
+    ) -> tuple[
+        ClassificationDescriptiveStatistics,
+        dict[HFSubset, ClassificationDescriptiveStatistics],
+    ]:
+        return self._calculate_metrics_from_datasets(
+            split, {hf_subset: self.dataset[hf_subset] for hf_subset in hf_subsets}
         )
-        return ClassificationDescriptiveStatistics(
-            num_samples=len(text),
-            number_of_characters=total_text_len,
-            number_texts_intersect_with_train=num_texts_in_train,
-            min_text_length=min(text_len),
-            average_text_length=total_text_len / len(text),
-            max_text_length=max(text_len),
-            unique_texts=len(set(text)),
-            min_labels_per_text=min(label_len),
-            average_label_per_text=total_label_len / len(label),
-            max_labels_per_text=max(label_len),
-            unique_labels=len(label_count),
-            labels={
-                str(label): {
-                    "count": value,
+
+    def _calculate_metrics_from_datasets(
+        self, split: str, datasets: dict[HFSubset, DatasetDict]
+    ) -> tuple[
+        ClassificationDescriptiveStatistics,
+        dict[HFSubset, ClassificationDescriptiveStatistics],
+    ]:
+        """Calculates the statistics of all the subsets in one columnar pass and derives the overall statistics from them."""
+        frame = subsets_frame(
+            {
+                hf_subset: {
+                    "text": to_series(dataset[split], "text"),
+                    "label": to_series(dataset[split], "label"),
                 }
-                for label, value in label_count.items()
-            },
+                for hf_subset, dataset in datasets.items()
+            }
         )
+        texts_per_subset, texts = text_statistics(frame, "text")
+        labels_per_subset, labels = label_statistics(frame, "label")
+        if split != "train":
+            train_frame = subsets_frame(
+                {
+                    hf_subset: {"text": to_series(dataset["train"], "text")}
+                    for hf_subset, dataset in datasets.items()
+                }
+            )
+            in_train_per_subset, in_train = intersection_sizes(
+                frame, train_frame, "text"
+            )
+        else:
+            in_train_per_subset, in_train = {}, None
+
+        per_subset = {
+            hf_subset: _classification_statistics(
+                texts_per_subset[hf_subset],
+                labels_per_subset[hf_subset],
+                in_train_per_subset.get(hf_subset),
+            )
+            for hf_subset in texts_per_subset
+        }
+        return _classification_statistics(texts, labels, in_train), per_subset
 
     def _push_dataset_to_hub(self, repo_name: str) -> None:
         self._upload_dataset_to_hub(repo_name, ["text", "label"])
+
+
+def _classification_statistics(
+    texts: dict[str, int],
+    labels: dict[str, Any],
+    num_texts_in_train: int | None,
+) -> ClassificationDescriptiveStatistics:
+    """The descriptive statistics from the text and label statistics of `text_statistics` and `label_statistics`."""
+    return ClassificationDescriptiveStatistics(
+        num_samples=texts["num_texts"],
+        number_of_characters=texts["total_length"],
+        number_texts_intersect_with_train=num_texts_in_train,
+        min_text_length=texts["min_length"],
+        average_text_length=texts["total_length"] / texts["num_texts"],
+        max_text_length=texts["max_length"],
+        unique_texts=texts["unique_texts"],
+        min_labels_per_text=labels["min_labels"],
+        average_label_per_text=labels["num_labels"] / texts["num_texts"],
+        max_labels_per_text=labels["max_labels"],
+        unique_labels=len(labels["labels"]),
+        labels={
+            str(label): {
+                "count": count,
+            }
+            for label, count in labels["labels"].items()
+        },
+    )
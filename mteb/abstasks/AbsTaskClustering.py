@@ -12,6 +12,11 @@ from mteb.abstasks.TaskMetadata import DescriptiveStatistics
 from mteb.encoder_interface import Encoder
 from mteb.load_results.task_results import ScoresDict
 
+from ..create_dataloaders import (
+    DEFAULT_BATCH_SIZE,
+    create_dataloader_from_texts,
+    static_batch_size,
+)
 from ..evaluation.evaluators import ClusteringEvaluator
 from .AbsTask import AbsTask
 
@@ -60,9 +65,13 @@ class AbsTaskClustering(AbsTask):
     self.load_data() must generate a huggingface dataset with a split matching self.metadata.eval_splits, and assign it to self.dataset. It must contain the following columns:
         sentences: list of str
         labels: list of str
+
+    The cluster sets are clustered with scikit-learn's MiniBatchKMeans by default. Set `kmeans_engine` to "torch" to use the
+    k-means of torch, on the accelerator if there is one.
     """
 
     abstask_prompt = "Identify categories in user passages."
+    kmeans_engine: str = "sklearn"
 
     def _evaluate_subset(
         self,
@@ -74,8 +83,31 @@ class AbsTaskClustering(AbsTask):
         encode_kwargs: dict[str, Any],
         **kwargs,
     ) -> ScoresDict:
+        # the texts of all the cluster sets are encoded at once, every text once
+        text_ids: dict[str, int] = {}
+        cluster_set_ids = [
+            np.array(
+                [text_ids.setdefault(text, len(text_ids)) for text in sentences],
+                dtype=np.int64,
+            )
+            for sentences in dataset["sentences"]
+        ]
+        # with batch_size="auto", the model batches the texts itself and the dataloader gets a static batch size
+        batch_size = static_batch_size(encode_kwargs).get(
+            "batch_size", DEFAULT_BATCH_SIZE
+        )
+        embeddings = model.encode(
+            create_dataloader_from_texts(list(text_ids), batch_size=batch_size),
+            task_metadata=self.metadata,
+            hf_split=hf_split,
+            hf_subset=hf_subset,
+            **encode_kwargs,
+        )
+
         v_measures = []
-        for cluster_set in tqdm.tqdm(dataset, desc="Clustering"):
+        for cluster_set, ids in zip(
+            tqdm.tqdm(dataset, desc="Clustering"), cluster_set_ids
+        ):
             clustering_dataset = Dataset.from_dict(cluster_set).rename_column(
                 original_column_name="sentences", new_column_name="text"
             )
@@ -84,6 +116,8 @@ class AbsTaskClustering(AbsTask):
                 task_metadata=self.metadata,
                 hf_split=hf_split,
                 hf_subset=hf_subset,
+                kmeans_engine=self.kmeans_engine,
+                embeddings=embeddings[ids],
                 **kwargs,
             )
             metrics = evaluator(model, encode_kwargs=encode_kwargs)
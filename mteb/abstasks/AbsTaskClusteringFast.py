@@ -9,15 +9,19 @@ from typing import Any
 import numpy as np
 import sklearn
 import sklearn.cluster
+import torch
 from datasets import Dataset, DatasetDict
 from sklearn.metrics.cluster import v_measure_score
 from torch.utils.data import DataLoader
 
 from mteb.abstasks.TaskMetadata import DescriptiveStatistics
 from mteb.encoder_interface import Encoder
+from mteb.evaluation.evaluators.kmeans import batched_kmeans, default_device, v_measure
+from mteb.types import Array
 
 from ..load_results.task_results import HFSubset
 from .AbsTask import AbsTask
+from .sampling import bootstrap_indices
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +37,17 @@ def evaluate_clustering_bootstrapped(
     kmean_batch_size: int,
     max_depth: int | None,
     rng_state: random.Random = random.Random(),
+    kmeans_engine: str = "sklearn",
+    seed: int = 42,
 ) -> dict[str, list[float]]:
     """Bootstrapped evaluation of clustering performance using V-measure.
 
     The bootstrapping is done by sampling N samples from the corpus and clustering them. It is done without replacement to get a diverse set of
     samples.
+
+    With `kmeans_engine="torch"`, the samples of a level are clustered at once with the batched k-means of
+    `mteb.evaluation.evaluators.kmeans`, on the accelerator if there is one, instead of one after the other with scikit-learn's
+    `MiniBatchKMeans`. The samples are the same, but the clusterings, and thus the scores, differ slightly.
     """
     v_measures = defaultdict(list)
     if max_depth is not None:
@@ -59,16 +69,23 @@ def evaluate_clustering_bootstrapped(
         )  # Could be level_labels != -1 but fails with FutureWarning: elementwise comparison failed
         level_labels = level_labels[valid_idx]
         level_embeddings = embeddings[valid_idx]
+        # sample N samples from the corpus with replacement
+        samples = bootstrap_indices(
+            rng_state, len(level_embeddings), n_clusters, cluster_size
+        )
+
+        if kmeans_engine == "torch":
+            v_measures[f"Level {i_level}"] = _torch_bootstrapped_v_measures(
+                level_embeddings, level_labels, samples, seed=seed + i_level
+            )
+            continue
+
         clustering_model = sklearn.cluster.MiniBatchKMeans(
             n_clusters=np.unique(level_labels).size,
             batch_size=kmean_batch_size,
             n_init="auto",
         )
-        for _ in range(n_clusters):
-            # sample N samples from the corpus with replacement
-            n_embeddings = len(level_embeddings)
-            cluster_indices = rng_state.choices(range(n_embeddings), k=cluster_size)
-
+        for cluster_indices in samples:
             _embeddings = level_embeddings[cluster_indices]
             _labels = level_labels[cluster_indices]
             cluster_assignment = clustering_model.fit_predict(_embeddings)
@@ -78,6 +95,21 @@ def evaluate_clustering_bootstrapped(
     return v_measures
 
 
+def _torch_bootstrapped_v_measures(
+    embeddings: Array, labels: np.ndarray, samples: np.ndarray, seed: int
+) -> list[float]:
+    """The V-measures of the k-means clusterings of the samples, clustered at once as a [n_samples, sample_size, d] batch."""
+    device = default_device()
+    label_names, label_ids = np.unique(labels, return_inverse=True)
+    idx = torch.from_numpy(samples).to(device)
+    x = torch.as_tensor(embeddings, dtype=torch.float32, device=device)[idx]
+    generator = torch.Generator(device=device).manual_seed(seed)
+    cluster_assignment = batched_kmeans(x, label_names.size, generator=generator)
+    return v_measure(
+        torch.from_numpy(label_ids)[idx.cpu()], cluster_assignment.cpu()
+    ).tolist()
+
+
 class ClusteringFastDescriptiveStatistics(DescriptiveStatistics):
     """Descriptive statistics for Clustering
 
@@ -128,6 +160,9 @@ class AbsTaskClusteringFast(AbsTask):
     If the clustering is hierarchical, and more than one label is specified in order for each observation,
     V-measures are calculated in the outlined way on each of the levels separately.
 
+    The samples are clustered with scikit-learn's MiniBatchKMeans by default. Set `kmeans_engine` to "torch" to cluster all the
+    samples of a level at once with torch, on the accelerator if there is one.
+
     self.load_data() must generate a huggingface dataset with a split matching self.metadata.eval_splits, and assign it to self.dataset.
     It must contain the following columns:
         sentences: list[str]
@@ -139,6 +174,7 @@ class AbsTaskClusteringFast(AbsTask):
     max_documents_per_cluster: int = 16_384
     n_clusters: int = 10
     k_mean_batch_size: int = 512
+    kmeans_engine: str = "sklearn"
     max_depth = None
     abstask_prompt = "Identify categories in user passages."
 
@@ -204,6 +240,8 @@ class AbsTaskClusteringFast(AbsTask):
             kmean_batch_size=self.k_mean_batch_size,
             max_depth=self.max_depth,
             rng_state=self.rng_state,
+            kmeans_engine=self.kmeans_engine,
+            seed=self.seed,
         )
         v_measures = list(itertools.chain.from_iterable(all_v_scores.values()))
 
@@ -17,7 +17,7 @@ class AbsTaskReranking(AbsTaskRetrieval):
     """Abstract class for re-ranking experiments. This is mostly the same as the RetrievalEvaluator, but here to adapt the old format to the new format. TODO: update these tasks to the new format and delete this class."""
 
     def load_data(self, **kwargs):
-        if self.data_loaded:
+        if self._is_data_loaded(kwargs.get("subsets_to_load")):
             return
 
         if self.metadata.name in OLD_FORMAT_RERANKING_TASKS:
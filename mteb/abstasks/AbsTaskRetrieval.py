@@ -8,13 +8,22 @@ from pathlib import Path
 from time import time
 from typing import Any, Callable
 
+import tqdm
 from datasets import Dataset, DatasetDict
 
 from mteb.abstasks.TaskMetadata import DescriptiveStatistics, HFSubset
 
 from ..evaluation.evaluators import RetrievalEvaluator
+from ..evaluation.evaluators.retrieval_predictions import (
+    PredictionsFormat,
+    PredictionsWriter,
+    predictions_path,
+    retrieval_errors,
+    top_k_documents,
+)
 from ..evaluation.evaluators.utils import make_score_dict
 from ..load_results.task_results import ScoresDict
+from ..profiling import profile_span
 from .AbsTask import AbsTask
 from .dataloaders import RetrievalDataLoader
 
@@ -130,8 +139,11 @@ class AbsTaskRetrieval(AbsTask):
     top_ranked = None
 
     def load_data(self, **kwargs):
-        if self.data_loaded:
+        # only the requested splits and subsets, e.g. the missing ones when resuming a partially evaluated task
+        subsets_to_load = kwargs.get("subsets_to_load")
+        if self._is_data_loaded(subsets_to_load):
             return
+        subsets_to_load = self._subsets_to_reload(subsets_to_load)
 
         self.corpus = defaultdict(dict)
         self.queries = defaultdict(dict)
@@ -179,13 +191,18 @@ class AbsTaskRetrieval(AbsTask):
                 else:
                     self.top_ranked[split] = top_ranked
 
+        if subsets_to_load is not None:
+            eval_splits = [split for split in eval_splits if split in subsets_to_load]
+
         if self.metadata.is_multilingual:
-            for lang in self.metadata.eval_langs:
+            for lang in self.hf_subsets:
                 for split in eval_splits:
-                    process_data(split, lang)
+                    if subsets_to_load is None or lang in subsets_to_load[split]:
+                        process_data(split, lang)
         else:
             for split in eval_splits:
                 process_data(split)
+        self._loaded_subsets = subsets_to_load
         self.data_loaded = True
 
     def evaluate(
@@ -197,6 +214,7 @@ class AbsTaskRetrieval(AbsTask):
         encode_kwargs: dict[str, Any],
         **kwargs,
     ) -> dict[HFSubset, ScoresDict]:
+        self._load_data_to_evaluate(split, subsets_to_run)
         retriever = RetrievalEvaluator(
             retriever=model,
             encode_kwargs=encode_kwargs,
@@ -257,6 +275,8 @@ class AbsTaskRetrieval(AbsTask):
         output_folder: str = "results",
         results: dict[str, dict[str, float]] | None = None,
         top_k: int | None = None,
+        predictions_format: PredictionsFormat = "json",
+        predictions_compression: str | None = None,
         **kwargs,
     ) -> ScoresDict:
         """Evaluate the retrieval task for a given subset of the dataset.
@@ -276,13 +296,19 @@ class AbsTaskRetrieval(AbsTask):
             output_folder: Folder to save the results
             results: Results from retrieval from previous run
             top_k: Top k documents to consider
+            predictions_format: The format of the saved predictions, "json", "parquet" or "trec". All of them can be loaded as
+                `previous_results`.
+            predictions_compression: "gzip" to compress the JSON or TREC predictions, or the codec of Parquet predictions (e.g.
+                "zstd"). Not compressed if None.
             **kwargs: kwargs
 
         Returns:
             ScoresDict: Evaluation scores
         """
+        retrieved_by_pipeline = False
         if not results:
             # perform the retrieval here
+            retrieved_by_pipeline = retriever.is_pipeline
             start_time = time()
             results = retriever(
                 corpus,
@@ -303,22 +329,20 @@ class AbsTaskRetrieval(AbsTask):
                 os.makedirs(output_folder)
 
         if save_predictions:
-            if top_k is not None:
-                for qid in list(results.keys()):
-                    doc_ids = set(
-                        sorted(
-                            results[qid], key=lambda x: results[qid][x], reverse=True
-                        )[:top_k]
-                    )
-                    results[qid] = {
-                        k: v for k, v in results[qid].items() if k in doc_ids
-                    }
-            qrels_save_path = (
-                output_folder / f"{self.metadata.name}_{hf_subset}_predictions.json"
+            predictions_save_path = predictions_path(
+                output_folder,
+                f"{self.metadata.name}_{hf_subset}",
+                predictions_format,
+                predictions_compression,
             )
-
-            with open(qrels_save_path, "w") as f:
-                json.dump(results, f)
+            with PredictionsWriter(
+                predictions_save_path, predictions_format, predictions_compression
+            ) as writer:
+                for qid, doc_scores in results.items():
+                    # truncated query by query and in place, as the scores are computed on the saved predictions
+                    if top_k is not None:
+                        doc_scores = results[qid] = top_k_documents(doc_scores, top_k)
+                    writer.write(qid, doc_scores)
 
         if save_qrels:
             with open(
@@ -326,46 +350,37 @@ class AbsTaskRetrieval(AbsTask):
             ) as f:
                 json.dump(relevant_docs, f)
 
-        ndcg, _map, recall, precision, naucs, task_scores = retriever.evaluate(
-            relevant_docs,
-            results,
-            retriever.k_values,
-            ignore_identical_ids=self.ignore_identical_ids,
-            task_metadata=self.metadata,
-        )
+        with profile_span("metrics", n_queries=len(results)):
+            ndcg, _map, recall, precision, naucs, task_scores = retriever.evaluate(
+                relevant_docs,
+                results,
+                retriever.k_values,
+                ignore_identical_ids=self.ignore_identical_ids,
+                task_metadata=self.metadata,
+            )
 
-        mrr, naucs_mrr = retriever.evaluate_custom(
-            relevant_docs, results, retriever.k_values, "mrr"
-        )
+            mrr, naucs_mrr = retriever.evaluate_custom(
+                relevant_docs, results, retriever.k_values, "mrr"
+            )
         scores = make_score_dict(
             ndcg, _map, recall, precision, mrr, naucs, naucs_mrr, task_scores
         )
         self._add_main_score(scores)
 
+        if retrieved_by_pipeline:
+            scores.update(
+                self._pipeline_stage_scores(
+                    retriever, relevant_docs, retriever.retriever.model
+                )
+            )
+
         if export_errors:
-            errors = {}
-
-            top_k = top_k or 1
-            if not save_predictions and top_k == 1:
-                for qid in results.keys():
-                    doc_scores = results[qid]
-                    sorted_docs = sorted(
-                        doc_scores.items(), key=lambda x: x[1], reverse=True
-                    )[:top_k]
-                    results[qid] = dict(sorted_docs)
-            for qid, retrieved_docs in results.items():
-                expected_docs = relevant_docs[qid]
-                false_positives = [
-                    doc for doc in retrieved_docs if doc not in expected_docs
-                ]
-                false_negatives = [
-                    doc for doc in expected_docs if doc not in retrieved_docs
-                ]
-                if false_positives or false_negatives:
-                    errors[qid] = {
-                        "false_positives": false_positives,
-                        "false_negatives": false_negatives,
-                    }
+            # the predictions saved with a top_k are already truncated
+            errors = retrieval_errors(
+                results,
+                relevant_docs,
+                top_k=1 if not save_predictions and (top_k or 1) == 1 else None,
+            )
 
             errors_save_path = (
                 output_folder / f"{self.metadata.name}_{hf_subset}_errors.json"
@@ -375,26 +390,47 @@ class AbsTaskRetrieval(AbsTask):
 
         return scores
 
+    def _pipeline_stage_scores(
+        self,
+        retriever: RetrievalEvaluator,
+        relevant_docs: dict[str, dict[str, int]],
+        pipeline,
+    ) -> dict[str, float]:
+        """Scores the intermediate results of a `RetrievalPipeline` and reports the time taken by each stage.
+
+        The keys are prefixed with the name of the stage, e.g. `first_stage_ndcg_at_10` or `reranking_time`.
+        """
+        scores = {}
+        for stage, stage_results in pipeline.stage_results.items():
+            ndcg, _map, recall, precision, naucs, task_scores = retriever.evaluate(
+                relevant_docs,
+                stage_results,
+                retriever.k_values,
+                ignore_identical_ids=self.ignore_identical_ids,
+                task_metadata=self.metadata,
+            )
+            mrr, naucs_mrr = retriever.evaluate_custom(
+                relevant_docs, stage_results, retriever.k_values, "mrr"
+            )
+            stage_scores = make_score_dict(
+                ndcg, _map, recall, precision, mrr, naucs, naucs_mrr, task_scores
+            )
+            scores.update({f"{stage}_{k}": v for k, v in stage_scores.items()})
+        for stage, stage_time in pipeline.stage_times.items():
+            scores[f"{stage}_time"] = stage_time
+        return scores
+
     def _calculate_metrics_from_split(
         self, split: str, hf_subset: str | None = None, compute_overall: bool = False
     ) -> RetrievalDescriptiveStatistics:
         top_ranked = None
         instructions = None
         if hf_subset and hf_subset in self.queries:
+            partials = self._subset_partial_statistics(split, hf_subset)
             # BrightRetrieval has different splits for different subsets of the corpus.
-            if (
-                self.corpus.get(hf_subset, None) is None
-                or self.corpus[hf_subset].get(split, None) is None
-            ):
+            if partials is None:
                 return {}
-
-            queries = self.queries[hf_subset][split]
-            corpus = self.corpus[hf_subset][split]
-            relevant_docs = self.relevant_docs[hf_subset][split]
-            if self.instructions is not None:
-                instructions = self.instructions[hf_subset][split]
-            if self.top_ranked is not None:
-                top_ranked = self.top_ranked[hf_subset][split]
+            return _retrieval_statistics(partials)
         elif compute_overall:
             queries = {}
             corpus = {}
@@ -432,86 +468,64 @@ class AbsTaskRetrieval(AbsTask):
             if self.top_ranked is not None:
                 top_ranked = self.top_ranked[split]
 
-        query_len = calculate_queries_length(queries)
-        doc_len = calculate_corpus_length(corpus)
-        num_documents = len(doc_len) if corpus is not None else 0
-        num_queries = len(query_len)
-        num_relevant_docs = sum(len(relevant_docs[qid]) for qid in relevant_docs)
-        none_queries = sum(q is None or len(q) == 0 for q in queries.values())
-
-        # create a list of number of relevant docs per query
-        qrels_lengths = [
-            len(relevant_docs[qid]) for qid in relevant_docs if qid in queries
-        ]
-        unique_qrels = len({doc for qid in relevant_docs for doc in relevant_docs[qid]})
-        # number of qrels that are not 0
-        num_qrels_non_zero = sum(
-            sum(1 for doc_id in docs if docs[doc_id] != 0)
-            for docs in relevant_docs.values()
+        return _retrieval_statistics(
+            _partial_statistics(
+                queries,
+                corpus,
+                relevant_docs,
+                instructions if self.instructions is not None else None,
+                top_ranked if self.top_ranked is not None else None,
+            )
         )
-        qrels_per_doc = num_qrels_non_zero / len(relevant_docs) if num_queries else 0
 
+    def _calculate_metrics_from_subsets(
+        self, split: str, hf_subsets: list[HFSubset]
+    ) -> tuple[
+        RetrievalDescriptiveStatistics, dict[HFSubset, RetrievalDescriptiveStatistics]
+    ]:
+        """Calculates the statistics of every subset once and derives the overall statistics from their partials.
+
+        As the ids of the subsets are made distinct in the overall statistics, the unique documents, queries, relevant
+        documents and instructions of the subsets add up.
+        """
+        if any(hf_subset not in self.queries for hf_subset in hf_subsets):
+            return super()._calculate_metrics_from_subsets(split, hf_subsets)
+
+        per_subset = {}
+        subset_partials = []
+        for hf_subset in tqdm.tqdm(hf_subsets, desc="Processing Languages..."):
+            partials = self._subset_partial_statistics(split, hf_subset)
+            # BrightRetrieval has different splits for different subsets of the corpus.
+            if partials is None:
+                per_subset[hf_subset] = {}
+                continue
+            per_subset[hf_subset] = _retrieval_statistics(partials)
+            subset_partials.append(partials)
+        overall = _retrieval_statistics(_combine_partial_statistics(subset_partials))
+        return overall, per_subset
+
+    def _subset_partial_statistics(
+        self, split: str, hf_subset: HFSubset
+    ) -> dict[str, Any] | None:
+        """The partial statistics of a subset, or None if the subset has no corpus for the split."""
+        if (
+            self.corpus.get(hf_subset, None) is None
+            or self.corpus[hf_subset].get(split, None) is None
+        ):
+            return None
+
+        instructions = None
+        top_ranked = None
         if self.instructions is not None:
-            instructions_len = [
-                len(instruction) for instruction in instructions.values()
-            ]
-            num_instructions = len(instructions)
-            average_instruction_length = sum(instructions_len)
-            min_instruction_length = min(instructions_len)
-            max_instruction_length = max(instructions_len)
-            unique_instructions = len(set(instructions))
-        else:
-            num_instructions = None
-            average_instruction_length = None
-            min_instruction_length = None
-            max_instruction_length = None
-            unique_instructions = None
-
-        if self.top_ranked is not None and num_queries:
-            top_ranked_per_query = [len(docs) for docs in top_ranked.values()]
-            num_top_ranked = len(top_ranked_per_query)
-            min_top_ranked_per_query = min(top_ranked_per_query)
-            average_top_ranked_per_query = sum(top_ranked_per_query) / num_queries
-            max_top_ranked_per_query = max(top_ranked_per_query)
-        else:
-            num_top_ranked = None
-            min_top_ranked_per_query = None
-            average_top_ranked_per_query = None
-            max_top_ranked_per_query = None
-
-        return RetrievalDescriptiveStatistics(
-            num_samples=num_documents + num_queries,
-            number_of_characters=sum(query_len) + sum(doc_len),
-            # documents
-            num_documents=num_documents,
-            min_document_length=min(doc_len),
-            average_document_length=sum(doc_len) / num_documents,
-            max_document_length=max(doc_len),
-            unique_documents=len(set(corpus)),
-            # queries
-            num_queries=num_queries,
-            min_query_length=min(query_len),
-            average_query_length=sum(query_len) / num_queries,
-            max_query_length=max(query_len),
-            unique_queries=len(set(queries)),
-            none_queries=none_queries,
-            # relevant docs
-            num_relevant_docs=num_relevant_docs,
-            min_relevant_docs_per_query=min(qrels_lengths),
-            average_relevant_docs_per_query=qrels_per_doc,
-            max_relevant_docs_per_query=max(qrels_lengths),
-            unique_relevant_docs=unique_qrels,
-            # instructions
-            num_instructions=num_instructions,
-            min_instruction_length=min_instruction_length,
-            average_instruction_length=average_instruction_length,
-            max_instruction_length=max_instruction_length,
-            unique_instructions=unique_instructions,
-            # top ranked
-            num_top_ranked=num_top_ranked,
-            min_top_ranked_per_query=min_top_ranked_per_query,
-            average_top_ranked_per_query=average_top_ranked_per_query,
-            max_top_ranked_per_query=max_top_ranked_per_query,
+            instructions = self.instructions[hf_subset][split]
+        if self.top_ranked is not None:
+            top_ranked = self.top_ranked[hf_subset][split]
+        return _partial_statistics(
+            self.queries[hf_subset][split],
+            self.corpus[hf_subset][split],
+            self.relevant_docs[hf_subset][split],
+            instructions,
+            top_ranked,
         )
 
     def _push_dataset_to_hub(self, repo_name: str) -> None:
@@ -660,6 +674,145 @@ def calculate_corpus_length(
     return doc_lens
 
 
+def _partial_statistics(
+    queries: dict[str, str],
+    corpus: dict[str, str | dict[str, str]],
+    relevant_docs: dict[str, dict[str, int]],
+    instructions: dict[str, str] | None,
+    top_ranked: dict[str, list[str]] | None,
+) -> dict[str, Any]:
+    """The lengths and counts from which the descriptive statistics of a split are calculated.
+
+    The partial statistics of several subsets are combined by `_combine_partial_statistics`. Instructions and top ranked
+    documents are None for tasks without them.
+    """
+    return {
+        "query_lengths": calculate_queries_length(queries),
+        "document_lengths": calculate_corpus_length(corpus),
+        "unique_queries": len(set(queries)),
+        "unique_documents": len(set(corpus)),
+        "none_queries": sum(q is None or len(q) == 0 for q in queries.values()),
+        "num_relevant_docs": sum(len(relevant_docs[qid]) for qid in relevant_docs),
+        "num_queries_with_relevant_docs": len(relevant_docs),
+        # the number of relevant docs per query
+        "relevant_docs_lengths": [
+            len(relevant_docs[qid]) for qid in relevant_docs if qid in queries
+        ],
+        "unique_relevant_docs": len(
+            {doc for qid in relevant_docs for doc in relevant_docs[qid]}
+        ),
+        # the number of qrels that are not 0
+        "num_qrels_non_zero": sum(
+            sum(1 for doc_id in docs if docs[doc_id] != 0)
+            for docs in relevant_docs.values()
+        ),
+        "instruction_lengths": (
+            [len(instruction) for instruction in instructions.values()]
+            if instructions is not None
+            else None
+        ),
+        "unique_instructions": (
+            len(set(instructions)) if instructions is not None else None
+        ),
+        "top_ranked_lengths": (
+            [len(docs) for docs in top_ranked.values()]
+            if top_ranked is not None
+            else None
+        ),
+    }
+
+
+def _combine_partial_statistics(
+    subset_partials: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """The partial statistics of the union of subsets whose ids are distinct."""
+    combined = {}
+    for key, value in subset_partials[0].items():
+        values = [partials[key] for partials in subset_partials]
+        if value is None:
+            combined[key] = None
+        elif isinstance(value, list):
+            combined[key] = [length for lengths in values for length in lengths]
+        else:
+            combined[key] = sum(values)
+    return combined
+
+
+def _retrieval_statistics(partials: dict[str, Any]) -> RetrievalDescriptiveStatistics:
+    """The descriptive statistics of a split from its partial statistics."""
+    query_len = partials["query_lengths"]
+    doc_len = partials["document_lengths"]
+    num_documents = len(doc_len) if doc_len is not None else 0
+    num_queries = len(query_len)
+    qrels_lengths = partials["relevant_docs_lengths"]
+    qrels_per_doc = (
+        partials["num_qrels_non_zero"] / partials["num_queries_with_relevant_docs"]
+        if num_queries
+        else 0
+    )
+
+    instructions_len = partials["instruction_lengths"]
+    if instructions_len is not None:
+        num_instructions = len(instructions_len)
+        average_instruction_length = sum(instructions_len)
+        min_instruction_length = min(instructions_len)
+        max_instruction_length = max(instructions_len)
+        unique_instructions = partials["unique_instructions"]
+    else:
+        num_instructions = None
+        average_instruction_length = None
+        min_instruction_length = None
+        max_instruction_length = None
+        unique_instructions = None
+
+    top_ranked_per_query = partials["top_ranked_lengths"]
+    if top_ranked_per_query is not None and num_queries:
+        num_top_ranked = len(top_ranked_per_query)
+        min_top_ranked_per_query = min(top_ranked_per_query)
+        average_top_ranked_per_query = sum(top_ranked_per_query) / num_queries
+        max_top_ranked_per_query = max(top_ranked_per_query)
+    else:
+        num_top_ranked = None
+        min_top_ranked_per_query = None
+        average_top_ranked_per_query = None
+        max_top_ranked_per_query = None
+
+    return RetrievalDescriptiveStatistics(
+        num_samples=num_documents + num_queries,
+        number_of_characters=sum(query_len) + sum(doc_len),
+        # documents
+        num_documents=num_documents,
+        min_document_length=min(doc_len),
+        average_document_length=sum(doc_len) / num_documents,
+        max_document_length=max(doc_len),
+        unique_documents=partials["unique_documents"],
+        # queries
+        num_queries=num_queries,
+        min_query_length=min(query_len),
+        average_query_length=sum(query_len) / num_queries,
+        max_query_length=max(query_len),
+        unique_queries=partials["unique_queries"],
+        none_queries=partials["none_queries"],
+        # relevant docs
+        num_relevant_docs=partials["num_relevant_docs"],
+        min_relevant_docs_per_query=min(qrels_lengths),
+        average_relevant_docs_per_query=qrels_per_doc,
+        max_relevant_docs_per_query=max(qrels_lengths),
+        unique_relevant_docs=partials["unique_relevant_docs"],
+        # instructions
+        num_instructions=num_instructions,
+        min_instruction_length=min_instruction_length,
+        average_instruction_length=average_instruction_length,
+        max_instruction_length=max_instruction_length,
+        unique_instructions=unique_instructions,
+        # top ranked
+        num_top_ranked=num_top_ranked,
+        min_top_ranked_per_query=min_top_ranked_per_query,
+        average_top_ranked_per_query=average_top_ranked_per_query,
+        max_top_ranked_per_query=max_top_ranked_per_query,
+    )
+
+
 def process_docs(
     collection: dict[str, dict[str, dict[str, str] | str]], hf_subset: str, split: str
 ) -> dict[str, str]:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from collections import Counter, defaultdict
+from collections import Counter
 from typing import Any
 
 import numpy as np
@@ -15,6 +15,7 @@ from ...evaluation.evaluators import (
     ImagelogRegClassificationEvaluator,
 )
 from ..AbsTask import AbsTask, ScoresDict
+from ..sampling import undersample_indices
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
@@ -134,15 +135,17 @@ class AbsTaskImageClassification(AbsTask):
         model,
         eval_split: str = "test",
         train_split: str = "train",
+        subsets_to_run: list[HFSubset] | None = None,
         *,
         encode_kwargs: dict[str, Any],
         **kwargs,
     ) -> dict[HFSubset, ScoresDict]:
-        if not self.data_loaded:
-            self.load_data()
+        self._load_data_to_evaluate(eval_split, subsets_to_run)
 
         scores = {}
         hf_subsets = self.hf_subsets
+        if subsets_to_run is not None:
+            hf_subsets = [s for s in hf_subsets if s in subsets_to_run]
 
         for hf_subset in hf_subsets:
             logger.info(
@@ -246,15 +249,9 @@ class AbsTaskImageClassification(AbsTask):
         self.np_rng.shuffle(idxs)
         if not isinstance(idxs, list):
             idxs = idxs.tolist()
-        label_counter = defaultdict(int)
-        selected_indices = []
-
-        labels = dataset_split[label_column_name]
-        for i in idxs:
-            label = labels[i]
-            if label_counter[label] < samples_per_label:
-                selected_indices.append(i)
-                label_counter[label] += 1
+        selected_indices = undersample_indices(
+            dataset_split[label_column_name], idxs, samples_per_label
+        )
 
         undersampled_dataset = dataset_split.select(selected_indices)
         return (
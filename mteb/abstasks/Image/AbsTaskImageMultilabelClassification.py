@@ -177,15 +177,17 @@ class AbsTaskImageMultilabelClassification(AbsTask):
         model: Encoder,
         eval_split: str = "test",
         train_split: str = "train",
+        subsets_to_run: list[HFSubset] | None = None,
         *,
         encode_kwargs: dict[str, Any],
         **kwargs: Any,
     ) -> dict[HFSubset, ScoresDict]:
-        if not self.data_loaded:
-            self.load_data()
+        self._load_data_to_evaluate(eval_split, subsets_to_run)
 
         scores = {}
         hf_subsets = self.hf_subsets
+        if subsets_to_run is not None:
+            hf_subsets = [s for s in hf_subsets if s in subsets_to_run]
 
         for hf_subset in hf_subsets:
             logger.info(
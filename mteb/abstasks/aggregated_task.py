@@ -94,12 +94,16 @@ class AbsTaskAggregate(AbsTask):
             kg_co2_emissions = np.nan
         else:
             kg_co2_emissions = sum(kg_co2_emissions_)
+        carbon_intensities = {tr.carbon_intensity for tr in task_results}
 
         task_res = TaskResult.from_task_results(
             self,
             scores=self.task_results_to_scores(task_results),
             evaluation_time=eval_time,
             kg_co2_emissions=kg_co2_emissions,
+            carbon_intensity=carbon_intensities.pop()
+            if len(carbon_intensities) == 1
+            else None,
         )
         mteb_versions = {tr.mteb_version for tr in task_results}
         if len(mteb_versions) != 1:
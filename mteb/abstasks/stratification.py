@@ -102,34 +102,33 @@ def _fold_tie_break(
         return random_state.choice(M_prim, 1)[0]
 
 
-def _get_most_desired_combination(samples_with_combination: dict):
+def _get_most_desired_combination(
+    number_of_labels: np.ndarray, support_sizes: np.ndarray
+) -> int | None:
     """Select the next most desired combination whose evidence should be split among folds
 
     Args:
-        samples_with_combination : dict[Combination, list[int]], :code:`(n_combinations)`
-            map from each label combination present in y to list of sample indexes that have this combination assigned
+        number_of_labels: np.array(int), :code:`(n_combinations)` the number of distinct labels of every combination
+        support_sizes: np.array(int), :code:`(n_combinations)` the number of unassigned samples with every combination
 
     Returns:
-        Combination, the combination to split next
+        int, the index of the combination to split next, or None if all the samples are assigned
     """
-    currently_chosen = None
-    best_number_of_combinations, best_support_size = None, None
-
-    for combination, evidence in samples_with_combination.items():
-        number_of_combinations, support_size = (len(set(combination)), len(evidence))
-        if support_size == 0:
-            continue
-        if currently_chosen is None or (
-            best_number_of_combinations < number_of_combinations  # type: ignore
-            and best_support_size > support_size  # type: ignore
-        ):
-            currently_chosen = combination
-            best_number_of_combinations, best_support_size = (
-                number_of_combinations,
-                support_size,
-            )
-
-    return currently_chosen
+    candidates = np.flatnonzero(support_sizes > 0)
+    if len(candidates) == 0:
+        return None
+    # Scanning the combinations in order, the chosen combination is replaced by a later one with more labels and a smaller
+    # support. As the number of labels increases, there are at most `order` replacements.
+    currently_chosen = candidates[0]
+    while True:
+        better = candidates[
+            (candidates > currently_chosen)
+            & (number_of_labels[candidates] > number_of_labels[currently_chosen])
+            & (support_sizes[candidates] < support_sizes[currently_chosen])
+        ]
+        if len(better) == 0:
+            return int(currently_chosen)
+        currently_chosen = better[0]
 
 
 class IterativeStratification(_BaseKFold):
@@ -200,7 +199,7 @@ class IterativeStratification(_BaseKFold):
             - rows_used : dict[int, bool], :code:`(n_samples)` boolean map from a given sample index to boolean value whether it has been already assigned to a fold or not
             - all_combinations :  list[Combination], :code:`(n_combinations)` list of all label combinations of order self.order present in y
             - per_row_combinations : list[Combination], :code:`(n_samples)` list of all label combinations of order self.order present in y per row
-            - samples_with_combination : dict[Combination, list[int]], :code:`(n_combinations)` map from each label combination present in y to list of sample indexes that have this combination assigned
+            - samples_with_combination : dict[Combination, dict[int, None]], :code:`(n_combinations)` map from each label combination present in y to the (ordered) set of sample indexes that have this combination assigned
             - folds: list[list[int]] (n_splits) list of lists to be populated with samples
         """
         self.n_samples, self.n_labels = y.shape
@@ -222,13 +221,24 @@ class IterativeStratification(_BaseKFold):
                 label_assignment, self.order
             ):
                 if combination not in samples_with_combination:
-                    samples_with_combination[combination] = []
+                    samples_with_combination[combination] = {}
 
-                samples_with_combination[combination].append(sample_index)
+                samples_with_combination[combination][sample_index] = None
                 all_combinations.append(combination)
                 per_row_combinations[sample_index].append(combination)
 
         all_combinations = [list(x) for x in set(all_combinations)]
+        self._combination_index = {
+            combination: i for i, combination in enumerate(samples_with_combination)
+        }
+        self._number_of_labels = np.array(
+            [len(set(combination)) for combination in samples_with_combination],
+            dtype=np.int64,
+        )
+        self._support_sizes = np.array(
+            [len(evidence) for evidence in samples_with_combination.values()],
+            dtype=np.int64,
+        )
 
         self.desired_samples_per_combination_per_fold = {
             combination: np.array(
@@ -256,30 +266,40 @@ class IterativeStratification(_BaseKFold):
         For params, see documentation of :code:`self._prepare_stratification`. Does not return anything,
         modifies params.
         """
-        l = _get_most_desired_combination(samples_with_combination)
+        combinations = list(samples_with_combination)
+        l = _get_most_desired_combination(self._number_of_labels, self._support_sizes)
         while l is not None:
-            while len(samples_with_combination[l]) > 0:
-                row = samples_with_combination[l].pop()
+            combination = combinations[l]
+            while len(samples_with_combination[combination]) > 0:
+                row, _ = samples_with_combination[combination].popitem()
+                self._support_sizes[l] -= 1
                 if rows_used[row]:
                     continue
 
-                max_val = max(self.desired_samples_per_combination_per_fold[l])
+                max_val = max(
+                    self.desired_samples_per_combination_per_fold[combination]
+                )
                 M = np.where(
-                    np.array(self.desired_samples_per_combination_per_fold[l])
+                    np.array(self.desired_samples_per_combination_per_fold[combination])
                     == max_val
                 )[0]
                 m = _fold_tie_break(
-                    self.desired_samples_per_combination_per_fold[l], M, self._rng_state
+                    self.desired_samples_per_combination_per_fold[combination],
+                    M,
+                    self._rng_state,
                 )
                 folds[m].append(row)
                 rows_used[row] = True
                 for i in per_row_combinations[row]:
                     if row in samples_with_combination[i]:
-                        samples_with_combination[i].remove(row)
+                        del samples_with_combination[i][row]
+                        self._support_sizes[self._combination_index[i]] -= 1
                     self.desired_samples_per_combination_per_fold[i][m] -= 1
                 self.desired_samples_per_fold[m] -= 1
 
-            l = _get_most_desired_combination(samples_with_combination)
+            l = _get_most_desired_combination(
+                self._number_of_labels, self._support_sizes
+            )
 
     def _distribute_negative_evidence(self, rows_used, folds):
         """Internal method to distribute evidence for unlabeled samples across folds
@@ -0,0 +1,141 @@
+"""Columnar descriptive statistics of the tasks, computed with polars for all the subsets of a split in one grouped pass.
+
+The columns of Hugging Face datasets are read zero-copy from their Arrow data, such that the texts are never converted to Python
+objects. The statistics of the whole split are derived from the per-subset partials, apart from the unique values, which are
+counted once over the columns of all the subsets.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import polars as pl
+from datasets import Dataset
+
+from .TaskMetadata import HFSubset
+
+SUBSET_COLUMN = "hf_subset"
+
+
+def to_series(dataset: Dataset | dict[str, Sequence[Any]], column: str) -> pl.Series:
+    """A column of a dataset as a polars series, read from the Arrow data of Hugging Face datasets."""
+    if isinstance(dataset, Dataset):
+        return pl.Series(column, pl.from_arrow(dataset.with_format("arrow")[column]))
+    return pl.Series(column, list(dataset[column]))
+
+
+def subsets_frame(columns: dict[HFSubset, dict[str, pl.Series]]) -> pl.DataFrame:
+    """The columns of all the subsets stacked in one frame, with the subset of every row in the `hf_subset` column."""
+    return pl.concat(
+        [
+            pl.DataFrame(subset_columns).with_columns(
+                pl.lit(hf_subset).alias(SUBSET_COLUMN)
+            )
+            for hf_subset, subset_columns in columns.items()
+        ],
+        how="vertical_relaxed",
+    )
+
+
+def text_statistics(
+    frame: pl.DataFrame, column: str
+) -> tuple[dict[HFSubset, dict[str, int]], dict[str, int]]:
+    """The number of texts, their total, minimal and maximal length and the number of unique texts of every subset and of
+    all the subsets, as `num_texts`, `total_length`, `min_length`, `max_length` and `unique_texts`.
+    """
+    length = pl.col(column).str.len_chars()
+    partials = frame.group_by(SUBSET_COLUMN, maintain_order=True).agg(
+        num_texts=pl.len(),
+        total_length=length.sum(),
+        min_length=length.min(),
+        max_length=length.max(),
+        unique_texts=pl.col(column).n_unique(),
+    )
+    per_subset = {row.pop(SUBSET_COLUMN): row for row in partials.iter_rows(named=True)}
+    overall = {
+        "num_texts": sum(stats["num_texts"] for stats in per_subset.values()),
+        "total_length": sum(stats["total_length"] for stats in per_subset.values()),
+        "min_length": min(stats["min_length"] for stats in per_subset.values()),
+        "max_length": max(stats["max_length"] for stats in per_subset.values()),
+        "unique_texts": frame[column].n_unique(),
+    }
+    return per_subset, overall
+
+
+def label_statistics(
+    frame: pl.DataFrame, column: str
+) -> tuple[dict[HFSubset, dict[str, Any]], dict[str, Any]]:
+    """The number of labels per text (`num_labels`, `min_labels`, `max_labels`) and the count of every label (`labels`, in
+    the order of their first occurrence) of every subset and of all the subsets.
+
+    The labels are either single labels or lists of labels, where a text without labels counts as a `None` label. String
+    labels are split into characters, as the statistics of the classification tasks always did.
+    """
+    labels = pl.col(column)
+    dtype = frame.schema[column]
+    if dtype == pl.String:
+        labels = labels.str.split("")
+    elif not isinstance(dtype, pl.List):
+        labels = pl.concat_list(labels)
+    frame = frame.select(SUBSET_COLUMN, labels.alias(column))
+
+    partials = frame.group_by(SUBSET_COLUMN, maintain_order=True).agg(
+        num_labels=pl.col(column).list.len().sum(),
+        min_labels=pl.col(column).list.len().min(),
+        max_labels=pl.col(column).list.len().max(),
+    )
+    per_subset = {
+        row.pop(SUBSET_COLUMN): {**row, "labels": {}}
+        for row in partials.iter_rows(named=True)
+    }
+    # an empty list of labels counts as a null label. It is replaced before exploding, as whether `explode` keeps empty lists
+    # as null rows depends on the polars version
+    counts = (
+        frame.with_columns(
+            pl.when(pl.col(column).list.len() == 0)
+            .then(pl.concat_list(pl.lit(None, dtype=frame.schema[column].inner)))
+            .otherwise(pl.col(column))
+            .alias(column)
+        )
+        .explode(column)
+        .group_by(SUBSET_COLUMN, column, maintain_order=True)
+        .len()
+    )
+    overall = {
+        "num_labels": sum(stats["num_labels"] for stats in per_subset.values()),
+        "min_labels": min(stats["min_labels"] for stats in per_subset.values()),
+        "max_labels": max(stats["max_labels"] for stats in per_subset.values()),
+        "labels": {},
+    }
+    for hf_subset, label, count in counts.iter_rows():
+        per_subset[hf_subset]["labels"][label] = count
+        overall["labels"][label] = overall["labels"].get(label, 0) + count
+    return per_subset, overall
+
+
+def intersection_sizes(
+    frame: pl.DataFrame, other: pl.DataFrame, column: str
+) -> tuple[dict[HFSubset, int], int]:
+    """The number of unique texts of every subset of `frame` that are in the same subset of `other`, and the number of unique
+    texts of `frame` that are in `other`, e.g. the test texts that are also training texts.
+    """
+    unique = frame.select(SUBSET_COLUMN, column).unique(maintain_order=True)
+    per_subset = dict.fromkeys(frame[SUBSET_COLUMN].unique(maintain_order=True), 0)
+    per_subset.update(
+        unique.join(
+            other.select(SUBSET_COLUMN, column).unique(),
+            on=[SUBSET_COLUMN, column],
+            how="semi",
+        )
+        .group_by(SUBSET_COLUMN)
+        .len()
+        .iter_rows()
+    )
+    overall = (
+        frame.select(column)
+        .unique()
+        .join(other.select(column).unique(), on=column, how="semi")
+        .height
+    )
+    return per_subset, overall
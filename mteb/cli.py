@@ -6,6 +6,7 @@
 - `mteb available_tasks`: Lists the available tasks within MTEB
 - `mteb available_benchmarks`: Lists the available benchmarks
 - `mteb create_meta`: Creates the metadata for a model card from a folder of results
+- `mteb benchmark_encoder`: Measures the encoding throughput of a model for a sweep of batch sizes and dtypes
 
 In the following we outline some sample use cases, but if you want to learn more about the arguments for each command you can run:
 
@@ -46,6 +47,23 @@ mteb available_benchmarks # list all available benchmarks
 ```
 
 
+## Benchmarking the Encoding Throughput
+
+To pick the batch size of a model before running it on tasks, use the `mteb benchmark_encoder` command. For example:
+
+```bash
+mteb benchmark_encoder -m sentence-transformers/all-MiniLM-L6-v2 \
+         --batch_sizes 16 32 64 128 \
+         --dtypes float32 float16 \
+         --text_lengths 16 64 256
+```
+
+This encodes synthetic texts of about 16, 64 and 256 words (or texts sampled from a task with `--task`) with every batch size and
+dtype, prints the throughput (texts/s, tokens/s), the latency percentiles and the peak memory, and saves the report with the
+recommended `encode_kwargs` to `{output_folder}/{model_name}/{model_revision}/encoder_benchmark.json`. The recommended batch size
+can then be passed to `mteb run --batch_size`.
+
+
 ## Creating Model Metadata
 
 Once a model is run you can create the metadata for a model card from a folder of results, use the `mteb create_meta` command. For example:
@@ -93,6 +111,8 @@ import torch
 
 import mteb
 from mteb.create_meta import generate_readme
+from mteb.encoder_benchmark import benchmark_encoder as _benchmark_encoder
+from mteb.encoder_benchmark import format_report
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -160,6 +180,8 @@ def run(args: argparse.Namespace) -> None:
         overwrite_results=args.overwrite,
         encode_kwargs=encode_kwargs,
         save_predictions=save_predictions,
+        predictions_format=getattr(args, "predictions_format", "json"),
+        profile=getattr(args, "profile", False),
     )
 
     _save_model_metadata(model, Path(args.output_folder))
@@ -292,9 +314,9 @@ def add_run_parser(subparsers) -> None:
     )
     parser.add_argument(
         "--batch_size",
-        type=int,
+        type=lambda value: value if value == "auto" else int(value),
         default=None,
-        help="Batch size of the encode. Will be passed to the MTEB as MTEB.evaluate(model, encode_kwargs = {'batch_size': value}).",
+        help="Batch size of the encode. Will be passed to the MTEB as MTEB.evaluate(model, encode_kwargs = {'batch_size': value}). Use 'auto' to form the batches by token count for Sentence Transformers models, other models then use a batch size of 32.",
     )
     parser.add_argument(
         "--overwrite",
@@ -308,6 +330,19 @@ def add_run_parser(subparsers) -> None:
         default=False,
         help="For retrieval tasks. Saves the predictions file in output_folder.",
     )
+    parser.add_argument(
+        "--predictions_format",
+        type=str,
+        choices=["json", "parquet", "trec"],
+        default="json",
+        help="For retrieval tasks. The format of the predictions saved with --save_predictions: JSON, Parquet or a TREC run.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Records the time spent in every stage of the evaluation in the results and saves a Chrome trace of every task in output_folder.",
+    )
 
     parser.set_defaults(func=run)
 
@@ -362,6 +397,105 @@ def add_create_meta_parser(subparsers) -> None:
     parser.set_defaults(func=create_meta)
 
 
+def benchmark_encoder(args: argparse.Namespace) -> None:
+    if args.device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    else:
+        device = args.device
+
+    model = mteb.get_model(args.model, args.model_revision, device=device)
+    task = mteb.get_task(args.task) if args.task is not None else None
+
+    report = _benchmark_encoder(
+        model,
+        batch_sizes=args.batch_sizes,
+        dtypes=args.dtypes,
+        text_lengths=args.text_lengths,
+        n_texts=args.n_texts,
+        task=task,
+    )
+    print(format_report(report))
+
+    meta = model.mteb_model_meta  # type: ignore
+    revision = meta.revision if meta.revision is not None else "no_revision_available"
+    save_path = (
+        Path(args.output_folder)
+        / meta.model_name_as_path()
+        / revision
+        / "encoder_benchmark.json"
+    )
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    with save_path.open("w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Saved the report to {save_path}")
+
+
+def add_benchmark_encoder_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "benchmark_encoder",
+        aliases=["benchmark-encoder"],
+        help="Measure the encoding throughput of a model for a sweep of batch sizes and dtypes",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--model",
+        type=str,
+        help="Model to use. Will priotize model implementation in MTEB's model registry, but default to loading the model using sentence-transformers.",
+    )
+    parser.add_argument(
+        "--model_revision",
+        type=str,
+        default=None,
+        help="Revision of the model to be loaded.",
+    )
+    parser.add_argument(
+        "--device", type=int, default=None, help="Device to use for computation"
+    )
+    parser.add_argument(
+        "--batch_sizes",
+        nargs="+",
+        type=int,
+        default=[8, 16, 32, 64, 128, 256],
+        help="Batch sizes to benchmark. Larger batch sizes are skipped once a batch size runs out of memory.",
+    )
+    parser.add_argument(
+        "--dtypes",
+        nargs="+",
+        type=str,
+        choices=["float32", "float16", "bfloat16"],
+        default=["float32"],
+        help="Dtypes to which the model is cast.",
+    )
+    parser.add_argument(
+        "--text_lengths",
+        nargs="+",
+        type=int,
+        default=[16, 64, 256],
+        help="Mean lengths of the texts in words.",
+    )
+    parser.add_argument(
+        "--n_texts",
+        type=int,
+        default=512,
+        help="Number of texts encoded for every text length, dtype and batch size.",
+    )
+    parser.add_argument(
+        "--task",
+        type=str,
+        default=None,
+        help="Task from which the texts are sampled. If not set, synthetic texts are used.",
+    )
+    parser.add_argument(
+        "--output_folder",
+        type=str,
+        default="results",
+        help="Output directory for the report. Will default to `results` if not set.",
+    )
+
+    parser.set_defaults(func=benchmark_encoder)
+
+
 def main():
     parser = argparse.ArgumentParser(description="The MTEB Command line interface.")
 
@@ -372,6 +506,7 @@ def main():
     add_available_tasks_parser(subparsers)
     add_available_benchmarks_parser(subparsers)
     add_create_meta_parser(subparsers)
+    add_benchmark_encoder_parser(subparsers)
 
     args = parser.parse_args()
     args.func(args)
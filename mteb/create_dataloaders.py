@@ -11,6 +11,26 @@ from mteb.types import BatchedInput, Conversation
 
 logger = logging.getLogger(__name__)
 
+# the batch size with `batch_size="auto"` of the inputs batched by a dataloader, e.g. images, or of the models without
+# adaptive batching, which only batches texts by their number of tokens (see `mteb.models.adaptive_batching`)
+DEFAULT_BATCH_SIZE = 32
+ADAPTIVE_BATCHING_KWARGS = ("token_budget", "memory_budget_mb")
+
+
+def static_batch_size(encode_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """The encode kwargs with an integer batch size: with `batch_size="auto"`, the batch size is `DEFAULT_BATCH_SIZE` and
+    the arguments of the adaptive batching are removed.
+    """
+    if encode_kwargs.get("batch_size") != "auto":
+        return encode_kwargs
+    resolved = {
+        key: value
+        for key, value in encode_kwargs.items()
+        if key not in ADAPTIVE_BATCHING_KWARGS
+    }
+    resolved["batch_size"] = DEFAULT_BATCH_SIZE
+    return resolved
+
 
 def create_dataloader_from_texts(
     text: list[str], **dataloader_kwargs
@@ -0,0 +1,348 @@
+"""Measures the encoding throughput of a model for a sweep of batch sizes and dtypes.
+
+Texts of controlled lengths, synthetic or sampled from a task, are encoded batch by batch, recording the latency of every
+batch, the throughput in texts and tokens per second and the peak memory. The batch size with the best throughput, which
+did not run out of memory for any text length, is recommended as `encode_kwargs`.
+
+Example:
+    >>> import mteb
+    >>> from mteb.encoder_benchmark import benchmark_encoder
+    >>> model = mteb.get_model("sentence-transformers/all-MiniLM-L6-v2")
+    >>> report = benchmark_encoder(model, text_lengths=[16, 256], batch_sizes=[16, 64, 256])
+    >>> report["recommended_encode_kwargs"]
+    {'batch_size': 64}
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import torch
+from datasets import Dataset
+
+from mteb.abstasks.AbsTask import AbsTask
+from mteb.abstasks.AbsTaskRetrieval import AbsTaskRetrieval
+from mteb.abstasks.TaskMetadata import TaskMetadata
+from mteb.create_dataloaders import create_dataloader_from_texts
+from mteb.encoder_interface import Encoder
+from mteb.models.adaptive_batching import is_oom_error
+from mteb.overview import get_task
+from mteb.profiling import RSSWatermark
+
+logger = logging.getLogger(__name__)
+
+_WORDS = np.array(
+    "the of and to in a is that for it as was with be by on not he this are or his from at which but have an they "
+    "you were her she there been one all we their has would when if so no what can more out other up time into only "
+    "language model embedding retrieval document query sentence benchmark evaluation representation".split()
+)
+_TEXT_COLUMNS = ("text", "sentence1", "sentence2", "sentences")
+_DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+}
+
+
+def synthetic_texts(n_texts: int, mean_length: int, seed: int = 42) -> list[str]:
+    """Random texts with a log-normal number of words around `mean_length`, similar to the lengths of natural datasets."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.lognormal(np.log(mean_length), 0.5, size=n_texts)
+    lengths = np.clip(np.round(lengths), 1, None).astype(int)
+    return [" ".join(rng.choice(_WORDS, size=length)) for length in lengths]
+
+
+def _task_texts(task: AbsTask) -> list[str]:
+    """All the texts of a task, i.e. the corpus and queries for retrieval and the text columns of the other tasks."""
+    task.load_data()
+    texts: list[str] = []
+
+    def collect(data: Any) -> None:
+        if isinstance(data, str):
+            texts.append(data)
+        elif isinstance(data, dict) and "text" in data:
+            texts.append(f"{data.get('title') or ''} {data['text']}".strip())
+        elif isinstance(data, dict):
+            for value in data.values():
+                collect(value)
+        elif isinstance(data, Dataset):
+            for column in _TEXT_COLUMNS:
+                if column in data.column_names:
+                    collect(data[column])
+        elif isinstance(data, (list, tuple)):
+            for value in data:
+                collect(value)
+
+    if isinstance(task, AbsTaskRetrieval):
+        collect(task.corpus)
+        collect(task.queries)
+    else:
+        collect(task.dataset)
+    return texts
+
+
+def task_texts(
+    task: AbsTask, n_texts: int, text_lengths: Sequence[int], seed: int = 42
+) -> dict[int, list[str]]:
+    """Samples `n_texts` texts of the task around every length in words.
+
+    The texts of the task are assigned to the closest of the `text_lengths`, such that the sweep covers the length
+    distribution of the task. Lengths without texts in the task are dropped.
+    """
+    texts = _task_texts(task)
+    if not texts:
+        raise ValueError(f"No texts found in {task.metadata.name}")
+    lengths = np.array([len(text.split()) for text in texts])
+    targets = np.array(text_lengths)
+    closest = np.abs(lengths[:, None] - targets[None, :]).argmin(axis=1)
+
+    rng = np.random.default_rng(seed)
+    sampled = {}
+    for i, length in enumerate(text_lengths):
+        candidates = np.flatnonzero(closest == i)
+        if len(candidates) == 0:
+            logger.warning(f"No texts of about {length} words in {task.metadata.name}")
+            continue
+        idxs = rng.choice(candidates, size=n_texts, replace=len(candidates) < n_texts)
+        sampled[length] = [texts[idx] for idx in idxs]
+    return sampled
+
+
+def _torch_module(model: Encoder) -> torch.nn.Module | None:
+    """The torch module of a local model, e.g. the SentenceTransformer of a `SentenceTransformerWrapper`."""
+    for candidate in (model, getattr(model, "model", None)):
+        if isinstance(candidate, torch.nn.Module):
+            return candidate
+    return None
+
+
+def _count_tokens(model: Encoder, texts: list[str]) -> tuple[int, bool]:
+    """The number of tokens seen by the model, truncated to its max sequence length, or the number of words if the model
+    has no tokenizer. Returns the count and whether it is an exact token count.
+    """
+    module = _torch_module(model)
+    tokenizer = getattr(module, "tokenizer", None)
+    if tokenizer is None or not callable(tokenizer):
+        return sum(len(text.split()) for text in texts), False
+    max_length = getattr(module, "max_seq_length", None) or float("inf")
+    input_ids = tokenizer(texts, add_special_tokens=True)["input_ids"]
+    return int(sum(min(len(ids), max_length) for ids in input_ids)), True
+
+
+def _encode_batches(
+    model: Encoder,
+    texts: list[str],
+    batch_size: int,
+    task_metadata: TaskMetadata,
+) -> tuple[list[float], float | None]:
+    """Encodes the texts batch by batch and returns the latency of every batch and the peak RSS in MB."""
+    latencies = []
+    # sampled during the encode calls, as the memory of their activations is released before they return
+    with RSSWatermark() as watermark:
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start : start + batch_size]
+            begin = time.perf_counter()
+            model.encode(
+                create_dataloader_from_texts(batch, batch_size=batch_size),
+                task_metadata=task_metadata,
+                hf_split="test",
+                hf_subset="default",
+                batch_size=batch_size,
+            )
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            latencies.append(time.perf_counter() - begin)
+    return latencies, watermark.peak_mb
+
+
+def _benchmark_configuration(
+    model: Encoder,
+    texts: list[str],
+    batch_size: int,
+    task_metadata: TaskMetadata,
+    n_tokens: int,
+) -> dict[str, Any]:
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+        torch.cuda.reset_peak_memory_stats()
+    # warm up, e.g. the lazy initialization of the kernels
+    _encode_batches(model, texts[:batch_size], batch_size, task_metadata)
+    latencies, peak_rss = _encode_batches(model, texts, batch_size, task_metadata)
+
+    total_time = sum(latencies)
+    result = {
+        "texts_per_second": len(texts) / total_time,
+        "tokens_per_second": n_tokens / total_time,
+        "latency_p50": float(np.percentile(latencies, 50)),
+        "latency_p90": float(np.percentile(latencies, 90)),
+        "latency_p99": float(np.percentile(latencies, 99)),
+        "peak_rss_mb": peak_rss,
+    }
+    if torch.cuda.is_available():
+        result["peak_gpu_memory_mb"] = torch.cuda.max_memory_allocated() / 1024**2
+    return result
+
+
+def _recommend(
+    results: list[dict[str, Any]],
+) -> tuple[str | None, int | None]:
+    """The dtype and batch size with the best throughput relative to the best throughput of every text length (geometric
+    mean), among the configurations which never ran out of memory.
+    """
+    best_per_length: dict[int, float] = {}
+    for result in results:
+        if not result["oom"]:
+            best_per_length[result["text_length"]] = max(
+                best_per_length.get(result["text_length"], 0.0),
+                result["texts_per_second"],
+            )
+
+    scores: dict[tuple[str, int], list[float]] = {}
+    failed = set()
+    for result in results:
+        key = (result["dtype"], result["batch_size"])
+        if result["oom"]:
+            failed.add(key)
+            continue
+        relative = result["texts_per_second"] / best_per_length[result["text_length"]]
+        scores.setdefault(key, []).append(relative)
+
+    candidates = {
+        key: float(np.exp(np.mean(np.log(values))))
+        for key, values in scores.items()
+        if key not in failed and len(values) == len(best_per_length)
+    }
+    if not candidates:
+        return None, None
+    return max(candidates, key=lambda key: candidates[key])
+
+
+def benchmark_encoder(
+    model: Encoder,
+    batch_sizes: Sequence[int] = (8, 16, 32, 64, 128, 256),
+    dtypes: Sequence[str] = ("float32",),
+    text_lengths: Sequence[int] = (16, 64, 256),
+    n_texts: int = 512,
+    task: AbsTask | None = None,
+    seed: int = 42,
+) -> dict[str, Any]:
+    """Measures the throughput, latency and peak memory of the model for every text length, dtype and batch size.
+
+    Args:
+        model: The model to benchmark.
+        batch_sizes: The batch sizes to sweep. For every text length and dtype, larger batch sizes are skipped once a batch
+            size runs out of memory.
+        dtypes: The dtypes ("float32", "float16" or "bfloat16") to which the torch module of the model is cast. Models
+            without a torch module, e.g. APIs, are only benchmarked in their own dtype (reported as "float32").
+        text_lengths: The (mean) lengths of the texts in words.
+        n_texts: The number of texts encoded for every configuration.
+        task: If given, the texts are sampled from the task instead of generated, its metadata is passed to encode.
+        seed: The seed of the generation or the sampling of the texts.
+
+    Returns:
+        A report with the "results" of every configuration, the "recommended_encode_kwargs" and the "recommended_dtype".
+        The throughput in tokens per second is computed using the tokenizer of the model if available, otherwise words are
+        counted, as stored in "token_count".
+    """
+    if task is not None:
+        texts_per_length = task_texts(task, n_texts, text_lengths, seed)
+        task_metadata = task.metadata
+    else:
+        texts_per_length = {
+            length: synthetic_texts(n_texts, length, seed + i)
+            for i, length in enumerate(text_lengths)
+        }
+        task_metadata = get_task("STSBenchmark").metadata
+
+    module = _torch_module(model)
+    original_dtype = next(module.parameters()).dtype if module is not None else None
+    if module is None and set(dtypes) != {"float32"}:
+        logger.warning(
+            "The model has no torch module to cast, benchmarking it in its own dtype only"
+        )
+        dtypes = ["float32"]
+
+    results = []
+    exact_tokens = True
+    try:
+        for dtype in dtypes:
+            if module is not None:
+                module.to(_DTYPES[dtype])
+            for length, texts in texts_per_length.items():
+                n_tokens, exact = _count_tokens(model, texts)
+                exact_tokens &= exact
+                for batch_size in sorted(batch_sizes):
+                    result = {
+                        "text_length": length,
+                        "dtype": dtype,
+                        "batch_size": batch_size,
+                        "oom": False,
+                    }
+                    try:
+                        result.update(
+                            _benchmark_configuration(
+                                model, texts, batch_size, task_metadata, n_tokens
+                            )
+                        )
+                    except Exception as e:
+                        if not is_oom_error(e):
+                            raise
+                        logger.warning(
+                            f"Out of memory with {dtype} and batch size {batch_size} for {length} words"
+                        )
+                        if torch.cuda.is_available():
+                            torch.cuda.empty_cache()
+                        result["oom"] = True
+                    results.append(result)
+                    if result["oom"]:
+                        break
+    finally:
+        if module is not None:
+            module.to(original_dtype)
+
+    dtype, batch_size = _recommend(results)
+    meta = getattr(model, "mteb_model_meta", None)
+    return {
+        "model_name": meta.name if meta is not None else None,
+        "revision": meta.revision if meta is not None else None,
+        "device": "cuda" if torch.cuda.is_available() else "cpu",
+        "texts": task.metadata.name if task is not None else "synthetic",
+        "n_texts": n_texts,
+        "token_count": "tokens" if exact_tokens else "words",
+        "results": results,
+        "recommended_encode_kwargs": {"batch_size": batch_size}
+        if batch_size is not None
+        else {},
+        "recommended_dtype": dtype,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """The results of `benchmark_encoder` as a table."""
+    unit = report["token_count"]
+    lines = [
+        f"{'length':>7}{'dtype':>10}{'batch':>7}{'texts/s':>10}{unit + '/s':>11}"
+        f"{'p50 (s)':>9}{'p99 (s)':>9}{'memory (MB)':>13}"
+    ]
+    for result in report["results"]:
+        line = (
+            f"{result['text_length']:>7}{result['dtype']:>10}{result['batch_size']:>7}"
+        )
+        if result["oom"]:
+            lines.append(line + f"{'out of memory':>20}")
+            continue
+        memory = result.get("peak_gpu_memory_mb", result["peak_rss_mb"])
+        lines.append(
+            line
+            + f"{result['texts_per_second']:>10.1f}{result['tokens_per_second']:>11.1f}"
+            + f"{result['latency_p50']:>9.3f}{result['latency_p99']:>9.3f}"
+            + (f"{memory:>13.0f}" if memory is not None else f"{'-':>13}")
+        )
+    lines.append(
+        f"Recommended: encode_kwargs={report['recommended_encode_kwargs']}, dtype={report['recommended_dtype']}"
+    )
+    return "\n".join(lines)
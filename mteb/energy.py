@@ -0,0 +1,293 @@
+"""Run-scoped energy and emissions meter of the evaluations.
+
+The hardware is probed once, when the meter is created: the RAPL energy counters of the CPU packages, the NVML counters of the
+GPUs and the CPU time of the process with psutil. While an interval is measured, e.g. the evaluation of a split, a single
+background thread samples the counters and accumulates the energy used by the process. The energy of the interval is the
+difference of the accumulated energy at its end and at its start.
+
+The RAPL and NVML counters measure the whole node, so their energy is shared between the processes running on it: the CPU
+energy in proportion to the CPU time of the process and the energy of a GPU in proportion to the GPU memory used by the
+process. Several evaluations running on the same node are therefore accounted correctly. Without RAPL counters, the CPU power is
+estimated from the CPU time of the process, and the power of the RAM from its RSS, as codecarbon does. The GPUs are only measured
+if `nvidia-ml-py` is installed (`pip install mteb[energy]`).
+
+The emissions are the energy times the carbon intensity of the electricity, which defaults to the world average and is stored
+with the emissions in the results (`TaskResult.carbon_intensity`).
+
+Example:
+    >>> from mteb.energy import EnergyMeter
+    >>> meter = EnergyMeter()
+    >>> with meter.measure("NFCorpus", "test") as measurement:
+    ...     ...
+    >>> measurement.energy_kwh, measurement.kg_co2_emissions
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# about the world average carbon intensity of electricity, in kg CO₂-equivalents per kWh
+DEFAULT_CARBON_INTENSITY = 0.475
+# the power of a CPU whose consumption is not measured, at full load, as the default TDP of codecarbon
+DEFAULT_CPU_WATTS = 85.0
+# the power of the RAM, 3 W per 8 GB, as estimated by codecarbon
+_RAM_WATTS_PER_GB = 3 / 8
+_JOULES_PER_KWH = 3.6e6
+
+
+@dataclass
+class EnergyMeasurement:
+    """The energy used by the process during an interval, e.g. the evaluation of a split of a task."""
+
+    task_name: str
+    hf_split: str | None
+    start: float
+    end: float | None = None
+    energy_kwh: float | None = None
+    kg_co2_emissions: float | None = None
+
+
+class _RaplCounters:
+    """The cumulative energy counters of the CPU packages, read from the powercap interface of Linux."""
+
+    def __init__(self, domains: list[Path]):
+        self.domains = domains
+        self.max_energy_uj = [
+            int((domain / "max_energy_range_uj").read_text()) for domain in domains
+        ]
+        self.last_energy_uj = self._read()
+
+    @classmethod
+    def probe(cls, root: Path) -> _RaplCounters | None:
+        # the packages, e.g. intel-rapl:0, and not their subdomains, e.g. intel-rapl:0:0, which they include
+        domains = sorted(
+            path for path in root.glob("intel-rapl:*") if path.name.count(":") == 1
+        )
+        if not domains:
+            return None
+        try:
+            return cls(domains)
+        except (OSError, ValueError) as e:
+            logger.debug(f"The RAPL counters cannot be read: {e}")
+            return None
+
+    def _read(self) -> list[int]:
+        return [int((domain / "energy_uj").read_text()) for domain in self.domains]
+
+    def joules(self) -> float:
+        """The energy used by the CPU packages since the previous call."""
+        energy_uj = self._read()
+        total = 0
+        for current, last, max_energy in zip(
+            energy_uj, self.last_energy_uj, self.max_energy_uj
+        ):
+            # the counters wrap around at max_energy_range_uj
+            total += current - last if current >= last else current + max_energy - last
+        self.last_energy_uj = energy_uj
+        return total / 1e6
+
+
+class _NvmlCounters:
+    """The energy used by the GPUs, from their cumulative energy counters or else from their power, shared between the
+    processes using them.
+    """
+
+    def __init__(self, pynvml: Any, handles: list[Any]):
+        self.pynvml = pynvml
+        self.handles = handles
+        self.last_energy_mj: list[int | None] = []
+        for handle in handles:
+            try:
+                self.last_energy_mj.append(
+                    pynvml.nvmlDeviceGetTotalEnergyConsumption(handle)
+                )
+            except pynvml.NVMLError:
+                # before Volta, the energy is estimated from the power
+                self.last_energy_mj.append(None)
+
+    def reset(self) -> None:
+        """Reads the energy counters, such that the energy used before is not counted by the next call to `joules`."""
+        for i, handle in enumerate(self.handles):
+            if self.last_energy_mj[i] is None:
+                continue
+            try:
+                self.last_energy_mj[i] = (
+                    self.pynvml.nvmlDeviceGetTotalEnergyConsumption(handle)
+                )
+            except self.pynvml.NVMLError:
+                continue
+
+    @classmethod
+    def probe(cls) -> _NvmlCounters | None:
+        try:
+            import pynvml
+
+            pynvml.nvmlInit()
+            handles = [
+                pynvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+        except Exception as e:
+            logger.debug(f"The NVML counters cannot be read: {e}")
+            return None
+        return cls(pynvml, handles) if handles else None
+
+    def _process_share(self, handle: Any) -> float:
+        """The share of the GPU memory used by the process, among the processes using the GPU."""
+        try:
+            processes = self.pynvml.nvmlDeviceGetComputeRunningProcesses(handle)
+        except self.pynvml.NVMLError:
+            return 1.0
+        if not processes:
+            return 1.0
+        memory = {process.pid: process.usedGpuMemory or 0 for process in processes}
+        if os.getpid() not in memory:
+            # in a container, NVML lists the PIDs of the host, the GPU is assumed to be shared evenly
+            return 1 / len(memory)
+        total = sum(memory.values())
+        return memory[os.getpid()] / total if total else 1 / len(memory)
+
+    def joules(self, elapsed: float) -> float:
+        """The energy used by the process on the GPUs since the previous call, `elapsed` seconds ago."""
+        total = 0.0
+        for i, handle in enumerate(self.handles):
+            try:
+                if self.last_energy_mj[i] is None:
+                    joules = self.pynvml.nvmlDeviceGetPowerUsage(handle) / 1e3 * elapsed
+                else:
+                    energy_mj = self.pynvml.nvmlDeviceGetTotalEnergyConsumption(handle)
+                    joules = (energy_mj - self.last_energy_mj[i]) / 1e3
+                    self.last_energy_mj[i] = energy_mj
+            except self.pynvml.NVMLError:
+                continue
+            total += joules * self._process_share(handle)
+        return total
+
+
+class EnergyMeter:
+    """Measures the energy used by the process and its CO₂ emissions during intervals, e.g. the evaluation of every split.
+
+    Args:
+        interval: The time between two samples of the counters in seconds.
+        carbon_intensity: The carbon intensity of the electricity, in kg CO₂-equivalents per kWh. Defaults to the world average,
+            set it to the carbon intensity of your grid. It is stored with the emissions in the results.
+        cpu_watts: The power of the CPU at full load, used when the RAPL counters cannot be read.
+        rapl_root: The directory of the powercap interface of Linux.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        carbon_intensity: float = DEFAULT_CARBON_INTENSITY,
+        cpu_watts: float = DEFAULT_CPU_WATTS,
+        rapl_root: str | Path = "/sys/class/powercap",
+    ):
+        self.interval = interval
+        self.carbon_intensity = carbon_intensity
+        self.cpu_watts = cpu_watts
+        self.measurements: list[EnergyMeasurement] = []
+
+        self._rapl = _RaplCounters.probe(Path(rapl_root))
+        self._nvml = _NvmlCounters.probe()
+        self._process = psutil.Process(os.getpid())
+        self._n_cpus = psutil.cpu_count() or 1
+        logger.info(
+            f"Measuring the energy of the CPU with {'RAPL' if self._rapl else 'its CPU time'}"
+            f"{' and of the GPUs with NVML' if self._nvml else ''}"
+        )
+
+        self._lock = threading.Lock()
+        self._energy_joules = 0.0
+        self._last_sample: float | None = None
+        self._last_process_cpu = 0.0
+        self._last_system_busy = 0.0
+        self._n_active = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _cpu_times(self) -> tuple[float, float]:
+        """The CPU time of the process and the busy CPU time of the node, in seconds."""
+        process_times = self._process.cpu_times()
+        system_times = psutil.cpu_times()
+        # the time of the virtual machines is also counted as user time
+        not_busy = ("idle", "iowait", "guest", "guest_nice")
+        idle = sum(getattr(system_times, name, 0.0) for name in not_busy)
+        return process_times.user + process_times.system, sum(system_times) - idle
+
+    def _sample(self) -> float:
+        """Accumulates the energy used since the previous sample and returns the accumulated energy in joules."""
+        with self._lock:
+            now = time.perf_counter()
+            process_cpu, system_busy = self._cpu_times()
+            if self._last_sample is not None:
+                elapsed = now - self._last_sample
+                process_cpu_delta = process_cpu - self._last_process_cpu
+                if self._rapl is not None:
+                    system_busy_delta = system_busy - self._last_system_busy
+                    share = (
+                        min(process_cpu_delta / system_busy_delta, 1.0)
+                        if system_busy_delta > 0
+                        else 0.0
+                    )
+                    self._energy_joules += self._rapl.joules() * share
+                else:
+                    self._energy_joules += (
+                        process_cpu_delta * self.cpu_watts / self._n_cpus
+                    )
+                if self._nvml is not None:
+                    self._energy_joules += self._nvml.joules(elapsed)
+                rss_gb = self._process.memory_info().rss / 1024**3
+                self._energy_joules += rss_gb * _RAM_WATTS_PER_GB * elapsed
+            else:
+                # the energy used before the first sample, e.g. while loading the model, is not counted
+                if self._rapl is not None:
+                    self._rapl.joules()
+                if self._nvml is not None:
+                    self._nvml.reset()
+            self._last_sample = now
+            self._last_process_cpu = process_cpu
+            self._last_system_busy = system_busy
+            return self._energy_joules
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    @contextmanager
+    def measure(
+        self, task_name: str, hf_split: str | None = None
+    ) -> Iterator[EnergyMeasurement]:
+        """Measures the energy used while the context is active. The energy and emissions of the measurement are set on exit."""
+        measurement = EnergyMeasurement(task_name, hf_split, start=time.time())
+        start_joules = self._sample()
+        self._n_active += 1
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        try:
+            yield measurement
+        finally:
+            self._n_active -= 1
+            if self._n_active == 0:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+            measurement.end = time.time()
+            measurement.energy_kwh = (self._sample() - start_joules) / _JOULES_PER_KWH
+            measurement.kg_co2_emissions = (
+                measurement.energy_kwh * self.carbon_intensity
+            )
+            self.measurements.append(measurement)
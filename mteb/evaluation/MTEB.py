@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import gc
 import json
 import logging
 import os
 import traceback
 from collections.abc import Iterable
+from contextlib import AbstractContextManager, nullcontext
 from copy import deepcopy
 from datetime import datetime
 from itertools import chain
@@ -13,22 +15,29 @@ from time import time
 from typing import TYPE_CHECKING, Any
 
 import datasets
-from codecarbon import EmissionsTracker
+import torch
 from sentence_transformers import CrossEncoder, SentenceTransformer
 
 import mteb
 from mteb.abstasks.AbsTask import ScoresDict
+from mteb.abstasks.AbsTaskRetrieval import AbsTaskRetrieval
 from mteb.abstasks.aggregated_task import AbsTaskAggregate
 from mteb.encoder_interface import Encoder
+from mteb.energy import EnergyMeter
 from mteb.model_meta import ModelMeta
 from mteb.models import (
     model_meta_from_cross_encoder,
     model_meta_from_sentence_transformers,
 )
+from mteb.models.adaptive_batching import resolve_batch_size
+from mteb.models.bm25 import BM25_MODEL_NAMES
+from mteb.models.profiling_wrapper import ProfiledEncoderWrapper
+from mteb.profiling import Profiler, RSSWatermark, profile_span
 
 from ..abstasks.AbsTask import AbsTask
 from ..load_results.task_results import TaskResult
 from ..models.sentence_transformer_wrapper import SentenceTransformerWrapper
+from .evaluators.retrieval_pipeline import RetrievalPipeline
 
 if TYPE_CHECKING:
     from mteb.benchmarks import Benchmark
@@ -62,6 +71,8 @@ class MTEB:
 
         self.err_logs_path = err_logs_path
         self.last_evaluated_splits = {}
+        # the peak memory (RSS) in MB of the process while evaluating every task of the last run
+        self.peak_rss_mb: dict[str, float | None] = {}
 
     @property
     def available_tasks(self):
@@ -155,6 +166,16 @@ class MTEB:
             logger.info(f"\n# Loading dataset for {task.metadata.name}")
             task.load_data()
 
+    @staticmethod
+    def _profiling(
+        profiler: Profiler | None,
+        task_name: str,
+        hf_split: str | None = None,
+    ) -> AbstractContextManager:
+        if profiler is None:
+            return nullcontext()
+        return profiler.activate(task_name, hf_split)
+
     @staticmethod
     def _run_eval(
         task: AbsTask,
@@ -163,17 +184,39 @@ class MTEB:
         subsets_to_run: list[str] | None = None,
         *,
         encode_kwargs: dict[str, Any],
+        profiler: Profiler | None = None,
         **kwargs: Any,
     ):
         tick = time()
-        results = task.evaluate(
-            model,
-            split,
-            subsets_to_run=subsets_to_run,
-            encode_kwargs=encode_kwargs,
-            **kwargs,
-        )
-        tock = time()
+        with MTEB._profiling(profiler, task.metadata.name, split):
+            results = task.evaluate(
+                model,
+                split,
+                subsets_to_run=subsets_to_run,
+                encode_kwargs=encode_kwargs,
+                **kwargs,
+            )
+            # the evaluation time is the time of the evaluation at the full dimension
+            tock = time()
+            evaluate_dimensions = getattr(model, "evaluate_dimensions", None)
+            if evaluate_dimensions is not None:
+                # the predictions are only saved for the full dimension
+                dimension_kwargs = {
+                    key: value
+                    for key, value in kwargs.items()
+                    if key not in ("save_predictions", "export_errors", "save_qrels")
+                }
+                dimension_scores = evaluate_dimensions(
+                    lambda: task.evaluate(
+                        model,
+                        split,
+                        subsets_to_run=subsets_to_run,
+                        encode_kwargs=encode_kwargs,
+                        **dimension_kwargs,
+                    )
+                )
+                for hf_subset, scores in dimension_scores.items():
+                    results[hf_subset]["matryoshka_dimensions"] = scores
         return results, tick, tock
 
     @staticmethod
@@ -227,10 +270,34 @@ class MTEB:
             evaluation_time=existing_results.evaluation_time
             + new_results.evaluation_time,
             kg_co2_emissions=merged_kg_co2_emissions,
+            # the emissions are only comparable if they were computed with the same carbon intensity
+            carbon_intensity=new_results.carbon_intensity
+            if merged_kg_co2_emissions is not None
+            and existing_results.carbon_intensity == new_results.carbon_intensity
+            else None,
+            profiling=MTEB._merge_subset_dicts(
+                existing_results.profiling, new_results.profiling
+            ),
+            quantization=MTEB._merge_subset_dicts(
+                existing_results.quantization, new_results.quantization
+            ),
         )
 
         return merged_results
 
+    @staticmethod
+    def _merge_subset_dicts(
+        existing: dict[str, dict[str, Any]] | None,
+        new: dict[str, dict[str, Any]] | None,
+    ) -> dict[str, dict[str, Any]] | None:
+        """Merges dictionaries of the form dict[Split, dict[HFSubset, Any]] by split and subset, the new subsets replacing the
+        existing ones, as the scores are merged.
+        """
+        merged = {split: dict(subsets) for split, subsets in (existing or {}).items()}
+        for split, subsets in (new or {}).items():
+            merged.setdefault(split, {}).update(subsets)
+        return merged or None
+
     @staticmethod
     def _merge_split_scores(
         existing_scores: list[ScoresDict], new_scores: list[ScoresDict]
@@ -242,21 +309,22 @@ class MTEB:
 
     def run(
         self,
-        model: SentenceTransformer | Encoder,
+        model: SentenceTransformer | Encoder | RetrievalPipeline,
         verbosity: int = 1,
         output_folder: str | None = "results",
         eval_splits: list[str] | None = None,
         eval_subsets: list[str] | None = None,
         overwrite_results: bool = False,
         raise_error: bool = True,
-        co2_tracker: bool = True,
+        co2_tracker: bool | EnergyMeter = True,
         encode_kwargs: dict[str, Any] | None = None,
+        profile: bool = False,
         **kwargs,
     ) -> list[TaskResult]:
         """Run the evaluation pipeline on the selected tasks.
 
         Args:
-            model: Model to be used for evaluation
+            model: Model to be used for evaluation. A `RetrievalPipeline` can be used to evaluate a first stage retriever followed by a reranker.
             verbosity: Verbosity level. Default is 1.
                 0: Only shows a progress bar for tasks being processed.
                 1: Shows a progress bar and prints task scores.
@@ -268,12 +336,18 @@ class MTEB:
             eval_subsets: List of subsets to evaluate on. If None, the subsets are taken from the task metadata.
             overwrite_results: Whether to overwrite existing results.
             raise_error: Whether to raise an error if an exception occurs during evaluation.
-            co2_tracker: Whether to enable or disable CO2 emissions tracker using codecarbon.
+            co2_tracker: Whether to measure the energy used by the evaluation of every split and its CO2 emissions, or the
+                `mteb.energy.EnergyMeter` measuring them, e.g. with the carbon intensity of your electricity.
             encode_kwargs: Additional keyword arguments to be passed to the model.encode method.
+            profile: Whether to record the time spent in every stage of the evaluation (loading the data, encoding, searching,
+                computing the metrics), with their throughput and the peak memory, in the `profiling` of the results. A Chrome
+                trace of every task is saved to `{output_folder}/{model_name}/{model_revision}/profiling/{task_name}.trace.json`.
             kwargs: Additional arguments to be passed to `_run_eval` method and task.load_data.
 
         Returns:
-            A list of TaskResult objects, one for each task evaluated.
+            A list of TaskResult objects, one for each task evaluated. The tasks of the aggregate tasks are evaluated once, even
+            if they are shared by several aggregate tasks or also selected on their own, and the aggregate tasks are combined
+            at the end.
         """
         # update logging to account for different levels of Verbosity (similar to the command line)
 
@@ -297,10 +371,24 @@ class MTEB:
         output_path = self.create_output_folder(meta, output_folder)
         if isinstance(model, (SentenceTransformer, CrossEncoder)):
             model = SentenceTransformerWrapper(model)
+        if (
+            profile
+            and not isinstance(model, RetrievalPipeline)
+            and not isinstance(model, ProfiledEncoderWrapper)
+        ):
+            model = ProfiledEncoderWrapper(model)
+        if not isinstance(model, RetrievalPipeline):
+            # the pipelines resolve the batch size of each of their models
+            encode_kwargs = resolve_batch_size(model, encode_kwargs)
 
         ## Disable co2_tracker for API models
         if "API" in meta.framework:
             co2_tracker = False
+        # the hardware is probed once for the whole run
+        if isinstance(co2_tracker, EnergyMeter):
+            energy_meter = co2_tracker
+        else:
+            energy_meter = EnergyMeter() if co2_tracker else None
 
         if output_path:
             self._save_model_metadata(meta, output_path)
@@ -312,12 +400,20 @@ class MTEB:
             self.print_selected_tasks()
 
         evaluation_results = []
-        original_tasks = deepcopy(
-            self.tasks
-        )  # save them in case we re-use the object (e.g. for reranking)
+        # save them in case we re-use the object (e.g. for reranking). The tasks are not copied, instead the data loaded
+        # during the run is unloaded once a task is evaluated.
+        original_tasks = list(self.tasks)
 
         # To evaluate missing splits, we keep track of the task name and the corresponding splits.
         self.last_evaluated_splits = {}
+        self.peak_rss_mb = {}
+        # the energy used by the evaluation of every split, in kWh, with its timestamps
+        self.energy_measurements = (
+            energy_meter.measurements if energy_meter is not None else []
+        )
+
+        # the aggregate tasks are combined once their constituent tasks, which are evaluated once, are evaluated
+        self.tasks, aggregate_tasks = self._flatten_aggregate_tasks(self.tasks)
 
         while len(self.tasks) > 0:
             task = self.tasks[0]
@@ -325,32 +421,18 @@ class MTEB:
                 f"\n\n********************** Evaluating {task.metadata.name} **********************"
             )
 
-            if isinstance(task, AbsTaskAggregate):
-                self_ = MTEB(tasks=task.metadata.tasks)
-                task_results = self_.run(
-                    model,
-                    verbosity=verbosity - 1,
-                    output_folder=output_folder,
-                    eval_splits=eval_splits,
-                    eval_subsets=eval_subsets,
-                    overwrite_results=overwrite_results,
-                    raise_error=raise_error,
-                    co2_tracker=co2_tracker,
-                    encode_kwargs=encode_kwargs,
-                    **kwargs,
+            if meta.name in BM25_MODEL_NAMES and task.metadata.type != "Retrieval":
+                logger.warning(
+                    f"{meta.name} only supports Retrieval tasks, but the task type is {task.metadata.type}. Skipping task."
                 )
-                new_results = task.combine_task_results(task_results)
-                evaluation_results.append(new_results)
-
-                if output_path:
-                    save_path = output_path / f"{task.metadata.name}.json"
-                    new_results.to_disk(save_path)
-                del self.tasks[0]
+                del self.tasks[0]  # empty memory
                 continue
 
-            if "bm25s" in meta.name and task.metadata.type != "Retrieval":
+            if isinstance(model, RetrievalPipeline) and not isinstance(
+                task, AbsTaskRetrieval
+            ):
                 logger.warning(
-                    f"bm25s only supports Retrieval tasks, but the task type is {task.metadata.type}. Skipping task."
+                    f"Retrieval pipelines only support retrieval tasks, but {task.metadata.name} is a {task.metadata.type} task. Skipping task."
                 )
                 del self.tasks[0]  # empty memory
                 continue
@@ -427,64 +509,66 @@ class MTEB:
                 del self.tasks[0]
                 continue
 
+            # Determine subsets to run for each split
+            # If the whole split is missing, run all required subsets
+            # If only some subsets are missing, run only those
+            subsets_to_run_per_split = {}
+            for split in final_splits_to_run:
+                info = missing_evaluations[split]
+                subsets_to_run = (
+                    info["missing_subsets"]
+                    if not overwrite_results
+                    else (eval_subsets or task_subsets)
+                )
+                if (
+                    info["whole_split_missing"] or overwrite_results
+                ) and task_subsets is None:
+                    subsets_to_run = ["default"]
+                subsets_to_run_per_split[split] = subsets_to_run
+
+            data_was_loaded = task.data_loaded
+            watermark = RSSWatermark().start()
             try:
                 task.check_if_dataset_is_superseded()
-                task.load_data(**kwargs)
+                profiler = Profiler() if profile else None
+                with self._profiling(profiler, task.metadata.name):
+                    with profile_span("load_data"):
+                        # only the splits and subsets to evaluate, e.g. the missing subsets when resuming a task
+                        task.load_data(
+                            subsets_to_load=subsets_to_run_per_split, **kwargs
+                        )
 
                 task_results = {}
+                # the memory and the scoring speed of quantized embeddings, stored beside the scores
+                quantization = {}
                 evaluation_time = 0
-                kg_co2_emissions: int | None = 0 if co2_tracker else None
+                # None unless the energy of the evaluation was measured
+                kg_co2_emissions: float | None = None
 
                 self.last_evaluated_splits[task.metadata.name] = []
 
                 for split in final_splits_to_run:
-                    info = missing_evaluations[split]
-
-                    # Determine subsets to run for this split
-                    # If the whole split is missing, run all required subsets
-                    # If only some subsets are missing, run only those
-                    subsets_to_run = (
-                        info["missing_subsets"]
-                        if not overwrite_results
-                        else (eval_subsets or task_subsets)
-                    )
+                    subsets_to_run = subsets_to_run_per_split[split]
 
-                    if (
-                        info["whole_split_missing"] or overwrite_results
-                    ) and task_subsets is None:
-                        subsets_to_run = ["default"]
-
-                    if co2_tracker:
-                        logger.warning(
-                            "Evaluating multiple MTEB runs simultaniously will produce incorrect CO₂ results"
-                        )
-                        with EmissionsTracker(
-                            save_to_file=False,
-                            save_to_api=False,
-                            logging_logger=logger,
-                            allow_multiple_runs=True,
-                        ) as tracker:
-                            results, tick, tock = self._run_eval(
-                                task,
-                                model,
-                                split,
-                                encode_kwargs=encode_kwargs,
-                                subsets_to_run=subsets_to_run,
-                                **kwargs,
-                            )
-
-                        kg_co2_emissions += (
-                            tracker.final_emissions
-                        )  # expressed as kilograms of CO₂-equivalents
-                    else:
+                    with (
+                        energy_meter.measure(task.metadata.name, split)
+                        if energy_meter is not None
+                        else nullcontext()
+                    ) as energy:
                         results, tick, tock = self._run_eval(
                             task,
                             model,
                             split,
                             subsets_to_run=subsets_to_run,
                             encode_kwargs=encode_kwargs,
+                            profiler=profiler,
                             **kwargs,
                         )
+                    if energy is not None and energy.kg_co2_emissions is not None:
+                        # expressed as kilograms of CO₂-equivalents
+                        kg_co2_emissions = (
+                            kg_co2_emissions or 0.0
+                        ) + energy.kg_co2_emissions
 
                     logger.info(
                         f"Evaluation for {task.metadata.name} on {split} took {tock - tick:.2f} seconds"
@@ -492,6 +576,13 @@ class MTEB:
                     evaluation_time += tock - tick
 
                     task_results[split] = results
+                    if hasattr(model, "quantization_statistics"):
+                        quantization[split] = {
+                            hf_subset: model.quantization_statistics(
+                                task.metadata.name, split, hf_subset
+                            )
+                            for hf_subset in results
+                        }
                     if verbosity >= 1:
                         logger.info(f"Scores: {task_results[split]}")
 
@@ -503,6 +594,13 @@ class MTEB:
                     task_results,
                     evaluation_time=evaluation_time,
                     kg_co2_emissions=kg_co2_emissions,
+                    profiling=profiler.summary(task.metadata.name)
+                    if profiler is not None
+                    else None,
+                    carbon_intensity=energy_meter.carbon_intensity
+                    if kg_co2_emissions is not None
+                    else None,
+                    quantization=quantization or None,
                 )
 
                 # Merge with existing if needed
@@ -515,6 +613,13 @@ class MTEB:
 
                 if output_path:
                     merged_results.to_disk(save_path)
+                    if profiler is not None:
+                        profiler.save_chrome_trace(
+                            output_path
+                            / "profiling"
+                            / f"{task.metadata.name}.trace.json",
+                            task.metadata.name,
+                        )
 
                 evaluation_results.append(merged_results)
 
@@ -529,12 +634,216 @@ class MTEB:
                     f_out.write(f"{datetime.now()} >>> {task.metadata.name}\n")
                     f_out.write(traceback.format_exc())
                     f_out.write("\n\n")
+            finally:
+                # the results are saved, release the data loaded for the evaluation (but not the data loaded by the user)
+                if not data_was_loaded:
+                    task.unload_data()
+                gc.collect()
+                self.peak_rss_mb[task.metadata.name] = watermark.stop()
+                if self.peak_rss_mb[task.metadata.name] is not None:
+                    logger.info(
+                        f"Peak memory (RSS) while evaluating {task.metadata.name}: {self.peak_rss_mb[task.metadata.name]:.0f} MB"
+                    )
 
             # empty memory
             del self.tasks[0]
 
         self.tasks = original_tasks
-        return evaluation_results
+        return self._combine_aggregate_tasks(
+            evaluation_results, aggregate_tasks, output_path
+        )
+
+    def _combine_aggregate_tasks(
+        self,
+        evaluation_results: list[TaskResult],
+        aggregate_tasks: list[AbsTaskAggregate],
+        output_path: Path | None,
+    ) -> list[TaskResult]:
+        """Combines the results of the aggregate tasks from the results of their constituent tasks.
+
+        Returns:
+            The results of the selected tasks, in their order, without the constituent tasks of the aggregate tasks.
+        """
+        results_by_task = {result.task_name: result for result in evaluation_results}
+        for task in aggregate_tasks:
+            task_results = [
+                results_by_task[subtask.metadata.name]
+                for subtask in task.metadata.tasks
+                if subtask.metadata.name in results_by_task
+            ]
+            if not task_results:
+                logger.warning(
+                    f"None of the tasks of {task.metadata.name} were evaluated. Skipping the aggregation."
+                )
+                continue
+            results_by_task[task.metadata.name] = task.combine_task_results(
+                task_results
+            )
+            if output_path:
+                save_path = output_path / f"{task.metadata.name}.json"
+                results_by_task[task.metadata.name].to_disk(save_path)
+
+        selected_results = {
+            task.metadata.name: results_by_task[task.metadata.name]
+            for task in self.tasks
+            if task.metadata.name in results_by_task
+        }
+        return list(selected_results.values())
+
+    def run_many(
+        self,
+        models: Iterable[ModelMeta | Encoder | SentenceTransformer | CrossEncoder],
+        *,
+        output_folder: str | None = "results",
+        eval_splits: list[str] | None = None,
+        eval_subsets: list[str] | None = None,
+        co2_tracker: bool | EnergyMeter = True,
+        **kwargs,
+    ) -> list[list[TaskResult]]:
+        """Evaluates several models, e.g. the checkpoints of a training run, on the selected tasks. The loop of `run` is
+        inverted: every task is loaded and transformed once, then all the models are evaluated on its data before the next
+        task is loaded.
+
+        The models given as `ModelMeta` are loaded with `ModelMeta.load_model` when they are evaluated on a task and released
+        afterwards, such that a single model is in memory at a time.
+
+        Args:
+            models: The models to evaluate, as their `ModelMeta` to load them lazily, or as loaded models.
+            output_folder: Folder where the results will be saved, see `run`.
+            eval_splits: List of splits to evaluate on. If None, the splits are taken from the task metadata.
+            eval_subsets: List of subsets to evaluate on. If None, the subsets are taken from the task metadata.
+            co2_tracker: Whether to measure the energy used by the evaluation of every split, or the
+                `mteb.energy.EnergyMeter` measuring them. The meter is shared by all the models.
+            kwargs: Additional arguments passed to `run`, e.g. `encode_kwargs` or `overwrite_results`.
+
+        Returns:
+            The results of every model, in the order of `models`, as a list of TaskResult objects as returned by `run`.
+
+        Example:
+            >>> metas = [mteb.get_model_meta(name) for name in ["intfloat/e5-small", "intfloat/e5-base"]]
+            >>> evaluation = mteb.MTEB(tasks=mteb.get_tasks(tasks=["NFCorpus", "SciFact"]))
+            >>> small_results, base_results = evaluation.run_many(metas)
+        """
+        models = list(models)
+        if isinstance(co2_tracker, EnergyMeter):
+            energy_meter = co2_tracker
+        else:
+            energy_meter = EnergyMeter() if co2_tracker else None
+
+        original_tasks = list(self.tasks)
+        tasks, aggregate_tasks = self._flatten_aggregate_tasks(self.tasks)
+        evaluation_results: list[list[TaskResult]] = [[] for _ in models]
+        # the metas of the loaded models, under which their results are saved
+        model_metas: list[ModelMeta | None] = [None for _ in models]
+        self.last_evaluated_splits = {}
+        self.peak_rss_mb = {}
+        self.energy_measurements = (
+            energy_meter.measurements if energy_meter is not None else []
+        )
+
+        for task in tasks:
+            logger.info(
+                f"\n\n********************** Loading {task.metadata.name} for {len(models)} models **********************"
+            )
+            data_was_loaded = task.data_loaded
+            # all the subsets any of the models may evaluate, as the missing subsets differ between the models
+            subsets_to_load = None
+            if eval_splits is not None or eval_subsets is not None:
+                subsets_to_load = {
+                    split: eval_subsets or task.hf_subsets
+                    for split in (eval_splits or task.eval_splits)
+                }
+            try:
+                task.load_data(subsets_to_load=subsets_to_load, **kwargs)
+                for i, model in enumerate(models):
+                    loaded_model = (
+                        model.load_model() if isinstance(model, ModelMeta) else model
+                    )
+                    model_metas[i] = self.create_model_meta(loaded_model)
+                    try:
+                        # the data is loaded, so it is kept by `run` for the next model
+                        evaluation = MTEB(
+                            tasks=[task], err_logs_path=self.err_logs_path
+                        )
+                        evaluation_results[i].extend(
+                            evaluation.run(
+                                loaded_model,
+                                output_folder=output_folder,
+                                eval_splits=eval_splits,
+                                eval_subsets=eval_subsets,
+                                co2_tracker=energy_meter
+                                if energy_meter is not None
+                                else False,
+                                **kwargs,
+                            )
+                        )
+                    finally:
+                        if isinstance(model, ModelMeta):
+                            del loaded_model
+                            gc.collect()
+                            if torch.cuda.is_available():
+                                torch.cuda.empty_cache()
+                    name = task.metadata.name
+                    evaluated_splits = self.last_evaluated_splits.setdefault(name, [])
+                    evaluated_splits += [
+                        split
+                        for split in evaluation.last_evaluated_splits.get(name, [])
+                        if split not in evaluated_splits
+                    ]
+                    peak_rss_mb = [
+                        rss
+                        for rss in (
+                            self.peak_rss_mb.get(name),
+                            evaluation.peak_rss_mb.get(name),
+                        )
+                        if rss is not None
+                    ]
+                    self.peak_rss_mb[name] = max(peak_rss_mb) if peak_rss_mb else None
+            finally:
+                if not data_was_loaded:
+                    task.unload_data()
+                gc.collect()
+
+        self.tasks = original_tasks
+        return [
+            self._combine_aggregate_tasks(
+                model_results,
+                aggregate_tasks,
+                self.create_output_folder(model_meta, output_folder)
+                if model_meta is not None
+                else None,
+            )
+            for model_meta, model_results in zip(model_metas, evaluation_results)
+        ]
+
+    @staticmethod
+    def _flatten_aggregate_tasks(
+        tasks: Iterable[AbsTask],
+    ) -> tuple[list[AbsTask], list[AbsTaskAggregate]]:
+        """Replaces the aggregate tasks by their constituent tasks, such that every task is evaluated once, even if it is
+        selected several times or combined by several aggregate tasks (e.g. the CQADupstack variants).
+
+        Returns:
+            The tasks to evaluate, deduplicated by name, and the aggregate tasks, in an order in which every aggregate task
+            comes after the aggregate tasks it combines.
+        """
+        tasks_to_evaluate: dict[str, AbsTask] = {}
+        aggregate_tasks: dict[str, AbsTaskAggregate] = {}
+
+        def add(task: AbsTask) -> None:
+            name = task.metadata.name
+            if name in tasks_to_evaluate or name in aggregate_tasks:
+                return
+            if isinstance(task, AbsTaskAggregate):
+                for subtask in task.metadata.tasks:
+                    add(subtask)
+                aggregate_tasks[name] = task
+            else:
+                tasks_to_evaluate[name] = task
+
+        for task in tasks:
+            add(task)
+        return list(tasks_to_evaluate.values()), list(aggregate_tasks.values())
 
     @staticmethod
     def create_model_meta(model: Encoder) -> ModelMeta:
@@ -9,6 +9,7 @@ from .evaluators import (
     Evaluator,
     PairClassificationEvaluator,
     RetrievalEvaluator,
+    RetrievalPipeline,
     STSEvaluator,
     SummarizationEvaluator,
     dot_distance,
@@ -25,6 +26,7 @@ __all__ = [
     "DeprecatedSummarizationEvaluator",
     "RetrievalEvaluator",
     "DenseRetrievalExactSearch",
+    "RetrievalPipeline",
     "ClusteringEvaluator",
     "BitextMiningEvaluator",
     "PairClassificationEvaluator",
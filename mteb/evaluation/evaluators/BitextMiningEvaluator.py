@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 import numpy as np
 import torch
 import tqdm
 from datasets import Dataset
-from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
 from mteb.abstasks import TaskMetadata
 from mteb.encoder_interface import Encoder
+from mteb.model_meta import ScoringFunction
+from mteb.types import Array
 
 from ...create_dataloaders import create_dataloader_from_texts
+from ...profiling import profile_span
+from ...similarity_functions import matmul_similarity_fn_name
 from .Evaluator import Evaluator
 
 logger = logging.getLogger(__name__)
@@ -21,7 +26,77 @@ logger = logging.getLogger(__name__)
 DEFAULT_PAIR = [("sentence1", "sentence2")]
 
 
+def _nearest_neighbors(
+    query_embeddings: torch.Tensor,
+    corpus_embeddings: list[torch.Tensor],
+    similarity_fn: Callable[[torch.Tensor, torch.Tensor], torch.Tensor],
+    query_chunk_size: int,
+    corpus_chunk_size: int,
+) -> np.ndarray:
+    """Finds the nearest neighbor of every query in each of the corpora, computing the similarities block by block.
+
+    The corpora have the same number of sentences and are scored together, so that the similarities of a block of queries with
+    the same block of every corpus are computed with a single matrix product.
+
+    Args:
+        query_embeddings: The query embeddings, of shape (n_queries, dim).
+        corpus_embeddings: The embeddings of every corpus, each of shape (n_corpus, dim).
+        similarity_fn: Computes the similarity matrix between two sets of embeddings.
+        query_chunk_size: The number of queries scored at a time.
+        corpus_chunk_size: The number of corpus sentences scored at a time, over all corpora.
+
+    Returns:
+        The index of the nearest neighbor of every query in every corpus, of shape (n_corpora, n_queries).
+    """
+    n_corpora = len(corpus_embeddings)
+    n_corpus = len(corpus_embeddings[0])
+    corpus_step = max(1, corpus_chunk_size // n_corpora)
+    stacked_corpora = torch.stack(corpus_embeddings)
+
+    best_indices = []
+    for query_start in range(0, len(query_embeddings), query_chunk_size):
+        queries = query_embeddings[query_start : query_start + query_chunk_size]
+        best_scores = torch.full(
+            (len(queries), n_corpora), -torch.inf, device=queries.device
+        )
+        best_index = torch.zeros(
+            (len(queries), n_corpora), dtype=torch.long, device=queries.device
+        )
+        for corpus_start in range(0, n_corpus, corpus_step):
+            corpus_chunk = stacked_corpora[:, corpus_start : corpus_start + corpus_step]
+            scores = torch.as_tensor(
+                similarity_fn(
+                    queries, corpus_chunk.reshape(-1, *corpus_chunk.shape[2:])
+                )
+            ).to(best_scores.device)
+            chunk_scores, chunk_index = scores.reshape(len(queries), n_corpora, -1).max(
+                dim=-1
+            )
+            # keep the first maximum, as for a single block
+            is_better = chunk_scores > best_scores
+            best_scores = torch.where(is_better, chunk_scores, best_scores)
+            best_index = torch.where(is_better, chunk_index + corpus_start, best_index)
+        best_indices.append(best_index)
+    return torch.cat(best_indices).T.cpu().numpy()
+
+
 class BitextMiningEvaluator(Evaluator):
+    """Evaluates a model by finding the nearest neighbor of every sentence of the first column in the second column.
+
+    Args:
+        sentences: The sentences of every column.
+        task_metadata: The metadata of the task.
+        hf_split: The split of the task.
+        hf_subset: The subset of the task.
+        pair_columns: The pairs of columns to evaluate.
+        pair_batch_size: The number of pairs with the same source column which are scored together with a single matrix
+            product. Only used for models with a cosine or dot product similarity.
+        num_workers: The number of threads in which the groups of pairs are scored.
+        query_chunk_size: The number of sentences of the source column scored at a time.
+        corpus_chunk_size: The number of sentences of the target columns scored at a time.
+        **kwargs: Additional arguments to pass to the Evaluator
+    """
+
     def __init__(
         self,
         sentences: Dataset,
@@ -29,6 +104,10 @@ class BitextMiningEvaluator(Evaluator):
         hf_split: str,
         hf_subset: str,
         pair_columns: list[tuple[str, str]] = DEFAULT_PAIR,
+        pair_batch_size: int = 16,
+        num_workers: int = 1,
+        query_chunk_size: int = 1024,
+        corpus_chunk_size: int = 16384,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -44,6 +123,10 @@ class BitextMiningEvaluator(Evaluator):
         self.hf_split = hf_split
         self.hf_subset = hf_subset
         self.task_metadata = task_metadata
+        self.pair_batch_size = pair_batch_size
+        self.num_workers = num_workers
+        self.query_chunk_size = query_chunk_size
+        self.corpus_chunk_size = corpus_chunk_size
 
     def __call__(self, model: Encoder, *, encode_kwargs: dict[str, Any]):
         scores = self.compute_metrics(model, encode_kwargs=encode_kwargs)
@@ -71,13 +154,19 @@ class BitextMiningEvaluator(Evaluator):
                 **encode_kwargs,
             )
 
-        scores = {}
-        for i, (key1, key2) in enumerate(
-            tqdm.tqdm(self.pairs, desc="Matching sentences")
-        ):
-            scores[f"{key1}-{key2}"] = self._compute_metrics(
-                embeddings[key1], embeddings[key2], model
-            )
+        logger.info("Finding nearest neighbors...")
+        with profile_span("search", n_pairs=len(self.pairs)):
+            nearest_neighbors = self._find_nearest_neighbors(embeddings, model)
+
+        logger.info("Computing metrics...")
+        with profile_span("metrics", n_pairs=len(self.pairs)):
+            labels = np.array([gold_pair[1] for gold_pair in self.gold])
+            scores = {}
+            for key1, key2 in self.pairs:
+                predictions = nearest_neighbors[(key1, key2)]
+                scores[f"{key1}-{key2}"] = self._compute_metrics(
+                    labels[: len(predictions)], predictions
+                )
 
         # in case of default pair unnest the dict
         def_pair_str = "-".join(DEFAULT_PAIR[0])
@@ -86,119 +175,112 @@ class BitextMiningEvaluator(Evaluator):
 
         return scores
 
+    def _find_nearest_neighbors(
+        self, embeddings: dict[str, Array], model: Encoder
+    ) -> dict[tuple[str, str], np.ndarray]:
+        """Finds the nearest neighbors of every pair of columns.
+
+        For cosine and dot product similarities, the embeddings of every column are converted (and normalized) once, and the pairs
+        with the same source column are scored in groups of `pair_batch_size`. Otherwise, `model.similarity` is used for every
+        pair.
+        """
+        kernel = matmul_similarity_fn_name(model)
+        if kernel is None:
+            tensors = {
+                column: _to_2d_tensor(column_embeddings)
+                for column, column_embeddings in embeddings.items()
+            }
+            similarity_fn = model.similarity
+            pair_batch_size = 1
+        else:
+            tensors = {
+                column: _to_2d_tensor(column_embeddings).float()
+                for column, column_embeddings in embeddings.items()
+            }
+            if kernel is ScoringFunction.COSINE:
+                tensors = {
+                    column: torch.nn.functional.normalize(tensor, p=2, dim=1)
+                    for column, tensor in tensors.items()
+                }
+            similarity_fn = _matmul_similarity
+            pair_batch_size = self.pair_batch_size
+
+        # group the pairs by source column, and the targets with the same number of sentences into batches
+        groups = defaultdict(list)
+        for key1, key2 in self.pairs:
+            groups[(key1, len(tensors[key2]))].append(key2)
+        jobs = [
+            (key1, targets[start : start + pair_batch_size])
+            for (key1, _), targets in groups.items()
+            for start in range(0, len(targets), pair_batch_size)
+        ]
+
+        def run(job: tuple[str, list[str]]) -> np.ndarray:
+            key1, targets = job
+            return _nearest_neighbors(
+                tensors[key1],
+                [tensors[key2] for key2 in targets],
+                similarity_fn,
+                query_chunk_size=self.query_chunk_size,
+                corpus_chunk_size=self.corpus_chunk_size,
+            )
+
+        if self.num_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+                results = list(
+                    tqdm.tqdm(
+                        executor.map(run, jobs),
+                        total=len(jobs),
+                        desc="Matching sentences",
+                    )
+                )
+        else:
+            results = [run(job) for job in tqdm.tqdm(jobs, desc="Matching sentences")]
+
+        nearest_neighbors = {}
+        for (key1, targets), predictions in zip(jobs, results):
+            for key2, target_predictions in zip(targets, predictions):
+                nearest_neighbors[(key1, key2)] = target_predictions
+        return nearest_neighbors
+
+    @staticmethod
     def _compute_metrics(
-        self,
-        embeddings1: np.ndarray,
-        embeddings2: np.ndarray,
-        model: Encoder,
+        labels: np.ndarray, predictions: np.ndarray
     ) -> dict[str, float]:
-        # Find nearest neighbors
-        logger.info("Finding nearest neighbors...")
-        nearest_neighbors = self._similarity_search(
-            embeddings1, embeddings2, model, top_k=1
+        """Accuracy and support-weighted precision, recall and F1, equal to the sklearn metrics with `average="weighted"` and
+        `zero_division=0`, computed from the counts of every class.
+        """
+        classes, encoded = np.unique(
+            np.concatenate([labels, predictions]), return_inverse=True
         )
-
-        # Compute errors
-        logger.info("Computing metrics...")
-        labels = []
-        predictions = []
-        for i, x in enumerate(nearest_neighbors):
-            j = x[0]["corpus_id"]
-            predictions.append(j)
-            labels.append(self.gold[i][1])
-
-        scores = {
-            "precision": precision_score(
-                labels, predictions, zero_division=0, average="weighted"
-            ),
-            "recall": recall_score(
-                labels, predictions, zero_division=0, average="weighted"
-            ),
-            "f1": f1_score(labels, predictions, zero_division=0, average="weighted"),
-            "accuracy": accuracy_score(labels, predictions),
+        encoded_labels, encoded_predictions = np.split(encoded, [len(labels)])
+        support = np.bincount(encoded_labels, minlength=len(classes))
+        n_predicted = np.bincount(encoded_predictions, minlength=len(classes))
+        is_correct = encoded_labels == encoded_predictions
+        true_positives = np.bincount(encoded_labels[is_correct], minlength=len(classes))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            precision = np.nan_to_num(true_positives / n_predicted)
+            recall = np.nan_to_num(true_positives / support)
+            f1 = np.nan_to_num(2 * true_positives / (n_predicted + support))
+        total_support = support.sum()
+        return {
+            "precision": float(precision @ support / total_support),
+            "recall": float(recall @ support / total_support),
+            "f1": float(f1 @ support / total_support),
+            "accuracy": float(is_correct.mean()),
         }
-        return scores
 
-    def _similarity_search(
-        self,
-        query_embeddings: np.ndarray,
-        corpus_embeddings: np.ndarray,
-        model: Encoder,
-        query_chunk_size: int = 100,
-        corpus_chunk_size: int = 500000,
-        top_k: int = 10,
-    ) -> list[list[dict[str, float]]]:
-        """This function performs a cosine similarity search between a list of query embeddings  and a list of corpus embeddings.
-        It can be used for Information Retrieval / Semantic Search for corpora up to about 1 Million entries.
-
-        Args:
-            query_embeddings: A 2 dimensional tensor with the query embeddings.
-            corpus_embeddings: A 2 dimensional tensor with the corpus embeddings.
-            model: The model used to encode the queries and corpus. This is used to check if the embeddings are on the same device and to encode the
-                queries and corpus if they are not already tensors.
-            query_chunk_size: Process 100 queries simultaneously. Increasing that value increases the speed, but requires more memory.
-            corpus_chunk_size: Scans the corpus 100k entries at a time. Increasing that value increases the speed, but requires more memory.
-            top_k: Retrieve top k matching entries.
-
-        Returns:
-            Returns a list with one entry for each query. Each entry is a list of dictionaries with the keys 'corpus_id' and 'score', sorted by
-                decreasing cosine similarity scores.
-        """
-        if len(query_embeddings.shape) == 1:
-            query_embeddings = query_embeddings.reshape(1, *query_embeddings.shape)
-        if len(corpus_embeddings.shape) == 1:
-            corpus_embeddings = corpus_embeddings.reshape(1, *corpus_embeddings)
-
-        # Check that corpus and queries are on the same device
-        if (
-            isinstance(corpus_embeddings, torch.Tensor)
-            and isinstance(query_embeddings, torch.Tensor)
-            and corpus_embeddings.device != query_embeddings.device
-        ):
-            query_embeddings = query_embeddings.to(corpus_embeddings.device)
-
-        queries_result_list = [[] for _ in range(len(query_embeddings))]
-
-        for query_start_idx in range(0, len(query_embeddings), query_chunk_size):
-            # Iterate over chunks of the corpus
-            for corpus_start_idx in range(0, len(corpus_embeddings), corpus_chunk_size):
-                # Compute cosine similarities
-                similarity_scores = model.similarity(  # type: ignore
-                    query_embeddings[
-                        query_start_idx : query_start_idx + query_chunk_size
-                    ],
-                    corpus_embeddings[
-                        corpus_start_idx : corpus_start_idx + corpus_chunk_size
-                    ],
-                )
 
-                # Get top-k scores
-                cos_scores_top_k_values, cos_scores_top_k_idx = torch.topk(
-                    similarity_scores,
-                    min(top_k, len(similarity_scores[0])),
-                    dim=1,
-                    largest=True,
-                    sorted=False,
-                )
-                cos_scores_top_k_values = cos_scores_top_k_values.cpu().tolist()
-                cos_scores_top_k_idx = cos_scores_top_k_idx.cpu().tolist()
-
-                for query_itr in range(len(similarity_scores)):
-                    for sub_corpus_id, score in zip(
-                        cos_scores_top_k_idx[query_itr],
-                        cos_scores_top_k_values[query_itr],
-                    ):
-                        corpus_id = corpus_start_idx + sub_corpus_id
-                        query_id = query_start_idx + query_itr
-                        queries_result_list[query_id].append(
-                            {"corpus_id": corpus_id, "score": score}
-                        )
-
-        # Sort and strip to top_k results
-        for idx in range(len(queries_result_list)):
-            queries_result_list[idx] = sorted(
-                queries_result_list[idx], key=lambda x: x["score"], reverse=True
-            )
-            queries_result_list[idx] = queries_result_list[idx][0:top_k]
+def _to_2d_tensor(embeddings: Array) -> torch.Tensor:
+    if isinstance(embeddings, torch.Tensor):
+        tensor = embeddings
+    else:
+        # zero-copy for numpy arrays
+        tensor = torch.from_numpy(np.ascontiguousarray(embeddings))
+    if tensor.dim() == 1:
+        tensor = tensor.reshape(1, *tensor.shape)
+    return tensor
+
 
-        return queries_result_list
+def _matmul_similarity(a: torch.Tensor, b: torch.Tensor) -> torch.Tensor:
+    return a @ b.T
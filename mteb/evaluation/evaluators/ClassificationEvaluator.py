@@ -17,6 +17,7 @@ from torch.utils.data import DataLoader
 from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.encoder_interface import Encoder
 from mteb.model_meta import ScoringFunction
+from mteb.profiling import profile_span
 
 from .Evaluator import Evaluator
 
@@ -87,8 +88,9 @@ class kNNClassificationEvaluator(Evaluator):
             knn = KNeighborsClassifier(
                 n_neighbors=self.k, n_jobs=-1, metric=metric.value
             )
-            knn.fit(X_train, y_train)
-            y_pred = knn.predict(X_test)
+            with profile_span("classifier", n_train=len(y_train), n_test=len(y_test)):
+                knn.fit(X_train, y_train)
+                y_pred = knn.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
             f1 = f1_score(y_test, y_pred, average="macro")
             scores["accuracy_" + metric.value] = accuracy
@@ -159,9 +161,10 @@ class logRegClassificationEvaluator(Evaluator):
         logger.info("Fitting logistic regression classifier...")
         y_train = self.train_dataset["label"]
         y_test = self.eval_dataset["label"]
-        clf.fit(X_train, y_train)
-        logger.info("Evaluating...")
-        y_pred = clf.predict(test_cache)
+        with profile_span("classifier", n_train=len(y_train), n_test=len(y_test)):
+            clf.fit(X_train, y_train)
+            logger.info("Evaluating...")
+            y_pred = clf.predict(test_cache)
         scores["accuracy"] = accuracy_score(y_test, y_pred)
         scores["f1"] = f1_score(y_test, y_pred, average="macro")
         scores["f1_weighted"] = f1_score(y_test, y_pred, average="weighted")
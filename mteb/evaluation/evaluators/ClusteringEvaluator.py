@@ -3,16 +3,21 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+import numpy as np
 import sklearn
 import sklearn.cluster
+import torch
 from datasets import Dataset
 from sklearn import metrics
 from torch.utils.data import DataLoader
 
 from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.encoder_interface import Encoder
+from mteb.profiling import profile_span
+from mteb.types import Array
 
 from .Evaluator import Evaluator
+from .kmeans import batched_kmeans, default_device, v_measure
 
 logger = logging.getLogger(__name__)
 
@@ -25,35 +30,59 @@ class ClusteringEvaluator(Evaluator):
         hf_split: str,
         hf_subset: str,
         clustering_batch_size: int = 500,
+        kmeans_engine: str = "sklearn",
+        embeddings: Array | None = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.dataset = dataset
         self.clustering_batch_size = clustering_batch_size
+        self.kmeans_engine = kmeans_engine
+        # the embeddings of the texts of the dataset, if already encoded
+        self.embeddings = embeddings
         self.task_metadata = task_metadata
         self.hf_split = hf_split
         self.hf_subset = hf_subset
 
     def __call__(self, model: Encoder, *, encode_kwargs: dict[str, Any]):
-        corpus_embeddings = model.encode(
-            DataLoader(self.dataset),
-            task_metadata=self.task_metadata,
-            hf_subset=self.hf_subset,
-            hf_split=self.hf_split,
-            **encode_kwargs,
-        )
+        corpus_embeddings = self.embeddings
+        if corpus_embeddings is None:
+            corpus_embeddings = model.encode(
+                DataLoader(self.dataset),
+                task_metadata=self.task_metadata,
+                hf_subset=self.hf_subset,
+                hf_split=self.hf_split,
+                **encode_kwargs,
+            )
 
         labels = self.dataset["labels"]
-        logger.info("Fitting Mini-Batch K-Means model...")
-        clustering_model = sklearn.cluster.MiniBatchKMeans(
-            n_clusters=len(set(labels)),
-            batch_size=self.clustering_batch_size,
-            n_init="auto",
-        )
-        clustering_model.fit(corpus_embeddings)
-        cluster_assignment = clustering_model.labels_
+        with profile_span("clustering", n_inputs=len(labels)):
+            if self.kmeans_engine == "torch":
+                return {"v_measure": self._torch_v_measure(corpus_embeddings, labels)}
+
+            logger.info("Fitting Mini-Batch K-Means model...")
+            clustering_model = sklearn.cluster.MiniBatchKMeans(
+                n_clusters=len(set(labels)),
+                batch_size=self.clustering_batch_size,
+                n_init="auto",
+            )
+            clustering_model.fit(corpus_embeddings)
+            cluster_assignment = clustering_model.labels_
 
-        logger.info("Evaluating...")
-        v_measure = metrics.cluster.v_measure_score(labels, cluster_assignment)
+            logger.info("Evaluating...")
+            v_measure = metrics.cluster.v_measure_score(labels, cluster_assignment)
 
         return {"v_measure": v_measure}
+
+    def _torch_v_measure(self, embeddings: Array, labels: list) -> float:
+        """Clusters the embeddings with the k-means of torch, on the accelerator if there is one."""
+        device = default_device()
+        label_names, label_ids = np.unique(labels, return_inverse=True)
+        x = torch.as_tensor(embeddings, dtype=torch.float32, device=device)
+        generator = torch.Generator(device=device).manual_seed(self.seed)
+        cluster_assignment = batched_kmeans(
+            x.unsqueeze(0), label_names.size, generator=generator
+        )
+        return v_measure(
+            torch.from_numpy(label_ids).unsqueeze(0), cluster_assignment.cpu()
+        ).item()
@@ -14,7 +14,7 @@ from datasets import Dataset
 from PIL import Image
 
 from mteb.abstasks import TaskMetadata
-from mteb.create_dataloaders import create_image_dataloader
+from mteb.create_dataloaders import create_image_dataloader, static_batch_size
 from mteb.encoder_interface import Encoder
 from mteb.types import PromptType
 
@@ -46,11 +46,12 @@ class Any2AnyMultiChoiceSearch:
     ):
         # Model is class that provides get_text_embeddings() and get_image_embeddings()
         self.model = model
-        self.encode_kwargs = encode_kwargs
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        self.encode_kwargs = static_batch_size(encode_kwargs)
 
         self.corpus_chunk_size = corpus_chunk_size
         self.previous_results = previous_results
-        self.batch_size = encode_kwargs.get("batch_size")
+        self.batch_size = self.encode_kwargs.get("batch_size")
         self.show_progress_bar = encode_kwargs.get("show_progress_bar")
         self.save_corpus_embeddings = kwargs.get("save_corpus_embeddings", False)
         self.corpus_embeddings = defaultdict(list)
@@ -14,7 +14,7 @@ from sklearn.metrics import (
 from sklearn.neighbors import KNeighborsClassifier
 
 from mteb.abstasks import TaskMetadata
-from mteb.create_dataloaders import create_image_dataloader
+from mteb.create_dataloaders import create_image_dataloader, static_batch_size
 from mteb.encoder_interface import Encoder
 from mteb.model_meta import ScoringFunction
 from mteb.similarity_functions import cos_sim, dot_score, euclidean_sim
@@ -54,7 +54,8 @@ class ImagekNNClassificationEvaluator(Evaluator):
         self.task_metadata = task_metadata
         self.hf_split = hf_split
         self.hf_subset = hf_subset
-        self.encode_kwargs = encode_kwargs
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        self.encode_kwargs = static_batch_size(encode_kwargs)
 
         self.k = k
 
@@ -145,7 +146,8 @@ class ImagekNNClassificationEvaluatorPytorch(Evaluator):
         self.task_metadata = task_metadata
         self.hf_split = hf_split
         self.hf_subset = hf_subset
-        self.encode_kwargs = encode_kwargs
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        self.encode_kwargs = static_batch_size(encode_kwargs)
 
         self.k = k
 
@@ -241,7 +243,8 @@ class ImagelogRegClassificationEvaluator(Evaluator):
         **kwargs,
     ):
         super().__init__(**kwargs)
-        self.encode_kwargs = encode_kwargs
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        self.encode_kwargs = static_batch_size(encode_kwargs)
 
         if limit is not None:
             dataset_train = dataset_train.select(list(range(limit)))
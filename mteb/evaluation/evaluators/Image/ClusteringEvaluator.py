@@ -10,7 +10,7 @@ from scipy.optimize import linear_sum_assignment
 from sklearn import metrics
 
 from mteb.abstasks import TaskMetadata
-from mteb.create_dataloaders import create_image_dataloader
+from mteb.create_dataloaders import create_image_dataloader, static_batch_size
 from mteb.encoder_interface import Encoder
 from mteb.evaluation.evaluators.Evaluator import Evaluator
 
@@ -39,6 +39,8 @@ class ImageClusteringEvaluator(Evaluator):
         self.hf_subset = hf_subset
 
     def __call__(self, model: Encoder, *, encode_kwargs: dict[str, Any]):
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        encode_kwargs = static_batch_size(encode_kwargs)
         image_embeddings = model.encode(
             create_image_dataloader(
                 self.dataset,
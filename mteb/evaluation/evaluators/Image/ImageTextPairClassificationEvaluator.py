@@ -11,6 +11,7 @@ from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.create_dataloaders import (
+    static_batch_size,
     transform_image_to_rgb,
 )
 from mteb.encoder_interface import Encoder
@@ -80,6 +81,8 @@ class ImageTextPairClassificationEvaluator(Evaluator):
         model: Encoder,
         encode_kwargs: dict[str, Any],
     ):
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        encode_kwargs = static_batch_size(encode_kwargs)
         num_images_per_sample = (
             len(self.images_column_names)
             if isinstance(self.images_column_names, list)
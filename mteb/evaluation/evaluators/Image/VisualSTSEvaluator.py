@@ -11,7 +11,7 @@ from sklearn.metrics.pairwise import (
 )
 
 from mteb.abstasks import TaskMetadata
-from mteb.create_dataloaders import create_image_dataloader
+from mteb.create_dataloaders import create_image_dataloader, static_batch_size
 from mteb.similarity_functions import compute_pairwise_similarity
 
 from ..Evaluator import Evaluator
@@ -57,6 +57,8 @@ class VisualSTSEvaluator(Evaluator):
         *,
         encode_kwargs: dict[str, Any],
     ):
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        encode_kwargs = static_batch_size(encode_kwargs)
         embeddings1 = model.encode(
             self.sentence1_dataset,
             task_metadata=self.task_metadata,
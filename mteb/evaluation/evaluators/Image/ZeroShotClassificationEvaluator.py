@@ -10,6 +10,7 @@ from mteb.abstasks import TaskMetadata
 from mteb.create_dataloaders import (
     create_dataloader_from_texts,
     create_image_dataloader,
+    static_batch_size,
 )
 from mteb.encoder_interface import Encoder
 from mteb.similarity_functions import vision_similarity
@@ -42,6 +43,8 @@ class ZeroShotClassificationEvaluator(Evaluator):
         self.hf_subset = hf_subset
 
     def __call__(self, model: Encoder, *, encode_kwargs: dict[str, Any]):
+        # the images are batched by dataloaders, so the batch size is a number of inputs
+        encode_kwargs = static_batch_size(encode_kwargs)
         dataloader = create_image_dataloader(
             self.dataset,
             image_column_name=self.image_column_name,
@@ -5,6 +5,7 @@ from collections import defaultdict
 from typing import Any
 
 import numpy as np
+import torch
 from sklearn.metrics import average_precision_score
 from sklearn.metrics.pairwise import (
     paired_cosine_distances,
@@ -17,6 +18,7 @@ from mteb.encoder_interface import Encoder
 from mteb.model_meta import ScoringFunction
 
 from ...create_dataloaders import create_dataloader_from_texts
+from ...profiling import profile_span
 from ...similarity_functions import compute_pairwise_similarity
 from .Evaluator import Evaluator
 
@@ -124,47 +126,46 @@ class PairClassificationEvaluator(Evaluator):
         embeddings1 = embeddings[:len_sentences1]
         embeddings2 = embeddings[len_sentences1:]
 
-        logger.info("Computing similarity distances.")
-        cosine_scores = 1 - paired_cosine_distances(embeddings1, embeddings2)
-        manhattan_distances = paired_manhattan_distances(embeddings1, embeddings2)
-        euclidean_distances = paired_euclidean_distances(embeddings1, embeddings2)
+        with profile_span("metrics", n_pairs=len(self.labels)):
+            logger.info("Computing similarity distances.")
+            cosine_scores = 1 - paired_cosine_distances(embeddings1, embeddings2)
+            manhattan_distances = paired_manhattan_distances(embeddings1, embeddings2)
+            euclidean_distances = paired_euclidean_distances(embeddings1, embeddings2)
 
-        similarity_scores = compute_pairwise_similarity(model, embeddings1, embeddings2)
-
-        embeddings1_np = np.asarray(embeddings1)
-        embeddings2_np = np.asarray(embeddings2)
-        dot_scores = [
-            np.dot(embeddings1_np[i], embeddings2_np[i])
-            for i in range(len(embeddings1_np))
-        ]
+            similarity_scores = compute_pairwise_similarity(
+                model, embeddings1, embeddings2
+            )
+            if isinstance(similarity_scores, torch.Tensor):
+                similarity_scores = similarity_scores.cpu().detach().float().numpy()
+
+            embeddings1_np = np.asarray(embeddings1)
+            embeddings2_np = np.asarray(embeddings2)
+            dot_scores = np.einsum("ij,ij->i", embeddings1_np, embeddings2_np)
+
+            logger.info("Computing metrics...")
+            labels = np.asarray(self.labels)
+            scoring_functions = [
+                # short name, scores, whether a higher score means more similar
+                ("similarity", similarity_scores, True),
+                (ScoringFunction.COSINE.value, cosine_scores, True),
+                (ScoringFunction.MANHATTAN.value, manhattan_distances, False),
+                (ScoringFunction.EUCLIDEAN.value, euclidean_distances, False),
+                (ScoringFunction.DOT_PRODUCT.value, dot_scores, True),
+            ]
+            all_metrics = self._compute_metrics_batched(
+                np.stack(
+                    [
+                        np.asarray(scores, dtype=np.float64)
+                        for _, scores, _ in scoring_functions
+                    ]
+                ),
+                labels,
+                np.array([reverse for _, _, reverse in scoring_functions]),
+            )
 
-        logger.info("Computing metrics...")
-        labels = np.asarray(self.labels)
         output_scores = {}
         max_scores = defaultdict(list)
-        for short_name, name, scores, reverse in [
-            [
-                "similarity",
-                "Model-Specified Similarity",
-                similarity_scores,
-                True,
-            ],
-            [ScoringFunction.COSINE.value, "Cosine-Similarity", cosine_scores, True],
-            [
-                ScoringFunction.MANHATTAN.value,
-                "Manhattan-Distance",
-                manhattan_distances,
-                False,
-            ],
-            [
-                ScoringFunction.EUCLIDEAN.value,
-                "Euclidean-Distance",
-                euclidean_distances,
-                False,
-            ],
-            [ScoringFunction.DOT_PRODUCT.value, "Dot-Product", dot_scores, True],
-        ]:
-            metrics = self._compute_metrics(scores, labels, reverse)
+        for (short_name, _, _), metrics in zip(scoring_functions, all_metrics):
             for metric_name, metric_value in metrics.items():
                 output_scores[f"{short_name}_{metric_name}"] = metric_value
                 max_scores[metric_name].append(metric_value)
@@ -189,96 +190,180 @@ class PairClassificationEvaluator(Evaluator):
         Returns:
             The metrics for the given scores and labels.
         """
-        acc, acc_threshold = PairClassificationEvaluator.find_best_acc_and_threshold(
-            scores, labels, high_score_more_similar
-        )
-        (
-            f1,
-            precision,
-            recall,
-            f1_threshold,
-        ) = PairClassificationEvaluator.find_best_f1_and_threshold(
-            scores, labels, high_score_more_similar
-        )
-        ap = PairClassificationEvaluator.ap_score(
-            scores, labels, high_score_more_similar
-        )
-
-        return {
-            "accuracy": float(acc),
-            "accuracy_threshold": float(acc_threshold),
-            "f1": float(f1),
-            "f1_threshold": float(f1_threshold),
-            "precision": float(precision),
-            "recall": float(recall),
-            "ap": float(ap),
-        }
+        return PairClassificationEvaluator._compute_metrics_batched(
+            np.asarray(scores, dtype=np.float64)[None],
+            np.asarray(labels),
+            np.array([high_score_more_similar]),
+        )[0]
 
     @staticmethod
-    def find_best_acc_and_threshold(scores, labels, high_score_more_similar: bool):
-        assert len(scores) == len(labels)
-        rows = list(zip(scores, labels))
-
-        rows = sorted(rows, key=lambda x: x[0], reverse=high_score_more_similar)
+    def _compute_metrics_batched(
+        scores: np.ndarray, labels: np.ndarray, high_score_more_similar: np.ndarray
+    ) -> list[dict[str, float]]:
+        """Compute the metrics of several scoring functions at once.
 
-        max_acc = 0
-        best_threshold = -1
+        Every row of scores is sorted once, and the best accuracy, the best F1 and the average precision are all derived from the
+        cumulative number of true positives along the sorted rows.
 
-        positive_so_far = 0
-        remaining_negatives = sum(np.array(labels) == 0)
-
-        for i in range(len(rows) - 1):
-            score, label = rows[i]
-            if label == 1:
-                positive_so_far += 1
-            else:
-                remaining_negatives -= 1
+        Args:
+            scores: The scores of every scoring function, specified as an array of shape (n_scoring_functions, n_pairs).
+            labels: The labels for the pairs, specified as an array of shape (n_pairs, ).
+            high_score_more_similar: Whether a higher score means more similar pairs for every scoring function, specified as an
+                array of shape (n_scoring_functions, ).
 
-            acc = (positive_so_far + remaining_negatives) / len(labels)
-            if acc > max_acc:
-                max_acc = acc
-                best_threshold = (rows[i][0] + rows[i + 1][0]) / 2
+        Returns:
+            The metrics of every scoring function.
+        """
+        sweep = _ThresholdSweep(scores, labels, high_score_more_similar)
+        acc, acc_threshold = sweep.best_accuracy()
+        f1, precision, recall, f1_threshold = sweep.best_f1()
+        if sweep.n_positives > 0:
+            ap = sweep.average_precision()
+        else:
+            ap = [
+                PairClassificationEvaluator.ap_score(row, labels, reverse)
+                for row, reverse in zip(scores, high_score_more_similar)
+            ]
+        return [
+            {
+                "accuracy": float(acc[i]),
+                "accuracy_threshold": float(acc_threshold[i]),
+                "f1": float(f1[i]),
+                "f1_threshold": float(f1_threshold[i]),
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "ap": float(ap[i]),
+            }
+            for i in range(len(scores))
+        ]
 
-        return max_acc, best_threshold
+    @staticmethod
+    def find_best_acc_and_threshold(scores, labels, high_score_more_similar: bool):
+        assert len(scores) == len(labels)
+        acc, threshold = _ThresholdSweep(
+            np.asarray(scores, dtype=np.float64)[None],
+            np.asarray(labels),
+            np.array([high_score_more_similar]),
+        ).best_accuracy()
+        return float(acc[0]), float(threshold[0])
 
     @staticmethod
     def find_best_f1_and_threshold(scores, labels, high_score_more_similar: bool):
         assert len(scores) == len(labels)
+        f1, precision, recall, threshold = _ThresholdSweep(
+            np.asarray(scores, dtype=np.float64)[None],
+            np.asarray(labels),
+            np.array([high_score_more_similar]),
+        ).best_f1()
+        return float(f1[0]), float(precision[0]), float(recall[0]), float(threshold[0])
 
-        scores = np.asarray(scores)
+    @staticmethod
+    def ap_score(scores, labels, high_score_more_similar: bool):
         labels = np.asarray(labels)
+        if not labels.any():
+            # undefined without positives, let sklearn handle (and warn about) it
+            scores = np.asarray(scores) * (1 if high_score_more_similar else -1)
+            return average_precision_score(labels, scores)
+        return float(
+            _ThresholdSweep(
+                np.asarray(scores, dtype=np.float64)[None],
+                labels,
+                np.array([high_score_more_similar]),
+            ).average_precision()[0]
+        )
 
-        rows = list(zip(scores, labels))
-
-        rows = sorted(rows, key=lambda x: x[0], reverse=high_score_more_similar)
 
-        best_f1 = best_precision = best_recall = 0
-        threshold = 0
-        nextract = 0
-        ncorrect = 0
-        total_num_duplicates = sum(labels)
+class _ThresholdSweep:
+    """Sweeps the decision threshold over the sorted scores of several scoring functions at once.
 
-        for i in range(len(rows) - 1):
-            score, label = rows[i]
-            nextract += 1
+    Every row of scores is sorted once (by decreasing similarity, ties keep their original order), after which the number of true
+    positives for every threshold is a cumulative sum over the sorted labels. As in the original sentence-transformers
+    implementation, the thresholds are placed halfway between two consecutive scores and the last score is not used as a
+    threshold.
 
-            if label == 1:
-                ncorrect += 1
+    Args:
+        scores: The scores, specified as an array of shape (n_scoring_functions, n_pairs).
+        labels: The binary labels, specified as an array of shape (n_pairs, ).
+        high_score_more_similar: Whether a higher score means more similar pairs, specified as an array of shape
+            (n_scoring_functions, ).
+    """
 
-            if ncorrect > 0:
-                precision = ncorrect / nextract
-                recall = ncorrect / total_num_duplicates
-                f1 = 2 * precision * recall / (precision + recall)
-                if f1 > best_f1:
-                    best_f1 = f1
-                    best_precision = precision
-                    best_recall = recall
-                    threshold = (rows[i][0] + rows[i + 1][0]) / 2
+    def __init__(
+        self,
+        scores: np.ndarray,
+        labels: np.ndarray,
+        high_score_more_similar: np.ndarray,
+    ):
+        # flip the distances, so that a higher score always means more similar
+        sign = np.where(high_score_more_similar, 1.0, -1.0)[:, None]
+        similarity = scores * sign
+        order = np.argsort(-similarity, axis=1, kind="stable")
+        self.sign = sign
+        self.sorted_similarity = np.take_along_axis(similarity, order, axis=1)
+        self.n_pairs = len(labels)
+        self.n_positives = int(np.sum(labels))
+        self.true_positives = np.cumsum(
+            np.asarray(labels, dtype=np.int64)[order], axis=1
+        )
+        self.n_predicted = np.arange(1, self.n_pairs + 1)
+
+    def _thresholds(self, index: np.ndarray) -> np.ndarray:
+        rows = np.arange(len(index))
+        between = (
+            self.sorted_similarity[rows, index]
+            + self.sorted_similarity[rows, index + 1]
+        ) / 2
+        return between * self.sign[:, 0]
+
+    def best_accuracy(self) -> tuple[np.ndarray, np.ndarray]:
+        n_rows = len(self.sorted_similarity)
+        if self.n_pairs < 2:
+            return np.zeros(n_rows), np.full(n_rows, -1.0)
+        true_positives = self.true_positives[:, :-1]
+        false_positives = self.n_predicted[:-1] - true_positives
+        n_negatives = self.n_pairs - self.n_positives
+        accuracy = (true_positives + n_negatives - false_positives) / self.n_pairs
+        best = np.argmax(accuracy, axis=1)
+        best_accuracy = accuracy[np.arange(n_rows), best]
+        found = best_accuracy > 0
+        return (
+            np.where(found, best_accuracy, 0.0),
+            np.where(found, self._thresholds(best), -1.0),
+        )
 
-        return best_f1, best_precision, best_recall, threshold
+    def best_f1(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        n_rows = len(self.sorted_similarity)
+        if self.n_pairs < 2 or self.n_positives == 0:
+            return tuple(np.zeros(n_rows) for _ in range(4))
+        true_positives = self.true_positives[:, :-1]
+        precision = true_positives / self.n_predicted[:-1]
+        recall = true_positives / self.n_positives
+        with np.errstate(invalid="ignore"):
+            f1 = 2 * precision * recall / (precision + recall)
+        f1 = np.where(true_positives > 0, f1, 0.0)
+        best = np.argmax(f1, axis=1)
+        rows = np.arange(n_rows)
+        found = f1[rows, best] > 0
+        return (
+            np.where(found, f1[rows, best], 0.0),
+            np.where(found, precision[rows, best], 0.0),
+            np.where(found, recall[rows, best], 0.0),
+            np.where(found, self._thresholds(best), 0.0),
+        )
 
-    @staticmethod
-    def ap_score(scores, labels, high_score_more_similar: bool):
-        return average_precision_score(
-            labels, scores * (1 if high_score_more_similar else -1)
+    def average_precision(self) -> np.ndarray:
+        """Average precision, computed as sklearn's average_precision_score: tied scores form a single threshold."""
+        # the last pair of every group of tied scores
+        is_group_end = np.ones_like(self.sorted_similarity, dtype=bool)
+        is_group_end[:, :-1] = np.diff(self.sorted_similarity, axis=1) != 0
+        group_true_positives = np.where(is_group_end, self.true_positives, 0)
+        previous_true_positives = np.zeros_like(group_true_positives)
+        previous_true_positives[:, 1:] = np.maximum.accumulate(
+            group_true_positives, axis=1
+        )[:, :-1]
+        recall_increase = (
+            np.where(is_group_end, self.true_positives - previous_true_positives, 0)
+            / self.n_positives
         )
+        precision = self.true_positives / self.n_predicted
+        return np.sum(recall_increase * precision, axis=1)
@@ -10,6 +10,7 @@ from .model_classes import (
     DenseRetrievalExactSearch,
     is_cross_encoder_compatible,
 )
+from .retrieval_pipeline import RetrievalPipeline
 from .utils import (
     add_task_specific_scores,
     calculate_retrieval_scores,
@@ -35,7 +36,12 @@ class RetrievalEvaluator(Evaluator):
     ):
         super().__init__(**kwargs)
         self.is_cross_encoder = False
-        if is_cross_encoder_compatible(retriever):
+        self.is_pipeline = isinstance(retriever, RetrievalPipeline)
+        if self.is_pipeline:
+            self.retriever = DenseRetrievalExactSearch(
+                retriever, encode_kwargs=encode_kwargs, **kwargs
+            )
+        elif is_cross_encoder_compatible(retriever):
             logger.info(
                 "The custom predict function of the model will be used if not a SentenceTransformer CrossEncoder"
             )
@@ -64,6 +70,9 @@ class RetrievalEvaluator(Evaluator):
         top_ranked: dict[str, list[str]] | None = None,
         **kwargs,
     ) -> dict[str, dict[str, float]]:
+        # imported here, as mteb.models imports the evaluators
+        from mteb.models.bm25 import BM25_MODEL_NAMES
+
         if not self.retriever:
             raise ValueError("Model/Technique has not been provided!")
 
@@ -72,7 +81,20 @@ class RetrievalEvaluator(Evaluator):
             self.top_k = kwargs["top_k"]
             del kwargs["top_k"]
 
-        if self.is_cross_encoder:
+        if self.is_pipeline:
+            return self.retriever.model.search(
+                corpus,
+                queries,
+                self.top_k,
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                instructions=instructions,
+                encode_kwargs=self.retriever.encode_kwargs,
+                top_ranked=top_ranked,
+                **kwargs,
+            )
+        elif self.is_cross_encoder:
             return self.retriever.search_cross_encoder(
                 corpus,
                 queries,
@@ -86,7 +108,7 @@ class RetrievalEvaluator(Evaluator):
         elif (
             hasattr(self.retriever.model, "mteb_model_meta")
             and self.retriever.model.mteb_model_meta is not None
-            and self.retriever.model.mteb_model_meta.name == "bm25s"
+            and self.retriever.model.mteb_model_meta.name in BM25_MODEL_NAMES
         ):
             return self.retriever.model.search(
                 corpus,
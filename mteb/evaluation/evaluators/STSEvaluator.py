@@ -14,6 +14,7 @@ from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.encoder_interface import Encoder
 
 from ...create_dataloaders import create_dataloader_from_texts
+from ...profiling import profile_span
 from ...similarity_functions import compute_pairwise_similarity
 from .Evaluator import Evaluator
 
@@ -60,29 +61,32 @@ class STSEvaluator(Evaluator):
             **encode_kwargs,
         )
 
-        logger.info("Evaluating...")
-        cosine_scores = 1 - (paired_cosine_distances(embeddings1, embeddings2))
-        manhattan_distances = -paired_manhattan_distances(embeddings1, embeddings2)
-        euclidean_distances = -paired_euclidean_distances(embeddings1, embeddings2)
+        with profile_span("metrics", n_pairs=len(self.gold_scores)):
+            logger.info("Evaluating...")
+            cosine_scores = 1 - (paired_cosine_distances(embeddings1, embeddings2))
+            manhattan_distances = -paired_manhattan_distances(embeddings1, embeddings2)
+            euclidean_distances = -paired_euclidean_distances(embeddings1, embeddings2)
 
-        cosine_pearson, _ = pearsonr(self.gold_scores, cosine_scores)
-        cosine_spearman, _ = spearmanr(self.gold_scores, cosine_scores)
+            cosine_pearson, _ = pearsonr(self.gold_scores, cosine_scores)
+            cosine_spearman, _ = spearmanr(self.gold_scores, cosine_scores)
 
-        manhatten_pearson, _ = pearsonr(self.gold_scores, manhattan_distances)
-        manhatten_spearman, _ = spearmanr(self.gold_scores, manhattan_distances)
+            manhatten_pearson, _ = pearsonr(self.gold_scores, manhattan_distances)
+            manhatten_spearman, _ = spearmanr(self.gold_scores, manhattan_distances)
 
-        euclidean_pearson, _ = pearsonr(self.gold_scores, euclidean_distances)
-        euclidean_spearman, _ = spearmanr(self.gold_scores, euclidean_distances)
+            euclidean_pearson, _ = pearsonr(self.gold_scores, euclidean_distances)
+            euclidean_spearman, _ = spearmanr(self.gold_scores, euclidean_distances)
 
-        similarity_scores = compute_pairwise_similarity(model, embeddings1, embeddings2)
+            similarity_scores = compute_pairwise_similarity(
+                model, embeddings1, embeddings2
+            )
 
-        if similarity_scores is not None:
-            pearson, _ = pearsonr(self.gold_scores, similarity_scores)
-            spearman, _ = spearmanr(self.gold_scores, similarity_scores)
-        else:
-            # if model does not have a similarity function, we assume the cosine similarity
-            pearson = cosine_pearson
-            spearman = cosine_spearman
+            if similarity_scores is not None:
+                pearson, _ = pearsonr(self.gold_scores, similarity_scores)
+                spearman, _ = spearmanr(self.gold_scores, similarity_scores)
+            else:
+                # if model does not have a similarity function, we assume the cosine similarity
+                pearson = cosine_pearson
+                spearman = cosine_spearman
 
         return {
             # using the models own similarity score
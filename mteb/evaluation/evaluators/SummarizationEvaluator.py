@@ -7,11 +7,11 @@ from typing import Any
 import numpy as np
 import torch
 import tqdm
-from scipy.stats import pearsonr, spearmanr
+from scipy.stats import pearsonr, rankdata, spearmanr
 
 from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.encoder_interface import Encoder
-from mteb.similarity_functions import cos_sim, dot_score
+from mteb.similarity_functions import convert_to_tensor, cos_sim, dot_score
 
 from ...create_dataloaders import create_dataloader_from_texts
 from .Evaluator import Evaluator
@@ -25,7 +25,65 @@ else:
 logger = logging.getLogger(__name__)
 
 
+def _padded_index(lens: list[int]) -> tuple[torch.Tensor, torch.Tensor]:
+    """Indices to gather the flattened summaries of every text into a padded array of shape (n_texts, max_len).
+
+    The padding repeats the last summary of the text, so that the indices of a chunk of texts stay within its own summaries.
+
+    Returns:
+        The indices and the mask of the summaries that are not padding.
+    """
+    lens_tensor = torch.tensor(lens, dtype=torch.long)
+    offsets = torch.cumsum(lens_tensor, dim=0) - lens_tensor
+    positions = torch.arange(max(lens, default=0))[None, :]
+    mask = positions < lens_tensor[:, None]
+    last_position = (lens_tensor[:, None] - 1).clamp(min=0)
+    index = offsets[:, None] + torch.minimum(positions, last_position)
+    return index.clamp(max=max(sum(lens) - 1, 0)), mask
+
+
+def _masked_max(scores: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    """Max over the last dimension of scores, ignoring the padded entries given by mask of shape (n_texts, n_last)."""
+    return scores.masked_fill(~mask[:, None, :], -torch.inf).max(dim=-1).values
+
+
+def _is_constant(scores: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Whether all non-padded scores of a row are equal, i.e. whether the row has a single unique score."""
+    return np.where(mask, scores, -np.inf).max(axis=1) == np.where(
+        mask, scores, np.inf
+    ).min(axis=1)
+
+
+def _masked_pearson(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """The Pearson correlation between x and y of every row, ignoring the padded entries."""
+    n = mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_centered = np.where(
+            mask, x - np.where(mask, x, 0).sum(axis=1, keepdims=True) / n[:, None], 0
+        )
+        y_centered = np.where(
+            mask, y - np.where(mask, y, 0).sum(axis=1, keepdims=True) / n[:, None], 0
+        )
+        correlation = (x_centered * y_centered).sum(axis=1) / np.sqrt(
+            (x_centered**2).sum(axis=1) * (y_centered**2).sum(axis=1)
+        )
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _masked_spearman(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """The Spearman correlation between x and y of every row, ignoring the padded entries.
+
+    The padded entries are ranked last, so that they do not change the ranks of the other entries.
+    """
+    x_ranks = rankdata(np.where(mask, x, np.inf), axis=1)
+    y_ranks = rankdata(np.where(mask, y, np.inf), axis=1)
+    return _masked_pearson(x_ranks, y_ranks, mask)
+
+
 class SummarizationEvaluator(Evaluator):
+    # number of texts for which the similarity of the model is computed in a single call
+    similarity_chunk_size = 256
+
     def __init__(
         self,
         human_summaries: list[list[str]],
@@ -64,13 +122,6 @@ class SummarizationEvaluator(Evaluator):
         *,
         encode_kwargs: dict[str, Any],
     ):
-        cosine_spearman_scores = []
-        cosine_pearson_scores = []
-        dot_spearman_scores = []
-        dot_pearson_scores = []
-        pearson_scores = []
-        spearman_scores = []
-
         # Get the human & machine summaries for the text in one go for all
         human_lens = [len(human_summaries) for human_summaries in self.human_summaries]
         machine_lens = [
@@ -107,74 +158,125 @@ class SummarizationEvaluator(Evaluator):
             **encode_kwargs,
         )
 
-        # Split the embeddings into the original human & machine summaries
-        embs_human_summaries_all = np.split(
-            embs_human_summaries_all, np.cumsum(human_lens)[:-1]
+        logger.info("Scoring...")
+        human_index, human_mask = _padded_index(human_lens)
+        machine_index, machine_mask = _padded_index(machine_lens)
+
+        # Pack the summaries of every text into tensors of shape (n_texts, max_n_summaries, dim)
+        embs_human_summaries = convert_to_tensor(embs_human_summaries_all).float()
+        embs_machine_summaries = convert_to_tensor(embs_machine_summaries_all).float()
+        embs_human_padded = embs_human_summaries[human_index] * human_mask[..., None]
+        embs_machine_padded = (
+            embs_machine_summaries[machine_index] * machine_mask[..., None]
         )
-        embs_machine_summaries_all = np.split(
-            embs_machine_summaries_all, np.cumsum(machine_lens)[:-1]
+
+        # Predicted quality score for a machine summary: the max similarity to the human summaries of the text
+        dot_pred_scores = _masked_max(
+            torch.bmm(embs_machine_padded, embs_human_padded.transpose(1, 2)),
+            human_mask,
+        )
+        cosine_pred_scores = _masked_max(
+            torch.bmm(
+                torch.nn.functional.normalize(embs_machine_padded, dim=-1),
+                torch.nn.functional.normalize(embs_human_padded, dim=-1).transpose(
+                    1, 2
+                ),
+            ),
+            human_mask,
+        )
+        sim_scores = _masked_max(
+            self._model_similarities(
+                model,
+                embs_machine_summaries,
+                embs_human_summaries,
+                machine_index,
+                human_index,
+            ),
+            human_mask,
         )
 
-        for i, (embs_human_summaries, embs_machine_summaries) in tqdm.tqdm(
-            enumerate(zip(embs_human_summaries_all, embs_machine_summaries_all)),
-            desc="Scoring",
-            total=len(self.human_summaries),
-        ):
-            cosine_pred_scores = []  # Predicted quality score for a summary
-            dot_pred_scores = []  # Predicted quality score for a summary
-            sim_scores = []
-            human_scores = []  # Human score for a summary
+        # Human score for a machine summary, as with zip the machine summaries without a human score are ignored
+        human_scores = np.zeros(machine_mask.shape)
+        mask = machine_mask.numpy().copy()
+        for i, gold_scores in enumerate(self.gold_scores):
+            n_scored = min(len(gold_scores), machine_lens[i])
+            human_scores[i, :n_scored] = gold_scores[:n_scored]
+            mask[i, n_scored:] = False
+
+        dot_pred_scores = dot_pred_scores.numpy().astype(np.float64)
+        cosine_pred_scores = cosine_pred_scores.numpy().astype(np.float64)
+        sim_scores = sim_scores.numpy().astype(np.float64)
+
+        is_valid = ~(
+            _is_constant(human_scores, mask)
+            | _is_constant(dot_pred_scores, mask)
+            | _is_constant(cosine_pred_scores, mask)
+        )
+        for i in np.flatnonzero(~is_valid):
+            logger.info(f"Skipping sample {i} due to equal scores")
+        human_scores = human_scores[is_valid]
+        mask = mask[is_valid]
 
-            for emb_machine_summary, human_eval_score in zip(
-                embs_machine_summaries, self.gold_scores[i]
-            ):  # Iterate through all machine summaries + scores for a single sample
-                cosine_scores = cos_sim(emb_machine_summary, embs_human_summaries)
-                dot_scores = dot_score(emb_machine_summary, embs_human_summaries)
+        return {
+            "pearson": np.mean(
+                _masked_pearson(human_scores, sim_scores[is_valid], mask)
+            ),
+            "spearman": np.mean(
+                _masked_spearman(human_scores, sim_scores[is_valid], mask)
+            ),
+            "cosine_spearman": np.mean(
+                _masked_spearman(human_scores, cosine_pred_scores[is_valid], mask)
+            ),
+            "cosine_pearson": np.mean(
+                _masked_pearson(human_scores, cosine_pred_scores[is_valid], mask)
+            ),
+            "dot_spearman": np.mean(
+                _masked_spearman(human_scores, dot_pred_scores[is_valid], mask)
+            ),
+            "dot_pearson": np.mean(
+                _masked_pearson(human_scores, dot_pred_scores[is_valid], mask)
+            ),
+        }
 
-                _sim_score = [
-                    float(model.similarity(emb_machine_summary, emb_human_summary))  # type: ignore
-                    for emb_human_summary in embs_human_summaries
+    def _model_similarities(
+        self,
+        model: Encoder,
+        embs_machine_summaries: torch.Tensor,
+        embs_human_summaries: torch.Tensor,
+        machine_index: torch.Tensor,
+        human_index: torch.Tensor,
+    ) -> torch.Tensor:
+        """Similarities of the model between the machine and human summaries of every text, of shape
+        (n_texts, max_n_machine_summaries, max_n_human_summaries).
+
+        As the similarity function of the model can not be batched over the texts, it is computed between all machine and
+        human summaries of a chunk of texts, after which the blocks belonging to the same text are gathered.
+        """
+        similarities = []
+        for start in range(0, len(machine_index), self.similarity_chunk_size):
+            chunk_machine_index = machine_index[
+                start : start + self.similarity_chunk_size
+            ]
+            chunk_human_index = human_index[start : start + self.similarity_chunk_size]
+            machine_offset = int(chunk_machine_index.min())
+            human_offset = int(chunk_human_index.min())
+            chunk_similarities = convert_to_tensor(
+                model.similarity(  # type: ignore
+                    embs_machine_summaries[
+                        machine_offset : int(chunk_machine_index.max()) + 1
+                    ],
+                    embs_human_summaries[
+                        human_offset : int(chunk_human_index.max()) + 1
+                    ],
+                )
+            ).float()
+            similarities.append(
+                chunk_similarities[
+                    (chunk_machine_index - machine_offset)[:, :, None],
+                    (chunk_human_index - human_offset)[:, None, :],
                 ]
-                sim_score = torch.tensor(_sim_score)
-
-                cosine_max_score = torch.max(cosine_scores).item()
-                dot_max_score = torch.max(dot_scores).item()
-                sim_max_score = torch.max(sim_score).item()
-
-                cosine_pred_scores.append(cosine_max_score)
-                dot_pred_scores.append(dot_max_score)
-                sim_scores.append(sim_max_score)
-                human_scores.append(human_eval_score)
-
-            if (
-                (len(set(human_scores)) == 1)
-                or (len(set(dot_pred_scores)) == 1)
-                or (len(set(cosine_pred_scores)) == 1)
-            ):
-                logger.info(f"Skipping sample {i} due to equal scores")
-                continue
-
-            cosine_spearman_scores.append(
-                spearmanr(human_scores, cosine_pred_scores).statistic
-            )
-            cosine_pearson_scores.append(
-                pearsonr(human_scores, cosine_pred_scores).statistic
-            )
-            dot_spearman_scores.append(
-                spearmanr(human_scores, dot_pred_scores).statistic
             )
-            dot_pearson_scores.append(pearsonr(human_scores, dot_pred_scores).statistic)
-            spearman_scores.append(spearmanr(human_scores, sim_scores).statistic)
-            pearson_scores.append(pearsonr(human_scores, sim_scores).statistic)
-
-        return {
-            "pearson": np.mean(pearson_scores),
-            "spearman": np.mean(spearman_scores),
-            "cosine_spearman": np.mean(cosine_spearman_scores),
-            "cosine_pearson": np.mean(cosine_pearson_scores),
-            "dot_spearman": np.mean(dot_spearman_scores),
-            "dot_pearson": np.mean(dot_pearson_scores),
-        }
+        return torch.cat(similarities)
 
 
 @deprecated(
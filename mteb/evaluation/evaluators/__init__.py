@@ -21,6 +21,7 @@ from .Image import (
 )
 from .model_classes import DenseRetrievalExactSearch
 from .PairClassificationEvaluator import PairClassificationEvaluator
+from .retrieval_pipeline import RetrievalPipeline
 from .RetrievalEvaluator import RetrievalEvaluator
 from .STSEvaluator import STSEvaluator
 from .SummarizationEvaluator import (
@@ -35,6 +36,7 @@ __all__ = [
     "DeprecatedSummarizationEvaluator",
     "RetrievalEvaluator",
     "DenseRetrievalExactSearch",
+    "RetrievalPipeline",
     "ClusteringEvaluator",
     "BitextMiningEvaluator",
     "PairClassificationEvaluator",
@@ -0,0 +1,197 @@
+"""Batched k-means and V-measure in torch, used by the clustering tasks to cluster all the bootstrap samples at once.
+
+The `B` samples of `n` embeddings are clustered simultaneously as a `[B, n, d]` problem, on CPU threads or on an accelerator:
+greedy k-means++ initialization followed by Lloyd iterations, as `sklearn.cluster.KMeans` with `n_init=1`.
+"""
+
+from __future__ import annotations
+
+import math
+
+import torch
+
+# the maximal number of distances computed at once, to bound the memory of the assignment step
+_MAX_DISTANCES = 2**25
+
+
+def default_device() -> torch.device:
+    """The accelerator if there is one, else the CPU."""
+    if torch.cuda.is_available():
+        return torch.device("cuda")
+    if torch.backends.mps.is_available():
+        return torch.device("mps")
+    return torch.device("cpu")
+
+
+def _squared_distances(
+    x: torch.Tensor, centroids: torch.Tensor, x_norms: torch.Tensor
+) -> torch.Tensor:
+    """The squared euclidean distances between the points [B, n, d] and the centroids [B, k, d], as [B, n, k], given the
+    squared norms of the points [B, n, 1].
+    """
+    distances = torch.baddbmm(
+        centroids.pow(2).sum(-1).unsqueeze(1), x, centroids.transpose(1, 2), alpha=-2
+    )
+    distances += x_norms
+    return distances.clamp_(min=0)
+
+
+def _assign(
+    x: torch.Tensor, centroids: torch.Tensor, x_norms: torch.Tensor
+) -> torch.Tensor:
+    """The closest centroid of every point, computed over chunks of points."""
+    batch_size, n_points, _ = x.shape
+    chunk_size = max(_MAX_DISTANCES // (batch_size * centroids.shape[1]), 1)
+    return torch.cat(
+        [
+            _squared_distances(
+                x[:, start : start + chunk_size],
+                centroids,
+                x_norms[:, start : start + chunk_size],
+            ).argmin(-1)
+            for start in range(0, n_points, chunk_size)
+        ],
+        dim=1,
+    )
+
+
+def kmeans_plusplus(
+    x: torch.Tensor,
+    n_clusters: int,
+    generator: torch.Generator | None = None,
+    x_norms: torch.Tensor | None = None,
+) -> torch.Tensor:
+    """Picks the initial centroids [B, k, d] of the points [B, n, d] with the greedy k-means++ of scikit-learn: every
+    centroid is the best of `2 + log(k)` points sampled with a probability proportional to their squared distance to the
+    closest centroid picked so far, the one reducing the most the sum of these distances.
+    """
+    batch_size, n_points, _ = x.shape
+    if x_norms is None:
+        x_norms = x.pow(2).sum(-1, keepdim=True)
+    n_trials = 2 + int(math.log(n_clusters))
+    batch = torch.arange(batch_size, device=x.device)
+    first = torch.randint(n_points, (batch_size,), generator=generator, device=x.device)
+    centroids = [x[batch, first]]
+    min_distances = _squared_distances(x, centroids[0].unsqueeze(1), x_norms).squeeze(
+        -1
+    )
+    for _ in range(1, n_clusters):
+        # the points are sampled uniformly if they all coincide with the centroids
+        weights = torch.where(
+            min_distances.sum(-1, keepdim=True) > 0,
+            min_distances,
+            torch.ones_like(min_distances),
+        )
+        candidates = torch.multinomial(
+            weights, n_trials, replacement=True, generator=generator
+        )
+        candidate_points = x[batch.unsqueeze(1), candidates]
+        # [B, n, n_trials]
+        candidate_distances = torch.minimum(
+            min_distances.unsqueeze(-1),
+            _squared_distances(x, candidate_points, x_norms),
+        )
+        best = candidate_distances.sum(1).argmin(-1)
+        centroids.append(candidate_points[batch, best])
+        min_distances = candidate_distances[batch, :, best]
+    return torch.stack(centroids, dim=1)
+
+
+def batched_kmeans(
+    x: torch.Tensor,
+    n_clusters: int,
+    max_iter: int = 100,
+    tol: float = 1e-4,
+    generator: torch.Generator | None = None,
+) -> torch.Tensor:
+    """Clusters every batch of points [B, n, d] independently and returns the cluster of every point, as [B, n].
+
+    Args:
+        x: The points, on the device used for the clustering.
+        n_clusters: The number of clusters.
+        max_iter: The maximal number of Lloyd iterations.
+        tol: The iterations stop once the squared moves of the centroids sum to at most `tol` times the mean variance of the
+            dimensions, as in scikit-learn.
+        generator: The random generator of the k-means++ initialization, on the device of `x`.
+    """
+    x = x.float()
+    x_norms = x.pow(2).sum(-1, keepdim=True)
+    n_clusters = min(n_clusters, x.shape[1])
+    centroids = kmeans_plusplus(x, n_clusters, generator, x_norms)
+    tol = tol * x.var(dim=1).mean(-1)
+    expanded_shape = (-1, -1, x.shape[-1])
+    for _ in range(max_iter):
+        assignment = _assign(x, centroids, x_norms)
+        sums = torch.zeros_like(centroids).scatter_add_(
+            1, assignment.unsqueeze(-1).expand(expanded_shape), x
+        )
+        counts = torch.zeros(centroids.shape[:2], device=x.device).scatter_add_(
+            1, assignment, torch.ones_like(assignment, dtype=torch.float)
+        )
+        # empty clusters keep their centroid
+        new_centroids = torch.where(
+            counts.unsqueeze(-1) > 0,
+            sums / counts.clamp(min=1).unsqueeze(-1),
+            centroids,
+        )
+        shift = (new_centroids - centroids).pow(2).sum((1, 2))
+        centroids = new_centroids
+        if bool((shift <= tol).all()):
+            break
+    return _assign(x, centroids, x_norms)
+
+
+def _entropy(counts: torch.Tensor) -> torch.Tensor:
+    """The entropy of the distributions given by the counts [B, c], as [B]."""
+    total = counts.sum(-1, keepdim=True)
+    p = counts / total
+    return -torch.where(counts > 0, p * torch.log(p), torch.zeros_like(p)).sum(-1)
+
+
+def v_measure(labels_true: torch.Tensor, labels_pred: torch.Tensor) -> torch.Tensor:
+    """The V-measure of every batch of the cluster assignments [B, n], as [B]. Matches `sklearn.metrics.v_measure_score`.
+
+    The labels are integers from 0, e.g. the inverse of `np.unique`. The V-measure is computed from the contingency table of
+    every batch, built at once with a single `bincount`.
+    """
+    batch_size = labels_true.shape[0]
+    n_true = int(labels_true.max()) + 1
+    n_pred = int(labels_pred.max()) + 1
+    cells = (
+        torch.arange(batch_size, device=labels_true.device).unsqueeze(1)
+        * (n_true * n_pred)
+        + labels_true * n_pred
+        + labels_pred
+    )
+    contingency = (
+        torch.bincount(cells.flatten(), minlength=batch_size * n_true * n_pred)
+        .reshape(batch_size, n_true, n_pred)
+        .double()
+    )
+    n = contingency.sum((1, 2))
+    entropy_true = _entropy(contingency.sum(2))
+    entropy_pred = _entropy(contingency.sum(1))
+    # the mutual information, from the joint entropy
+    joint = contingency.flatten(1) / n.unsqueeze(1)
+    joint_entropy = -torch.where(
+        joint > 0, joint * torch.log(joint), torch.zeros_like(joint)
+    ).sum(-1)
+    mutual_information = entropy_true + entropy_pred - joint_entropy
+
+    # a single class (or cluster) is perfectly homogeneous (or complete)
+    homogeneity = torch.where(
+        entropy_true > 0,
+        mutual_information / entropy_true.clamp(min=1e-300),
+        torch.ones_like(n),
+    )
+    completeness = torch.where(
+        entropy_pred > 0,
+        mutual_information / entropy_pred.clamp(min=1e-300),
+        torch.ones_like(n),
+    )
+    total = homogeneity + completeness
+    return torch.where(
+        total > 0,
+        2 * homogeneity * completeness / total.clamp(min=1e-300),
+        torch.zeros_like(n),
+    )
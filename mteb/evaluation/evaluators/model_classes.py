@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import heapq
-import json
 import logging
 import os
 from pathlib import Path
@@ -14,13 +13,23 @@ from torch.utils.data import DataLoader
 
 from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.encoder_interface import Encoder
+from mteb.model_meta import ScoringFunction
 
 from ...create_dataloaders import (
     create_dataloader_for_queries,
     create_dataloader_for_queries_conversation,
     create_dataloader_for_retrieval_corpus,
 )
+from ...profiling import profile_span
+from ...similarity_functions import (
+    PreNormalizedEmbeddings,
+    convert_to_tensor,
+    matmul_similarity_fn_name,
+    topk_similarity,
+)
 from ...types import Array, BatchedInput, PromptType
+from .multi_vector_index import MultiVectorIndex
+from .retrieval_predictions import load_predictions
 from .utils import download
 
 logger = logging.getLogger(__name__)
@@ -33,9 +42,29 @@ class DenseRetrievalExactSearch:
         model: Encoder,
         encode_kwargs: dict[str, Any],
         corpus_chunk_size: int = 50000,
-        previous_results: str | Path | None = None,
+        previous_results: str | Path | dict[str, dict[str, float]] | None = None,
+        use_multi_vector_index: bool = False,
+        multi_vector_index_kwargs: dict[str, Any] | None = None,
+        use_fused_topk: bool = True,
         **kwargs: Any,
     ):
+        """Exact (brute force) search over the corpus embeddings.
+
+        Args:
+            model: The model used to encode queries and corpus.
+            encode_kwargs: Keyword arguments passed to the model's encode method.
+            corpus_chunk_size: Number of documents encoded and scored at a time.
+            previous_results: Path or url to the results of a first stage retriever, e.g. predictions saved in any format by
+                `save_predictions`, or the results themselves in the format {qid: {doc_id: score}}, used when reranking with a
+                cross-encoder.
+            use_multi_vector_index: Whether to search the corpus of models with the MaxSim similarity function using a
+                `MultiVectorIndex` instead of scoring all documents. The search is approximate, so its scores can differ from the
+                exact MaxSim scores, and it is only used when requested. Other models search the full corpus.
+            multi_vector_index_kwargs: Keyword arguments passed to the `MultiVectorIndex`.
+            use_fused_topk: Whether to compute the top-k documents with `topk_similarity` for models with a cosine or dot product
+                similarity, which normalizes the queries once and never materializes the full similarity matrix.
+            **kwargs: Additional keyword arguments.
+        """
         self.model = model
         self.encode_kwargs = encode_kwargs.copy()
 
@@ -48,10 +77,17 @@ class DenseRetrievalExactSearch:
         else:
             self.previous_results = previous_results
         self.batch_size = self.encode_kwargs.get("batch_size", 32)
+        if not isinstance(self.batch_size, int):
+            # e.g. "auto" for adaptive batching, which is done by the model
+            self.batch_size = 32
         self.show_progress_bar = self.encode_kwargs.get("show_progress_bar")
         self.results = {}
 
-        if self.previous_results is not None:
+        self.use_multi_vector_index = use_multi_vector_index
+        self.multi_vector_index_kwargs = multi_vector_index_kwargs or {}
+        self.use_fused_topk = use_fused_topk
+
+        if isinstance(self.previous_results, str):
             self.previous_results = self.load_results_file()
 
         if hasattr(self.model, "predict"):
@@ -180,7 +216,12 @@ class DenseRetrievalExactSearch:
             )
         else:
             logger.info("Performing full corpus search...")
-            result_heaps = self._full_corpus_search(
+            search_fn = (
+                self._multi_vector_index_search
+                if self.use_multi_vector_index and self._uses_max_sim()
+                else self._full_corpus_search
+            )
+            result_heaps = search_fn(
                 query_ids=query_ids,
                 query_embeddings=query_embeddings,
                 corpus=corpus,
@@ -250,6 +291,11 @@ class DenseRetrievalExactSearch:
         if hasattr(torch, "compile"):
             os.environ["TOKENIZERS_PARALLELISM"] = "false"  # we don't need it anymore
 
+        if matmul_similarity_fn_name(self.model) is ScoringFunction.COSINE:
+            # normalize the queries and documents once instead of for every query
+            query_embeddings = PreNormalizedEmbeddings(query_embeddings)
+            all_doc_embeddings = PreNormalizedEmbeddings(all_doc_embeddings).to(device)
+
         # Process each query
         for query_idx, query_id in enumerate(tqdm.tqdm(query_ids)):
             if query_id not in top_ranked:
@@ -258,12 +304,15 @@ class DenseRetrievalExactSearch:
 
             ranked_ids = top_ranked[query_id]
             doc_indices = torch.tensor([doc_id_to_idx[doc_id] for doc_id in ranked_ids])
-            query_doc_embeddings = torch.as_tensor(all_doc_embeddings[doc_indices]).to(
-                device
-            )
+            if isinstance(all_doc_embeddings, PreNormalizedEmbeddings):
+                query_doc_embeddings = all_doc_embeddings[doc_indices.to(device)]
+            else:
+                query_doc_embeddings = torch.as_tensor(
+                    all_doc_embeddings[doc_indices]
+                ).to(device)
 
             # Ensure query embedding is on the correct device and has correct shape
-            query_embedding = query_embeddings[query_idx].unsqueeze(0)
+            query_embedding = query_embeddings[query_idx : query_idx + 1]
 
             with torch.inference_mode():
                 scores = self.model.similarity(
@@ -329,6 +378,13 @@ class DenseRetrievalExactSearch:
         logger.info("Encoding Corpus in batches... Warning: This might take a while!")
         itr = range(0, len(corpus), self.corpus_chunk_size)
 
+        similarity_fn_name = (
+            matmul_similarity_fn_name(self.model) if self.use_fused_topk else None
+        )
+        query_embeddings = torch.as_tensor(query_embeddings).to(device)
+        if similarity_fn_name is ScoringFunction.COSINE:
+            query_embeddings = PreNormalizedEmbeddings(query_embeddings)
+
         result_heaps = {qid: [] for qid in query_ids}
         for batch_num, corpus_start_idx in enumerate(itr):
             logger.info(f"Encoding Batch {batch_num + 1}/{len(itr)}...")
@@ -347,43 +403,122 @@ class DenseRetrievalExactSearch:
             )
 
             # Compute similarities using either cosine-similarity or dot product
-            logging.info("Computing Similarities...")
-            query_embeddings = torch.as_tensor(query_embeddings).to(device)
-            sub_corpus_embeddings = torch.as_tensor(sub_corpus_embeddings).to(device)
+            with profile_span(
+                "search",
+                n_queries=len(query_embeddings),
+                n_documents=corpus_end_idx - corpus_start_idx,
+            ):
+                logging.info("Computing Similarities...")
+                sub_corpus_embeddings = convert_to_tensor(sub_corpus_embeddings).to(
+                    device
+                )
 
-            with torch.inference_mode():
-                scores = self.model.similarity(query_embeddings, sub_corpus_embeddings)
+                with torch.inference_mode():
+                    if similarity_fn_name is not None:
+                        # get top-k values
+                        cos_scores_top_k_values, cos_scores_top_k_idx = topk_similarity(
+                            query_embeddings,
+                            sub_corpus_embeddings,
+                            min(top_k + 1, len(sub_corpus_embeddings)),
+                            similarity_fn_name,
+                        )
+                    else:
+                        scores = self.model.similarity(
+                            query_embeddings, sub_corpus_embeddings
+                        )
+
+                        # get top-k values
+                        cos_scores_top_k_values, cos_scores_top_k_idx = torch.topk(
+                            scores,
+                            min(
+                                top_k + 1,
+                                len(scores[1]) if len(scores) > 1 else len(scores[-1]),
+                            ),
+                            dim=1,
+                            largest=True,
+                            sorted=return_sorted,
+                        )
+
+                for query_itr in range(len(query_embeddings)):
+                    query_id = query_ids[query_itr]
+                    for sub_corpus_id, score in zip(
+                        cos_scores_top_k_idx[query_itr].cpu().tolist(),
+                        cos_scores_top_k_values[query_itr].cpu().tolist(),
+                    ):
+                        corpus_id = corpus_ids[corpus_start_idx + sub_corpus_id]
+                        if len(result_heaps[query_id]) < top_k:
+                            # push item on the heap
+                            heapq.heappush(result_heaps[query_id], (score, corpus_id))
+                        else:
+                            # If item is larger than the smallest in the heap, push it on the heap then pop the smallest element
+                            heapq.heappushpop(
+                                result_heaps[query_id], (score, corpus_id)
+                            )
 
-            # get top-k values
-            cos_scores_top_k_values, cos_scores_top_k_idx = torch.topk(
-                scores,
-                min(
-                    top_k + 1,
-                    len(scores[1]) if len(scores) > 1 else len(scores[-1]),
-                ),
-                dim=1,
-                largest=True,
-                sorted=return_sorted,
+        return result_heaps
+
+    def _uses_max_sim(self) -> bool:
+        meta = getattr(self.model, "mteb_model_meta", None)
+        if meta is not None and meta.similarity_fn_name is ScoringFunction.MAX_SIM:
+            return True
+        logger.warning(
+            "The multi-vector index is only used for models with the MaxSim similarity function, searching the full corpus "
+            "instead."
+        )
+        return False
+
+    def _multi_vector_index_search(
+        self,
+        query_ids: list[str],
+        query_embeddings: np.ndarray,
+        corpus: dict[str, dict[str, str]],
+        top_k: int,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        request_qid: str | None = None,
+        return_sorted: bool = False,
+    ) -> dict[str, list[tuple[float, str]]]:
+        """Search the corpus with a centroid-pruned multi-vector index instead of computing MaxSim against every document."""
+        corpus_ids = sorted(corpus, reverse=True)
+        corpus = [corpus[cid] for cid in corpus_ids]
+
+        index = MultiVectorIndex(**self.multi_vector_index_kwargs)
+        itr = range(0, len(corpus), self.corpus_chunk_size)
+        for batch_num, corpus_start_idx in enumerate(itr):
+            logger.info(f"Encoding and indexing Batch {batch_num + 1}/{len(itr)}...")
+            corpus_end_idx = min(corpus_start_idx + self.corpus_chunk_size, len(corpus))
+            sub_corpus_embeddings = self.model.encode(
+                create_dataloader_for_retrieval_corpus(
+                    corpus[corpus_start_idx:corpus_end_idx]
+                ),  # type: ignore
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                prompt_type=PromptType.passage,
+                request_qid=request_qid,
+                **self.encode_kwargs,
             )
+            index.add(sub_corpus_embeddings)
 
-            for query_itr in range(len(query_embeddings)):
-                query_id = query_ids[query_itr]
-                for sub_corpus_id, score in zip(
-                    cos_scores_top_k_idx[query_itr].cpu().tolist(),
-                    cos_scores_top_k_values[query_itr].cpu().tolist(),
-                ):
-                    corpus_id = corpus_ids[corpus_start_idx + sub_corpus_id]
-                    if len(result_heaps[query_id]) < top_k:
-                        # push item on the heap
-                        heapq.heappush(result_heaps[query_id], (score, corpus_id))
-                    else:
-                        # If item is larger than the smallest in the heap, push it on the heap then pop the smallest element
-                        heapq.heappushpop(result_heaps[query_id], (score, corpus_id))
+        logger.info("Searching the multi-vector index...")
+        with profile_span(
+            "search", n_queries=len(query_embeddings), n_documents=len(corpus)
+        ):
+            scores, indices = index.search(query_embeddings, top_k)
 
+        result_heaps = {qid: [] for qid in query_ids}
+        for query_itr, query_id in enumerate(query_ids):
+            for score, doc_idx in zip(
+                scores[query_itr].tolist(), indices[query_itr].tolist()
+            ):
+                if doc_idx < 0:
+                    break
+                heapq.heappush(result_heaps[query_id], (score, corpus_ids[doc_idx]))
         return result_heaps
 
     def load_results_file(self):
-        # load the first stage results from file in format {qid: {doc_id: score}}
+        # load the first stage results in format {qid: {doc_id: score}} from predictions saved in any format
         if "https://" in self.previous_results:
             # download the file
             if not os.path.exists(self.previous_results):
@@ -400,18 +535,7 @@ class DenseRetrievalExactSearch:
                 )
             self.previous_results = dest_file
 
-        with open(self.previous_results) as f:
-            previous_results = json.load(f)
-
-        if not isinstance(previous_results, dict) or not isinstance(
-            previous_results[list(previous_results.keys())[0]], dict
-        ):
-            raise ValueError(
-                "Previous results file must be in format {qid: {doc_id: score}}. Got "
-                + type(previous_results)
-            )
-
-        return previous_results
+        return load_predictions(self.previous_results)
 
     def search_cross_encoder(
         self,
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import logging
+import math
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def _kmeans(
+    x: torch.Tensor, n_clusters: int, n_iter: int = 20, seed: int = 42
+) -> torch.Tensor:
+    """Plain Lloyd k-means on the unit sphere (spherical k-means), used to find the index centroids."""
+    generator = torch.Generator().manual_seed(seed)
+    init_idx = torch.randperm(x.shape[0], generator=generator)[:n_clusters]
+    centroids = x[init_idx].clone()
+    for _ in range(n_iter):
+        assignment = (x @ centroids.T).argmax(dim=1)
+        sums = torch.zeros_like(centroids).index_add_(0, assignment, x)
+        counts = torch.bincount(assignment, minlength=n_clusters)
+        non_empty = counts > 0
+        # empty clusters keep their previous centroid
+        centroids[non_empty] = sums[non_empty]
+        centroids = torch.nn.functional.normalize(centroids, p=2, dim=1)
+    return centroids
+
+
+def _segment_max(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Max over consecutive column segments of a [n_rows, n_cols] matrix. offsets holds the start of each segment."""
+    return np.maximum.reduceat(values, offsets, axis=1)
+
+
+def _gather_token_ranges(
+    doc_ids: np.ndarray, doc_offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the token positions of the given documents and the start of every document in the returned array."""
+    starts = doc_offsets[doc_ids]
+    lengths = doc_offsets[doc_ids + 1] - starts
+    segment_starts = np.zeros(len(doc_ids), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=segment_starts[1:])
+    token_idx = np.repeat(starts - segment_starts, lengths) + np.arange(lengths.sum())
+    return token_idx, segment_starts
+
+
+def _check_token_embeddings(embeddings: np.ndarray) -> None:
+    if embeddings.ndim != 3:
+        raise ValueError(
+            "The multi-vector index expects token embeddings of shape [n_texts, n_tokens, dim], got embeddings of shape "
+            f"{embeddings.shape}. Single-vector embeddings should be searched exactly."
+        )
+
+
+class MultiVectorIndex:
+    """A PLAID-style index for late-interaction (MaxSim) retrieval.
+
+    Token embeddings are clustered into centroids and every token is stored as a centroid id plus an `nbits` quantized residual.
+    Searching follows the PLAID pipeline (https://arxiv.org/abs/2205.09707):
+        1. Candidate generation: every query token probes its `n_probe` closest centroids; all documents with a token in these
+            centroids are candidates.
+        2. Centroid interaction: candidates are scored with MaxSim using the centroids in place of the token embeddings. Centroids
+            scoring below `centroid_score_threshold` for all query tokens are ignored. The best `n_candidates` documents are kept.
+        3. Reranking: the remaining documents are scored with MaxSim over their decompressed token embeddings.
+
+    Documents are added in chunks with `add`, matching the chunked corpus encoding of `DenseRetrievalExactSearch`. The centroids are
+    trained on the first chunk.
+
+    Args:
+        n_bits: Number of bits used to quantize each dimension of the residuals. Must be 1, 2, 4 or 8.
+        n_centroids: Number of centroids. If None, it is derived from the number of tokens in the first chunk as in PLAID.
+        n_probe: Number of centroids probed per query token.
+        n_candidates: Number of documents kept after the centroid interaction.
+        centroid_score_threshold: Centroids whose best score over the query tokens is below this threshold are pruned during
+            the centroid interaction.
+        kmeans_sample_size: Maximum number of tokens used to train the centroids.
+        seed: Seed for the k-means initialization and token sampling.
+    """
+
+    def __init__(
+        self,
+        n_bits: int = 2,
+        n_centroids: int | None = None,
+        n_probe: int = 2,
+        n_candidates: int = 1024,
+        centroid_score_threshold: float = 0.45,
+        kmeans_sample_size: int = 262_144,
+        seed: int = 42,
+    ):
+        if n_bits not in (1, 2, 4, 8):
+            raise ValueError(f"n_bits must be one of 1, 2, 4 or 8, got {n_bits}")
+        self.n_bits = n_bits
+        self.n_centroids = n_centroids
+        self.n_probe = n_probe
+        self.n_candidates = n_candidates
+        self.centroid_score_threshold = centroid_score_threshold
+        self.kmeans_sample_size = kmeans_sample_size
+        self.seed = seed
+
+        self.centroids: np.ndarray | None = None
+        self.bucket_cutoffs: np.ndarray | None = None
+        self.bucket_weights: np.ndarray | None = None
+
+        self._codes: list[np.ndarray] = []
+        self._residuals: list[np.ndarray] = []
+        self._doc_lengths: list[np.ndarray] = []
+        self._finalized = False
+
+    @staticmethod
+    def _to_token_lists(embeddings) -> tuple[np.ndarray, np.ndarray]:
+        """Flattens padded [n_docs, n_tokens, dim] embeddings into normalized token vectors, dropping zero padding."""
+        embeddings = np.asarray(
+            embeddings.float().cpu()
+            if isinstance(embeddings, torch.Tensor)
+            else embeddings,
+            dtype=np.float32,
+        )
+        _check_token_embeddings(embeddings)
+        mask = np.abs(embeddings).sum(axis=-1) > 0
+        tokens = embeddings[mask]
+        tokens /= np.linalg.norm(tokens, axis=1, keepdims=True)
+        return tokens, mask.sum(axis=1)
+
+    def _train(self, tokens: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        if len(tokens) > self.kmeans_sample_size:
+            sample = tokens[
+                rng.choice(len(tokens), self.kmeans_sample_size, replace=False)
+            ]
+        else:
+            sample = tokens
+
+        n_centroids = self.n_centroids
+        if n_centroids is None:
+            n_centroids = 2 ** math.floor(math.log2(16 * math.sqrt(len(tokens))))
+        n_centroids = min(n_centroids, len(sample))
+        logger.info(f"Training {n_centroids} centroids on {len(sample)} tokens")
+
+        self.centroids = _kmeans(
+            torch.from_numpy(sample), n_centroids, seed=self.seed
+        ).numpy()
+
+        codes = (sample @ self.centroids.T).argmax(axis=1)
+        residuals = sample - self.centroids[codes]
+        n_buckets = 2**self.n_bits
+        self.bucket_cutoffs = np.quantile(
+            residuals, np.arange(1, n_buckets) / n_buckets
+        ).astype(np.float32)
+        self.bucket_weights = np.quantile(
+            residuals, (np.arange(n_buckets) + 0.5) / n_buckets
+        ).astype(np.float32)
+
+    def _compress(self, tokens: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        codes = np.empty(len(tokens), dtype=np.int32)
+        buckets = np.empty(tokens.shape, dtype=np.uint8)
+        for start in range(0, len(tokens), 65_536):
+            batch = tokens[start : start + 65_536]
+            batch_codes = (batch @ self.centroids.T).argmax(axis=1)
+            codes[start : start + len(batch)] = batch_codes
+            buckets[start : start + len(batch)] = np.searchsorted(
+                self.bucket_cutoffs, batch - self.centroids[batch_codes]
+            )
+        # keep the n_bits lowest bits of every bucket id and pack them into bytes
+        bits = np.unpackbits(buckets[..., None], axis=-1)[..., -self.n_bits :]
+        return codes, np.packbits(bits.reshape(len(tokens), -1), axis=1)
+
+    def _decompress(self, token_idx: np.ndarray) -> np.ndarray:
+        dim = self.centroids.shape[1]
+        bits = np.unpackbits(self._residuals[token_idx], axis=1)[:, : dim * self.n_bits]
+        bits = bits.reshape(len(token_idx), dim, self.n_bits)
+        buckets = np.zeros((len(token_idx), dim), dtype=np.int64)
+        for bit in range(self.n_bits):
+            buckets = (buckets << 1) | bits[..., bit]
+        tokens = self.centroids[self._codes[token_idx]] + self.bucket_weights[buckets]
+        return tokens / np.linalg.norm(tokens, axis=1, keepdims=True)
+
+    def add(self, embeddings) -> None:
+        """Adds a chunk of documents to the index.
+
+        Args:
+            embeddings: Padded token embeddings of shape [n_docs, n_tokens, dim]. Rows of zeros are treated as padding.
+        """
+        if self._finalized:
+            raise ValueError("Cannot add documents to a finalized index.")
+        tokens, doc_lengths = self._to_token_lists(embeddings)
+        if self.centroids is None:
+            self._train(tokens)
+        codes, residuals = self._compress(tokens)
+        self._codes.append(codes)
+        self._residuals.append(residuals)
+        self._doc_lengths.append(doc_lengths)
+
+    def finalize(self) -> None:
+        """Concatenates the added chunks and builds the inverted lists from centroids to documents."""
+        self._codes = np.concatenate(self._codes)
+        self._residuals = np.concatenate(self._residuals)
+        doc_lengths = np.concatenate(self._doc_lengths)
+        self.doc_offsets = np.zeros(len(doc_lengths) + 1, dtype=np.int64)
+        np.cumsum(doc_lengths, out=self.doc_offsets[1:])
+        self.n_docs = len(doc_lengths)
+
+        token_docs = np.repeat(np.arange(self.n_docs), doc_lengths)
+        pairs = np.unique(
+            self._codes.astype(np.int64) * self.n_docs + token_docs
+        )  # unique (centroid, doc) pairs sorted by centroid
+        self._ivf_docs = pairs % self.n_docs
+        self._ivf_offsets = np.searchsorted(
+            pairs // self.n_docs, np.arange(len(self.centroids) + 1)
+        )
+        self._finalized = True
+        logger.info(
+            f"Indexed {len(self._codes)} tokens from {self.n_docs} documents with {len(self.centroids)} centroids"
+        )
+
+    def _candidates(self, centroid_scores: np.ndarray) -> np.ndarray:
+        n_probe = min(self.n_probe, centroid_scores.shape[1])
+        probed = np.unique(
+            np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        )
+        return np.unique(
+            np.concatenate(
+                [
+                    self._ivf_docs[self._ivf_offsets[c] : self._ivf_offsets[c + 1]]
+                    for c in probed
+                ]
+            )
+        )
+
+    def _maxsim(
+        self, query_tokens: np.ndarray, doc_ids: np.ndarray, decompress: bool
+    ) -> np.ndarray:
+        token_idx, segment_starts = _gather_token_ranges(doc_ids, self.doc_offsets)
+        if decompress:
+            token_scores = query_tokens @ self._decompress(token_idx).T
+        else:
+            centroid_scores = query_tokens @ self.centroids.T
+            centroid_scores[
+                :, centroid_scores.max(axis=0) < self.centroid_score_threshold
+            ] = 0.0
+            token_scores = centroid_scores[:, self._codes[token_idx]]
+        return _segment_max(token_scores, segment_starts).sum(axis=0)
+
+    def search(self, query_embeddings, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Searches the index.
+
+        Args:
+            query_embeddings: Padded query token embeddings of shape [n_queries, n_tokens, dim].
+            top_k: Number of documents to return per query.
+
+        Returns:
+            A tuple of the scores and the document indices, both of shape [n_queries, top_k] and sorted by decreasing score.
+            Queries with fewer than top_k candidates are padded with a score of -inf and an index of -1, queries without any
+            token are only padding.
+        """
+        if not self._finalized:
+            self.finalize()
+        query_embeddings = np.asarray(
+            query_embeddings.float().cpu()
+            if isinstance(query_embeddings, torch.Tensor)
+            else query_embeddings,
+            dtype=np.float32,
+        )
+        _check_token_embeddings(query_embeddings)
+
+        all_scores = np.full((len(query_embeddings), top_k), -np.inf, dtype=np.float32)
+        all_indices = np.full((len(query_embeddings), top_k), -1, dtype=np.int64)
+        for i, query in enumerate(query_embeddings):
+            # queries are not normalized, as MaxSim is computed on the raw query tokens
+            query_tokens = query[np.abs(query).sum(axis=-1) > 0]
+            if len(query_tokens) == 0:
+                # e.g. an empty query, which does not probe any centroid
+                continue
+            candidates = self._candidates(query_tokens @ self.centroids.T)
+
+            if len(candidates) > self.n_candidates:
+                approx_scores = self._maxsim(query_tokens, candidates, decompress=False)
+                keep = np.argpartition(-approx_scores, self.n_candidates - 1)[
+                    : self.n_candidates
+                ]
+                candidates = candidates[keep]
+
+            scores = self._maxsim(query_tokens, candidates, decompress=True)
+            k = min(top_k, len(candidates))
+            top = np.argsort(-scores, kind="stable")[:k]
+            all_scores[i, :k] = scores[top]
+            all_indices[i, :k] = candidates[top]
+        return all_scores, all_indices
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import logging
+from time import time
+from typing import Any
+
+from mteb.abstasks.TaskMetadata import TaskMetadata
+from mteb.encoder_interface import Encoder
+
+from .model_classes import DenseRetrievalExactSearch, is_cross_encoder_compatible
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalPipeline:
+    """A retrieval pipeline where a first stage retriever feeds its top `depth` documents to a reranker, evaluated in a single run.
+
+    Both stages run in memory on the same loaded corpus, so the reranker only scores `depth` documents per query instead of the whole
+    corpus and no intermediate predictions file is needed. The pipeline can be passed to `MTEB.run` in place of a model. Besides the
+    scores of the reranked results, the scores of the first stage are reported with a `first_stage_` prefix, and the time taken by
+    each stage is reported as `first_stage_time` and `reranking_time` (in seconds).
+
+    Args:
+        first_stage: The first stage retriever, e.g. BM25 or a dense encoder.
+        reranker: The model reranking the results of the first stage. Cross-encoders score the query-document pairs using `predict`,
+            other encoders rerank the documents using their embedding similarity.
+        depth: The number of documents retrieved by the first stage and reranked for every query.
+
+    Example:
+        >>> import mteb
+        >>> pipeline = mteb.RetrievalPipeline(
+        ...     first_stage=mteb.get_model("bm25s"),
+        ...     reranker=mteb.get_model("cross-encoder/ms-marco-MiniLM-L-6-v2"),
+        ...     depth=100,
+        ... )
+        >>> results = mteb.MTEB(tasks=mteb.get_tasks(["SciFact"])).run(pipeline)
+    """
+
+    def __init__(self, first_stage: Encoder, reranker: Encoder, depth: int = 100):
+        # imported here to avoid a circular import, as the evaluators are imported by the tasks
+        from sentence_transformers import CrossEncoder, SentenceTransformer
+
+        from mteb.evaluation.MTEB import MTEB
+        from mteb.models import SentenceTransformerWrapper
+
+        first_stage_meta = MTEB.create_model_meta(first_stage)
+        reranker_meta = MTEB.create_model_meta(reranker)
+        if isinstance(first_stage, (SentenceTransformer, CrossEncoder)):
+            first_stage = SentenceTransformerWrapper(first_stage)
+            first_stage.mteb_model_meta = first_stage_meta
+        if isinstance(reranker, (SentenceTransformer, CrossEncoder)):
+            reranker = SentenceTransformerWrapper(reranker)
+            reranker.mteb_model_meta = reranker_meta
+
+        self.first_stage = first_stage
+        self.reranker = reranker
+        self.depth = depth
+        self.mteb_model_meta = reranker_meta.model_copy(
+            update={
+                "name": f"{reranker_meta.name}__{first_stage_meta.model_name_as_path()}_top{depth}",
+                "loader": None,
+            }
+        )
+
+        self.stage_results: dict[str, dict[str, dict[str, float]]] = {}
+        self.stage_times: dict[str, float] = {}
+
+    def _first_stage_search(
+        self,
+        corpus: dict[str, dict[str, str]],
+        queries: dict[str, str],
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        instructions: dict[str, str] | None,
+        encode_kwargs: dict[str, Any],
+        top_ranked: dict[str, list[str]] | None = None,
+        **kwargs: Any,
+    ) -> dict[str, dict[str, float]]:
+        # retrievers implementing their own search, like BM25, are not encoders
+        if callable(getattr(self.first_stage, "search", None)):
+            if top_ranked is None:
+                return self.first_stage.search(
+                    corpus,
+                    queries,
+                    self.depth,
+                    task_metadata=task_metadata,
+                    hf_split=hf_split,
+                    hf_subset=hf_subset,
+                    instructions=instructions,
+                    **kwargs,
+                )
+            # all candidates are searched, and the results of every query are restricted to its own candidates
+            candidates_corpus = {
+                doc_id: corpus[doc_id]
+                for doc_ids in top_ranked.values()
+                for doc_id in doc_ids
+            }
+            results = self.first_stage.search(
+                candidates_corpus,
+                queries,
+                len(candidates_corpus),
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                instructions=instructions,
+                **kwargs,
+            )
+            first_stage_results = {}
+            for qid, docs in results.items():
+                candidates = set(top_ranked.get(qid, []))
+                ranked = sorted(
+                    (doc_id for doc_id in docs if doc_id in candidates),
+                    key=docs.get,
+                    reverse=True,
+                )
+                first_stage_results[qid] = {
+                    doc_id: docs[doc_id] for doc_id in ranked[: self.depth]
+                }
+            return first_stage_results
+        return DenseRetrievalExactSearch(
+            self.first_stage, encode_kwargs=encode_kwargs
+        ).search(
+            corpus,
+            queries,
+            self.depth,
+            task_metadata=task_metadata,
+            hf_split=hf_split,
+            hf_subset=hf_subset,
+            instructions=instructions,
+            top_ranked=top_ranked,
+            **kwargs,
+        )
+
+    def _rerank(
+        self,
+        corpus: dict[str, dict[str, str]],
+        queries: dict[str, str],
+        first_stage_results: dict[str, dict[str, float]],
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        instructions: dict[str, str] | None,
+        encode_kwargs: dict[str, Any],
+        **kwargs: Any,
+    ) -> dict[str, dict[str, float]]:
+        reranker = DenseRetrievalExactSearch(
+            self.reranker,
+            encode_kwargs=encode_kwargs,
+            previous_results=first_stage_results,
+        )
+        if is_cross_encoder_compatible(self.reranker):
+            return reranker.search_cross_encoder(
+                corpus,
+                queries,
+                self.depth,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                task_metadata=task_metadata,
+                instructions=instructions,
+                **kwargs,
+            )
+        top_ranked = {
+            qid: sorted(docs, key=docs.get, reverse=True)
+            for qid, docs in first_stage_results.items()
+            if docs
+        }
+        return reranker.search(
+            corpus,
+            queries,
+            self.depth,
+            task_metadata=task_metadata,
+            hf_split=hf_split,
+            hf_subset=hf_subset,
+            instructions=instructions,
+            top_ranked=top_ranked,
+            **kwargs,
+        )
+
+    def search(
+        self,
+        corpus: dict[str, dict[str, str]],
+        queries: dict[str, str],
+        top_k: int,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        instructions: dict[str, str] | None = None,
+        encode_kwargs: dict[str, Any] | None = None,
+        top_ranked: dict[str, list[str]] | None = None,
+        **kwargs: Any,
+    ) -> dict[str, dict[str, float]]:
+        """Retrieves the top `depth` documents with the first stage and reranks them.
+
+        Args:
+            corpus: Dictionary mapping corpus IDs to document dictionaries
+            queries: Dictionary mapping query IDs to query strings
+            top_k: Number of top results to return. At most `depth` documents are returned per query.
+            task_metadata: Metadata of the task
+            hf_split: Name of split
+            hf_subset: Name of subset
+            instructions: Optional instructions to append to queries
+            encode_kwargs: Keyword arguments passed to the encode and predict methods of the models
+            top_ranked: The candidate documents of every query, e.g. of a reranking task. The first stage then only ranks the
+                candidates of every query instead of the whole corpus.
+            **kwargs: Additional keyword arguments passed to the search of both stages
+
+        Returns:
+            The reranked results in the format {qid: {doc_id: score}}. The results and the time taken by the first stage are stored in
+            `stage_results` and `stage_times`.
+        """
+        # imported here, as the models import the evaluators
+        from mteb.models.adaptive_batching import resolve_batch_size
+
+        encode_kwargs = encode_kwargs or {}
+        if top_k < self.depth:
+            logger.warning(
+                f"top_k ({top_k}) is lower than the depth of the pipeline ({self.depth}). All {self.depth} documents are reranked."
+            )
+
+        logger.info(f"Retrieving the top {self.depth} documents with the first stage.")
+        start_time = time()
+        first_stage_results = self._first_stage_search(
+            corpus,
+            queries,
+            task_metadata=task_metadata,
+            hf_split=hf_split,
+            hf_subset=hf_subset,
+            instructions=instructions,
+            encode_kwargs=resolve_batch_size(self.first_stage, encode_kwargs),
+            top_ranked=top_ranked,
+            **kwargs,
+        )
+        first_stage_time = time() - start_time
+
+        logger.info(f"Reranking the top {self.depth} documents.")
+        start_time = time()
+        results = self._rerank(
+            corpus,
+            queries,
+            first_stage_results,
+            task_metadata=task_metadata,
+            hf_split=hf_split,
+            hf_subset=hf_subset,
+            instructions=instructions,
+            encode_kwargs=resolve_batch_size(self.reranker, encode_kwargs),
+            **kwargs,
+        )
+        reranking_time = time() - start_time
+
+        self.stage_results = {"first_stage": first_stage_results}
+        self.stage_times = {
+            "first_stage": first_stage_time,
+            "reranking": reranking_time,
+        }
+        return results
@@ -0,0 +1,252 @@
+"""Writing and reading the predictions of retrieval tasks, i.e. the scores of the retrieved documents of every query.
+
+The predictions are written query by query instead of serializing all of them at once, in one of the formats:
+
+- `json`: `{qid: {doc_id: score}}`, the format used so far.
+- `parquet`: one row per retrieved document, with the columns `query_id`, `doc_id`, `rank` and `score`.
+- `trec`: a TREC run, with one `qid Q0 doc_id rank score run_name` line per retrieved document.
+
+The JSON and TREC files can be compressed with gzip, Parquet files with any codec supported by pyarrow (e.g. `zstd`). All
+formats can be loaded with `load_predictions`, e.g. as the `previous_results` to rerank.
+"""
+
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any, Literal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PredictionsFormat = Literal["json", "parquet", "trec"]
+
+_SUFFIXES = {"json": ".json", "parquet": ".parquet", "trec": ".trec"}
+
+
+def predictions_path(
+    output_folder: Path,
+    name: str,
+    predictions_format: PredictionsFormat = "json",
+    compression: str | None = None,
+) -> Path:
+    """The path of the predictions file `{name}_predictions` with the suffix of the format, e.g. `.trec.gz`."""
+    suffix = _SUFFIXES[predictions_format]
+    if compression is not None and predictions_format != "parquet":
+        suffix += ".gz"
+    return output_folder / f"{name}_predictions{suffix}"
+
+
+def top_k_documents(doc_scores: dict[str, float], top_k: int) -> dict[str, float]:
+    """The `top_k` documents with the highest scores, in their order in `doc_scores`."""
+    top_docs = {
+        doc_id
+        for doc_id, _ in heapq.nlargest(top_k, doc_scores.items(), key=itemgetter(1))
+    }
+    return {doc_id: score for doc_id, score in doc_scores.items() if doc_id in top_docs}
+
+
+def ranked_documents(
+    doc_scores: dict[str, float], top_k: int | None = None
+) -> list[tuple[str, float]]:
+    """The (`top_k`) documents by decreasing score, as a list of (doc_id, score)."""
+    if top_k is None:
+        return sorted(doc_scores.items(), key=itemgetter(1), reverse=True)
+    return heapq.nlargest(top_k, doc_scores.items(), key=itemgetter(1))
+
+
+def retrieval_errors(
+    results: dict[str, dict[str, float]],
+    relevant_docs: dict[str, dict[str, int]],
+    top_k: int | None = None,
+) -> dict[str, dict[str, list[str]]]:
+    """The retrieved documents which are not relevant (`false_positives`) and the relevant documents which are not retrieved
+    (`false_negatives`) of every query with errors.
+
+    Args:
+        results: The retrieved documents of every query with their scores.
+        relevant_docs: The relevant documents of every query.
+        top_k: The number of retrieved documents to consider, all of them if None.
+    """
+    errors = {}
+    for qid, doc_scores in results.items():
+        retrieved_docs = (
+            doc_scores if top_k is None else dict(ranked_documents(doc_scores, top_k))
+        )
+        expected_docs = relevant_docs[qid]
+        false_positives = [doc for doc in retrieved_docs if doc not in expected_docs]
+        false_negatives = [doc for doc in expected_docs if doc not in retrieved_docs]
+        if false_positives or false_negatives:
+            errors[qid] = {
+                "false_positives": false_positives,
+                "false_negatives": false_negatives,
+            }
+    return errors
+
+
+class PredictionsWriter:
+    """Writes the predictions of a retrieval task query by query, such that they never have to be serialized at once.
+
+    Args:
+        path: The path of the predictions file.
+        predictions_format: The format of the file, one of "json", "parquet" or "trec".
+        compression: "gzip" to compress JSON and TREC files, or the codec of Parquet files (e.g. "zstd"). Not compressed if
+            None.
+        run_name: The name of the run in the TREC format.
+        rows_per_batch: The number of rows buffered before they are written to a Parquet file.
+
+    Example:
+        >>> with PredictionsWriter("predictions.parquet", "parquet") as writer:
+        ...     for qid, doc_scores in results.items():
+        ...         writer.write(qid, doc_scores)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        predictions_format: PredictionsFormat = "json",
+        compression: str | None = None,
+        run_name: str = "mteb",
+        rows_per_batch: int = 100_000,
+    ):
+        if predictions_format not in _SUFFIXES:
+            raise ValueError(
+                f"Unknown predictions format {predictions_format}, expected one of {list(_SUFFIXES)}"
+            )
+        if predictions_format != "parquet" and compression not in (None, "gzip"):
+            raise ValueError(
+                f"The {predictions_format} predictions can only be compressed with gzip, got {compression}"
+            )
+        self.path = Path(path)
+        self.predictions_format = predictions_format
+        self.compression = compression
+        self.run_name = run_name
+        self.rows_per_batch = rows_per_batch
+
+        self._file: IO[str] | None = None
+        self._parquet_writer: pq.ParquetWriter | None = None
+        self._rows: dict[str, list[Any]] = {
+            "query_id": [],
+            "doc_id": [],
+            "rank": [],
+            "score": [],
+        }
+        self._n_queries = 0
+        if predictions_format != "parquet":
+            self._file = (
+                gzip.open(self.path, "wt", encoding="utf-8")
+                if compression == "gzip"
+                else open(self.path, "w", encoding="utf-8")
+            )
+            if predictions_format == "json":
+                self._file.write("{")
+
+    def write(self, query_id: str, doc_scores: dict[str, float]) -> None:
+        """Writes the retrieved documents of a query with their scores."""
+        if self.predictions_format == "json":
+            # the same separators as `json.dump`
+            separator = ", " if self._n_queries else ""
+            self._file.write(
+                f"{separator}{json.dumps(query_id)}: {json.dumps(doc_scores)}"
+            )
+        elif self.predictions_format == "trec":
+            self._file.writelines(
+                f"{query_id} Q0 {doc_id} {rank} {score} {self.run_name}\n"
+                for rank, (doc_id, score) in enumerate(
+                    ranked_documents(doc_scores), start=1
+                )
+            )
+        else:
+            for rank, (doc_id, score) in enumerate(
+                ranked_documents(doc_scores), start=1
+            ):
+                self._rows["query_id"].append(query_id)
+                self._rows["doc_id"].append(doc_id)
+                self._rows["rank"].append(rank)
+                self._rows["score"].append(score)
+            if len(self._rows["query_id"]) >= self.rows_per_batch:
+                self._write_parquet_rows()
+        self._n_queries += 1
+
+    def _write_parquet_rows(self) -> None:
+        table = pa.table(
+            {
+                "query_id": pa.array(self._rows["query_id"], pa.string()),
+                "doc_id": pa.array(self._rows["doc_id"], pa.string()),
+                "rank": pa.array(self._rows["rank"], pa.int32()),
+                "score": pa.array(self._rows["score"], pa.float64()),
+            }
+        )
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(
+                self.path, table.schema, compression=self.compression or "none"
+            )
+        self._parquet_writer.write_table(table)
+        for rows in self._rows.values():
+            rows.clear()
+
+    def close(self) -> None:
+        """Writes the remaining predictions and closes the file."""
+        if self._file is not None:
+            if self.predictions_format == "json":
+                self._file.write("}")
+            self._file.close()
+            self._file = None
+        elif self.predictions_format == "parquet":
+            if self._rows["query_id"] or self._parquet_writer is None:
+                self._write_parquet_rows()
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self) -> PredictionsWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def load_predictions(path: str | Path) -> dict[str, dict[str, float]]:
+    """Loads predictions in any of the formats of `PredictionsWriter`, inferred from the suffix of the file, as
+    `{qid: {doc_id: score}}`. Files with an unknown suffix are read as JSON.
+    """
+    path = Path(path)
+    suffixes = [suffix for suffix in path.suffixes if suffix != ".gz"]
+    suffix = suffixes[-1] if suffixes else ""
+
+    if suffix == ".parquet":
+        table = pq.read_table(path, columns=["query_id", "doc_id", "score"])
+        predictions = {}
+        for query_id, doc_id, score in zip(
+            *(table.column(name).to_pylist() for name in table.column_names)
+        ):
+            predictions.setdefault(query_id, {})[doc_id] = score
+        return predictions
+
+    with _open_text(path) as f:
+        if suffix == ".trec":
+            predictions = {}
+            for line in f:
+                query_id, _, doc_id, _, score, *_ = line.split()
+                predictions.setdefault(query_id, {})[doc_id] = float(score)
+            return predictions
+        predictions = json.load(f)
+
+    if not isinstance(predictions, dict) or not isinstance(
+        next(iter(predictions.values()), {}), dict
+    ):
+        raise ValueError(
+            f"Previous results file must be in format {{qid: {{doc_id: score}}}}. Got {type(predictions)}"
+        )
+    return predictions
+
+
+def _open_text(path: Path) -> IO[str]:
+    """Opens a text file, decompressing it if it is gzipped."""
+    with open(path, "rb") as f:
+        is_gzip = f.read(2) == b"\x1f\x8b"
+    if is_gzip:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
@@ -113,6 +113,13 @@ class TaskResult(BaseModel):
             the dataset.
         evaluation_time: The time taken to evaluate the model.
         kg_co2_emissions: The kg of CO2 emissions produced by the model during evaluation.
+        carbon_intensity: The carbon intensity of the electricity used to compute the emissions, in kg CO2-equivalents per kWh.
+        profiling: The time spent in every stage of the evaluation, with their counters and the peak memory, if the evaluation was
+            profiled. The profiling is a dictionary with the following structure; dict[Split, dict[HFSubset, dict[str, Any]]],
+            see `mteb.profiling.Profiler.summary`.
+        quantization: The memory of the quantized embeddings and the speed of their similarity computations, if the model
+            quantizes its embeddings, with the structure dict[Split, dict[HFSubset, dict[str, float]]], see
+            `mteb.models.quantization.QuantizedEncoderWrapper.quantization_statistics`.
 
     Example:
         >>> scores = {
@@ -147,6 +154,9 @@ class TaskResult(BaseModel):
     scores: dict[Split, list[ScoresDict]]
     evaluation_time: float | None
     kg_co2_emissions: float | None = None
+    carbon_intensity: float | None = None
+    profiling: dict[str, dict[str, dict[str, Any]]] | None = None
+    quantization: dict[str, dict[str, dict[str, float]]] | None = None
 
     @classmethod
     def from_task_results(
@@ -155,6 +165,9 @@ class TaskResult(BaseModel):
         scores: dict[Split, dict[HFSubset, ScoresDict]],
         evaluation_time: float,
         kg_co2_emissions: float | None = None,
+        profiling: dict[str, dict[str, dict[str, Any]]] | None = None,
+        carbon_intensity: float | None = None,
+        quantization: dict[str, dict[str, dict[str, float]]] | None = None,
     ) -> TaskResult:
         task_meta = task.metadata
         subset2langscripts = task_meta.hf_subsets_to_langscripts
@@ -176,6 +189,9 @@ class TaskResult(BaseModel):
             scores=flat_scores,
             evaluation_time=evaluation_time,
             kg_co2_emissions=kg_co2_emissions,
+            carbon_intensity=carbon_intensity,
+            profiling=profiling,
+            quantization=quantization,
         )
 
     @field_validator("scores")
@@ -230,7 +246,14 @@ class TaskResult(BaseModel):
         return self.task.metadata.type
 
     def to_dict(self) -> dict:
-        return self.model_dump()
+        # the profiling and the quantization are only included if the evaluation was profiled or quantized, and the carbon
+        # intensity if the emissions were measured
+        exclude = {
+            field
+            for field in ("profiling", "carbon_intensity", "quantization")
+            if getattr(self, field) is None
+        }
+        return self.model_dump(exclude=exclude or None)
 
     @classmethod
     def from_dict(cls, data: dict) -> TaskResult:
@@ -252,7 +275,7 @@ class TaskResult(BaseModel):
                 scores[key] = round(value, n)
 
     def to_disk(self, path: Path) -> None:
-        json_obj = self.model_dump()
+        json_obj = self.to_dict()
         self._round_scores(json_obj["scores"], 6)
 
         with path.open("w") as f:
@@ -503,6 +526,42 @@ class TaskResult(BaseModel):
             raise ValueError("No splits had scores for the specified languages.")
         return val_sum / n_val
 
+    def get_matryoshka_scores(
+        self,
+        splits: list[Split] | None = None,
+        getter: Callable[[ScoresDict], Score] = lambda scores: scores["main_score"],
+        aggregation: Callable[[list[Score]], Any] = np.mean,
+    ) -> dict[int, Any]:
+        """Get the score of every truncated dimension evaluated with the `MatryoshkaEncoderWrapper`.
+
+        Args:
+            splits: The splits to consider.
+            getter: A function that takes the scores dictionary of a dimension and returns a score.
+            aggregation: The aggregation function to use.
+
+        Returns:
+            A dictionary mapping every dimension to the result of the aggregation function on its scores.
+        """
+        if splits is None:
+            splits = list(self.scores.keys())
+
+        dimensions = {
+            dimension
+            for split in splits
+            for scores in self.scores.get(split, [])
+            for dimension in scores.get("matryoshka_dimensions", {})
+        }
+        return {
+            int(dimension): self.get_score(
+                splits=splits,
+                getter=lambda scores, dimension=dimension: getter(
+                    scores["matryoshka_dimensions"][dimension]
+                ),
+                aggregation=aggregation,
+            )
+            for dimension in sorted(dimensions, key=int)
+        }
+
     @classmethod
     def from_validated(cls, **data) -> TaskResult:
         return cls.model_construct(**data)
@@ -8,6 +8,7 @@ from torch.utils.data import DataLoader
 
 import mteb
 from mteb.abstasks.TaskMetadata import TASK_TYPE, TaskMetadata
+from mteb.encoder_interface import Encoder
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.similarity_functions import (
     cos_sim,
@@ -285,3 +286,37 @@ class AbsEncoder(ABC):
             The combined query and instruction text.
         """
         return f"{query} {instruction}"
+
+
+class EncoderWrapper(AbsEncoder):
+    """Base class of the wrappers which change how the inputs of a model are encoded and otherwise behave as the wrapped model.
+
+    The similarities are computed by the wrapped model and the attributes which are not set on the wrapper fall back to the
+    attributes of the wrapped model. Wrappers which compute the similarities themselves set `_forwards_similarity` to False, as
+    `matmul_similarity_fn_name` resolves the wrappers marked with it to the wrapped model.
+
+    Args:
+        model: The model to wrap.
+    """
+
+    _forwards_similarity = True
+
+    def __init__(self, model: Encoder):
+        self._model = model
+        self.mteb_model_meta = getattr(model, "mteb_model_meta", None)
+
+    def similarity(self, embeddings1: Array, embeddings2: Array) -> Array:
+        if hasattr(self._model, "similarity"):
+            return self._model.similarity(embeddings1, embeddings2)
+        return super().similarity(embeddings1, embeddings2)
+
+    def similarity_pairwise(self, embeddings1: Array, embeddings2: Array) -> Array:
+        if hasattr(self._model, "similarity_pairwise"):
+            return self._model.similarity_pairwise(embeddings1, embeddings2)
+        return super().similarity_pairwise(embeddings1, embeddings2)
+
+    def __getattr__(self, name: str) -> Any:
+        """Falls back to the attributes of the wrapped model"""
+        if name == "_model":
+            raise AttributeError(name)
+        return getattr(self._model, name)
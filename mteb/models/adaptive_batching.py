@@ -0,0 +1,210 @@
+"""Adaptive batching of local encoders under a memory budget.
+
+A single static batch size either runs out of memory on long passages or under-utilizes the hardware on short sentences.
+With `encode_kwargs={"batch_size": "auto"}`, the texts are instead grouped into batches of at most `token_budget` padded
+tokens (the number of texts times the length of the longest text of the batch). The budget starts large and is halved
+whenever a batch runs out of GPU memory, or when the RSS of the process exceeds `memory_budget_mb` on CPU. The largest safe
+budget is remembered per model and used for the following encode calls.
+
+Example:
+    >>> model = mteb.get_model("sentence-transformers/all-MiniLM-L6-v2")
+    >>> evaluation.run(model, encode_kwargs={"batch_size": "auto"})
+"""
+
+from __future__ import annotations
+
+import logging
+import weakref
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+from mteb.create_dataloaders import DEFAULT_BATCH_SIZE, static_batch_size
+from mteb.profiling import rss_mb
+from mteb.types import Array
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 2**17
+
+# the largest token budget which did not run out of memory, per model
+_safe_token_budgets: weakref.WeakKeyDictionary[Any, int] = weakref.WeakKeyDictionary()
+
+
+def is_oom_error(error: BaseException) -> bool:
+    """Whether the error is an out of memory error of torch."""
+    return isinstance(error, torch.cuda.OutOfMemoryError) or (
+        isinstance(error, RuntimeError) and "out of memory" in str(error)
+    )
+
+
+def _batch_end(
+    lengths: Sequence[int], order: Sequence[int], start: int, token_budget: int
+) -> int:
+    """The end of the batch starting at `start` in `order`, the texts sorted from the longest to the shortest, such that
+    the batch has at most `token_budget` padded tokens. A text longer than the budget forms its own batch.
+    """
+    # the texts are sorted, so the first text of the batch is the longest
+    batch_size = max(token_budget // max(lengths[order[start]], 1), 1)
+    return min(start + batch_size, len(order))
+
+
+class AdaptiveBatcher:
+    """Encodes texts in batches formed by token count, backing off when running out of memory.
+
+    Args:
+        model: The model, used as the key of the remembered token budget.
+        token_budget: The initial number of padded tokens per batch. Defaults to the remembered budget of the model or to
+            `DEFAULT_TOKEN_BUDGET`.
+        memory_budget_mb: The maximal RSS of the process in MB, used on CPU where running out of memory cannot be caught.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        token_budget: int | None = None,
+        memory_budget_mb: float | None = None,
+    ):
+        self.model = model
+        self.token_budget = token_budget or _safe_token_budgets.get(
+            model, DEFAULT_TOKEN_BUDGET
+        )
+        self.memory_budget_mb = memory_budget_mb
+
+    def _reduce_budget(self, min_budget: int, reason: str) -> None:
+        """Halves the token budget, down to `min_budget`, i.e. a batch of a single text."""
+        if self.token_budget <= min_budget:
+            return
+        self.token_budget = max(self.token_budget // 2, min_budget)
+        logger.info(f"{reason}, reducing the batch size to {self.token_budget} tokens")
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        lengths: Sequence[int],
+        encode_batch: Callable[[list[str]], Array],
+    ) -> Array:
+        """Encodes the texts with `encode_batch` and returns the embeddings in the order of the texts.
+
+        Args:
+            texts: The texts to encode.
+            lengths: The number of tokens of every text, including the special tokens and the prompt.
+            encode_batch: Encodes a batch of texts.
+        """
+        # from the longest to the shortest text, such that texts of similar lengths are padded together and the largest
+        # batches, which are the most likely to run out of memory, come first
+        order = np.argsort(-np.asarray(lengths), kind="stable").tolist()
+        embeddings: list[Array | None] = [None] * len(texts)
+        start = 0
+        while start < len(order):
+            end = _batch_end(lengths, order, start, self.token_budget)
+            batch = order[start:end]
+            try:
+                batch_embeddings = encode_batch([texts[idx] for idx in batch])
+            except Exception as e:
+                if not is_oom_error(e):
+                    raise
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                if len(batch) == 1:
+                    raise MemoryError(
+                        f"A single text of {lengths[batch[0]]} tokens does not fit in memory"
+                    ) from e
+                self._reduce_budget(max(lengths[batch[0]], 1), "Out of memory")
+                continue
+
+            for idx, embedding in zip(batch, batch_embeddings):
+                embeddings[idx] = embedding
+            start = end
+
+            rss = rss_mb()
+            if (
+                self.memory_budget_mb is not None
+                and rss is not None
+                and rss > self.memory_budget_mb
+                and start < len(order)
+            ):
+                self._reduce_budget(
+                    max(lengths[order[start]], 1),
+                    f"RSS of {rss:.0f} MB over the budget of {self.memory_budget_mb:.0f} MB",
+                )
+
+        _safe_token_budgets[self.model] = self.token_budget
+        if isinstance(embeddings[0], torch.Tensor):
+            return torch.stack(embeddings)
+        return np.stack(embeddings)
+
+
+def _sentence_transformer_lengths(
+    model: SentenceTransformer, sentences: Sequence[str], prompt: str | None
+) -> list[int]:
+    """The number of tokens of every sentence seen by the model, including the prompt, or the number of words if the model
+    has no (callable) tokenizer.
+    """
+    prompt = prompt or ""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None or not callable(tokenizer):
+        prompt_length = len(prompt.split())
+        return [prompt_length + len(sentence.split()) for sentence in sentences]
+    input_ids = tokenizer(
+        [prompt + sentence for sentence in sentences],
+        add_special_tokens=True,
+        truncation=model.max_seq_length is not None,
+        max_length=model.max_seq_length,
+    )["input_ids"]
+    return [len(ids) for ids in input_ids]
+
+
+def encode_sentences(
+    model: SentenceTransformer, sentences: Sequence[str], **kwargs: Any
+) -> Array:
+    """`model.encode(sentences, **kwargs)`, with adaptive batching if `batch_size="auto"`.
+
+    The adaptive batching accepts the optional `token_budget` and `memory_budget_mb` keyword arguments, see
+    `AdaptiveBatcher`. Used by the wrappers of Sentence Transformers models.
+    """
+    if kwargs.get("batch_size") != "auto":
+        return model.encode(sentences, **kwargs)
+
+    kwargs.pop("batch_size")
+    batcher = AdaptiveBatcher(
+        model,
+        token_budget=kwargs.pop("token_budget", None),
+        memory_budget_mb=kwargs.pop("memory_budget_mb", None),
+    )
+    if len(sentences) == 0:
+        return model.encode(sentences, **kwargs)
+
+    prompt = kwargs.get("prompt")
+    if prompt is None and kwargs.get("prompt_name") is not None:
+        prompt = model.prompts.get(kwargs["prompt_name"])
+    lengths = _sentence_transformer_lengths(model, sentences, prompt)
+    kwargs.setdefault("show_progress_bar", False)
+
+    return batcher.encode(
+        sentences,
+        lengths,
+        lambda batch: model.encode(batch, batch_size=len(batch), **kwargs),
+    )
+
+
+def supports_adaptive_batching(model: Any) -> bool:
+    """Whether the model encodes with `encode_sentences`, i.e. handles `batch_size="auto"`. The wrappers of models, e.g. for
+    profiling or caching, fall back to the attribute of the wrapped model.
+    """
+    return getattr(model, "supports_adaptive_batching", False)
+
+
+def resolve_batch_size(model: Any, encode_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """The encode kwargs of the model: with `batch_size="auto"`, the models without adaptive batching encode batches of
+    `DEFAULT_BATCH_SIZE` texts and do not receive the arguments of the adaptive batching.
+    """
+    if encode_kwargs.get("batch_size") != "auto" or supports_adaptive_batching(model):
+        return encode_kwargs
+    logger.info(
+        f"{type(model).__name__} does not support adaptive batching, using a batch size of {DEFAULT_BATCH_SIZE}"
+    )
+    return static_batch_size(encode_kwargs)
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import random
+import time
+import urllib.error
+from collections.abc import Awaitable, Sequence
+from typing import Callable, TypeVar
+
+import tqdm
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# the transient errors without a status code: connection errors and timeouts
+RETRYABLE_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    concurrent.futures.TimeoutError,
+    urllib.error.URLError,
+)
+# the connection errors and timeouts of the vendor SDKs and of their HTTP clients, matched by name to not import them
+RETRYABLE_ERROR_NAMES = frozenset(
+    {
+        # openai, anthropic and voyageai, APITimeoutError is also a connection error
+        "APIConnectionError",
+        "APITimeoutError",
+        # httpx, the base class of its connection errors and timeouts
+        "TransportError",
+        # requests and urllib3, which do not subclass the builtin errors
+        "ConnectionError",
+        "Timeout",
+        "ProtocolError",
+        # botocore
+        "EndpointConnectionError",
+        "ConnectTimeoutError",
+        "ReadTimeoutError",
+        # voyageai
+        "ServiceUnavailableError",
+        "RateLimitError",
+    }
+)
+
+
+def _status_code(error: BaseException) -> int | None:
+    """Finds the HTTP status code of an error raised by one of the vendor SDKs or by urllib."""
+    for attr in ("status_code", "status", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        # botocore ClientError
+        return response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _retry_after(error: BaseException) -> float | None:
+    """The delay requested by the server through the Retry-After header, if any."""
+    headers = getattr(error, "headers", None) or getattr(
+        getattr(error, "response", None), "headers", None
+    )
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether a failed request should be retried.
+
+    Errors with a status code are retried if they are caused by rate limiting, timeouts or server errors, but not other client
+    errors (e.g. a 400 caused by an invalid input). Errors without a status code are only retried if they are connection
+    errors or timeouts (`RETRYABLE_ERRORS` and `RETRYABLE_ERROR_NAMES`), such that bugs, e.g. a KeyError when parsing a
+    response, are raised at once.
+    """
+    status_code = _status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, RETRYABLE_ERRORS) or any(
+        cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__
+    )
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `capacity` tokens per `interval` seconds.
+
+    Used to limit the number of requests per minute and the number of tokens per minute sent to an API.
+
+    Args:
+        capacity: The number of tokens available per interval.
+        interval: The interval in seconds.
+        clock: The clock used to refill the bucket, in seconds.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.refill_rate = capacity / interval
+        self.clock = clock
+        self._tokens = capacity
+        self._last_refill = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate
+        )
+        self._last_refill = now
+
+    def wait_time(self, amount: float) -> float:
+        """The time to wait until `amount` tokens are available. Amounts larger than the capacity are capped to the capacity."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self._tokens) / self.refill_rate)
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+
+
+class APIRequestEngine:
+    """Sends the requests of the API models concurrently while respecting the rate limits of the API.
+
+    The requests are run on an asyncio event loop with at most `max_concurrency` requests in flight. Synchronous request
+    functions, such as the calls of the vendor SDKs, are run in a thread. Before a request is sent, the engine waits until the
+    requests per minute and tokens per minute limits allow it. Failed requests are retried with an exponential backoff with
+    jitter, and the results are returned in the order of the inputs.
+
+    The rate limits are kept between calls of `run`, so a single engine should be used per model.
+
+    Args:
+        max_concurrency: The maximum number of requests in flight.
+        max_rpm: The maximum number of requests per minute. If None, the requests are not limited.
+        max_tpm: The maximum number of tokens per minute. If None, the tokens are not limited.
+        max_retries: The number of times a failed request is retried before the error is raised.
+        initial_backoff: The delay in seconds before the first retry. It is doubled for every following retry.
+        max_backoff: The maximum delay in seconds between two retries.
+        is_retryable: Decides whether a failed request is retried. Defaults to `is_retryable_error`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_rpm: int | None = None,
+        max_tpm: int | None = None,
+        max_retries: int = 5,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        is_retryable: Callable[[BaseException], bool] = is_retryable_error,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be at least 1, got {max_concurrency}"
+            )
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.is_retryable = is_retryable
+        self._request_bucket = TokenBucket(max_rpm) if max_rpm else None
+        self._token_bucket = TokenBucket(max_tpm) if max_tpm else None
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        delay = min(self.max_backoff, self.initial_backoff * 2**attempt)
+        # equal jitter: half of the delay is fixed, the other half is random
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        retry_after = _retry_after(error)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    async def _wait_for_rate_limits(self, n_tokens: int, lock: asyncio.Lock) -> None:
+        # the lock makes the requests acquire the rate limits in the order in which they are sent
+        async with lock:
+            while True:
+                wait = max(
+                    bucket.wait_time(amount)
+                    for bucket, amount in (
+                        (self._request_bucket, 1),
+                        (self._token_bucket, n_tokens),
+                    )
+                    if bucket is not None
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self._request_bucket is not None:
+                self._request_bucket.consume(1)
+            if self._token_bucket is not None:
+                self._token_bucket.consume(n_tokens)
+
+    async def _request(
+        self,
+        request_fn: Callable[[T], R | Awaitable[R]],
+        request_input: T,
+        n_tokens: int,
+        semaphore: asyncio.Semaphore,
+        lock: asyncio.Lock,
+        executor: concurrent.futures.Executor,
+    ) -> R:
+        attempt = 0
+        async with semaphore:
+            while True:
+                if self._request_bucket is not None or self._token_bucket is not None:
+                    await self._wait_for_rate_limits(n_tokens, lock)
+                try:
+                    if inspect.iscoroutinefunction(request_fn):
+                        return await request_fn(request_input)
+                    return await asyncio.get_running_loop().run_in_executor(
+                        executor, request_fn, request_input
+                    )
+                except Exception as e:
+                    if attempt == self.max_retries or not self.is_retryable(e):
+                        raise
+                    delay = self._backoff(attempt, e)
+                    logger.warning(
+                        f"Request failed with {e!r}. Retrying in {delay:.1f} seconds ({attempt + 1}/{self.max_retries})."
+                    )
+                    await asyncio.sleep(delay)
+                    attempt += 1
+
+    async def _run(
+        self,
+        request_fn: Callable[[T], R | Awaitable[R]],
+        request_inputs: Sequence[T],
+        n_tokens: Sequence[int],
+        show_progress_bar: bool,
+    ) -> list[R]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        lock = asyncio.Lock()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency
+        )
+        tasks = [
+            asyncio.ensure_future(
+                self._request(
+                    request_fn, request_input, tokens, semaphore, lock, executor
+                )
+            )
+            for request_input, tokens in zip(request_inputs, n_tokens)
+        ]
+        try:
+            with tqdm.tqdm(
+                total=len(tasks), leave=False, disable=not show_progress_bar
+            ) as progress_bar:
+                for future in asyncio.as_completed(tasks):
+                    await future
+                    progress_bar.update(1)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            executor.shutdown(wait=False)
+        return [task.result() for task in tasks]
+
+    def run(
+        self,
+        request_fn: Callable[[T], R | Awaitable[R]],
+        request_inputs: Sequence[T],
+        n_tokens: Sequence[int] | None = None,
+        show_progress_bar: bool = False,
+    ) -> list[R]:
+        """Sends one request per input and returns the results in the order of the inputs.
+
+        Args:
+            request_fn: Sends a single request. Can be a regular function, which is run in a thread, or a coroutine function.
+            request_inputs: The inputs of the requests, e.g. batches of texts.
+            n_tokens: The number of tokens of every request, used for the tokens per minute limit.
+            show_progress_bar: Whether to show a progress bar.
+
+        Returns:
+            The results of `request_fn` for every input.
+        """
+        if n_tokens is None:
+            n_tokens = [0] * len(request_inputs)
+        coroutine = self._run(request_fn, request_inputs, n_tokens, show_progress_bar)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # an event loop is already running (e.g. in a notebook), so the requests are run on a new loop in another thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
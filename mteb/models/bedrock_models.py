@@ -6,12 +6,12 @@ import re
 from typing import Any
 
 import numpy as np
-import tqdm
 from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.api_request_engine import APIRequestEngine
 from mteb.models.cohere_models import model_prompts as cohere_model_prompts
 from mteb.models.cohere_models import supported_languages as cohere_supported_languages
 from mteb.requires_package import requires_package
@@ -27,6 +27,9 @@ class BedrockModel(AbsEncoder):
         provider: str,
         max_tokens: int,
         model_prompts: dict[str, str] | None = None,
+        max_concurrency: int = 8,
+        max_rpm: int | None = None,
+        max_retries: int = 5,
         **kwargs,
     ) -> None:
         requires_package(self, "boto3", "The AWS SDK for Python")
@@ -38,6 +41,11 @@ class BedrockModel(AbsEncoder):
 
         self._model_id = model_id
         self._provider = provider.lower()
+        self._engine = APIRequestEngine(
+            max_concurrency=max_concurrency,
+            max_rpm=max_rpm,
+            max_retries=max_retries,
+        )
 
         if self._provider == "cohere":
             self.model_prompts = model_prompts
@@ -80,22 +88,17 @@ class BedrockModel(AbsEncoder):
     ) -> np.ndarray:
         from botocore.exceptions import ValidationError
 
-        all_embeddings = []
         # https://docs.aws.amazon.com/bedrock/latest/userguide/titan-embedding-models.html
         max_sequence_length = int(self._max_tokens * 4.5)
 
-        for sentence in tqdm.tqdm(
-            sentences, leave=False, disable=not show_progress_bar
-        ):
+        def embed(sentence: str) -> np.ndarray:
             if len(sentence) > max_sequence_length:
                 truncated_sentence = sentence[:max_sequence_length]
             else:
                 truncated_sentence = sentence
 
             try:
-                embedding = self._embed_amazon(truncated_sentence)
-                all_embeddings.append(embedding)
-
+                return self._embed_amazon(truncated_sentence)
             except ValidationError as e:
                 error_str = str(e)
                 pattern = r"request input token count:\s*(\d+)"
@@ -106,12 +109,12 @@ class BedrockModel(AbsEncoder):
                     ratio = 0.9 * (self._max_tokens / num_tokens)
                     dynamic_cutoff = int(len(truncated_sentence) * ratio)
 
-                    embedding = self._embed_amazon(truncated_sentence[:dynamic_cutoff])
-                    all_embeddings.append(embedding)
-                else:
-                    raise e
+                    return self._embed_amazon(truncated_sentence[:dynamic_cutoff])
+                raise e
 
-        return np.array(all_embeddings)
+        return np.array(
+            self._engine.run(embed, sentences, show_progress_bar=show_progress_bar)
+        )
 
     def _encode_cohere(
         self,
@@ -124,9 +127,7 @@ class BedrockModel(AbsEncoder):
             for i in range(0, len(sentences), self._max_batch_size)
         ]
 
-        all_embeddings = []
-
-        for batch in tqdm.tqdm(batches, leave=False, disable=not show_progress_bar):
+        def embed(batch: list[str]) -> np.ndarray:
             response = self._client.invoke_model(
                 body=json.dumps(
                     {
@@ -138,7 +139,13 @@ class BedrockModel(AbsEncoder):
                 accept="*/*",
                 contentType="application/json",
             )
-            all_embeddings.extend(self._to_numpy(response))
+            return self._to_numpy(response)
+
+        all_embeddings = []
+        for embeddings in self._engine.run(
+            embed, batches, show_progress_bar=show_progress_bar
+        ):
+            all_embeddings.extend(embeddings)
 
         return np.array(all_embeddings)
 
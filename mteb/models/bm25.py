@@ -1,117 +1,509 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import Literal
+import os
+import re
+from pathlib import Path
+from typing import Any, Literal
 
+import numpy as np
+import scipy.sparse
+
+from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.model_meta import ModelMeta
 from mteb.models.abs_encoder import AbsEncoder
 from mteb.requires_package import requires_package
 
 logger = logging.getLogger(__name__)
 
+# the BM25 models, which search the corpus themselves and only support retrieval tasks
+BM25_MODEL_NAMES = ("bm25s", "mteb/bm25-sparse")
+
+# The english stopwords of Lucene, which are also the default stopwords of bm25s
+ENGLISH_STOPWORDS = frozenset(
+    [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "but",
+        "by",
+        "for",
+        "if",
+        "in",
+        "into",
+        "is",
+        "it",
+        "no",
+        "not",
+        "of",
+        "on",
+        "or",
+        "such",
+        "that",
+        "the",
+        "their",
+        "then",
+        "there",
+        "these",
+        "they",
+        "this",
+        "to",
+        "was",
+        "will",
+        "with",
+    ]
+)
+
+
+def default_bm25_cache_dir() -> Path:
+    """The directory in which BM25 indexes are persisted. Uses the MTEB_CACHE environment variable or "~/.cache/mteb" by default."""
+    cache_directory = os.environ.get("MTEB_CACHE", None)
+    cache_directory = (
+        Path(cache_directory) if cache_directory else Path.home() / ".cache" / "mteb"
+    )
+    return cache_directory / "bm25_indexes"
+
+
+def _hash_corpus(corpus_ids: list[str], corpus_texts: list[str]) -> str:
+    """Hashes the id and the text of every document."""
+    corpus_hash = hashlib.sha256()
+    for corpus_id, text in zip(corpus_ids, corpus_texts):
+        # the lengths delimit the values, which can contain any character
+        for value in (corpus_id, text):
+            encoded = value.encode()
+            corpus_hash.update(len(encoded).to_bytes(8, "little"))
+            corpus_hash.update(encoded)
+    return corpus_hash.hexdigest()
+
+
+class BM25Tokenizer:
+    """Lowercases, splits on a regex pattern, removes stopwords and (optionally) stems the texts. Mirrors the tokenization of bm25s.
+
+    Args:
+        stopwords: "en" for the english stopwords, a list of stopwords, or None to keep all tokens.
+        stemmer_language: The language of the PyStemmer stemmer, or None to not stem the tokens. Requires PyStemmer.
+        token_pattern: The regex pattern used to split the texts into tokens.
+    """
+
+    def __init__(
+        self,
+        stopwords: str | list[str] | None = "en",
+        stemmer_language: str | None = None,
+        token_pattern: str = r"(?u)\b\w\w+\b",
+    ):
+        if stopwords == "en":
+            self.stopwords = ENGLISH_STOPWORDS
+        elif stopwords is None:
+            self.stopwords = frozenset()
+        elif isinstance(stopwords, str):
+            raise ValueError(
+                f"Unknown stopwords '{stopwords}'. Use 'en', a list of stopwords or None."
+            )
+        else:
+            self.stopwords = frozenset(stopwords)
+
+        self.stemmer = None
+        self.stemmer_language = None
+        if stemmer_language is not None:
+            # the results of a model are saved under the same name with and without stemming, so stemming is never skipped
+            requires_package(self, "Stemmer", "BM25", "pip install mteb[bm25s]")
+            import Stemmer
+
+            self.stemmer = Stemmer.Stemmer(stemmer_language)
+            self.stemmer_language = stemmer_language
+        self.token_pattern = token_pattern
+        self._split = re.compile(token_pattern).findall
+
+    @property
+    def config(self) -> dict[str, Any]:
+        return {
+            "stopwords": sorted(self.stopwords),
+            "stemmer_language": self.stemmer_language,
+            "token_pattern": self.token_pattern,
+        }
+
+    def __call__(self, texts: list[str]) -> list[list[str]]:
+        tokenized = [
+            [
+                token
+                for token in self._split(text.lower())
+                if token not in self.stopwords
+            ]
+            for text in texts
+        ]
+        if self.stemmer is None:
+            return tokenized
+        # stem every unique token only once
+        unique_tokens = list({token for tokens in tokenized for token in tokens})
+        stems = dict(zip(unique_tokens, self.stemmer.stemWords(unique_tokens)))
+        return [[stems[token] for token in tokens] for tokens in tokenized]
+
+
+class SparseBM25Index:
+    """A BM25 index stored as a [vocabulary size, number of documents] scipy.sparse CSR matrix of precomputed term weights.
+
+    Scoring a batch of queries is a single sparse matrix product between the query-term count matrix and the term-document matrix.
+    The weights follow the Lucene variant of BM25, which is also the default of bm25s.
+
+    Args:
+        term_doc: The term-document matrix with the BM25 weight of every (term, document) pair.
+        vocab: Mapping from token to row of the term-document matrix.
+        corpus_ids: The id of every column of the term-document matrix.
+    """
+
+    def __init__(
+        self,
+        term_doc: scipy.sparse.csr_matrix,
+        vocab: dict[str, int],
+        corpus_ids: list[str],
+    ):
+        self.term_doc = term_doc
+        self.vocab = vocab
+        self.corpus_ids = corpus_ids
+
+    @classmethod
+    def build(
+        cls,
+        corpus_tokens: list[list[str]],
+        corpus_ids: list[str],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> SparseBM25Index:
+        vocab: dict[str, int] = {}
+        term_ids = [
+            [vocab.setdefault(token, len(vocab)) for token in tokens]
+            for tokens in corpus_tokens
+        ]
+        doc_lengths = np.array([len(ids) for ids in term_ids], dtype=np.float32)
+        rows = np.fromiter(
+            (term_id for ids in term_ids for term_id in ids),
+            dtype=np.int64,
+            count=int(doc_lengths.sum()),
+        )
+        cols = np.repeat(np.arange(len(term_ids)), doc_lengths.astype(np.int64))
+        # duplicates are summed, giving the term frequencies
+        term_doc = scipy.sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(vocab), len(term_ids)),
+        )
+        term_doc.sum_duplicates()
+
+        n_docs = len(term_ids)
+        doc_freq = np.diff(term_doc.indptr)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_doc_length = max(doc_lengths.mean(), 1.0) if n_docs else 1.0
+        tf = term_doc.data
+        length_norm = k1 * (1 - b + b * doc_lengths[term_doc.indices] / avg_doc_length)
+        term_doc.data = (np.repeat(idf, doc_freq) * tf / (tf + length_norm)).astype(
+            np.float32
+        )
+        return cls(term_doc, vocab, list(corpus_ids))
+
+    def save(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "data.npy", self.term_doc.data)
+        np.save(path / "indices.npy", self.term_doc.indices)
+        np.save(path / "indptr.npy", self.term_doc.indptr)
+        with (path / "vocab.json").open("w") as f:
+            json.dump(self.vocab, f)
+        with (path / "corpus_ids.json").open("w") as f:
+            json.dump(self.corpus_ids, f)
+        # written last, marks the index as complete
+        with (path / "index_meta.json").open("w") as f:
+            json.dump({"shape": list(self.term_doc.shape)}, f)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> SparseBM25Index:
+        mmap_mode = "r" if mmap else None
+        with (path / "index_meta.json").open() as f:
+            shape = tuple(json.load(f)["shape"])
+        term_doc = scipy.sparse.csr_matrix(
+            (
+                np.load(path / "data.npy", mmap_mode=mmap_mode),
+                np.load(path / "indices.npy", mmap_mode=mmap_mode),
+                np.load(path / "indptr.npy", mmap_mode=mmap_mode),
+            ),
+            shape=shape,
+            copy=False,
+        )
+        with (path / "vocab.json").open() as f:
+            vocab = json.load(f)
+        with (path / "corpus_ids.json").open() as f:
+            corpus_ids = json.load(f)
+        return cls(term_doc, vocab, corpus_ids)
+
+    def query_matrix(self, queries_tokens: list[list[str]]) -> scipy.sparse.csr_matrix:
+        """Converts tokenized queries into a [number of queries, vocabulary size] matrix of term counts. Unknown tokens are dropped."""
+        term_ids = [
+            [self.vocab[token] for token in tokens if token in self.vocab]
+            for tokens in queries_tokens
+        ]
+        lengths = np.array([len(ids) for ids in term_ids], dtype=np.int64)
+        cols = np.fromiter(
+            (term_id for ids in term_ids for term_id in ids),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        rows = np.repeat(np.arange(len(term_ids)), lengths)
+        matrix = scipy.sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.float32), (rows, cols)),
+            shape=(len(term_ids), self.term_doc.shape[0]),
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+    def search(
+        self,
+        queries_tokens: list[list[str]],
+        top_k: int,
+        batch_size: int = 1024,
+    ) -> list[dict[str, float]]:
+        """Scores all queries against the corpus and returns the top_k documents of every query.
+
+        Documents that do not share any token with a query are not returned.
+        """
+        query_matrix = self.query_matrix(queries_tokens)
+        results = []
+        for start in range(0, query_matrix.shape[0], batch_size):
+            scores = query_matrix[start : start + batch_size] @ self.term_doc
+            for row in range(scores.shape[0]):
+                row_slice = slice(scores.indptr[row], scores.indptr[row + 1])
+                row_scores = scores.data[row_slice]
+                row_docs = scores.indices[row_slice]
+                if len(row_scores) > top_k:
+                    top = np.argpartition(-row_scores, top_k - 1)[:top_k]
+                    row_scores, row_docs = row_scores[top], row_docs[top]
+                results.append(
+                    {
+                        self.corpus_ids[doc]: float(score)
+                        for doc, score in zip(row_docs.tolist(), row_scores.tolist())
+                    }
+                )
+        return results
+
+
+class BM25Search(AbsEncoder):
+    """BM25 search
+
+    The backends score differently (tokenization, document length normalization), so they are registered as different models:
+    "bm25s" uses the bm25s package and "mteb/bm25-sparse" the built-in sparse index. Only the sparse index is persisted and reused,
+    the bm25s backend tokenizes and indexes the corpus on every search.
+
+    Args:
+        previous_results: Unused, kept for compatibility with the retrieval evaluator.
+        stopwords: "en" for the english stopwords, a list of stopwords or None.
+        stemmer_language: Language of the PyStemmer stemmer or None to disable stemming. The "mteb/bm25-sparse" model does not stem
+            by default.
+        backend: "sparse" uses the built-in scipy.sparse implementation, "bm25s" uses the bm25s package.
+        k1: The BM25 term frequency saturation parameter. Only used by the sparse backend.
+        b: The BM25 document length normalization parameter. Only used by the sparse backend.
+        cache_dir: Directory in which the sparse indexes are persisted. Defaults to `default_bm25_cache_dir()`.
+        persist_index: Whether to persist the sparse indexes to disk and reuse them in later runs. Only used by the sparse backend.
+    """
+
+    def __init__(
+        self,
+        previous_results: str | None = None,
+        stopwords: str | list[str] | None = "en",
+        stemmer_language: str | None = "english",
+        backend: Literal["sparse", "bm25s"] = "sparse",
+        k1: float = 1.5,
+        b: float = 0.75,
+        cache_dir: str | Path | None = None,
+        persist_index: bool = True,
+        **kwargs,
+    ):
+        self.model = None
+        self.backend = backend
+        self.stopwords = stopwords
+        self.stemmer_language = stemmer_language
+        self.k1 = k1
+        self.b = b
+        self.cache_dir = Path(cache_dir) if cache_dir else default_bm25_cache_dir()
+        self.persist_index = persist_index
+        # only the last index is kept in memory, e.g. for the splits which share a corpus, the others are loaded from disk
+        self._last_index: tuple[str, SparseBM25Index] | None = None
+
+        if backend == "bm25s":
+            requires_package(self, "bm25s", "bm25s", "pip install mteb[bm25s]")
+            import Stemmer
 
-def bm25_loader(model_name, **kwargs):
-    requires_package(bm25_loader, "bm25s", model_name, "pip install mteb[bm25s]")
-    import bm25s
-    import Stemmer
-
-    class BM25Search(AbsEncoder):
-        """BM25 search"""
-
-        def __init__(
-            self,
-            previous_results: str | None = None,
-            stopwords: str = "en",
-            stemmer_language: str | None = "english",
-            **kwargs,
-        ):
-            self.model = None
-
-            self.stopwords = stopwords
             self.stemmer = (
                 Stemmer.Stemmer(stemmer_language) if stemmer_language else None
             )
+        elif backend == "sparse":
+            self.tokenizer = BM25Tokenizer(
+                stopwords=stopwords, stemmer_language=stemmer_language
+            )
+        else:
+            raise ValueError(
+                f"Unknown BM25 backend '{backend}'. Use 'sparse' or 'bm25s'."
+            )
 
-        @classmethod
-        def name(cls) -> Literal["bm25s"]:
-            return "bm25s"
-
-        def search(
-            self,
-            corpus: dict[str, dict[str, str]],
-            queries: dict[str, str | list[str]],
-            top_k: int,
-            **kwargs,
-        ) -> dict[str, dict[str, float]]:
-            logger.info("Encoding Corpus...")
-            corpus_ids = list(corpus.keys())
-            corpus_with_ids = [
-                {
-                    "doc_id": cid,
-                    **(
-                        {"text": corpus[cid]}
-                        if isinstance(corpus[cid], str)
-                        else corpus[cid]
-                    ),
-                }
-                for cid in corpus_ids
-            ]
+    @classmethod
+    def name(cls) -> Literal["bm25s"]:
+        return "bm25s"
+
+    @staticmethod
+    def _corpus_texts(corpus: dict[str, dict[str, str] | str]) -> list[str]:
+        # concatenate all document values (title, text, ...)
+        return [
+            doc
+            if isinstance(doc, str)
+            else "\n".join([doc.get("title", ""), doc["text"]])
+            for doc in corpus.values()
+        ]
 
-            corpus_texts = [
-                "\n".join([doc.get("title", ""), doc["text"]])
-                for doc in corpus_with_ids
-            ]  # concatenate all document values (title, text, ...)
-            encoded_corpus = self.encode(corpus_texts)
+    def _index_key(
+        self,
+        corpus_ids: list[str],
+        corpus_texts: list[str],
+        task_metadata: TaskMetadata | None,
+        hf_split: str | None,
+        hf_subset: str | None,
+    ) -> str:
+        key = {
+            "task_name": task_metadata.name if task_metadata else None,
+            "dataset_revision": task_metadata.dataset.get("revision")
+            if task_metadata
+            else None,
+            "hf_subset": hf_subset,
+            "hf_split": hf_split,
+            "tokenizer": self.tokenizer.config,
+            "k1": self.k1,
+            "b": self.b,
+            # guards against changes of the corpus that are not reflected in the revision, e.g. a custom dataset_transform
+            "corpus": _hash_corpus(corpus_ids, corpus_texts),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
 
+    def get_index(
+        self,
+        corpus: dict[str, dict[str, str] | str],
+        task_metadata: TaskMetadata | None = None,
+        hf_split: str | None = None,
+        hf_subset: str | None = None,
+    ) -> SparseBM25Index:
+        """Returns the sparse index of the corpus. The index is loaded from memory if it is the index of the last search, from disk if
+        it was built before, otherwise it is built and persisted.
+        """
+        corpus_ids = list(corpus.keys())
+        corpus_texts = self._corpus_texts(corpus)
+        key = self._index_key(
+            corpus_ids, corpus_texts, task_metadata, hf_split, hf_subset
+        )
+        if self._last_index is not None and self._last_index[0] == key:
+            return self._last_index[1]
+        # the previous index is released before the next one is loaded
+        self._last_index = None
+
+        task_name = task_metadata.name if task_metadata else "no_task_name"
+        index_path = self.cache_dir / task_name / key
+        if self.persist_index and (index_path / "index_meta.json").exists():
+            logger.info(f"Loading BM25 index from {index_path}")
+            index = SparseBM25Index.load(index_path)
+        else:
+            logger.info("Tokenizing Corpus...")
+            corpus_tokens = self.tokenizer(corpus_texts)
+            index = SparseBM25Index.build(
+                corpus_tokens, corpus_ids, k1=self.k1, b=self.b
+            )
             logger.info(
-                f"Indexing Corpus... {len(encoded_corpus.ids):,} documents, {len(encoded_corpus.vocab):,} vocab"
+                f"Indexed Corpus... {len(corpus_ids):,} documents, {len(index.vocab):,} vocab"
             )
+            if self.persist_index:
+                logger.info(f"Saving BM25 index to {index_path}")
+                index.save(index_path)
+        self._last_index = (key, index)
+        return index
 
-            # Create the BM25 model and index the corpus
-            retriever = bm25s.BM25()
-            retriever.index(encoded_corpus)
+    def search(
+        self,
+        corpus: dict[str, dict[str, str]],
+        queries: dict[str, str | list[str]],
+        top_k: int,
+        task_metadata: TaskMetadata | None = None,
+        hf_split: str | None = None,
+        hf_subset: str | None = None,
+        **kwargs,
+    ) -> dict[str, dict[str, float]]:
+        if self.backend == "bm25s":
+            # the bm25s index is not persisted
+            return self._search_bm25s(corpus, queries, top_k)
 
-            logger.info("Encoding Queries...")
-            query_ids = list(queries.keys())
-            self.results = {qid: {} for qid in query_ids}
-            queries_texts = [queries[qid] for qid in queries]
+        index = self.get_index(corpus, task_metadata, hf_split, hf_subset)
+        query_ids = list(queries.keys())
+        logger.info(f"Retrieving Results... {len(queries):,} queries")
+        query_tokens = self.tokenizer([queries[qid] for qid in query_ids])
+        self.results = dict(zip(query_ids, index.search(query_tokens, top_k)))
+        return self.results
 
-            query_token_strs = self.encode(queries_texts, return_ids=False)
+    def _search_bm25s(
+        self,
+        corpus: dict[str, dict[str, str]],
+        queries: dict[str, str | list[str]],
+        top_k: int,
+    ) -> dict[str, dict[str, float]]:
+        import bm25s
 
-            logger.info(f"Retrieving Results... {len(queries):,} queries")
+        logger.info("Encoding Corpus...")
+        corpus_ids = list(corpus.keys())
+        corpus_with_ids = [{"doc_id": cid} for cid in corpus_ids]
+        encoded_corpus = self.encode(self._corpus_texts(corpus))
 
-            queries_results, queries_scores = retriever.retrieve(
-                query_token_strs, corpus=corpus_with_ids, k=top_k
-            )
+        logger.info(
+            f"Indexing Corpus... {len(encoded_corpus.ids):,} documents, {len(encoded_corpus.vocab):,} vocab"
+        )
+
+        # Create the BM25 model and index the corpus
+        retriever = bm25s.BM25()
+        retriever.index(encoded_corpus)
+
+        logger.info("Encoding Queries...")
+        query_ids = list(queries.keys())
+        self.results = {qid: {} for qid in query_ids}
+        queries_texts = [queries[qid] for qid in queries]
+
+        query_token_strs = self.encode(queries_texts, return_ids=False)
+
+        logger.info(f"Retrieving Results... {len(queries):,} queries")
+
+        queries_results, queries_scores = retriever.retrieve(
+            query_token_strs, corpus=corpus_with_ids, k=top_k
+        )
 
-            # Iterate over queries
-            for qi, qid in enumerate(query_ids):
-                doc_id_to_score = {}
-                query_results = queries_results[qi]
-                scores = queries_scores[qi]
-                doc_id_to_score = {}
+        # Iterate over queries
+        for qi, qid in enumerate(query_ids):
+            self.results[qid] = {
+                doc["doc_id"]: float(score)
+                for doc, score in zip(queries_results[qi], queries_scores[qi])
+            }
 
-                # Iterate over results
-                for ri in range(len(query_results)):
-                    doc = query_results[ri]
-                    score = scores[ri]
-                    doc_id = doc["doc_id"]
+        return self.results
 
-                    doc_id_to_score[doc_id] = float(score)
+    def encode(self, texts: list[str], **kwargs):
+        """Encode input text as term vectors"""
+        if self.backend == "sparse":
+            return self.tokenizer(texts)
 
-                self.results[qid] = doc_id_to_score
+        import bm25s
 
-            return self.results
+        return bm25s.tokenize(texts, stopwords=self.stopwords, stemmer=self.stemmer)  # type: ignore
 
-        def encode(self, texts: list[str], **kwargs):
-            """Encode input text as term vectors"""
-            return bm25s.tokenize(texts, stopwords=self.stopwords, stemmer=self.stemmer)  # type: ignore
 
+def bm25_loader(model_name, **kwargs):
     return BM25Search(**kwargs)
 
 
 bm25_s = ModelMeta(
     loader=bm25_loader,
+    loader_kwargs={"backend": "bm25s"},
     name="bm25s",
     languages=["eng_Latn"],
     open_weights=True,
@@ -130,3 +522,26 @@ bm25_s = ModelMeta(
     public_training_data=None,
     training_datasets=None,
 )
+
+bm25_sparse = ModelMeta(
+    loader=bm25_loader,
+    # stemming requires PyStemmer, the built-in index runs without extra dependencies
+    loader_kwargs={"backend": "sparse", "stemmer_language": None},
+    name="mteb/bm25-sparse",
+    languages=["eng_Latn"],
+    open_weights=True,
+    revision="1",
+    release_date=None,
+    n_parameters=None,
+    memory_usage_mb=None,
+    embed_dim=None,
+    license=None,
+    max_tokens=None,
+    reference="https://github.com/embeddings-benchmark/mteb",
+    similarity_fn_name=None,
+    framework=[],
+    use_instructions=False,
+    public_training_code=None,
+    public_training_data=None,
+    training_datasets=None,
+)
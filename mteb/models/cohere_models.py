@@ -3,13 +3,12 @@ from __future__ import annotations
 from typing import Any
 
 import numpy as np
-import torch
-import tqdm
 from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.api_request_engine import APIRequestEngine
 from mteb.types import Array, BatchedInput, PromptType
 
 supported_languages = [
@@ -133,20 +132,28 @@ class CohereTextEmbeddingModel(AbsEncoder):
         revision: str,
         sep: str = " ",
         model_prompts: dict[str, str] | None = None,
+        max_concurrency: int = 8,
+        max_rpm: int | None = None,
+        max_retries: int = 5,
         **kwargs,
     ) -> None:
         self.model_name = model_name.lstrip("Cohere/Cohere-")
         self.sep = sep
         self.model_prompts = model_prompts
         self.validate_task_to_prompt_name()
+        # Cohere's API is not always reliable, failed requests are retried by the engine
+        self._engine = APIRequestEngine(
+            max_concurrency=max_concurrency,
+            max_rpm=max_rpm,
+            max_retries=max_retries,
+        )
 
     def _embed(
         self,
         sentences: list[str],
         cohere_task_type: str,
         show_progress_bar: bool = False,
-        retries: int = 5,
-    ) -> torch.Tensor:
+    ) -> np.ndarray:
         import cohere  # type: ignore
 
         max_batch_size = 256
@@ -158,24 +165,18 @@ class CohereTextEmbeddingModel(AbsEncoder):
 
         client = cohere.Client()
 
-        all_embeddings = []
-
-        for batch in tqdm.tqdm(batches, leave=False, disable=not show_progress_bar):
-            while retries > 0:  # Cohere's API is not always reliable
-                try:
-                    response = client.embed(
-                        texts=batch,
-                        model=self.model_name,
-                        input_type=cohere_task_type,
-                    )
-                    break
-                except Exception as e:
-                    print(f"Retrying... {retries} retries left.")
-                    retries -= 1
-                    if retries == 0:
-                        raise e
+        def embed(batch: list[str]) -> list[list[float]]:
+            return client.embed(
+                texts=batch,
+                model=self.model_name,
+                input_type=cohere_task_type,
+            ).embeddings
 
-            all_embeddings.extend(torch.tensor(response.embeddings).numpy())
+        all_embeddings = []
+        for embeddings in self._engine.run(
+            embed, batches, show_progress_bar=show_progress_bar
+        ):
+            all_embeddings.extend(embeddings)
 
         return np.array(all_embeddings)
 
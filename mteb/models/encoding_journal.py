@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import torch
+from datasets import Dataset
+from torch.utils.data import DataLoader
+
+from mteb.abstasks.TaskMetadata import TaskMetadata
+from mteb.create_dataloaders import ADAPTIVE_BATCHING_KWARGS
+from mteb.encoder_interface import Encoder
+from mteb.models.abs_encoder import EncoderWrapper
+from mteb.types import Array, BatchedInput, PromptType
+
+logger = logging.getLogger(__name__)
+
+
+# encode arguments which change how the inputs are batched, but not their embeddings
+_BATCHING_KWARGS = ("batch_size", "show_progress_bar", *ADAPTIVE_BATCHING_KWARGS)
+
+
+def _update_hash(hasher: Any, value: Any) -> None:
+    """Adds a value of an arrow column, e.g. the bytes and path of an image, to the hash."""
+    if isinstance(value, bytes):
+        hasher.update(b"b" + str(len(value)).encode() + b":" + value)
+    elif isinstance(value, str):
+        encoded = value.encode()
+        hasher.update(b"s" + str(len(encoded)).encode() + b":" + encoded)
+    elif isinstance(value, dict):
+        hasher.update(b"{")
+        for key in sorted(value):
+            _update_hash(hasher, key)
+            _update_hash(hasher, value[key])
+        hasher.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"[")
+        for item in value:
+            _update_hash(hasher, item)
+        hasher.update(b"]")
+    else:
+        hasher.update(b"v" + repr(value).encode() + b";")
+
+
+def _hash_inputs(dataset: Dataset, encode_kwargs: dict[str, Any]) -> str:
+    """Hashes every column of the inputs and the encode arguments which affect the embeddings, so that a journal is only
+    reused for the same inputs encoded the same way.
+    """
+    hasher = hashlib.sha256(str(len(dataset)).encode())
+    output_kwargs = {
+        key: value
+        for key, value in encode_kwargs.items()
+        if key not in _BATCHING_KWARGS
+    }
+    hasher.update(json.dumps(output_kwargs, sort_keys=True, default=str).encode())
+    # the arrow format returns the stored values, e.g. the bytes of an image instead of the decoded image
+    columns = sorted(dataset.column_names)
+    for batch in dataset.with_format("arrow").iter(batch_size=1000):
+        for column in columns:
+            _update_hash(hasher, column)
+            _update_hash(hasher, batch.column(column).to_pylist())
+    return hasher.hexdigest()
+
+
+def _concatenate(embeddings: list[np.ndarray]) -> np.ndarray:
+    """Concatenates the embeddings of the chunks. The multi-vector embeddings of the chunks are padded with zeros to the
+    largest number of tokens, as the models pad the embeddings of a batch.
+    """
+    if all(chunk.ndim == 3 for chunk in embeddings):
+        n_tokens = max(chunk.shape[1] for chunk in embeddings)
+        embeddings = [
+            np.pad(chunk, ((0, 0), (0, n_tokens - chunk.shape[1]), (0, 0)))
+            for chunk in embeddings
+        ]
+    return np.concatenate(embeddings)
+
+
+def _atomic_write(path: Path, write_fn) -> None:
+    """Writes to a temporary file which then replaces `path`, so that a crash never leaves a partially written file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        write_fn(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class EncodingJournal:
+    """Stores the embeddings of the completed chunks of an encode call on disk.
+
+    Every completed chunk is saved as a `.npy` file, after which the manifest listing the completed row ranges is updated.
+    A journal is only valid for the inputs it was created for, which is checked using the number of inputs and the chunk size.
+
+    Args:
+        directory: The directory of the journal.
+        n_inputs: The number of inputs of the encode call.
+        chunk_size: The number of inputs encoded at a time.
+    """
+
+    manifest_name = "manifest.json"
+
+    def __init__(self, directory: Path, n_inputs: int, chunk_size: int):
+        self.directory = directory
+        self.n_inputs = n_inputs
+        self.chunk_size = chunk_size
+        self.completed: set[tuple[int, int]] = set()
+
+        manifest_path = self.directory / self.manifest_name
+        if manifest_path.exists():
+            with manifest_path.open() as f:
+                manifest = json.load(f)
+            if (
+                manifest["n_inputs"] == n_inputs
+                and manifest["chunk_size"] == chunk_size
+            ):
+                self.completed = {tuple(r) for r in manifest["completed"]}
+            else:
+                logger.warning(
+                    f"The encoding journal in {self.directory} was created with different settings and is discarded."
+                )
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def ranges(self) -> list[tuple[int, int]]:
+        return [
+            (start, min(start + self.chunk_size, self.n_inputs))
+            for start in range(0, self.n_inputs, self.chunk_size)
+        ]
+
+    def _chunk_path(self, start: int, end: int) -> Path:
+        return self.directory / f"chunk_{start:010d}_{end:010d}.npy"
+
+    def is_completed(self, start: int, end: int) -> bool:
+        return (start, end) in self.completed and self._chunk_path(start, end).exists()
+
+    def load(self, start: int, end: int) -> np.ndarray:
+        return np.load(self._chunk_path(start, end))
+
+    def add(self, start: int, end: int, embeddings: np.ndarray) -> None:
+        _atomic_write(self._chunk_path(start, end), lambda f: np.save(f, embeddings))
+        self.completed.add((start, end))
+        manifest = {
+            "n_inputs": self.n_inputs,
+            "chunk_size": self.chunk_size,
+            "completed": sorted(self.completed),
+        }
+        _atomic_write(
+            self.directory / self.manifest_name,
+            lambda f: f.write(json.dumps(manifest).encode()),
+        )
+
+
+class JournaledEncoderWrapper(EncoderWrapper):
+    """Wraps a model so that long encode calls can be resumed after a crash.
+
+    The inputs of every encode call are split in chunks of `chunk_size` inputs, and the embeddings of every completed chunk are
+    written to a journal on disk. When the same inputs are encoded again for the same task, split, subset, prompt type, encode
+    arguments and model revision, e.g. after restarting a failed run, the completed chunks are loaded from the journal and only the remaining chunks
+    are encoded. The journals are kept after the encode call, remove the journal directory once the run has finished.
+
+    Args:
+        model: The model to wrap.
+        journal_path: The directory in which the journals are stored.
+        chunk_size: The number of inputs encoded between two writes to the journal.
+
+    Example:
+        >>> import mteb
+        >>> from mteb.models.encoding_journal import JournaledEncoderWrapper
+        >>> model = JournaledEncoderWrapper(mteb.get_model("openai/text-embedding-3-small"), "encoding_journal")
+        >>> mteb.MTEB(tasks=mteb.get_tasks(["NFCorpus"])).run(model)
+    """
+
+    def __init__(
+        self, model: Encoder, journal_path: str | Path, chunk_size: int = 2048
+    ):
+        super().__init__(model)
+        self.journal_path = Path(journal_path)
+        self.chunk_size = chunk_size
+
+    def _journal_directory(
+        self,
+        dataset: Dataset,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None,
+        encode_kwargs: dict[str, Any],
+    ) -> Path:
+        model_path, revision = "no_model_name_available", "no_revision_available"
+        if self.mteb_model_meta is not None:
+            if self.mteb_model_meta.name is not None:
+                model_path = self.mteb_model_meta.model_name_as_path()
+            revision = self.mteb_model_meta.revision or revision
+        prompt_name = prompt_type.value if prompt_type is not None else "none"
+        return (
+            self.journal_path
+            / model_path
+            / revision
+            / task_metadata.name
+            / f"{hf_subset}_{hf_split}_{prompt_name}_{_hash_inputs(dataset, encode_kwargs)[:16]}"
+        )
+
+    def encode(
+        self,
+        inputs: DataLoader[BatchedInput],
+        *,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None = None,
+        **kwargs: Any,
+    ) -> Array:
+        dataset = inputs.dataset
+        if not isinstance(dataset, Dataset):
+            logger.warning(
+                "The inputs are not a datasets.Dataset, encoding without journal."
+            )
+            return self._model.encode(
+                inputs,
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                prompt_type=prompt_type,
+                **kwargs,
+            )
+
+        journal = EncodingJournal(
+            self._journal_directory(
+                dataset, task_metadata, hf_split, hf_subset, prompt_type, kwargs
+            ),
+            n_inputs=len(dataset),
+            chunk_size=self.chunk_size,
+        )
+        ranges = journal.ranges()
+        n_completed = sum(journal.is_completed(start, end) for start, end in ranges)
+        if n_completed:
+            logger.info(
+                f"Resuming encoding from the journal in {journal.directory}: {n_completed}/{len(ranges)} chunks already encoded."
+            )
+
+        embeddings = []
+        for start, end in ranges:
+            if journal.is_completed(start, end):
+                embeddings.append(journal.load(start, end))
+                continue
+            chunk_embeddings = self._model.encode(
+                DataLoader(
+                    dataset.select(range(start, end)),
+                    batch_size=inputs.batch_size,
+                    collate_fn=inputs.collate_fn,
+                ),
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                prompt_type=prompt_type,
+                **kwargs,
+            )
+            if isinstance(chunk_embeddings, torch.Tensor):
+                chunk_embeddings = chunk_embeddings.cpu().detach().float().numpy()
+            chunk_embeddings = np.asarray(chunk_embeddings)
+            journal.add(start, end, chunk_embeddings)
+            embeddings.append(chunk_embeddings)
+
+        if not embeddings:
+            return np.empty((0,))
+        return _concatenate(embeddings)
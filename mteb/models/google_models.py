@@ -3,12 +3,12 @@ from __future__ import annotations
 from typing import Any
 
 import numpy as np
-import tqdm
 from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.api_request_engine import APIRequestEngine
 from mteb.requires_package import requires_package
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -58,11 +58,19 @@ class GoogleTextEmbeddingModel(AbsEncoder):
         model_name: str,
         sep: str = " ",
         model_prompts: dict[str, str] | None = None,
+        max_concurrency: int = 8,
+        max_rpm: int | None = None,
+        max_retries: int = 5,
         **kwargs,
     ) -> None:
         self.model_name = model_name
         self.model_prompts = model_prompts
         self.validate_task_to_prompt_name()
+        self._engine = APIRequestEngine(
+            max_concurrency=max_concurrency,
+            max_rpm=max_rpm,
+            max_retries=max_retries,
+        )
 
     def _embed(
         self,
@@ -103,17 +111,16 @@ class GoogleTextEmbeddingModel(AbsEncoder):
             for i in range(0, len(inputs), max_batch_size)
         ]
 
-        all_embeddings = []
-
-        for batch in tqdm.tqdm(batches, leave=False, disable=not show_progress_bar):
-            try:
-                embeddings_batch = model.get_embeddings(batch, **kwargs)
-            # Except the very rare google.api_core.exceptions.InternalServerError
-            except Exception as e:
-                print("Retrying once after error:", e)
-                embeddings_batch = model.get_embeddings(batch, **kwargs)
+        def embed(batch: list[TextEmbeddingInput]) -> list[list[float]]:
+            return [
+                embedding.values for embedding in model.get_embeddings(batch, **kwargs)
+            ]
 
-            all_embeddings.extend([embedding.values for embedding in embeddings_batch])
+        all_embeddings = []
+        for embeddings in self._engine.run(
+            embed, batches, show_progress_bar=show_progress_bar
+        ):
+            all_embeddings.extend(embeddings)
 
         return np.asarray(all_embeddings)
 
@@ -9,6 +9,7 @@ from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.adaptive_batching import encode_sentences
 from mteb.requires_package import requires_package
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -85,6 +86,9 @@ def instruct_wrapper(
 
 
 class InstructSentenceTransformerModel(AbsEncoder):
+    # `batch_size="auto"` is handled by `encode_sentences`
+    supports_adaptive_batching = True
+
     def __init__(
         self,
         model_name: str,
@@ -162,7 +166,8 @@ class InstructSentenceTransformerModel(AbsEncoder):
                 f"Using instruction: '{instruction}' for task: '{task_metadata.name}'"
             )
 
-        embeddings = self.model.encode(
+        embeddings = encode_sentences(
+            self.model,
             sentences,
             prompt=instruction,
             **kwargs,
@@ -10,6 +10,7 @@ from torch.utils.data import DataLoader
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.adaptive_batching import encode_sentences
 from mteb.models.nvidia_models import nvidia_training_datasets
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -17,6 +18,9 @@ logger = logging.getLogger(__name__)
 
 
 class JasperModel(AbsEncoder):
+    # `batch_size="auto"` is handled by `encode_sentences`
+    supports_adaptive_batching = True
+
     def __init__(
         self,
         model_name: str,
@@ -47,7 +51,8 @@ class JasperModel(AbsEncoder):
             instruction = None
         inputs = [text for batch in inputs for text in batch["text"]]
 
-        embeddings = self.model.encode(
+        embeddings = encode_sentences(
+            self.model,
             inputs,
             normalize_embeddings=True,
             prompt=instruction,
@@ -9,6 +9,7 @@ from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
+from mteb.models.adaptive_batching import encode_sentences
 from mteb.models.sentence_transformer_wrapper import SentenceTransformerWrapper
 from mteb.requires_package import requires_package
 from mteb.types import Array, BatchedInput, PromptType
@@ -175,7 +176,8 @@ class JinaWrapper(SentenceTransformerWrapper):
 
         jina_task_name = self.model_prompts.get(prompt_name, None)
 
-        embeddings = self.model.encode(
+        embeddings = encode_sentences(
+            self.model,
             sentences,
             task=jina_task_name,
             prompt=self.jina_task_to_prompt.get(jina_task_name, None),
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+import torch
+from datasets import Dataset
+from torch.utils.data import DataLoader
+
+from mteb.abstasks.TaskMetadata import HFSubset, TaskMetadata
+from mteb.encoder_interface import Encoder
+from mteb.models.abs_encoder import EncoderWrapper
+from mteb.models.encoding_journal import _hash_inputs
+from mteb.types import Array, BatchedInput, PromptType
+
+
+def truncate_embeddings(embeddings: Array, dimension: int) -> np.ndarray:
+    """Keeps the first `dimension` dimensions of the embeddings and normalizes them to unit length."""
+    if isinstance(embeddings, torch.Tensor):
+        embeddings = embeddings.cpu().detach().float().numpy()
+    truncated = np.asarray(embeddings, dtype=np.float32)[:, :dimension]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms > 0, norms, 1.0)
+
+
+class MatryoshkaEncoderWrapper(EncoderWrapper):
+    """Evaluates a model with Matryoshka embeddings at several dimensions, encoding the inputs only once.
+
+    The inputs are encoded at the full dimension of the model and the embeddings are kept in memory. When the task is then
+    evaluated again for every dimension in `dimensions` (see `evaluate_dimensions`), the embeddings are loaded from memory,
+    truncated to the dimension and normalized, so that only the scoring of the task is repeated. The scores of every dimension are added to the scores of the
+    subset under `matryoshka_dimensions`, see `TaskResult.get_matryoshka_scores`.
+
+    Args:
+        model: The model to wrap.
+        dimensions: The dimensions to evaluate besides the full dimension, e.g. [64, 128, 256, 512].
+
+    Example:
+        >>> import mteb
+        >>> from mteb.models.matryoshka import MatryoshkaEncoderWrapper
+        >>> model = MatryoshkaEncoderWrapper(mteb.get_model("nomic-ai/nomic-embed-text-v1.5"), [64, 128, 256, 512])
+        >>> results = mteb.MTEB(tasks=mteb.get_tasks(["NFCorpus"])).run(model)
+        >>> results[0].get_matryoshka_scores()
+    """
+
+    def __init__(self, model: Encoder, dimensions: Sequence[int]):
+        if not dimensions or min(dimensions) <= 0:
+            raise ValueError(
+                f"The dimensions should be positive integers, got {dimensions}"
+            )
+        super().__init__(model)
+        self.matryoshka_dimensions = sorted(set(dimensions), reverse=True)
+        self.dimension: int | None = None
+        self._cache: dict[tuple[str, str, str, str, str], np.ndarray] = {}
+
+    @contextmanager
+    def truncate(self, dimension: int) -> Iterator[None]:
+        """Truncates the embeddings returned by `encode` to `dimension` inside the context."""
+        self.dimension = dimension
+        try:
+            yield
+        finally:
+            self.dimension = None
+
+    def clear_cache(self) -> None:
+        """Removes the full dimension embeddings kept in memory, called once all dimensions of a split are evaluated."""
+        self._cache.clear()
+
+    def evaluate_dimensions(
+        self, evaluate: Callable[[], dict[HFSubset, dict[str, Any]]]
+    ) -> dict[HFSubset, dict[str, dict[str, Any]]]:
+        """Evaluates a split at every dimension once it is evaluated at the full dimension, and clears the embeddings kept in
+        memory.
+
+        Args:
+            evaluate: Evaluates the split with this model, called once per dimension with the embeddings truncated.
+
+        Returns:
+            The scores of every subset at every dimension, as dict[HFSubset, dict[dimension, scores]].
+        """
+        scores: dict[HFSubset, dict[str, dict[str, Any]]] = {}
+        try:
+            for dimension in self.matryoshka_dimensions:
+                with self.truncate(dimension):
+                    for hf_subset, subset_scores in evaluate().items():
+                        scores.setdefault(hf_subset, {})[str(dimension)] = subset_scores
+        finally:
+            self.clear_cache()
+        return scores
+
+    @staticmethod
+    def _cache_key(
+        inputs: DataLoader[BatchedInput],
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None,
+        encode_kwargs: dict[str, Any],
+    ) -> tuple[str, str, str, str, str] | None:
+        dataset = inputs.dataset
+        if not isinstance(dataset, Dataset):
+            return None
+        prompt_name = prompt_type.value if prompt_type is not None else "none"
+        return (
+            task_metadata.name,
+            hf_split,
+            hf_subset,
+            prompt_name,
+            _hash_inputs(dataset, encode_kwargs),
+        )
+
+    def encode(
+        self,
+        inputs: DataLoader[BatchedInput],
+        *,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None = None,
+        **kwargs: Any,
+    ) -> Array:
+        key = self._cache_key(
+            inputs, task_metadata, hf_split, hf_subset, prompt_type, kwargs
+        )
+        if key is not None and key in self._cache:
+            embeddings = self._cache[key]
+        else:
+            embeddings = self._model.encode(
+                inputs,
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                prompt_type=prompt_type,
+                **kwargs,
+            )
+            if isinstance(embeddings, torch.Tensor):
+                embeddings = embeddings.cpu().detach().float().numpy()
+            embeddings = np.asarray(embeddings)
+            if key is not None:
+                self._cache[key] = embeddings
+
+        if self.dimension is None or self.dimension >= embeddings.shape[-1]:
+            # a copy, so that the evaluators cannot modify the cached embeddings
+            return embeddings.copy()
+        return truncate_embeddings(embeddings, self.dimension)
@@ -11,6 +11,7 @@ from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
+from mteb.models.adaptive_batching import encode_sentences
 from mteb.models.sentence_transformer_wrapper import SentenceTransformerWrapper
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -70,7 +71,8 @@ class NomicWrapper(SentenceTransformerWrapper):
             "STS",
             "Summarization",
         )
-        emb = self.model.encode(
+        emb = encode_sentences(
+            self.model,
             sentences,
             prompt_name=prompt_name,
             batch_size=batch_size,
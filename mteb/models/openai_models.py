@@ -4,12 +4,12 @@ import logging
 from typing import Any
 
 import numpy as np
-import tqdm
 from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.api_request_engine import APIRequestEngine
 from mteb.requires_package import requires_package
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -23,10 +23,15 @@ class OpenAIModel(AbsEncoder):
         max_tokens: int,
         tokenizer_name: str = "cl100k_base",  # since all models use this tokenizer now
         embed_dim: int | None = None,
+        max_concurrency: int = 8,
+        max_rpm: int | None = None,
+        max_tpm: int | None = None,
+        max_retries: int = 5,
         **kwargs,
     ) -> None:
         """Wrapper for OpenAIs embedding API.
         To handle documents larger than 8191 tokens, we truncate the document to the specified sequence length.
+        The requests are sent concurrently by an `APIRequestEngine`, limited by `max_concurrency`, `max_rpm` and `max_tpm`.
         """
         requires_package(
             self,
@@ -44,7 +49,14 @@ class OpenAIModel(AbsEncoder):
         )
         import tiktoken
 
-        self._client = OpenAI()
+        # retries are handled by the request engine
+        self._client = OpenAI(max_retries=0)
+        self._engine = APIRequestEngine(
+            max_concurrency=max_concurrency,
+            max_rpm=max_rpm,
+            max_tpm=max_tpm,
+            max_retries=max_retries,
+        )
         self._model_name = model_name.split("/")[-1]
         self._embed_dim = embed_dim
         self._max_tokens = max_tokens
@@ -76,6 +88,7 @@ class OpenAIModel(AbsEncoder):
         sentences = [text for batch in inputs for text in batch["text"]]
 
         trimmed_sentences = []
+        n_tokens = []
         for sentence in sentences:
             encoded_sentence = self._encoding.encode(sentence)
             if len(encoded_sentence) > self._max_tokens:
@@ -83,12 +96,17 @@ class OpenAIModel(AbsEncoder):
                 trimmed_sentences.append(truncated_sentence)
             else:
                 trimmed_sentences.append(sentence)
+            n_tokens.append(min(len(encoded_sentence), self._max_tokens))
 
         max_batch_size = kwargs.get("batch_size", 2048)
         sublists = [
             trimmed_sentences[i : i + max_batch_size]
             for i in range(0, len(trimmed_sentences), max_batch_size)
         ]
+        sublists_n_tokens = [
+            sum(n_tokens[i : i + max_batch_size])
+            for i in range(0, len(n_tokens), max_batch_size)
+        ]
 
         show_progress_bar = (
             False
@@ -96,39 +114,23 @@ class OpenAIModel(AbsEncoder):
             else kwargs.pop("show_progress_bar")
         )
 
-        all_embeddings = []
+        def embed(sublist: list[str]) -> np.ndarray:
+            response = self._client.embeddings.create(
+                input=sublist,
+                model=self._model_name,
+                encoding_format="float",
+                dimensions=self._embed_dim or NotGiven(),
+            )
+            return self._to_numpy(response)
 
-        for sublist in tqdm.tqdm(sublists, leave=False, disable=not show_progress_bar):
-            try:
-                response = self._client.embeddings.create(
-                    input=sublist,
-                    model=self._model_name,
-                    encoding_format="float",
-                    dimensions=self._embed_dim or NotGiven(),
-                )
-            except Exception as e:
-                # Sleep due to too many requests
-                logger.info("Sleeping for 10 seconds due to error", e)
-                import time
-
-                time.sleep(10)
-                try:
-                    response = self._client.embeddings.create(
-                        input=sublist,
-                        model=self._model_name,
-                        encoding_format="float",
-                        dimensions=self._embed_dim or NotGiven(),
-                    )
-                except Exception as e:
-                    logger.info("Sleeping for 60 seconds due to error", e)
-                    time.sleep(60)
-                    response = self._client.embeddings.create(
-                        input=sublist,
-                        model=self._model_name,
-                        encoding_format="float",
-                        dimensions=self._embed_dim or NotGiven(),
-                    )
-            all_embeddings.extend(self._to_numpy(response))
+        all_embeddings = []
+        for embeddings in self._engine.run(
+            embed,
+            sublists,
+            n_tokens=sublists_n_tokens,
+            show_progress_bar=show_progress_bar,
+        ):
+            all_embeddings.extend(embeddings)
 
         return np.array(all_embeddings)
 
@@ -345,6 +345,7 @@ def model_meta_from_cross_encoder(model: CrossEncoder) -> ModelMeta:
         public_training_data=None,
         use_instructions=None,
         training_datasets=None,
+        is_cross_encoder=True,
     )
 
 
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Any
+
+from datasets import Dataset
+from torch.utils.data import DataLoader
+
+from mteb.abstasks.TaskMetadata import TaskMetadata
+from mteb.models.abs_encoder import EncoderWrapper
+from mteb.profiling import get_profiler, profile_span
+from mteb.types import Array, BatchedInput, PromptType
+
+
+class ProfiledEncoderWrapper(EncoderWrapper):
+    """Records the encode and similarity calls of a model as spans of the active `Profiler`.
+
+    Every encode call is recorded as "encode_query", "encode_passage" or "encode" (without prompt type) with the number of
+    inputs and characters, from which the throughput is computed, and sets the subset to which the following spans are
+    attributed. Used by `MTEB.run(..., profile=True)`.
+
+    Args:
+        model: The model to wrap.
+    """
+
+    def encode(
+        self,
+        inputs: DataLoader[BatchedInput],
+        *,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None = None,
+        **kwargs: Any,
+    ) -> Array:
+        profiler = get_profiler()
+        if profiler is not None:
+            profiler.set_subset(hf_subset)
+
+        counters = {"n_inputs": len(inputs.dataset)}
+        dataset = inputs.dataset
+        if isinstance(dataset, Dataset) and "text" in dataset.column_names:
+            counters["n_characters"] = sum(len(text or "") for text in dataset["text"])
+        name = f"encode_{prompt_type.value}" if prompt_type is not None else "encode"
+        with profile_span(name, **counters):
+            return self._model.encode(
+                inputs,
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                prompt_type=prompt_type,
+                **kwargs,
+            )
+
+    def similarity(self, embeddings1: Array, embeddings2: Array) -> Array:
+        with profile_span("similarity", n_pairs=len(embeddings1) * len(embeddings2)):
+            return super().similarity(embeddings1, embeddings2)
+
+    def similarity_pairwise(self, embeddings1: Array, embeddings2: Array) -> Array:
+        with profile_span("similarity", n_pairs=len(embeddings1)):
+            return super().similarity_pairwise(embeddings1, embeddings2)
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Literal, get_args
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+
+from mteb.abstasks.TaskMetadata import TaskMetadata
+from mteb.encoder_interface import Encoder
+from mteb.model_meta import ScoringFunction
+from mteb.models.abs_encoder import EncoderWrapper
+from mteb.similarity_functions import matmul_similarity_fn_name
+from mteb.types import Array, BatchedInput, PromptType
+
+logger = logging.getLogger(__name__)
+
+EmbeddingPrecision = Literal["float16", "int8", "binary"]
+
+# number of bytes per dimension, the binary embeddings are packed in 8 dimensions per byte
+_BYTES_PER_DIMENSION = {"float32": 4, "float16": 2, "int8": 1}
+
+# number of elements of the intermediate arrays when computing the hamming distances
+_HAMMING_BLOCK_ELEMENTS = 2**22
+
+
+def _to_numpy(embeddings: Array) -> np.ndarray:
+    if isinstance(embeddings, torch.Tensor):
+        return embeddings.cpu().detach().numpy()
+    return np.asarray(embeddings)
+
+
+def calibrate_int8_ranges(embeddings: Array) -> np.ndarray:
+    """The minimum and maximum of every dimension of the embeddings, of shape (2, dim), used to quantize them to int8."""
+    embeddings = _to_numpy(embeddings).astype(np.float32)
+    return np.stack([embeddings.min(axis=0), embeddings.max(axis=0)])
+
+
+def quantize_embeddings(
+    embeddings: Array,
+    precision: EmbeddingPrecision,
+    ranges: np.ndarray | None = None,
+) -> np.ndarray:
+    """Quantizes float embeddings.
+
+    Args:
+        embeddings: The embeddings to quantize, of shape (n_embeddings, dim).
+        precision: "float16", "int8" for scalar quantization of every dimension to 256 buckets between the minimum and maximum in
+            `ranges`, or "binary" to keep the sign of every dimension.
+        ranges: The minimum and maximum of every dimension, of shape (2, dim), see `calibrate_int8_ranges`. Required for "int8".
+
+    Returns:
+        The quantized embeddings. Binary embeddings are returned unpacked as -1/+1 int8 values, and are packed to bits when
+        computing their hamming distances.
+    """
+    embeddings = _to_numpy(embeddings).astype(np.float32)
+    if precision == "float16":
+        return embeddings.astype(np.float16)
+    if precision == "binary":
+        return np.where(embeddings > 0, 1, -1).astype(np.int8)
+    if precision == "int8":
+        if ranges is None:
+            raise ValueError("The ranges are required to quantize to int8.")
+        minimum = ranges[0]
+        steps = (ranges[1] - minimum) / 255
+        steps = np.where(steps > 0, steps, 1.0)
+        return np.clip(
+            np.round((embeddings - minimum) / steps) - 128, -128, 127
+        ).astype(np.int8)
+    raise ValueError(
+        f"Unknown precision {precision}, expected one of {get_args(EmbeddingPrecision)}"
+    )
+
+
+def dequantize_int8_embeddings(embeddings: Array, ranges: np.ndarray) -> np.ndarray:
+    """Maps int8 embeddings back to the center of their buckets."""
+    steps = (ranges[1] - ranges[0]) / 255
+    return (_to_numpy(embeddings).astype(np.float32) + 128) * steps + ranges[0]
+
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    # numpy < 2.0, count the bits of every byte with a lookup table
+    table = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+    return table[x.view(np.uint8)].reshape(*x.shape, -1).sum(axis=-1)
+
+
+def _pack_bits(embeddings: np.ndarray) -> np.ndarray:
+    """Packs the signs of the embeddings in 64-bit words, padding the dimensions to a multiple of 64."""
+    packed = np.packbits(embeddings > 0, axis=1)
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def hamming_similarity(a: Array, b: Array) -> np.ndarray:
+    """The similarity between binary embeddings, computed as dim - 2 * hamming_distance(a[i], b[j]) with XOR and popcount on the
+    packed bits. It is equal to the dot product of the -1/+1 embeddings.
+
+    Returns:
+        Matrix with res[i][j] = dim - 2 * hamming_distance(a[i], b[j])
+    """
+    a, b = np.atleast_2d(_to_numpy(a)), np.atleast_2d(_to_numpy(b))
+    packed_a, packed_b = _pack_bits(a), _pack_bits(b)
+    distances = np.empty((len(a), len(b)), dtype=np.int64)
+    chunk_size = max(1, _HAMMING_BLOCK_ELEMENTS // max(1, packed_b.size))
+    for start in range(0, len(a), chunk_size):
+        xor = np.bitwise_xor(packed_a[start : start + chunk_size, None], packed_b[None])
+        distances[start : start + chunk_size] = _popcount(xor).sum(axis=-1)
+    return a.shape[1] - 2 * distances
+
+
+def pairwise_hamming_similarity(a: Array, b: Array) -> np.ndarray:
+    """Computes dim - 2 * hamming_distance(a[i], b[i]) for binary embeddings."""
+    a, b = np.atleast_2d(_to_numpy(a)), np.atleast_2d(_to_numpy(b))
+    xor = np.bitwise_xor(_pack_bits(a), _pack_bits(b))
+    return a.shape[1] - 2 * _popcount(xor).sum(axis=-1).astype(np.int64)
+
+
+def _integer_matrix(embeddings: Array) -> torch.Tensor:
+    embeddings = _to_numpy(embeddings)
+    # products of int8 values are summed exactly in float32 up to 1024 dimensions
+    dtype = np.float32 if embeddings.shape[-1] <= 1024 else np.float64
+    return torch.from_numpy(np.atleast_2d(embeddings).astype(dtype))
+
+
+def int8_similarity(a: Array, b: Array, normalize: bool) -> torch.Tensor:
+    """The integer dot products (or cosine similarities if `normalize`) between int8 embeddings."""
+    a, b = _integer_matrix(a), _integer_matrix(b)
+    if normalize:
+        a = torch.nn.functional.normalize(a, p=2, dim=1)
+        b = torch.nn.functional.normalize(b, p=2, dim=1)
+    return a @ b.T
+
+
+class QuantizedEncoderWrapper(EncoderWrapper):
+    """Quantizes the embeddings of a model after encoding, to evaluate the embeddings as they are stored in a (4-32x smaller)
+    quantized index.
+
+    The embeddings are quantized to "float16", to "int8" using the minimum and maximum of every dimension, or to "binary" using
+    their sign. The int8 ranges are computed on the `calibration_embeddings`, or if these are not given, on the first embeddings
+    of the documents encoded for every task, split and subset (e.g. the first chunk of the corpus of a retrieval task), which are
+    what is stored in the index. The queries (encoded with `PromptType.query`) are returned in full precision and quantized when
+    they are scored, with the ranges of the documents.
+
+    The similarities between int8 embeddings are integer dot products (or cosine similarities for models with a cosine
+    similarity), and the similarities between binary embeddings are computed from their hamming distance with XOR and popcount
+    on the packed bits. Other similarity functions are computed by the wrapped model on the quantized values. With
+    `rescore_top_k`, the query embeddings are kept in full precision and the `rescore_top_k` documents with the best quantized
+    similarity are rescored with the float query embeddings, as done in a quantized index with rescoring.
+
+    The quantized values are returned as float32 arrays, so that every evaluator can use them without overflowing the integer
+    types, while the memory is reported for the quantized storage.
+
+    The memory of the embeddings and the speed of the similarity computations of every subset, e.g. `compression_ratio` and
+    `scored_pairs_per_second`, are stored in the `quantization` of the results, see `quantization_statistics`.
+
+    Args:
+        model: The model to wrap.
+        precision: The precision of the embeddings.
+        calibration_embeddings: The embeddings used to compute the int8 ranges.
+        rescore_top_k: The number of documents per query rescored with the float query embeddings. Only used for "int8" and
+            "binary".
+
+    Example:
+        >>> import mteb
+        >>> from mteb.models.quantization import QuantizedEncoderWrapper
+        >>> model = QuantizedEncoderWrapper(mteb.get_model("intfloat/multilingual-e5-small"), "binary", rescore_top_k=100)
+        >>> mteb.MTEB(tasks=mteb.get_tasks(["NFCorpus"])).run(model)
+    """
+
+    # the similarities are computed on the quantized embeddings
+    _forwards_similarity = False
+
+    def __init__(
+        self,
+        model: Encoder,
+        precision: EmbeddingPrecision,
+        calibration_embeddings: Array | None = None,
+        rescore_top_k: int | None = None,
+    ):
+        if precision not in get_args(EmbeddingPrecision):
+            raise ValueError(
+                f"Unknown precision {precision}, expected one of {get_args(EmbeddingPrecision)}"
+            )
+        super().__init__(model)
+        self.precision = precision
+        self.rescore_top_k = rescore_top_k if precision != "float16" else None
+        self._calibrated_ranges = (
+            calibrate_int8_ranges(calibration_embeddings)
+            if calibration_embeddings is not None
+            else None
+        )
+        self._ranges: dict[tuple[str, str, str], np.ndarray] = {}
+        self._context: tuple[str, str, str] | None = None
+        # the (task, split, subset) whose queries were encoded, which are then the first embeddings of `similarity`
+        self._query_contexts: set[tuple[str, str, str]] = set()
+        self._statistics: dict[tuple[str, str, str], dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+        self.similarity_fn_name = matmul_similarity_fn_name(model)
+        meta = getattr(model, "mteb_model_meta", None)
+        if meta is not None and meta.name is not None:
+            suffix = self.precision
+            if self.rescore_top_k:
+                suffix += f"_rescore{self.rescore_top_k}"
+            meta = meta.model_copy(update={"name": f"{meta.name}__{suffix}"})
+        self.mteb_model_meta = meta
+
+    def _get_ranges(self) -> np.ndarray | None:
+        if self._calibrated_ranges is not None:
+            return self._calibrated_ranges
+        if self._context is None:
+            return None
+        return self._ranges.get(self._context)
+
+    def encode(
+        self,
+        inputs: DataLoader[BatchedInput],
+        *,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None = None,
+        **kwargs: Any,
+    ) -> Array:
+        embeddings = _to_numpy(
+            self._model.encode(
+                inputs,
+                task_metadata=task_metadata,
+                hf_split=hf_split,
+                hf_subset=hf_subset,
+                prompt_type=prompt_type,
+                **kwargs,
+            )
+        ).astype(np.float32)
+        self._context = (task_metadata.name, hf_split, hf_subset)
+
+        statistics = self._statistics[self._context]
+        statistics["n_embeddings"] += len(embeddings)
+        statistics["n_dimensions"] = embeddings.shape[-1]
+
+        if prompt_type == PromptType.query:
+            # quantized when they are scored, as the documents are usually encoded after the queries
+            self._query_contexts.add(self._context)
+            return embeddings
+
+        if self.precision == "int8" and self._get_ranges() is None:
+            logger.info(
+                f"Calibrating the int8 ranges on {len(embeddings)} embeddings of {task_metadata.name} ({hf_split}, {hf_subset})."
+            )
+            self._ranges[self._context] = calibrate_int8_ranges(embeddings)
+        return quantize_embeddings(
+            embeddings, self.precision, self._get_ranges()
+        ).astype(np.float32)
+
+    def _quantize_queries(self, queries: np.ndarray) -> np.ndarray:
+        """Quantizes the float queries with the ranges of the documents."""
+        return quantize_embeddings(queries, self.precision, self._get_ranges())
+
+    def _quantized_similarity(self, a: Array, b: Array) -> torch.Tensor:
+        if self.precision == "binary":
+            return torch.from_numpy(hamming_similarity(a, b))
+        if self.precision == "int8" and self.similarity_fn_name is not None:
+            return int8_similarity(
+                a, b, normalize=self.similarity_fn_name is ScoringFunction.COSINE
+            )
+        # float16 and other similarity functions are computed by the model on the (de)quantized values
+        return torch.as_tensor(
+            self._model.similarity(
+                _to_numpy(a).astype(np.float32), _to_numpy(b).astype(np.float32)
+            )
+        )
+
+    def _rescored_similarity(
+        self, queries: np.ndarray, documents: np.ndarray
+    ) -> torch.Tensor:
+        """Ranks the documents by their quantized similarity and rescores the top documents with the float queries.
+
+        The documents which are not rescored keep their quantized ranking, below all rescored documents.
+        """
+        quantized_scores = self._quantized_similarity(
+            self._quantize_queries(queries), documents
+        ).double()
+        k = min(self.rescore_top_k, quantized_scores.shape[1])
+        top_scores, top_indices = torch.topk(quantized_scores, k, dim=1)
+
+        if self.precision == "int8":
+            float_documents = dequantize_int8_embeddings(documents, self._get_ranges())
+        else:
+            float_documents = documents.astype(np.float32)
+        queries_tensor = torch.from_numpy(queries).float()
+        candidates = torch.from_numpy(float_documents)[top_indices]
+        if self.similarity_fn_name is ScoringFunction.COSINE:
+            queries_tensor = torch.nn.functional.normalize(queries_tensor, dim=-1)
+            candidates = torch.nn.functional.normalize(candidates, dim=-1)
+        rescored = torch.einsum("qd,qkd->qk", queries_tensor, candidates).double()
+
+        # map the quantized scores of the other documents below the lowest rescored score, keeping their order
+        lowest_rescored = rescored.min(dim=1, keepdim=True).values
+        scores = lowest_rescored - 1 - (top_scores[:, -1:] - quantized_scores)
+        scores.scatter_(1, top_indices, rescored)
+        return scores.float()
+
+    def similarity(self, embeddings1: Array, embeddings2: Array) -> Array:
+        start = time.perf_counter()
+        embeddings1 = np.atleast_2d(_to_numpy(embeddings1))
+        if self._context not in self._query_contexts:
+            scores = self._quantized_similarity(embeddings1, embeddings2)
+        elif self.rescore_top_k:
+            scores = self._rescored_similarity(
+                embeddings1.astype(np.float32),
+                np.atleast_2d(_to_numpy(embeddings2)),
+            )
+        else:
+            scores = self._quantized_similarity(
+                self._quantize_queries(embeddings1), embeddings2
+            )
+        self._record_scoring(start, scores.numel())
+        return scores
+
+    def similarity_pairwise(self, embeddings1: Array, embeddings2: Array) -> Array:
+        start = time.perf_counter()
+        if self.precision == "binary":
+            scores = torch.from_numpy(
+                pairwise_hamming_similarity(embeddings1, embeddings2)
+            )
+        elif self.precision == "int8" and self.similarity_fn_name is not None:
+            a, b = _integer_matrix(embeddings1), _integer_matrix(embeddings2)
+            if self.similarity_fn_name is ScoringFunction.COSINE:
+                a = torch.nn.functional.normalize(a, p=2, dim=1)
+                b = torch.nn.functional.normalize(b, p=2, dim=1)
+            scores = (a * b).sum(dim=-1)
+        else:
+            scores = torch.as_tensor(
+                self._model.similarity_pairwise(
+                    _to_numpy(embeddings1).astype(np.float32),
+                    _to_numpy(embeddings2).astype(np.float32),
+                )
+            )
+        self._record_scoring(start, scores.numel())
+        return scores
+
+    def _record_scoring(self, start: float, n_pairs: int) -> None:
+        if self._context is None:
+            return
+        statistics = self._statistics[self._context]
+        statistics["scoring_time"] += time.perf_counter() - start
+        statistics["n_scored_pairs"] += n_pairs
+
+    def quantization_statistics(
+        self, task_name: str, hf_split: str, hf_subset: str
+    ) -> dict[str, float]:
+        """The memory of the embeddings and the speed of the similarity computations for a subset.
+
+        If nothing was encoded with the name of the subset (e.g. the language pairs of a bitext mining task), the statistics of
+        all subsets of the split are combined.
+        """
+        keys = [(task_name, hf_split, hf_subset)]
+        if keys[0] not in self._statistics:
+            keys = [key for key in self._statistics if key[:2] == (task_name, hf_split)]
+        if not keys:
+            return {}
+        n_embeddings = sum(self._statistics[key]["n_embeddings"] for key in keys)
+        n_dimensions = max(self._statistics[key]["n_dimensions"] for key in keys)
+        scoring_time = sum(self._statistics[key]["scoring_time"] for key in keys)
+        n_scored_pairs = sum(self._statistics[key]["n_scored_pairs"] for key in keys)
+
+        float_memory = n_embeddings * n_dimensions * _BYTES_PER_DIMENSION["float32"]
+        if self.precision == "binary":
+            memory = n_embeddings * np.ceil(n_dimensions / 8)
+        else:
+            memory = n_embeddings * n_dimensions * _BYTES_PER_DIMENSION[self.precision]
+        return {
+            "float32_memory_mb": float_memory / 1024**2,
+            "quantized_memory_mb": float(memory) / 1024**2,
+            "compression_ratio": float(float_memory / memory) if memory else 0.0,
+            "scoring_time": scoring_time,
+            "scored_pairs_per_second": n_scored_pairs / scoring_time
+            if scoring_time
+            else 0.0,
+        }
@@ -10,6 +10,7 @@ from sentence_transformers import CrossEncoder, SentenceTransformer
 from torch.utils.data import DataLoader
 
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.adaptive_batching import encode_sentences
 from mteb.types import Array, BatchedInput, PromptType
 
 if TYPE_CHECKING:
@@ -68,6 +69,11 @@ class SentenceTransformerWrapper(AbsEncoder):
         if isinstance(self.model, CrossEncoder):
             self.predict = self.handle_instructions_predict
 
+    @property
+    def supports_adaptive_batching(self) -> bool:
+        """`batch_size="auto"` is handled by `encode_sentences`. Cross-encoders only predict, with a static batch size."""
+        return not isinstance(self.model, CrossEncoder)
+
     def encode(
         self,
         inputs: DataLoader[BatchedInput],
@@ -113,7 +119,8 @@ class SentenceTransformerWrapper(AbsEncoder):
 
         inputs = [text for batch in inputs for text in batch["text"]]
 
-        embeddings = self.model.encode(
+        embeddings = encode_sentences(
+            self.model,
             inputs,
             prompt_name=prompt_name,
             **kwargs,
@@ -8,6 +8,7 @@ from torch.utils.data import DataLoader
 
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
+from mteb.models.adaptive_batching import encode_sentences
 from mteb.models.sentence_transformer_wrapper import SentenceTransformerWrapper
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -43,7 +44,8 @@ class UAEWrapper(SentenceTransformerWrapper):
             prompt = self.model.prompts[prompt_name]
             sentences = [prompt.format(text=sentence) for sentence in sentences]
 
-        embeddings = self.model.encode(
+        embeddings = encode_sentences(
+            self.model,
             sentences,
             **kwargs,
         )
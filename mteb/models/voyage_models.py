@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import time
-from functools import wraps
 from typing import Any, Literal
 
 import numpy as np
@@ -10,6 +8,7 @@ from torch.utils.data import DataLoader
 from mteb.abstasks import TaskMetadata
 from mteb.model_meta import ModelMeta, ScoringFunction
 from mteb.models.abs_encoder import AbsEncoder
+from mteb.models.api_request_engine import APIRequestEngine
 from mteb.requires_package import requires_package
 from mteb.types import Array, BatchedInput, PromptType
 
@@ -19,57 +18,6 @@ VOYAGE_TRAINING_DATA = {
 }
 
 
-def token_limit(max_tpm: int, interval: int = 60):
-    limit_interval_start_ts = time.time()
-    used_tokens = 0
-
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            nonlocal limit_interval_start_ts, used_tokens
-
-            result = func(*args, **kwargs)
-            used_tokens += result.total_tokens
-
-            current_time = time.time()
-            if current_time - limit_interval_start_ts > interval:
-                limit_interval_start_ts = current_time
-                used_tokens = 0
-
-            if used_tokens > max_tpm:
-                time.sleep(interval - (current_time - limit_interval_start_ts))
-                used_tokens = 0
-            return result
-
-        return wrapper
-
-    return decorator
-
-
-def rate_limit(max_rpm: int, interval: int = 60):
-    request_interval = interval / max_rpm
-    previous_call_ts: float | None = None
-
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            current_time = time.time()
-            nonlocal previous_call_ts
-            if (
-                previous_call_ts is not None
-                and current_time - previous_call_ts < request_interval
-            ):
-                time.sleep(request_interval - (current_time - previous_call_ts))
-
-            result = func(*args, **kwargs)
-            previous_call_ts = time.time()
-            return result
-
-        return wrapper
-
-    return decorator
-
-
 class VoyageModel(AbsEncoder):
     def __init__(
         self,
@@ -77,14 +25,21 @@ class VoyageModel(AbsEncoder):
         max_retries: int = 5,
         max_rpm: int = 300,
         max_tpm: int = 1_000_000,
+        max_concurrency: int = 8,
         model_prompts: dict[str, str] | None = None,
         **kwargs,
     ) -> None:
         requires_package(self, "voyageai", model_name, "pip install 'mteb[voyageai]'")
         import voyageai
 
-        self._client = voyageai.Client(max_retries=max_retries)
-        self._embed_func = rate_limit(max_rpm)(token_limit(max_tpm)(self._client.embed))
+        # retries and rate limits are handled by the request engine
+        self._client = voyageai.Client(max_retries=0)
+        self._engine = APIRequestEngine(
+            max_concurrency=max_concurrency,
+            max_rpm=max_rpm,
+            max_tpm=max_tpm,
+            max_retries=max_retries,
+        )
 
         self._model_name = model_name.split("/")[-1]
         self._max_tpm = max_tpm
@@ -113,7 +68,7 @@ class VoyageModel(AbsEncoder):
         batch_size: int,
         input_type: Literal["query", "document"],
     ) -> np.ndarray:
-        embeddings, index = [], 0
+        batches, batches_n_tokens, index = [], [], 0
 
         while index < len(sentences):
             batch, batch_tokens = [], 0
@@ -130,14 +85,21 @@ class VoyageModel(AbsEncoder):
                 batch_tokens += n_tokens
                 batch.append(sentences[index])
                 index += 1
-
-            embeddings.extend(
-                self._embed_func(
-                    texts=batch,
-                    model=self._model_name,
-                    input_type=input_type,
-                ).embeddings
-            )
+            batches.append(batch)
+            batches_n_tokens.append(batch_tokens)
+
+        def embed(batch: list[str]) -> list[list[float]]:
+            return self._client.embed(
+                texts=batch,
+                model=self._model_name,
+                input_type=input_type,
+            ).embeddings
+
+        embeddings = []
+        for batch_embeddings in self._engine.run(
+            embed, batches, n_tokens=batches_n_tokens
+        ):
+            embeddings.extend(batch_embeddings)
 
         return np.array(embeddings)
 
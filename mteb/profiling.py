@@ -0,0 +1,281 @@
+"""Lightweight profiling of the evaluation stages.
+
+The stages of an evaluation (loading the data, encoding, searching, computing the metrics, ...) are recorded as named spans
+with counters, e.g. the number of encoded texts, while a `Profiler` is active. Spans are no-ops when no profiler is active.
+
+Example:
+    >>> from mteb.profiling import Profiler, profile_span
+    >>> profiler = Profiler()
+    >>> with profiler.activate(task_name="NFCorpus", hf_split="test"):
+    ...     with profile_span("encode", n_inputs=100):
+    ...         ...
+    >>> profiler.summary("NFCorpus")
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import torch
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+_profiler: Profiler | None = None
+
+# the key of the spans outside of a split or subset, e.g. loading the data
+NO_CONTEXT = "_all"
+
+
+def rss_mb() -> float | None:
+    """The current resident set size (RSS) of the process in MB, None if psutil is not installed."""
+    if psutil is None:
+        return None
+    return psutil.Process(os.getpid()).memory_info().rss / 1024**2
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    end: float
+    task_name: str | None
+    hf_split: str | None
+    hf_subset: str | None
+    thread_id: int
+    counters: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Profiler:
+    """Collects the spans of an evaluation, aggregated per task, split and subset in `summary`.
+
+    The spans are attributed to the task and split set with `activate` or `set_context`, and to the subset of the last encode
+    call (set by the `ProfiledEncoderWrapper` with `set_subset`). The peak memory of the process (RSS) and of the GPU are
+    recorded per subset at the end of every span.
+    """
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self.task_name: str | None = None
+        self.hf_split: str | None = None
+        self.hf_subset: str | None = None
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._peak_memory: dict[tuple[str | None, str, str], dict[str, float]] = (
+            defaultdict(dict)
+        )
+
+    @contextmanager
+    def activate(
+        self, task_name: str | None = None, hf_split: str | None = None
+    ) -> Iterator[Profiler]:
+        """Records the spans emitted inside the context."""
+        global _profiler
+        previous = _profiler
+        _profiler = self
+        self.set_context(task_name, hf_split)
+        try:
+            yield self
+        finally:
+            _profiler = previous
+
+    def set_context(
+        self,
+        task_name: str | None = None,
+        hf_split: str | None = None,
+        hf_subset: str | None = None,
+    ) -> None:
+        """Sets the task, split and subset to which the following spans are attributed."""
+        if (task_name, hf_split, hf_subset) != (
+            self.task_name,
+            self.hf_split,
+            self.hf_subset,
+        ) and torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+        self.task_name, self.hf_split, self.hf_subset = task_name, hf_split, hf_subset
+
+    def set_subset(self, hf_subset: str | None) -> None:
+        """Sets the subset to which the following spans are attributed, keeping the task and split."""
+        self.set_context(self.task_name, self.hf_split, hf_subset)
+
+    def _record_memory(
+        self, task_name: str | None, hf_split: str | None, hf_subset: str | None
+    ) -> None:
+        peak = self._peak_memory[
+            (task_name, hf_split or NO_CONTEXT, hf_subset or NO_CONTEXT)
+        ]
+        rss = rss_mb()
+        if rss is not None:
+            peak["peak_rss_mb"] = max(peak.get("peak_rss_mb", 0.0), rss)
+        if torch.cuda.is_available():
+            gpu_memory = torch.cuda.max_memory_allocated() / 1024**2
+            peak["peak_gpu_memory_mb"] = max(
+                peak.get("peak_gpu_memory_mb", 0.0), gpu_memory
+            )
+
+    @contextmanager
+    def span(self, name: str, **counters: float) -> Iterator[dict[str, float]]:
+        """Records the duration of the context. The yielded counters can be updated inside the context."""
+        context = (self.task_name, self.hf_split, self.hf_subset)
+        start = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.spans.append(
+                    Span(
+                        name,
+                        start,
+                        end,
+                        *context,
+                        thread_id=threading.get_ident(),
+                        counters=counters,
+                    )
+                )
+                self._record_memory(*context)
+
+    def summary(self, task_name: str) -> dict[str, dict[str, dict[str, Any]]]:
+        """Aggregates the spans of a task.
+
+        Returns:
+            A dictionary {split: {subset: {span_name: {"count", "total_time", counters and counters per second}}}}, where the
+            spans outside of a split or subset are stored under "_all". The peak memory is stored as "peak_rss_mb" and
+            "peak_gpu_memory_mb" for every subset.
+        """
+        summary: dict[str, dict[str, dict[str, Any]]] = defaultdict(
+            lambda: defaultdict(dict)
+        )
+        for span in self.spans:
+            if span.task_name != task_name:
+                continue
+            stages = summary[span.hf_split or NO_CONTEXT][span.hf_subset or NO_CONTEXT]
+            stage = stages.setdefault(span.name, {"count": 0, "total_time": 0.0})
+            stage["count"] += 1
+            stage["total_time"] += span.duration
+            for counter, value in span.counters.items():
+                stage[counter] = stage.get(counter, 0) + value
+
+        for split, subsets in summary.items():
+            for subset, stages in subsets.items():
+                for stage in stages.values():
+                    for counter in list(stage):
+                        if (
+                            counter in ("count", "total_time")
+                            or not stage["total_time"]
+                        ):
+                            continue
+                        stage[f"{counter}_per_second"] = (
+                            stage[counter] / stage["total_time"]
+                        )
+                stages.update(self._peak_memory.get((task_name, split, subset), {}))
+        return {split: dict(subsets) for split, subsets in summary.items()}
+
+    def to_chrome_trace(self, task_name: str | None = None) -> dict[str, Any]:
+        """The spans in the Chrome trace event format, which can be opened in chrome://tracing or https://ui.perfetto.dev."""
+        events = []
+        for span in self.spans:
+            if task_name is not None and span.task_name != task_name:
+                continue
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.task_name or "mteb",
+                    "ph": "X",
+                    "ts": (span.start - self._origin) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": span.thread_id,
+                    "args": {
+                        "task_name": span.task_name,
+                        "hf_split": span.hf_split,
+                        "hf_subset": span.hf_subset,
+                        **span.counters,
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str | Path, task_name: str | None = None) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(self.to_chrome_trace(task_name), f)
+
+
+class RSSWatermark:
+    """Records the peak RSS of the process between `start` and `stop`, sampled in a background thread.
+
+    Args:
+        interval: The time between two samples in seconds.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        rss = rss_mb()
+        if rss is not None:
+            self.peak_mb = max(self.peak_mb or 0.0, rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> RSSWatermark:
+        if psutil is None:
+            return self
+        self._sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> float | None:
+        """Stops the sampling and returns the peak RSS in MB, None if psutil is not installed."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._sample()
+        return self.peak_mb
+
+    def __enter__(self) -> RSSWatermark:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+def get_profiler() -> Profiler | None:
+    """The active profiler, if any."""
+    return _profiler
+
+
+@contextmanager
+def profile_span(name: str, **counters: float) -> Iterator[dict[str, float]]:
+    """Records a span with the active profiler, does nothing if no profiler is active."""
+    profiler = _profiler
+    if profiler is None:
+        yield counters
+        return
+    with profiler.span(name, **counters) as span_counters:
+        yield span_counters
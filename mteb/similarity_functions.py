@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from functools import cache
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
 import torch
 
 import mteb
 from mteb.types import Array
 
+if TYPE_CHECKING:
+    from mteb.model_meta import ScoringFunction
+
 
+@cache
 def use_torch_compile():
     gpu_ok = False
     if torch.cuda.is_available():
@@ -16,10 +24,59 @@ def use_torch_compile():
     return gpu_ok
 
 
+class PreNormalizedEmbeddings:
+    """Embeddings normalized to unit length once, e.g. the corpus of a retrieval task which is scored against many batches of
+    queries. `cos_sim` does not normalize them again and computes a plain dot product instead.
+
+    Args:
+        embeddings: The embeddings to normalize, of shape (n_embeddings, dim).
+        is_normalized: Whether the embeddings are already normalized.
+    """
+
+    def __init__(self, embeddings: Array, *, is_normalized: bool = False):
+        embeddings = convert_to_tensor(embeddings)
+        if embeddings.dim() == 1:
+            embeddings = embeddings.unsqueeze(0)
+        self.embeddings = (
+            embeddings
+            if is_normalized
+            else torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        )
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def __getitem__(self, index) -> PreNormalizedEmbeddings:
+        return PreNormalizedEmbeddings(self.embeddings[index], is_normalized=True)
+
+    @property
+    def shape(self) -> torch.Size:
+        return self.embeddings.shape
+
+    def to(self, device: str | torch.device) -> PreNormalizedEmbeddings:
+        return PreNormalizedEmbeddings(self.embeddings.to(device), is_normalized=True)
+
+
+_NUMPY_DTYPES = {
+    torch.float16: np.float16,
+    torch.float32: np.float32,
+    torch.float64: np.float64,
+}
+
+
 def convert_to_tensor(a: Array, dtype=torch.float32) -> torch.Tensor:
-    if not isinstance(a, torch.Tensor):
-        a = torch.tensor(a, dtype=dtype)
-    return a
+    """Converts the embeddings to a tensor. Tensors are returned as is, and numpy arrays of the same dtype are not copied."""
+    if isinstance(a, PreNormalizedEmbeddings):
+        return a.embeddings
+    if isinstance(a, torch.Tensor):
+        return a
+    if (
+        isinstance(a, np.ndarray)
+        and a.dtype == _NUMPY_DTYPES.get(dtype)
+        and a.flags.writeable
+    ):
+        return torch.from_numpy(a)
+    return torch.tensor(np.asarray(a), dtype=dtype)
 
 
 def compute_pairwise_similarity(
@@ -42,45 +99,156 @@ def normalize_embeddings(embeddings: Array) -> torch.Tensor:
     Returns:
         Tensor: The normalized embeddings matrix.
     """
+    if isinstance(embeddings, PreNormalizedEmbeddings):
+        return embeddings.embeddings
+    embeddings = convert_to_tensor(embeddings)
+    return torch.nn.functional.normalize(embeddings, p=2, dim=1)
+
+
+def _dot_score_kernel(a: torch.Tensor, b: torch.Tensor) -> torch.Tensor:
+    return a @ b.transpose(0, 1)
+
+
+def _topk_dot_score_kernel(
+    a: torch.Tensor, b: torch.Tensor, k: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    return torch.topk(a @ b.transpose(0, 1), k, dim=1, largest=True, sorted=True)
+
+
+_SIMILARITY_KERNELS: dict[str, Callable[..., torch.Tensor]] = {
+    "dot_score": _dot_score_kernel,
+    "topk_dot_score": _topk_dot_score_kernel,
+}
+_compiled_kernels: dict[tuple[str, torch.dtype, torch.device], Callable] = {}
+
+
+def register_similarity_kernel(name: str, kernel: Callable[..., torch.Tensor]) -> None:
+    """Registers a kernel operating on tensors, which can then be retrieved (and compiled) with `get_similarity_kernel`."""
+    _SIMILARITY_KERNELS[name] = kernel
+    for key in [key for key in _compiled_kernels if key[0] == name]:
+        del _compiled_kernels[key]
+
+
+def get_similarity_kernel(
+    name: str, dtype: torch.dtype, device: torch.device
+) -> Callable[..., torch.Tensor]:
+    """Returns a similarity kernel for inputs of the given dtype and device.
+
+    On GPUs supported by `use_torch_compile`, the kernel is compiled the first time it is requested for a (kernel, dtype, device)
+    combination, after which the compiled kernel is reused for all following calls.
+    """
+    key = (name, dtype, torch.device(device))
+    if key not in _compiled_kernels:
+        kernel = _SIMILARITY_KERNELS[name]
+        if hasattr(torch, "compile") and use_torch_compile() and key[2].type == "cuda":
+            kernel = torch.compile(kernel, dynamic=True)
+        _compiled_kernels[key] = kernel
+    return _compiled_kernels[key]
+
+
+def _as_matrices(a: Array, b: Array) -> tuple[torch.Tensor, torch.Tensor]:
+    a = convert_to_tensor(a)
+    b = convert_to_tensor(b)
+    if len(a.shape) == 1:
+        a = a.unsqueeze(0)
+    if len(b.shape) == 1:
+        b = b.unsqueeze(0)
+    if a.dtype != b.dtype:
+        dtype = torch.promote_types(a.dtype, b.dtype)
+        a, b = a.to(dtype), b.to(dtype)
+    return a, b
+
+
+def _normalized_matrix(embeddings: Array) -> torch.Tensor:
+    if isinstance(embeddings, PreNormalizedEmbeddings):
+        return embeddings.embeddings
     embeddings = convert_to_tensor(embeddings)
+    if len(embeddings.shape) == 1:
+        embeddings = embeddings.unsqueeze(0)
     return torch.nn.functional.normalize(embeddings, p=2, dim=1)
 
 
 def cos_sim(a: Array, b: Array) -> torch.Tensor:
     """Calculate pairwise cosine similarities between two sets of vectors.
 
-    Computes the cosine similarity cos_sim(a[i], b[j]) for all i and j.
+    Computes the cosine similarity cos_sim(a[i], b[j]) for all i and j. Inputs wrapped in `PreNormalizedEmbeddings` are not
+    normalized again.
 
     Return:
         Matrix with res[i][j]  = cos_sim(a[i], b[j])
     """
-    # Move tensor conversion outside the compiled function
-    # since compile works better with pure tensor operations
-    a = convert_to_tensor(a)
-    b = convert_to_tensor(b)
+    a, b = _as_matrices(_normalized_matrix(a), _normalized_matrix(b))
+    return get_similarity_kernel("dot_score", a.dtype, a.device)(a, b)
 
-    # The actual function to compile
-    def _cos_sim_core(a_tensor, b_tensor):
-        if len(a_tensor.shape) == 1:
-            a_tensor = a_tensor.reshape(1, *a_tensor.shape)
-        if len(b_tensor.shape) == 1:
-            b_tensor = b_tensor.reshape(1, *b_tensor.shape)
-
-        a_norm = normalize_embeddings(a_tensor)
-        b_norm = normalize_embeddings(b_tensor)
-        return a_norm @ b_norm.transpose(0, 1)
-
-    # Compile the core function once
-    should_compile = (
-        hasattr(torch, "compile")
-        and use_torch_compile()
-        and (isinstance(a, torch.Tensor) and isinstance(b, torch.Tensor))
-    )
-    if should_compile:
-        _cos_sim_core_compiled = torch.compile(_cos_sim_core)
-        return _cos_sim_core_compiled(a, b)
-    else:
-        return _cos_sim_core(a, b)
+
+def topk_similarity(
+    a: Array,
+    b: Array,
+    k: int,
+    similarity_fn_name: ScoringFunction | str = "cosine",
+    query_chunk_size: int = 1024,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Computes the top-k of the cosine or dot product similarities between a and b, fusing the matrix product with the top-k.
+
+    The similarities are computed for `query_chunk_size` rows of a at a time, so that the full similarity matrix is never
+    materialized.
+
+    Args:
+        a: The queries, of shape (n_queries, dim).
+        b: The documents, of shape (n_documents, dim).
+        k: The number of documents to return per query.
+        similarity_fn_name: "cosine" or "dot".
+        query_chunk_size: The number of queries scored at a time.
+
+    Returns:
+        The top-k similarities and the indices of the documents, sorted by decreasing similarity, each of shape (n_queries, k).
+    """
+    if similarity_fn_name == "cosine":
+        a, b = _normalized_matrix(a), _normalized_matrix(b)
+    elif similarity_fn_name != "dot":
+        raise ValueError(
+            f"Fused top-k is only supported for cosine and dot product similarities, got {similarity_fn_name}."
+        )
+    a, b = _as_matrices(a, b)
+    kernel = get_similarity_kernel("topk_dot_score", a.dtype, a.device)
+    values, indices = [], []
+    for start in range(0, len(a), query_chunk_size):
+        chunk_values, chunk_indices = kernel(a[start : start + query_chunk_size], b, k)
+        values.append(chunk_values)
+        indices.append(chunk_indices)
+    return torch.cat(values), torch.cat(indices)
+
+
+def matmul_similarity_fn_name(model: mteb.Encoder) -> ScoringFunction | None:
+    """The similarity of the model if it is a cosine or dot product similarity, i.e. if it can be computed as a plain matrix
+    product, using `PreNormalizedEmbeddings` and `topk_similarity`.
+
+    Mirrors `AbsEncoder.similarity`. Returns None for other similarities and for models overriding `similarity`, which should be
+    computed by calling `model.similarity`. Wrappers which only forward `similarity` to the wrapped model (marked with
+    `_forwards_similarity`) are resolved to the wrapped model.
+    """
+    from mteb.model_meta import ScoringFunction
+    from mteb.models.abs_encoder import AbsEncoder
+
+    while getattr(type(model), "_forwards_similarity", False):
+        model = model._model
+    if (
+        not isinstance(model, AbsEncoder)
+        or type(model).similarity is not AbsEncoder.similarity
+    ):
+        return None
+    meta = model.mteb_model_meta
+    if meta is None or meta.similarity_fn_name is None:
+        inner_model = getattr(model, "model", None)
+        if callable(getattr(inner_model, "similarity", None)):
+            return None
+        return ScoringFunction.COSINE
+    if meta.similarity_fn_name in (
+        ScoringFunction.COSINE,
+        ScoringFunction.DOT_PRODUCT,
+    ):
+        return meta.similarity_fn_name
+    return None
 
 
 # https://github.com/UKPLab/sentence-transformers/blob/3fd59c3d122f2148e22b6338447b45d850fb6ea4/sentence_transformers/util.py#L125
@@ -159,29 +327,8 @@ def dot_score(a: Array, b: Array) -> torch.Tensor:
     """Computes the dot-product dot_prod(a[i], b[j]) for all i and j.
     :return: Matrix with res[i][j]  = dot_prod(a[i], b[j])
     """
-    # Move tensor conversion outside the compiled function
-    a = convert_to_tensor(a)
-    b = convert_to_tensor(b)
-
-    # The actual function to compile
-    def _dot_score_core(a_tensor, b_tensor):
-        if len(a_tensor.shape) == 1:
-            a_tensor = a_tensor.unsqueeze(0)
-        if len(b_tensor.shape) == 1:
-            b_tensor = b_tensor.unsqueeze(0)
-
-        return a_tensor @ b_tensor.transpose(0, 1)
-
-    # Compile the core function once
-    if (
-        hasattr(torch, "compile")
-        and use_torch_compile()
-        and isinstance(a, torch.Tensor)
-    ):
-        _dot_score_core_compiled = torch.compile(_dot_score_core)
-        return _dot_score_core_compiled(a, b)
-    else:
-        return _dot_score_core(a, b)
+    a, b = _as_matrices(a, b)
+    return get_similarity_kernel("dot_score", a.dtype, a.device)(a, b)
 
 
 def pairwise_dot_score(a: Array, b: Array) -> Array:
@@ -0,0 +1,278 @@
+"""Benchmarks the overhead of the evaluation, i.e. the time spent outside of the model.
+
+Representative synthetic tasks are evaluated through the real evaluators with a mock encoder, which makes the encoding
+(almost) free, and the time spent in every stage (loading the data, encoding, searching, computing the metrics and
+serializing the results) is recorded using the profiler. The timings can be saved as a baseline, against which later runs
+are compared to report regressions.
+
+Usage:
+    # save a baseline, e.g. on the main branch
+    python -m tests.perf.overhead_benchmark --save-baseline
+    # compare the current tree to the baseline, exits with 1 if a stage regressed
+    python -m tests.perf.overhead_benchmark
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+import mteb
+from mteb import MTEB
+from mteb.abstasks.AbsTask import AbsTask
+from mteb.load_results.task_results import TaskResult
+from tests.perf.synthetic_tasks import (
+    SyntheticBitextMiningTask,
+    SyntheticClassificationTask,
+    SyntheticClusteringTask,
+    SyntheticPairClassificationTask,
+    SyntheticRetrievalTask,
+)
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE_PATH = Path(".benchmarks") / "overhead_baseline.json"
+
+# sizes of the synthetic tasks, "full" is representative of the large MTEB tasks, "tiny" is used in the tests
+SCALES: dict[str, dict[str, dict[str, int]]] = {
+    "tiny": {
+        "retrieval": {"n_documents": 200, "n_queries": 10},
+        "classification": {"n_samples": 100},
+        "clustering": {"n_samples": 100},
+        "pair_classification": {"n_pairs": 100},
+        "bitext_mining": {"n_pairs": 100},
+    },
+    "small": {
+        "retrieval": {"n_documents": 50_000, "n_queries": 500},
+        "classification": {"n_samples": 2_000},
+        "clustering": {"n_samples": 5_000},
+        "pair_classification": {"n_pairs": 5_000},
+        "bitext_mining": {"n_pairs": 2_000},
+    },
+    "full": {
+        "retrieval": {"n_documents": 1_000_000, "n_queries": 1_000},
+        "classification": {"n_samples": 10_000},
+        "clustering": {"n_samples": 50_000},
+        "pair_classification": {"n_pairs": 50_000},
+        "bitext_mining": {"n_pairs": 10_000},
+    },
+}
+
+CASES: dict[str, Callable[..., AbsTask]] = {
+    "retrieval": SyntheticRetrievalTask,
+    "classification": SyntheticClassificationTask,
+    "clustering": SyntheticClusteringTask,
+    "pair_classification": SyntheticPairClassificationTask,
+    "bitext_mining": SyntheticBitextMiningTask,
+}
+
+
+@dataclass
+class Regression:
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def _stage_timings(profiling: dict) -> dict[str, float]:
+    """Sums the time of every span over the splits and subsets, merging the encode spans into "encode"."""
+    timings: dict[str, float] = {}
+    for subsets in profiling.values():
+        for stages in subsets.values():
+            for name, stage in stages.items():
+                if not isinstance(stage, dict):
+                    continue  # the peak memory
+                name = "encode" if name.startswith("encode") else name
+                timings[name] = timings.get(name, 0.0) + stage["total_time"]
+    return timings
+
+
+def run_case(case: str, scale: str = "full") -> dict[str, float]:
+    """Evaluates a synthetic task once and returns the time in seconds spent in every stage.
+
+    Besides the profiled stages, the timings contain the "serialization" of the results (writing and reading them), the
+    "total" time of the evaluation and the "overhead", i.e. the total time minus the time spent encoding.
+    """
+    task = CASES[case](**SCALES[scale][case])
+    np.random.seed(0)  # noqa: NPY002, the mock encoder uses the global random state
+    with tempfile.TemporaryDirectory() as output_folder:
+        start = time.perf_counter()
+        result = MTEB(tasks=[task]).run(
+            MockNumpyEncoder(),
+            output_folder=None,
+            verbosity=0,
+            co2_tracker=False,
+            profile=True,
+        )[0]
+        total = time.perf_counter() - start
+
+        start = time.perf_counter()
+        path = Path(output_folder) / f"{task.metadata.name}.json"
+        result.to_disk(path)
+        TaskResult.from_disk(path)
+        serialization = time.perf_counter() - start
+
+    timings = _stage_timings(result.profiling)
+    timings["serialization"] = serialization
+    timings["total"] = total
+    timings["overhead"] = total - timings.get("encode", 0.0)
+    return timings
+
+
+def run_benchmarks(
+    scale: str = "full", repeats: int = 3, cases: list[str] | None = None
+) -> dict[str, dict[str, float]]:
+    """Runs every case `repeats` times and returns the median time of every stage, {case: {stage: seconds}}."""
+    timings = {}
+    for case in cases or list(CASES):
+        runs = [run_case(case, scale) for _ in range(repeats)]
+        stages = sorted({stage for run in runs for stage in run})
+        timings[case] = {
+            stage: statistics.median(run.get(stage, 0.0) for run in runs)
+            for stage in stages
+        }
+        logger.info(f"{case}: {timings[case]['overhead']:.3f}s of overhead")
+    return timings
+
+
+def find_regressions(
+    current: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float = 0.2,
+    min_difference: float = 0.05,
+) -> list[Regression]:
+    """Compares timings to a baseline.
+
+    Args:
+        current: The timings to check, {case: {stage: seconds}}.
+        baseline: The reference timings, in the same format.
+        tolerance: The relative slow down above which a stage is reported, e.g. 0.2 for 20%.
+        min_difference: The minimal slow down in seconds of a reported stage, so that short stages are not reported
+            because of noise.
+
+    Returns:
+        The regressed stages. Stages missing from the baseline are not reported.
+    """
+    regressions = []
+    for case, stages in current.items():
+        for stage, seconds in stages.items():
+            reference = baseline.get(case, {}).get(stage)
+            if reference is None:
+                continue
+            if (
+                seconds > reference * (1 + tolerance)
+                and seconds - reference > min_difference
+            ):
+                regressions.append(Regression(case, stage, reference, seconds))
+    return regressions
+
+
+def save_baseline(
+    timings: dict[str, dict[str, float]], path: Path, scale: str, repeats: int
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        json.dump(
+            {
+                "scale": scale,
+                "repeats": repeats,
+                "mteb_version": mteb.__version__,
+                "python_version": platform.python_version(),
+                "machine": platform.platform(),
+                "timings": timings,
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_baseline(path: Path) -> dict:
+    with path.open() as f:
+        return json.load(f)
+
+
+def format_report(
+    current: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None = None,
+    regressions: list[Regression] | None = None,
+) -> str:
+    regressed = {(r.case, r.stage) for r in regressions or []}
+    lines = [f"{'case':<22}{'stage':<16}{'current':>10}{'baseline':>10}{'ratio':>8}"]
+    for case, stages in current.items():
+        for stage, seconds in stages.items():
+            reference = (baseline or {}).get(case, {}).get(stage)
+            line = f"{case:<22}{stage:<16}{seconds:>9.3f}s"
+            if reference is not None:
+                ratio = seconds / reference if reference else float("inf")
+                line += f"{reference:>9.3f}s{ratio:>8.2f}"
+            if (case, stage) in regressed:
+                line += "  REGRESSION"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="full")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save the timings as the new baseline instead of comparing to it.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="The relative slow down above which a stage is reported as a regression.",
+    )
+    args = parser.parse_args(argv)
+    logging.getLogger("mteb").setLevel(logging.WARNING)
+
+    timings = run_benchmarks(args.scale, args.repeats, args.cases)
+    if args.save_baseline:
+        save_baseline(timings, args.baseline, args.scale, args.repeats)
+        print(format_report(timings))
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(format_report(timings))
+        print(f"No baseline found at {args.baseline}, run with --save-baseline first")
+        return 0
+    baseline = load_baseline(args.baseline)
+    if baseline["scale"] != args.scale:
+        raise ValueError(
+            f"The baseline was run with --scale {baseline['scale']}, not {args.scale}"
+        )
+    regressions = find_regressions(timings, baseline["timings"], args.tolerance)
+    print(format_report(timings, baseline["timings"], regressions))
+    if regressions:
+        print(
+            f"{len(regressions)} stage(s) regressed by more than {args.tolerance:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Synthetic tasks of configurable size for benchmarking the overhead of the evaluation, i.e. everything but the model."""
+
+from __future__ import annotations
+
+from functools import cache
+
+import numpy as np
+from datasets import Dataset, DatasetDict
+
+from mteb.abstasks.AbsTaskBitextMining import AbsTaskBitextMining
+from mteb.abstasks.AbsTaskClassification import AbsTaskClassification
+from mteb.abstasks.AbsTaskClusteringFast import AbsTaskClusteringFast
+from mteb.abstasks.AbsTaskPairClassification import AbsTaskPairClassification
+from mteb.abstasks.AbsTaskRetrieval import AbsTaskRetrieval
+from mteb.abstasks.TaskMetadata import TaskMetadata
+from tests.test_benchmark.mock_tasks import general_args
+
+_VOCABULARY = np.array(
+    "the a of to and in is for on with as by at from that this it be are was an or which "
+    "model text query document sentence label cluster pair benchmark evaluation embedding "
+    "search index vector score retrieval classification similarity language data task".split()
+)
+
+
+@cache
+def synthetic_texts(n_texts: int, seed: int = 0, n_words: int = 12) -> tuple[str, ...]:
+    """Deterministic texts of `n_words` words, cached as generating a million texts takes a few seconds."""
+    rng = np.random.default_rng(seed)
+    words = _VOCABULARY[rng.integers(len(_VOCABULARY), size=(n_texts, n_words))]
+    return tuple(" ".join(row) for row in words)
+
+
+def _labels(n_samples: int, n_labels: int, seed: int) -> list[int]:
+    return np.random.default_rng(seed).integers(n_labels, size=n_samples).tolist()
+
+
+class SyntheticRetrievalTask(AbsTaskRetrieval):
+    metadata = TaskMetadata(
+        type="Retrieval",
+        name="SyntheticRetrievalTask",
+        main_score="ndcg_at_10",
+        **general_args,  # type: ignore
+    )
+
+    def __init__(self, n_documents: int = 10_000, n_queries: int = 100, **kwargs):
+        super().__init__(**kwargs)
+        self.n_documents = n_documents
+        self.n_queries = n_queries
+
+    def load_data(self, **kwargs):
+        if self.data_loaded:
+            return
+        documents = synthetic_texts(self.n_documents, seed=1)
+        queries = synthetic_texts(self.n_queries, seed=2, n_words=6)
+        relevant = np.random.default_rng(3).integers(
+            self.n_documents, size=(self.n_queries, 3)
+        )
+        self.corpus = {"test": {f"d{i}": text for i, text in enumerate(documents)}}
+        self.queries = {"test": {f"q{i}": text for i, text in enumerate(queries)}}
+        self.relevant_docs = {
+            "test": {
+                f"q{i}": {f"d{doc}": 1 for doc in docs}
+                for i, docs in enumerate(relevant)
+            }
+        }
+        self.top_ranked = None
+        self.instructions = None
+        self.data_loaded = True
+
+
+class SyntheticClassificationTask(AbsTaskClassification):
+    metadata = TaskMetadata(
+        type="Classification",
+        name="SyntheticClassificationTask",
+        main_score="accuracy",
+        **general_args,  # type: ignore
+    )
+
+    def __init__(self, n_samples: int = 1_000, n_labels: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.n_samples = n_samples
+        self.n_labels = n_labels
+
+    def load_data(self, **kwargs):
+        if self.data_loaded:
+            return
+        self.dataset = DatasetDict(
+            {
+                split: Dataset.from_dict(
+                    {
+                        "text": list(synthetic_texts(self.n_samples, seed=seed)),
+                        "label": _labels(self.n_samples, self.n_labels, seed),
+                    }
+                )
+                for split, seed in [("train", 4), ("test", 5)]
+            }
+        )
+        self.data_loaded = True
+
+
+class SyntheticClusteringTask(AbsTaskClusteringFast):
+    metadata = TaskMetadata(
+        type="Clustering",
+        name="SyntheticClusteringTask",
+        main_score="v_measure",
+        **general_args,  # type: ignore
+    )
+
+    def __init__(self, n_samples: int = 1_000, n_labels: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.n_samples = n_samples
+        self.n_labels = n_labels
+        self.max_document_to_embed = n_samples
+        self.max_fraction_of_documents_to_embed = None
+
+    def load_data(self, **kwargs):
+        if self.data_loaded:
+            return
+        self.dataset = DatasetDict(
+            {
+                "test": Dataset.from_dict(
+                    {
+                        "sentences": list(synthetic_texts(self.n_samples, seed=6)),
+                        "labels": _labels(self.n_samples, self.n_labels, seed=6),
+                    }
+                )
+            }
+        )
+        self.data_loaded = True
+
+
+class SyntheticPairClassificationTask(AbsTaskPairClassification):
+    metadata = TaskMetadata(
+        type="PairClassification",
+        name="SyntheticPairClassificationTask",
+        main_score="similarity_ap",
+        **general_args,  # type: ignore
+    )
+
+    def __init__(self, n_pairs: int = 1_000, **kwargs):
+        super().__init__(**kwargs)
+        self.n_pairs = n_pairs
+
+    def load_data(self, **kwargs):
+        if self.data_loaded:
+            return
+        self.dataset = DatasetDict(
+            {
+                "test": Dataset.from_dict(
+                    {
+                        "sentence1": [list(synthetic_texts(self.n_pairs, seed=7))],
+                        "sentence2": [list(synthetic_texts(self.n_pairs, seed=8))],
+                        "labels": [_labels(self.n_pairs, 2, seed=7)],
+                    }
+                )
+            }
+        )
+        self.data_loaded = True
+
+
+class SyntheticBitextMiningTask(AbsTaskBitextMining):
+    metadata = TaskMetadata(
+        type="BitextMining",
+        name="SyntheticBitextMiningTask",
+        main_score="f1",
+        **general_args,  # type: ignore
+    )
+
+    def __init__(self, n_pairs: int = 1_000, **kwargs):
+        super().__init__(**kwargs)
+        self.n_pairs = n_pairs
+
+    def load_data(self, **kwargs):
+        if self.data_loaded:
+            return
+        self.dataset = DatasetDict(
+            {
+                "test": Dataset.from_dict(
+                    {
+                        "sentence1": list(synthetic_texts(self.n_pairs, seed=9)),
+                        "sentence2": list(synthetic_texts(self.n_pairs, seed=10)),
+                    }
+                )
+            }
+        )
+        self.data_loaded = True
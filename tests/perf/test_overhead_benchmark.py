@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from tests.perf.overhead_benchmark import (
+    CASES,
+    find_regressions,
+    load_baseline,
+    main,
+    run_benchmarks,
+)
+
+
+def test_run_benchmarks():
+    timings = run_benchmarks(scale="tiny", repeats=1)
+    assert set(timings) == set(CASES)
+    for stages in timings.values():
+        assert {"load_data", "encode", "serialization", "total", "overhead"} <= set(
+            stages
+        )
+        assert stages["overhead"] <= stages["total"]
+    assert "search" in timings["retrieval"]
+    assert "metrics" in timings["retrieval"]
+    assert "classifier" in timings["classification"]
+
+
+def test_find_regressions():
+    baseline = {"retrieval": {"search": 1.0, "metrics": 0.01}}
+    current = {
+        "retrieval": {"search": 1.5, "metrics": 0.02, "load_data": 10.0},
+        "classification": {"classifier": 1.0},
+    }
+    regressions = find_regressions(current, baseline, tolerance=0.2)
+    # the metrics doubled but by less than min_difference, and stages missing from the baseline are ignored
+    assert [(r.case, r.stage) for r in regressions] == [("retrieval", "search")]
+    assert regressions[0].ratio == 1.5
+    assert find_regressions(current, baseline, tolerance=0.6) == []
+
+
+def test_main_saves_and_compares_to_baseline(tmp_path: Path):
+    baseline_path = tmp_path / "baseline.json"
+    args = ["--scale", "tiny", "--repeats", "1", "--cases", "bitext_mining"]
+    args += ["--baseline", str(baseline_path)]
+
+    assert main([*args, "--save-baseline"]) == 0
+    baseline = load_baseline(baseline_path)
+    assert baseline["scale"] == "tiny"
+    assert set(baseline["timings"]) == {"bitext_mining"}
+    # a generous tolerance, the comparison itself is tested in test_find_regressions
+    assert main([*args, "--tolerance", "100"]) == 0
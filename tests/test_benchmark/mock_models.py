@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Any, Literal
 
 import numpy as np
 import torch
 from numpy import ndarray
 from sentence_transformers import CrossEncoder, SentenceTransformer
+from sentence_transformers.models import Pooling, WordEmbeddings
+from sentence_transformers.models.tokenizer import WhitespaceTokenizer
 from torch import Tensor
 from torch.utils.data import DataLoader
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
 
 from mteb.abstasks.TaskMetadata import TaskMetadata
 from mteb.load_results.task_results import Namespace
@@ -138,6 +142,56 @@ class MockMocoEncoder(AbsMockEncoder):
     )
 
 
+class MockCrossEncoder(AbsMockEncoder):
+    """Scores a query-document pair with the number of words they share. Keeps track of the number of scored pairs."""
+
+    mteb_model_meta = ModelMeta(
+        loader=None,
+        name="mock/MockCrossEncoder",
+        languages=["eng_Latn"],
+        revision="1.0.0",
+        release_date="2024-01-01",
+        n_parameters=None,
+        memory_usage_mb=None,
+        max_tokens=None,
+        embed_dim=None,
+        license=None,
+        open_weights=True,
+        public_training_code=None,
+        public_training_data=None,
+        framework=["PyTorch"],
+        similarity_fn_name=None,
+        use_instructions=False,
+        training_datasets=None,
+        is_cross_encoder=True,
+    )
+
+    def __init__(self):
+        self.n_scored_pairs = 0
+
+    def predict(
+        self,
+        inputs1: DataLoader[BatchedInput],
+        inputs2: DataLoader[BatchedInput],
+        *,
+        task_metadata: TaskMetadata,
+        hf_split: str,
+        hf_subset: str,
+        prompt_type: PromptType | None = None,
+        **kwargs: Any,
+    ) -> Array:
+        queries = [text for batch in inputs1 for text in batch["text"]]
+        documents = [text for batch in inputs2 for text in batch["text"]]
+        self.n_scored_pairs += len(queries)
+        return np.array(
+            [
+                len(set(query.lower().split()) & set(document.lower().split()))
+                for query, document in zip(queries, documents)
+            ],
+            dtype=np.float32,
+        )
+
+
 class MockSentenceTransformer(SentenceTransformer):
     """Ensure that data types not supported by the encoder are converted to the supported data type."""
 
@@ -172,6 +226,41 @@ class MockSentenceTransformer(SentenceTransformer):
         return 10
 
 
+class MockWordEmbeddingSentenceTransformer(SentenceTransformer):
+    """A small SentenceTransformer averaging random word embeddings, which does not need to be downloaded."""
+
+    def __init__(self):
+        vocab = ["the", "of", "and", "model", "query", "document"]
+        embeddings = WordEmbeddings(
+            WhitespaceTokenizer(vocab),
+            np.random.default_rng(0).random((len(vocab), 8)).astype(np.float32),
+        )
+        pooling = Pooling(embeddings.get_word_embedding_dimension())
+        super().__init__(modules=[embeddings, pooling], device="cpu")
+
+
+class MockBertCrossEncoder(CrossEncoder):
+    """A CrossEncoder with a small random BERT saved to `path`, which does not need to be downloaded."""
+
+    def __init__(self, path: str | Path):
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+        vocab += ["the", "of", "and", "model", "query", "document"]
+        vocab_file = Path(path) / "vocab.txt"
+        vocab_file.parent.mkdir(parents=True, exist_ok=True)
+        vocab_file.write_text("\n".join(vocab))
+        BertTokenizerFast(vocab_file.as_posix()).save_pretrained(path)
+        config = BertConfig(
+            vocab_size=len(vocab),
+            hidden_size=8,
+            num_hidden_layers=1,
+            num_attention_heads=1,
+            intermediate_size=8,
+            num_labels=1,
+        )
+        BertForSequenceClassification(config).save_pretrained(path)
+        super().__init__(Path(path).as_posix(), device="cpu")
+
+
 class MockSentenceTransformersbf16Encoder(MockSentenceTransformer):
     def encode(
         self,
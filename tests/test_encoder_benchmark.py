@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import time
+from argparse import Namespace
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+import mteb
+from mteb.cli import benchmark_encoder as benchmark_encoder_cli
+from mteb.encoder_benchmark import benchmark_encoder, synthetic_texts, task_texts
+from mteb.models import SentenceTransformerWrapper
+from mteb.profiling import rss_mb
+from mteb.types import Array, BatchedInput
+from tests.test_benchmark.mock_models import (
+    AbsMockEncoder,
+    MockNumpyEncoder,
+    MockWordEmbeddingSentenceTransformer,
+)
+from tests.test_benchmark.mock_tasks import MockRetrievalTask
+
+
+class OOMEncoder(AbsMockEncoder):
+    def encode(self, inputs: DataLoader[BatchedInput], **kwargs: Any) -> Array:
+        if len(inputs.dataset) > 16:
+            raise torch.cuda.OutOfMemoryError("CUDA out of memory.")
+        return np.zeros((len(inputs.dataset), 10))
+
+
+class TemporaryMemoryEncoder(AbsMockEncoder):
+    """Allocates 256 MB while encoding, which is released before encode returns."""
+
+    def encode(self, inputs: DataLoader[BatchedInput], **kwargs: Any) -> Array:
+        buffer = np.ones(256 * 1024**2, dtype=np.uint8)
+        time.sleep(0.3)
+        del buffer
+        return np.zeros((len(inputs.dataset), 10))
+
+
+def test_synthetic_texts():
+    texts = synthetic_texts(200, mean_length=32, seed=0)
+    assert len(texts) == 200
+    assert 24 < np.mean([len(text.split()) for text in texts]) < 40
+    assert texts == synthetic_texts(200, mean_length=32, seed=0)
+
+
+def test_task_texts():
+    texts = task_texts(MockRetrievalTask(), n_texts=3, text_lengths=[5, 100])
+    assert list(texts) == [5]  # all the texts of the mock task are short
+    assert len(texts[5]) == 3
+
+
+def test_benchmark_encoder():
+    model = SentenceTransformerWrapper(MockWordEmbeddingSentenceTransformer())
+    report = benchmark_encoder(
+        model,
+        batch_sizes=[4, 16],
+        dtypes=["float32", "bfloat16"],
+        text_lengths=[4, 16],
+        n_texts=32,
+    )
+    assert len(report["results"]) == 8
+    assert not any(result["oom"] for result in report["results"])
+    assert all(result["texts_per_second"] > 0 for result in report["results"])
+    assert report["recommended_encode_kwargs"]["batch_size"] in [4, 16]
+    assert report["recommended_dtype"] in ["float32", "bfloat16"]
+    # the model is restored to its dtype
+    assert next(model.model.parameters()).dtype == torch.float32
+
+
+def test_benchmark_encoder_skips_larger_batch_sizes_after_oom():
+    report = benchmark_encoder(
+        OOMEncoder(), batch_sizes=[64, 8, 16, 32], text_lengths=[8], n_texts=64
+    )
+    assert [(r["batch_size"], r["oom"]) for r in report["results"]] == [
+        (8, False),
+        (16, False),
+        (32, True),
+    ]
+    assert report["token_count"] == "words"
+    assert report["recommended_encode_kwargs"]["batch_size"] in [8, 16]
+
+
+def test_benchmark_encoder_records_the_peak_memory_during_encode():
+    pytest.importorskip("psutil")
+    before = rss_mb()
+    report = benchmark_encoder(
+        TemporaryMemoryEncoder(), batch_sizes=[8], text_lengths=[8], n_texts=8
+    )
+    assert report["results"][0]["peak_rss_mb"] > before + 200
+
+
+def test_benchmark_encoder_cli(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    model = MockNumpyEncoder()
+    model.mteb_model_meta = mteb.get_model_meta("mixedbread-ai/mxbai-embed-large-v1")
+    monkeypatch.setattr(mteb, "get_model", lambda *args, **kwargs: model)
+    args = Namespace(
+        model="mixedbread-ai/mxbai-embed-large-v1",
+        model_revision=None,
+        device=None,
+        batch_sizes=[2, 4],
+        dtypes=["float32"],
+        text_lengths=[8],
+        n_texts=8,
+        task=None,
+        output_folder=tmp_path.as_posix(),
+    )
+    benchmark_encoder_cli(args)
+
+    meta = model.mteb_model_meta
+    with (
+        tmp_path / meta.model_name_as_path() / meta.revision / "encoder_benchmark.json"
+    ).open() as f:
+        report = json.load(f)
+    assert report["model_name"] == meta.name
+    assert len(report["results"]) == 2
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from mteb import MTEB
+from mteb.energy import EnergyMeter, _NvmlCounters, _RaplCounters
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import MockRetrievalTask
+
+
+def _write_rapl_domain(root: Path, name: str, energy_uj: int) -> Path:
+    domain = root / name
+    domain.mkdir(parents=True, exist_ok=True)
+    (domain / "max_energy_range_uj").write_text("1000000\n")
+    (domain / "energy_uj").write_text(f"{energy_uj}\n")
+    return domain
+
+
+def test_rapl_counters(tmp_path: Path):
+    package = _write_rapl_domain(tmp_path, "intel-rapl:0", 900_000)
+    # a subdomain of the package, which is included in its energy
+    _write_rapl_domain(tmp_path, "intel-rapl:0:0", 0)
+    counters = _RaplCounters.probe(tmp_path)
+    assert counters.domains == [package]
+
+    (package / "energy_uj").write_text("950000\n")
+    assert counters.joules() == 0.05
+    # the counter wraps around
+    (package / "energy_uj").write_text("50000\n")
+    assert counters.joules() == 0.1
+
+
+def test_rapl_counters_missing(tmp_path: Path):
+    assert _RaplCounters.probe(tmp_path) is None
+
+
+def test_measure_intervals(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    meter = EnergyMeter(interval=0.01, rapl_root=tmp_path)
+    # the CPU time of the process and the busy CPU time of the node
+    cpu_time = 0.0
+    monkeypatch.setattr(meter, "_cpu_times", lambda: (cpu_time, cpu_time))
+
+    with meter.measure("task", "test") as measurement:
+        cpu_time += 2.0
+    with meter.measure("task", "dev") as idle_measurement:
+        time.sleep(0.01)
+
+    assert [m.hf_split for m in meter.measurements] == ["test", "dev"]
+    assert measurement.energy_kwh > idle_measurement.energy_kwh > 0
+    assert measurement.kg_co2_emissions == (
+        measurement.energy_kwh * meter.carbon_intensity
+    )
+    assert measurement.start <= measurement.end <= idle_measurement.start
+    # the sampling thread only runs during the measurements
+    assert meter._thread is None
+
+
+def test_run_measures_every_split(tmp_path: Path):
+    meter = EnergyMeter(interval=0.01, rapl_root=tmp_path)
+    evaluation = MTEB(tasks=[MockRetrievalTask()])
+    results = evaluation.run(MockNumpyEncoder(), output_folder=None, co2_tracker=meter)
+
+    assert [(m.task_name, m.hf_split) for m in evaluation.energy_measurements] == [
+        ("MockRetrievalTask", "val"),
+        ("MockRetrievalTask", "test"),
+    ]
+    assert results[0].kg_co2_emissions == sum(
+        m.kg_co2_emissions for m in meter.measurements
+    )
+    assert results[0].carbon_intensity == meter.carbon_intensity
+
+
+def test_run_without_tracker_reports_no_emissions():
+    results = MTEB(tasks=[MockRetrievalTask()]).run(
+        MockNumpyEncoder(), output_folder=None, co2_tracker=False
+    )
+
+    assert results[0].kg_co2_emissions is None
+    assert "carbon_intensity" not in results[0].to_dict()
+
+
+class _FakeNvml:
+    class NVMLError(Exception):
+        pass
+
+    def __init__(self, pids: list[int]):
+        self.pids = pids
+        self.energy_mj = 0
+
+    def nvmlDeviceGetComputeRunningProcesses(self, handle):
+        return [SimpleNamespace(pid=pid, usedGpuMemory=1024) for pid in self.pids]
+
+    def nvmlDeviceGetTotalEnergyConsumption(self, handle):
+        return self.energy_mj
+
+
+def test_nvml_process_share():
+    counters = _NvmlCounters.__new__(_NvmlCounters)
+    counters.pynvml = _FakeNvml([os.getpid(), os.getpid() + 1])
+    assert counters._process_share(None) == 0.5
+
+    # in a container, the PIDs of the host are listed
+    counters.pynvml = _FakeNvml([1, 2, 3, 4])
+    assert counters._process_share(None) == 0.25
+
+
+def test_energy_before_the_first_measurement_is_not_counted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    nvml = _FakeNvml([os.getpid()])
+    monkeypatch.setattr(
+        _NvmlCounters, "probe", classmethod(lambda cls: cls(nvml, [None]))
+    )
+    meter = EnergyMeter(interval=0.01, cpu_watts=0.0, rapl_root=tmp_path)
+    # e.g. loading the model on the GPU
+    nvml.energy_mj += 1_000_000
+
+    with meter.measure("task", "test") as measurement:
+        nvml.energy_mj += 2_000
+
+    # 2 J of the GPU and a little energy of the RAM
+    assert 2 / 3.6e6 <= measurement.energy_kwh < 3 / 3.6e6
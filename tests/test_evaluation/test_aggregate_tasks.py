@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from mteb import MTEB
+from mteb.abstasks.aggregated_task import AbsTaskAggregate, AggregateTaskMetadata
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import (
+    MockClassificationTask,
+    MockRetrievalTask,
+    MockSTSTask,
+)
+
+
+class CountingEncoder(MockNumpyEncoder):
+    def __init__(self):
+        self.calls = Counter()
+
+    def encode(self, inputs, *, task_metadata, **kwargs: Any):
+        self.calls[task_metadata.name] += 1
+        return super().encode(inputs, task_metadata=task_metadata, **kwargs)
+
+
+def _aggregate_task(name: str, tasks: list) -> AbsTaskAggregate:
+    class MockAggregateTask(AbsTaskAggregate):
+        metadata = AggregateTaskMetadata(
+            name=name,
+            description="a mock aggregate task for testing",
+            tasks=tasks,
+            main_score="main_score",
+            type="Retrieval",
+            eval_splits=["test"],
+        )
+
+    return MockAggregateTask()
+
+
+def test_shared_tasks_are_evaluated_once(tmp_path: Path):
+    model = CountingEncoder()
+    retrieval_result = MTEB(tasks=[MockRetrievalTask()]).run(
+        model, output_folder=(tmp_path / "retrieval").as_posix(), co2_tracker=False
+    )[0]
+    retrieval_calls = model.calls["MockRetrievalTask"]
+
+    retrieval_task, sts_task = MockRetrievalTask(), MockSTSTask()
+    aggregate_1 = _aggregate_task("MockAggregate1", [retrieval_task, sts_task])
+    # another instance of the same task
+    aggregate_2 = _aggregate_task("MockAggregate2", [MockRetrievalTask()])
+    tasks = [aggregate_1, MockClassificationTask(), aggregate_2, sts_task]
+
+    model = CountingEncoder()
+    # without results on disk, which would be loaded instead of evaluating the task again
+    results = MTEB(tasks=tasks).run(model, output_folder=None, co2_tracker=False)
+
+    assert model.calls["MockRetrievalTask"] == retrieval_calls
+    assert [result.task_name for result in results] == [
+        "MockAggregate1",
+        "MockClassificationTask",
+        "MockAggregate2",
+        "MockSTSTask",
+    ]
+    # the result of the retrieval task is shared by the aggregate tasks
+    assert results[2].get_score() == retrieval_result.get_score()
+    assert results[0].get_score() == (
+        (retrieval_result.get_score() + results[3].get_score()) / 2
+    )
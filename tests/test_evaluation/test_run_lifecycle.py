@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from mteb import MTEB
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import MockClassificationTask, MockRetrievalTask
+
+
+def test_run_unloads_data(tmp_path: Path):
+    retrieval_task, classification_task = MockRetrievalTask(), MockClassificationTask()
+    evaluation = MTEB(tasks=[retrieval_task, classification_task])
+    evaluation.run(
+        MockNumpyEncoder(), output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+
+    # the tasks are not copied
+    assert evaluation.tasks[0] is retrieval_task
+    assert evaluation.tasks[1] is classification_task
+    for task in [retrieval_task, classification_task]:
+        assert not task.data_loaded
+        assert task.dataset is None
+    assert "corpus" not in vars(retrieval_task)
+    assert set(evaluation.peak_rss_mb) == {
+        "MockRetrievalTask",
+        "MockClassificationTask",
+    }
+    assert all(peak > 0 for peak in evaluation.peak_rss_mb.values())
+
+    # the data is loaded again when re-running the tasks
+    results = evaluation.run(
+        MockNumpyEncoder(),
+        output_folder=tmp_path.as_posix(),
+        co2_tracker=False,
+        overwrite_results=True,
+    )
+    assert len(results) == 2
+
+
+def test_run_keeps_preloaded_data(tmp_path: Path):
+    task = MockClassificationTask()
+    task.load_data()
+    dataset = task.dataset
+
+    MTEB(tasks=[task]).run(
+        MockNumpyEncoder(), output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+    assert task.data_loaded
+    assert task.dataset is not None
+    assert set(task.dataset) == set(dataset)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from mteb import MTEB
+from mteb.model_meta import ModelMeta
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import MockClassificationTask, MockRetrievalTask
+from tests.test_evaluation.test_aggregate_tasks import _aggregate_task
+
+
+class CountingRetrievalTask(MockRetrievalTask):
+    """Keeps track of the number of times its data is loaded, which is kept once loaded, as for the tasks of the hub."""
+
+    n_loads = 0
+
+    def load_data(self, **kwargs):
+        if self.data_loaded:
+            return
+        self.n_loads += 1
+        super().load_data(**kwargs)
+
+
+def _model_meta(
+    name: str, loaded_models: list[str], revision: str | None = "1.0.0"
+) -> ModelMeta:
+    def loader(model_name: str, **kwargs) -> MockNumpyEncoder:
+        loaded_models.append(model_name)
+        return MockNumpyEncoder()
+
+    return ModelMeta(
+        loader=loader,
+        name=name,
+        languages=["eng_Latn"],
+        revision=revision,
+        release_date="2024-01-01",
+        n_parameters=None,
+        memory_usage_mb=None,
+        max_tokens=None,
+        embed_dim=None,
+        license=None,
+        open_weights=True,
+        public_training_code=None,
+        public_training_data=None,
+        framework=["PyTorch"],
+        similarity_fn_name=None,
+        use_instructions=False,
+        training_datasets=None,
+    )
+
+
+def test_run_many_loads_every_task_once(tmp_path: Path):
+    loaded_models = []
+    metas = [_model_meta(f"mock/checkpoint-{i}", loaded_models) for i in range(3)]
+    retrieval_task = CountingRetrievalTask()
+    evaluation = MTEB(tasks=[retrieval_task, MockClassificationTask()])
+    results = evaluation.run_many(
+        metas, output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+
+    assert retrieval_task.n_loads == 1
+    # the data loaded for the models is released once they are evaluated
+    assert not retrieval_task.data_loaded
+    # the models are loaded for every task, one at a time
+    assert loaded_models == [meta.name for meta in metas] * 2
+    assert len(results) == 3
+    for meta, model_results in zip(metas, results):
+        assert [result.task_name for result in model_results] == [
+            "MockRetrievalTask",
+            "MockClassificationTask",
+        ]
+        assert (
+            tmp_path / meta.model_name_as_path() / "1.0.0" / "MockRetrievalTask.json"
+        ).exists()
+    assert evaluation.last_evaluated_splits["MockRetrievalTask"] == ["val", "test"]
+
+
+def test_run_many_matches_run(tmp_path: Path):
+    loaded_models = []
+    meta = _model_meta("mock/checkpoint", loaded_models)
+    tasks = [_aggregate_task("MockAggregate", [MockRetrievalTask()])]
+    model = MockNumpyEncoder()
+
+    run_results = MTEB(tasks=tasks).run(
+        model, output_folder=(tmp_path / "run").as_posix(), co2_tracker=False
+    )
+    # an already loaded model and a model loaded from its meta
+    model_results, meta_results = MTEB(tasks=tasks).run_many(
+        [model, meta], output_folder=(tmp_path / "run_many").as_posix()
+    )
+
+    assert loaded_models == ["mock/checkpoint"]
+    for results in [model_results, meta_results]:
+        assert [result.task_name for result in results] == ["MockAggregate"]
+        assert results[0].scores.keys() == run_results[0].scores.keys()
+        assert results[0].kg_co2_emissions is not None
+    assert (
+        tmp_path / "run_many" / "mock__checkpoint" / "1.0.0" / "MockAggregate.json"
+    ).exists()
+
+
+def test_run_many_without_revision(tmp_path: Path):
+    meta = _model_meta("mock/checkpoint", [], revision=None)
+    tasks = [_aggregate_task("MockAggregate", [MockRetrievalTask()])]
+    (results,) = MTEB(tasks=tasks).run_many(
+        [meta], output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+
+    assert [result.task_name for result in results] == ["MockAggregate"]
+    assert (
+        tmp_path / "mock__checkpoint" / "no_revision_available" / "MockAggregate.json"
+    ).exists()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+
+import pytest
+from datasets import Dataset, DatasetDict
+
+from mteb import MTEB
+from mteb.abstasks import AbsTask, AbsTaskRetrieval
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import (
+    MockMultilingualClassificationTask,
+    MockMultilingualRetrievalTask,
+)
+
+# the modules, shadowed by the classes of the same name in `mteb.abstasks`
+abstask_module = importlib.import_module("mteb.abstasks.AbsTask")
+retrieval_module = importlib.import_module("mteb.abstasks.AbsTaskRetrieval")
+
+
+class HubClassificationTask(MockMultilingualClassificationTask):
+    """Loaded with the default `load_data`, from a fake hub."""
+
+    load_data = AbsTask.load_data
+
+
+class HubRetrievalTask(MockMultilingualRetrievalTask):
+    """Loaded with the default `load_data` of retrieval tasks, from a fake hub."""
+
+    load_data = AbsTaskRetrieval.load_data
+
+
+@pytest.fixture
+def loaded_configs(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str | None, str]]:
+    """Replaces the hub by in-memory datasets and records the loaded (split, config) pairs."""
+    loaded = []
+
+    def load_dataset(name: str, **kwargs) -> DatasetDict:
+        loaded.append((None, name))
+        texts = ["This is a test sentence", "This is another test sentence"]
+        split = Dataset.from_dict({"text": texts, "label": [0, 1]})
+        return DatasetDict({"train": split, "test": split})
+
+    class RetrievalDataLoader:
+        def __init__(self, split: str, config: str | None, **kwargs):
+            self.split, self.config = split, config
+
+        def load(self):
+            loaded.append((self.split, self.config))
+            corpus = {"d1": {"title": "", "text": "This is a document"}}
+            queries = {"q1": "This is a query"}
+            return corpus, queries, {"q1": {"d1": 1}}, None, None
+
+    monkeypatch.setattr(abstask_module.datasets, "load_dataset", load_dataset)
+    monkeypatch.setattr(retrieval_module, "RetrievalDataLoader", RetrievalDataLoader)
+    return loaded
+
+
+def test_load_data_loads_requested_subsets(loaded_configs):
+    task = HubClassificationTask()
+    task.load_data(subsets_to_load={"test": ["fra"]})
+    assert loaded_configs == [(None, "fra")]
+    assert set(task.dataset) == {"fra"}
+    # the subsets of the task are unchanged
+    assert task.hf_subsets == ["eng", "fra"]
+
+
+def test_retrieval_load_data_loads_requested_splits_and_subsets(loaded_configs):
+    task = HubRetrievalTask()
+    task.load_data(subsets_to_load={"val": ["eng"], "test": ["fra"]})
+    assert sorted(loaded_configs) == [("test", "fra"), ("val", "eng")]
+    assert set(task.corpus) == {"eng", "fra"}
+    assert set(task.corpus["fra"]) == {"test"}
+
+    task = HubRetrievalTask()
+    task.load_data()
+    assert len(loaded_configs) == 2 + 4
+
+
+@pytest.mark.parametrize("task_class", [HubClassificationTask, HubRetrievalTask])
+def test_resume_loads_missing_subsets(task_class, loaded_configs, tmp_path: Path):
+    evaluation = MTEB(tasks=[task_class()])
+    kwargs = dict(output_folder=tmp_path.as_posix(), co2_tracker=False)
+    evaluation.run(MockNumpyEncoder(), eval_subsets=["eng"], **kwargs)
+    assert {config for _, config in loaded_configs} == {"eng"}
+
+    loaded_configs.clear()
+    results = evaluation.run(MockNumpyEncoder(), eval_subsets=["eng", "fra"], **kwargs)
+    assert {config for _, config in loaded_configs} == {"fra"}
+    assert sorted(results[0].languages) == ["eng", "fra"]
+    assert {scores["hf_subset"] for scores in results[0].scores["test"]} == {
+        "eng",
+        "fra",
+    }
+
+
+@pytest.mark.parametrize("task_class", [HubClassificationTask, HubRetrievalTask])
+def test_partial_load_is_extended(task_class, loaded_configs):
+    task = task_class()
+    task.load_data(subsets_to_load={"test": ["eng"]})
+    task.load_data(subsets_to_load={"test": ["eng"]})
+    assert {config for _, config in loaded_configs} == {"eng"}
+    assert task._is_data_loaded({"test": ["eng"]})
+    assert not task._is_data_loaded({"test": ["fra"]})
+    assert not task._is_data_loaded()
+
+    # the subsets that were not loaded are loaded when they are evaluated
+    loaded_configs.clear()
+    scores = task.evaluate(
+        MockNumpyEncoder(), "test", subsets_to_run=["eng", "fra"], encode_kwargs={}
+    )
+    assert set(scores) == {"eng", "fra"}
+    assert "fra" in {config for _, config in loaded_configs}
+
+    task.load_data()
+    assert task._is_data_loaded()
+    task.unload_data()
+    assert not task._is_data_loaded({"test": ["eng"]})
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+from datasets import Dataset
+from sklearn.metrics import f1_score, precision_score, recall_score
+
+from mteb.evaluation.evaluators import BitextMiningEvaluator
+from tests.test_benchmark.mock_models import AbsMockEncoder
+from tests.test_benchmark.mock_tasks import MockBitextMiningTask
+
+TOL = 0.0001
+LANGUAGES = ["eng", "fra", "deu", "spa"]
+
+
+class NoisyTranslationEncoder(AbsMockEncoder):
+    """Embeds the i-th sentence of every language as a noisy version of the same vector."""
+
+    def __init__(self, n_sentences: int):
+        rng = np.random.default_rng(42)
+        base = rng.normal(size=(n_sentences, 8))
+        self.embeddings = {
+            lang: (base + rng.normal(scale=0.8, size=base.shape)).astype(np.float32)
+            for lang in LANGUAGES
+        }
+
+    def encode(self, inputs, *, hf_subset: str, **kwargs):
+        return self.embeddings[hf_subset]
+
+
+class DistanceEncoder(NoisyTranslationEncoder):
+    """Uses the negative euclidean distance as similarity, which is not computed by a matrix product."""
+
+    def similarity(self, embeddings1, embeddings2):
+        return -torch.cdist(torch.as_tensor(embeddings1), torch.as_tensor(embeddings2))
+
+
+def reference_scores(model, pairs):
+    """Nearest neighbors with a single similarity matrix per pair."""
+    scores = {}
+    for key1, key2 in pairs:
+        similarities = model.similarity(model.embeddings[key1], model.embeddings[key2])
+        predictions = np.asarray(torch.as_tensor(similarities).argmax(dim=1))
+        labels = np.arange(len(predictions))
+        scores[f"{key1}-{key2}"] = {
+            "precision": precision_score(
+                labels, predictions, zero_division=0, average="weighted"
+            ),
+            "recall": recall_score(
+                labels, predictions, zero_division=0, average="weighted"
+            ),
+            "f1": f1_score(labels, predictions, zero_division=0, average="weighted"),
+            "accuracy": np.mean(labels == predictions),
+        }
+    return scores
+
+
+@pytest.mark.parametrize("model_cls", [NoisyTranslationEncoder, DistanceEncoder])
+@pytest.mark.parametrize(
+    "evaluator_kwargs",
+    [
+        {},
+        {
+            "pair_batch_size": 2,
+            "num_workers": 2,
+            "query_chunk_size": 7,
+            "corpus_chunk_size": 11,
+        },
+    ],
+)
+def test_parallel_bitext_mining(model_cls, evaluator_kwargs):
+    n_sentences = 50
+    model = model_cls(n_sentences)
+    sentences = Dataset.from_dict(
+        {lang: [f"{lang} {i}" for i in range(n_sentences)] for lang in LANGUAGES}
+    )
+    pairs = [(lang1, lang2) for lang1 in LANGUAGES for lang2 in LANGUAGES]
+    evaluator = BitextMiningEvaluator(
+        sentences,
+        task_metadata=MockBitextMiningTask.metadata,
+        hf_split="test",
+        hf_subset="parallel",
+        pair_columns=pairs,
+        **evaluator_kwargs,
+    )
+
+    scores = evaluator(model, encode_kwargs={})
+
+    expected = reference_scores(model, pairs)
+    assert scores.keys() == expected.keys()
+    for pair, pair_scores in scores.items():
+        for metric, value in pair_scores.items():
+            assert value == pytest.approx(expected[pair][metric], TOL)
+    assert scores["eng-eng"]["accuracy"] == 1.0
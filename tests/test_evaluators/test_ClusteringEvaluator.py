@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import numpy as np
+import pytest
 from datasets import Dataset
 from torch.utils.data import DataLoader
 
@@ -35,3 +36,22 @@ class TestClusteringEvaluator:
         result = clusterer(model, encode_kwargs={})
 
         assert result == {"v_measure": 1.0}
+
+    def test_clustering_v_measure_torch(self):
+        class Model:
+            def encode(self, sentences: DataLoader, **kwargs) -> np.ndarray:
+                return np.repeat(np.eye(3), 2, axis=0)
+
+        dataset = Dataset.from_dict(
+            {"text": ["a", "b", "c", "d", "e", "f"], "labels": [1, 1, 2, 2, 3, 3]}
+        )
+        clusterer = ClusteringEvaluator(
+            dataset,
+            task_metadata="",  # typing: ignore
+            hf_subset="",
+            hf_split="",
+            kmeans_engine="torch",
+        )
+        result = clusterer(model=Model(), encode_kwargs={})
+
+        assert result == {"v_measure": pytest.approx(1.0)}
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import numpy as np
 import pytest
+from sklearn.metrics import average_precision_score
 
 from mteb.evaluation.evaluators import PairClassificationEvaluator
 
@@ -44,3 +46,28 @@ class TestPairClassificationEvaluator:
             scores, labels, high_score_more_similar
         )
         assert ap == pytest.approx(0.7, TOL)
+
+    @pytest.mark.parametrize("high_score_more_similar", [True, False])
+    def test_ap_with_ties(self, high_score_more_similar: bool):
+        rng = np.random.default_rng(42)
+        scores = rng.integers(0, 5, size=100).astype(float)
+        labels = rng.integers(0, 2, size=100)
+        ap = PairClassificationEvaluator.ap_score(
+            scores, labels, high_score_more_similar
+        )
+        sign = 1 if high_score_more_similar else -1
+        assert ap == pytest.approx(average_precision_score(labels, sign * scores), TOL)
+
+    def test_distances(self):
+        scores = [6.12, 5.39, 5.28, 5.94, 6.34, 6.47, 7.88, 6.62, 8.04, 5.9]
+        labels = [0, 0, 0, 0, 1, 0, 0, 0, 1, 0]
+        similarities = PairClassificationEvaluator._compute_metrics(
+            np.array(scores), np.array(labels), True
+        )
+        distances = PairClassificationEvaluator._compute_metrics(
+            -np.array(scores), np.array(labels), False
+        )
+        assert distances["accuracy_threshold"] == pytest.approx(-7.95999, TOL)
+        assert distances["f1_threshold"] == pytest.approx(-7.95999, TOL)
+        for metric in ["accuracy", "f1", "precision", "recall", "ap"]:
+            assert distances[metric] == pytest.approx(similarities[metric], TOL)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from scipy.stats import pearsonr, spearmanr
+
+from mteb.evaluation.evaluators import SummarizationEvaluator
+from mteb.evaluation.evaluators.SummarizationEvaluator import (
+    _masked_pearson,
+    _masked_spearman,
+)
+from tests.test_benchmark.mock_models import AbsMockEncoder
+from tests.test_benchmark.mock_tasks import MockSummarizationTask
+
+TOL = 0.0001
+
+
+class LengthEncoder(AbsMockEncoder):
+    """Embeds a text by its length and its number of words."""
+
+    def encode(self, inputs, **kwargs):
+        texts = [text for batch in inputs for text in batch["text"]]
+        return np.array([[len(text), len(text.split())] for text in texts], float)
+
+
+def test_masked_correlations():
+    rng = np.random.default_rng(42)
+    lens = [3, 5, 8, 8]
+    x = rng.integers(0, 4, size=(len(lens), max(lens))).astype(float)
+    y = rng.normal(size=x.shape)
+    mask = np.arange(max(lens))[None, :] < np.array(lens)[:, None]
+
+    pearson = _masked_pearson(x, y, mask)
+    spearman = _masked_spearman(x, y, mask)
+
+    for i, n in enumerate(lens):
+        assert pearson[i] == pytest.approx(pearsonr(x[i, :n], y[i, :n])[0], TOL)
+        assert spearman[i] == pytest.approx(spearmanr(x[i, :n], y[i, :n])[0], TOL)
+
+
+def test_summarization_evaluator():
+    human_summaries = [["a short summary", "another summary"], ["summary"]]
+    machine_summaries = [
+        ["a", "a summary", "a longer machine summary"],
+        ["summary", "a much longer machine summary", "ab"],
+    ]
+    gold_scores = [[0.0, 0.5, 1.0], [1.0, 0.0, 0.5]]
+    evaluator = SummarizationEvaluator(
+        human_summaries=human_summaries,
+        machine_summaries=machine_summaries,
+        texts=["text", "another text"],
+        gold_scores=gold_scores,
+        task_metadata=MockSummarizationTask.metadata,
+        hf_split="test",
+        hf_subset="default",
+    )
+    scores = evaluator(LengthEncoder(), encode_kwargs={})
+
+    # reference: the max dot product to the human summaries of the text
+    model = LengthEncoder()
+    expected = []
+    for humans, machines, gold in zip(human_summaries, machine_summaries, gold_scores):
+        human_embs = model.encode([{"text": humans}])
+        machine_embs = model.encode([{"text": machines}])
+        predicted = (machine_embs @ human_embs.T).max(axis=1)
+        expected.append(spearmanr(gold, predicted)[0])
+    assert scores["dot_spearman"] == pytest.approx(np.mean(expected), TOL)
+    assert scores["spearman"] == pytest.approx(scores["cosine_spearman"], TOL)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+import torch
+from sklearn.metrics import v_measure_score
+
+from mteb.abstasks.AbsTaskClusteringFast import evaluate_clustering_bootstrapped
+from mteb.evaluation.evaluators.kmeans import batched_kmeans, v_measure
+
+
+def _blobs(n_per_cluster: int, n_clusters: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=10, size=(n_clusters, 8))
+    labels = np.repeat(np.arange(n_clusters), n_per_cluster)
+    points = centers[labels] + rng.normal(scale=0.1, size=(len(labels), 8))
+    return points.astype(np.float32), labels
+
+
+def test_v_measure_matches_sklearn():
+    rng = np.random.default_rng(0)
+    labels_true = rng.integers(0, 5, size=(4, 200))
+    labels_pred = rng.integers(0, 7, size=(4, 200))
+    labels_pred[1] = labels_true[1]  # perfect clustering
+    labels_pred[2] = 0  # a single cluster
+    labels_true[3] = 3  # a single class
+
+    expected = [v_measure_score(t, p) for t, p in zip(labels_true, labels_pred)]
+    scores = v_measure(torch.from_numpy(labels_true), torch.from_numpy(labels_pred))
+    np.testing.assert_allclose(scores.numpy(), expected, atol=1e-10)
+
+
+def test_batched_kmeans_recovers_clusters():
+    points, labels = _blobs(n_per_cluster=20, n_clusters=4)
+    # every batch is a different permutation of the points
+    permutations = torch.stack([torch.randperm(len(points)) for _ in range(3)])
+    x = torch.from_numpy(points)[permutations]
+    generator = torch.Generator().manual_seed(0)
+    assignment = batched_kmeans(x, n_clusters=4, generator=generator)
+
+    assert assignment.shape == (3, len(points))
+    scores = v_measure(torch.from_numpy(labels)[permutations], assignment)
+    np.testing.assert_allclose(scores.numpy(), 1.0)
+
+
+def test_torch_engine_matches_sklearn_engine():
+    points, labels = _blobs(n_per_cluster=50, n_clusters=5)
+    hierarchical_labels = [[label, label // 2] for label in labels.tolist()]
+    kwargs = dict(n_clusters=4, cluster_size=100, kmean_batch_size=512, max_depth=None)
+
+    sklearn_scores = evaluate_clustering_bootstrapped(
+        points, hierarchical_labels, rng_state=random.Random(42), **kwargs
+    )
+    torch_scores = evaluate_clustering_bootstrapped(
+        points,
+        hierarchical_labels,
+        rng_state=random.Random(42),
+        kmeans_engine="torch",
+        **kwargs,
+    )
+    assert set(torch_scores) == {"Level 0", "Level 1"}
+    assert len(torch_scores["Level 0"]) == 4
+    for level in sklearn_scores:
+        assert np.mean(torch_scores[level]) == pytest.approx(
+            np.mean(sklearn_scores[level]), abs=0.1
+        )
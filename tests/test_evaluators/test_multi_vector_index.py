@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import zlib
+
+import numpy as np
+import pytest
+
+from mteb.evaluation.evaluators import DenseRetrievalExactSearch
+from mteb.evaluation.evaluators.multi_vector_index import MultiVectorIndex
+from mteb.model_meta import ModelMeta, ScoringFunction
+from tests.test_benchmark.mock_models import AbsMockEncoder
+from tests.test_benchmark.mock_tasks import MockRetrievalTask
+
+
+def _random_documents(rng: np.random.Generator, n_docs: int, n_tokens: int, dim: int):
+    embeddings = rng.normal(size=(n_docs, n_tokens, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    # zero padding, as produced by the ColBERT wrapper
+    for i, length in enumerate(rng.integers(n_tokens // 2, n_tokens + 1, n_docs)):
+        embeddings[i, length:] = 0.0
+    return embeddings
+
+
+@pytest.mark.parametrize("n_bits", [1, 2, 4, 8])
+def test_multi_vector_index_finds_source_documents(n_bits: int):
+    rng = np.random.default_rng(0)
+    documents = _random_documents(rng, n_docs=500, n_tokens=16, dim=32)
+    source_docs = rng.choice(len(documents), 10, replace=False)
+    # queries are the first tokens of a document with some noise
+    queries = documents[source_docs, :4] + 0.05 * rng.normal(size=(10, 4, 32))
+    queries = queries.astype(np.float32)
+
+    index = MultiVectorIndex(n_bits=n_bits, n_candidates=64)
+    index.add(documents[:250])
+    index.add(documents[250:])
+    scores, indices = index.search(queries, top_k=5)
+
+    assert scores.shape == indices.shape == (10, 5)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert (indices[:, 0] == source_docs).all()
+
+
+def test_multi_vector_index_pads_missing_candidates():
+    rng = np.random.default_rng(0)
+    # 4 documents around each of 3 orthogonal directions, such that every direction is a centroid
+    directions = np.eye(8, dtype=np.float32)[:3]
+    documents = np.repeat(directions, 4, axis=0)[:, None] + 0.05 * rng.normal(
+        size=(12, 2, 8)
+    )
+    index = MultiVectorIndex(n_centroids=3, n_probe=1)
+    index.add(documents.astype(np.float32))
+    # the query only probes the centroid of the first direction, which has 4 of the 12 documents
+    scores, indices = index.search(directions[:1, None], top_k=6)
+
+    assert sorted(indices[0, :4]) == [0, 1, 2, 3]
+    assert np.isfinite(scores[0, :4]).all()
+    assert np.all(np.diff(scores[0, :4]) <= 0)
+    assert (indices[0, 4:] == -1).all()
+    assert np.isneginf(scores[0, 4:]).all()
+
+
+class MaxSimEncoder(AbsMockEncoder):
+    """Embeds every word of a text as a random token vector seeded by the word, padded with zeros to 8 tokens."""
+
+    mteb_model_meta = ModelMeta(
+        loader=None,
+        name="mock/MaxSimEncoder",
+        languages=["eng_Latn"],
+        revision="1.0.0",
+        release_date="2024-01-01",
+        n_parameters=None,
+        memory_usage_mb=None,
+        max_tokens=None,
+        embed_dim=16,
+        license=None,
+        open_weights=True,
+        public_training_code=None,
+        public_training_data=None,
+        framework=[],
+        similarity_fn_name=ScoringFunction.MAX_SIM,
+        use_instructions=False,
+        training_datasets=None,
+    )
+
+    def encode(self, inputs, **kwargs):
+        texts = [text for batch in inputs for text in batch["text"]]
+        embeddings = np.zeros((len(texts), 8, 16), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for j, word in enumerate(text.split()[:8]):
+                token = np.random.default_rng(zlib.crc32(word.encode())).normal(size=16)
+                embeddings[i, j] = token / np.linalg.norm(token)
+        return embeddings
+
+
+def test_multi_vector_index_search():
+    rng = np.random.default_rng(0)
+    vocabulary = [f"word{i}" for i in range(100)]
+    corpus = {
+        f"d{i}": {"title": "", "text": " ".join(rng.choice(vocabulary, 6))}
+        for i in range(50)
+    }
+    # the first words of a document, and an empty query
+    queries = {f"q{i}": " ".join(corpus[f"d{i}"]["text"].split()[:3]) for i in range(5)}
+    queries["empty"] = ""
+    search_kwargs = dict(
+        top_k=5,
+        task_metadata=MockRetrievalTask().metadata,
+        hf_split="test",
+        hf_subset="default",
+    )
+
+    model = MaxSimEncoder()
+    exact = DenseRetrievalExactSearch(model, encode_kwargs={"batch_size": 8})
+    assert not exact.use_multi_vector_index
+    exact_results = exact.search(corpus, queries, **search_kwargs)
+    indexed_results = DenseRetrievalExactSearch(
+        model,
+        encode_kwargs={"batch_size": 8},
+        use_multi_vector_index=True,
+        multi_vector_index_kwargs={"n_bits": 8, "n_centroids": 32, "n_probe": 4},
+    ).search(corpus, queries, **search_kwargs)
+
+    for i in range(5):
+        best = max(exact_results[f"q{i}"], key=exact_results[f"q{i}"].get)
+        assert best == f"d{i}"
+        assert max(indexed_results[f"q{i}"], key=indexed_results[f"q{i}"].get) == best
+        assert indexed_results[f"q{i}"][best] == pytest.approx(
+            exact_results[f"q{i}"][best], abs=0.1
+        )
+    assert indexed_results["empty"] == {}
+
+
+class DenseEncoder(MaxSimEncoder):
+    """Averages the token vectors of the MaxSimEncoder into a single vector."""
+
+    mteb_model_meta = MaxSimEncoder.mteb_model_meta.model_copy(
+        update={
+            "name": "mock/DenseEncoder",
+            "similarity_fn_name": ScoringFunction.COSINE,
+        }
+    )
+
+    def encode(self, inputs, **kwargs):
+        return super().encode(inputs, **kwargs).mean(axis=1)
+
+
+def test_multi_vector_index_rejects_single_vectors():
+    index = MultiVectorIndex()
+    with pytest.raises(ValueError, match="token embeddings"):
+        index.add(np.ones((4, 16), dtype=np.float32))
+
+
+def test_multi_vector_index_search_falls_back_for_dense_models():
+    rng = np.random.default_rng(0)
+    vocabulary = [f"word{i}" for i in range(100)]
+    corpus = {
+        f"d{i}": {"title": "", "text": " ".join(rng.choice(vocabulary, 6))}
+        for i in range(50)
+    }
+    queries = {f"q{i}": corpus[f"d{i}"]["text"] for i in range(5)}
+    search_kwargs = dict(
+        top_k=5,
+        task_metadata=MockRetrievalTask().metadata,
+        hf_split="test",
+        hf_subset="default",
+    )
+
+    model = DenseEncoder()
+    exact_results = DenseRetrievalExactSearch(
+        model, encode_kwargs={"batch_size": 8}
+    ).search(corpus, queries, **search_kwargs)
+    indexed_results = DenseRetrievalExactSearch(
+        model, encode_kwargs={"batch_size": 8}, use_multi_vector_index=True
+    ).search(corpus, queries, **search_kwargs)
+
+    assert indexed_results == exact_results
+    assert all(len(indexed_results[f"q{i}"]) == 5 for i in range(5))
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import mteb
+from mteb import MTEB, RetrievalPipeline
+from tests.test_benchmark.mock_models import (
+    MockBertCrossEncoder,
+    MockCrossEncoder,
+    MockNumpyEncoder,
+)
+from tests.test_benchmark.mock_tasks import (
+    MockClassificationTask,
+    MockInstructionRetrieval,
+    MockRerankingTask,
+    MockRetrievalTask,
+)
+
+
+@pytest.fixture
+def pipeline(tmp_path: Path) -> RetrievalPipeline:
+    return RetrievalPipeline(
+        first_stage=mteb.get_model(
+            "bm25s", cache_dir=tmp_path / "bm25", stemmer_language=None
+        ),
+        reranker=MockCrossEncoder(),
+        depth=1,
+    )
+
+
+def test_pipeline_reranks_only_first_stage_results(
+    pipeline: RetrievalPipeline, tmp_path: Path
+):
+    results = MTEB(tasks=[MockRetrievalTask()]).run(
+        pipeline,
+        output_folder=(tmp_path / "results").as_posix(),
+        eval_splits=["test"],
+        co2_tracker=False,
+    )
+
+    # 2 queries with a depth of 1
+    assert pipeline.reranker.n_scored_pairs == 2
+    scores = results[0].scores["test"][0]
+    assert scores["main_score"] == scores["ndcg_at_10"]
+    assert "first_stage_ndcg_at_10" in scores
+    assert scores["first_stage_time"] >= 0
+    assert scores["reranking_time"] >= 0
+    assert results[0].task_name == "MockRetrievalTask"
+    assert (
+        tmp_path
+        / "results"
+        / "mock__MockCrossEncoder__bm25s_top1"
+        / "1.0.0"
+        / "MockRetrievalTask.json"
+    ).exists()
+
+
+def test_pipeline_with_cross_encoder_and_auto_batch_size(tmp_path: Path):
+    pipeline = RetrievalPipeline(
+        first_stage=MockNumpyEncoder(),
+        reranker=MockBertCrossEncoder(tmp_path / "model"),
+        depth=2,
+    )
+    results = MTEB(tasks=[MockRetrievalTask(), MockRerankingTask()]).run(
+        pipeline,
+        output_folder=(tmp_path / "results").as_posix(),
+        co2_tracker=False,
+        encode_kwargs={"batch_size": "auto"},
+        raise_error=True,
+    )
+
+    assert all(result.get_score() is not None for result in results)
+
+
+def test_pipeline_with_dense_first_stage():
+    pipeline = RetrievalPipeline(
+        first_stage=MockNumpyEncoder(), reranker=MockCrossEncoder(), depth=2
+    )
+    task = MockRetrievalTask()
+    task.load_data()
+    results = pipeline.search(
+        task.corpus["test"],
+        task.queries["test"],
+        top_k=10,
+        task_metadata=task.metadata,
+        hf_split="test",
+        hf_subset="default",
+    )
+
+    assert pipeline.reranker.n_scored_pairs == 4
+    assert {qid: set(docs) for qid, docs in results.items()} == {
+        "q1": {"d1", "d2"},
+        "q2": {"d1", "d2"},
+    }
+    assert set(pipeline.stage_times) == {"first_stage", "reranking"}
+
+
+@pytest.mark.parametrize("first_stage", ["bm25s", "dense"])
+def test_pipeline_reranks_the_candidates_of_the_task(tmp_path: Path, first_stage):
+    pipeline = RetrievalPipeline(
+        first_stage=mteb.get_model(
+            "bm25s", cache_dir=tmp_path / "bm25", stemmer_language=None
+        )
+        if first_stage == "bm25s"
+        else MockNumpyEncoder(),
+        reranker=MockCrossEncoder(),
+        depth=2,
+    )
+    task = MockRetrievalTask()
+    corpus = {
+        "d1": {"title": "", "text": "This is a test sentence"},
+        "d2": {"title": "", "text": "This is another test sentence"},
+        "d3": {"title": "", "text": "A sentence about something else"},
+        "d4": {"title": "", "text": "Yet another sentence"},
+    }
+    queries = {"q1": "This is a test sentence", "q2": "another sentence"}
+    top_ranked = {"q1": ["d3", "d4"], "q2": ["d4"]}
+    results = pipeline.search(
+        corpus,
+        queries,
+        top_k=10,
+        task_metadata=task.metadata,
+        hf_split="test",
+        hf_subset="default",
+        top_ranked=top_ranked,
+    )
+
+    assert {qid: set(docs) for qid, docs in results.items()} == {
+        "q1": {"d3", "d4"},
+        "q2": {"d4"},
+    }
+    assert {
+        qid: set(docs) for qid, docs in pipeline.stage_results["first_stage"].items()
+    } == {"q1": {"d3", "d4"}, "q2": {"d4"}}
+
+
+def test_pipeline_gets_the_candidates_of_reranking_tasks(
+    pipeline: RetrievalPipeline, monkeypatch: pytest.MonkeyPatch
+):
+    search = pipeline.search
+    top_ranked = []
+
+    def recording_search(*args, **kwargs):
+        top_ranked.append(kwargs.get("top_ranked"))
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "search", recording_search)
+    MTEB(tasks=[MockRerankingTask()]).run(
+        pipeline, output_folder=None, eval_splits=["test"], co2_tracker=False
+    )
+
+    assert top_ranked == [{"q1": ["d1", "d2"], "q2": ["d2", "d1"]}]
+
+
+@pytest.mark.parametrize(
+    "task",
+    [MockRerankingTask(), MockInstructionRetrieval()],
+    ids=lambda t: t.metadata.type,
+)
+def test_pipeline_runs_on_retrieval_subtypes(pipeline: RetrievalPipeline, task):
+    results = MTEB(tasks=[task]).run(
+        pipeline, output_folder=None, eval_splits=["test"], co2_tracker=False
+    )
+
+    assert [res.task_name for res in results] == [task.metadata.name]
+    assert "reranking_time" in results[0].scores["test"][0]
+
+
+def test_pipeline_skips_non_retrieval_tasks(pipeline: RetrievalPipeline):
+    results = MTEB(tasks=[MockClassificationTask()]).run(
+        pipeline, output_folder=None, co2_tracker=False
+    )
+    assert results == []
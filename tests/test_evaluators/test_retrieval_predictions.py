@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from mteb import MTEB
+from mteb.evaluation.evaluators.retrieval_predictions import (
+    PredictionsWriter,
+    load_predictions,
+    predictions_path,
+    retrieval_errors,
+    top_k_documents,
+)
+from tests.test_benchmark.mock_models import MockCrossEncoder, MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import MockRetrievalTask
+
+RESULTS = {
+    "q1": {"d1": 0.5, "d2": 0.9, "d3": 0.1},
+    "q2": {"d3": 0.7, "d1": 0.2},
+}
+
+
+def test_json_predictions_match_json_dump(tmp_path: Path):
+    path = tmp_path / "predictions.json"
+    with PredictionsWriter(path) as writer:
+        for qid, doc_scores in RESULTS.items():
+            writer.write(qid, doc_scores)
+
+    assert path.read_text() == json.dumps(RESULTS)
+
+
+@pytest.mark.parametrize(
+    "predictions_format, compression",
+    [
+        ("json", None),
+        ("json", "gzip"),
+        ("parquet", None),
+        ("parquet", "zstd"),
+        ("trec", None),
+        ("trec", "gzip"),
+    ],
+)
+def test_predictions_roundtrip(
+    tmp_path: Path, predictions_format: str, compression: str | None
+):
+    path = predictions_path(tmp_path, "Task_default", predictions_format, compression)
+    # a small batch size, such that the Parquet rows are written in several batches
+    with PredictionsWriter(
+        path, predictions_format, compression, rows_per_batch=2
+    ) as writer:
+        for qid, doc_scores in RESULTS.items():
+            writer.write(qid, doc_scores)
+
+    assert load_predictions(path) == RESULTS
+
+
+def test_trec_predictions_are_ranked(tmp_path: Path):
+    path = tmp_path / "predictions.trec"
+    with PredictionsWriter(path, "trec", run_name="run") as writer:
+        writer.write("q1", RESULTS["q1"])
+
+    assert path.read_text().splitlines() == [
+        "q1 Q0 d2 1 0.9 run",
+        "q1 Q0 d1 2 0.5 run",
+        "q1 Q0 d3 3 0.1 run",
+    ]
+
+
+def test_unknown_compression_raises(tmp_path: Path):
+    with pytest.raises(ValueError):
+        PredictionsWriter(tmp_path / "predictions.trec", "trec", "zstd")
+
+
+def test_top_k_documents_keep_their_order():
+    assert top_k_documents(RESULTS["q1"], 2) == {"d1": 0.5, "d2": 0.9}
+
+
+def test_retrieval_errors():
+    relevant_docs = {"q1": {"d1": 1}, "q2": {"d3": 1}}
+
+    assert retrieval_errors(RESULTS, relevant_docs) == {
+        "q1": {"false_positives": ["d2", "d3"], "false_negatives": []},
+        "q2": {"false_positives": ["d1"], "false_negatives": []},
+    }
+    assert retrieval_errors(RESULTS, relevant_docs, top_k=1) == {
+        "q1": {"false_positives": ["d2"], "false_negatives": ["d1"]},
+    }
+
+
+def test_saved_predictions_are_reranked(tmp_path: Path):
+    task = MockRetrievalTask()
+    MTEB(tasks=[task]).run(
+        MockNumpyEncoder(),
+        eval_splits=["test"],
+        output_folder=(tmp_path / "stage1").as_posix(),
+        save_predictions=True,
+        predictions_format="parquet",
+        top_k=1,
+        co2_tracker=False,
+    )
+    path = tmp_path / "stage1" / "MockRetrievalTask_default_predictions.parquet"
+    predictions = load_predictions(path)
+    assert all(len(doc_scores) == 1 for doc_scores in predictions.values())
+
+    reranker = MockCrossEncoder()
+    MTEB(tasks=[MockRetrievalTask()]).run(
+        reranker,
+        eval_splits=["test"],
+        output_folder=(tmp_path / "stage2").as_posix(),
+        previous_results=path,
+        co2_tracker=False,
+    )
+    # only the saved top document of every query is reranked
+    assert reranker.n_scored_pairs == len(predictions)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+
+import mteb
+from mteb.models import SentenceTransformerWrapper
+from mteb.models.adaptive_batching import (
+    DEFAULT_BATCH_SIZE,
+    AdaptiveBatcher,
+    _safe_token_budgets,
+    encode_sentences,
+    supports_adaptive_batching,
+)
+from mteb.models.profiling_wrapper import ProfiledEncoderWrapper
+from tests.test_benchmark.mock_models import (
+    MockBertCrossEncoder,
+    MockCLIPEncoder,
+    MockNumpyEncoder,
+    MockWordEmbeddingSentenceTransformer,
+)
+from tests.test_benchmark.mock_tasks import (
+    MockAny2AnyRetrievalI2TTask,
+    MockImageClassificationTask,
+    MockImageClusteringTask,
+    MockImageTextPairClassificationTask,
+    MockRerankingTask,
+    MockRetrievalTask,
+    MockVisualSTSTask,
+)
+
+
+class Model:
+    """Encodes a text as its length, runs out of memory above `max_tokens` padded tokens."""
+
+    def __init__(self, max_tokens: int = 10**9):
+        self.max_tokens = max_tokens
+        self.batches: list[list[str]] = []
+
+    def encode_batch(self, batch: list[str]) -> np.ndarray:
+        if len(batch) * max(len(text.split()) for text in batch) > self.max_tokens:
+            raise torch.cuda.OutOfMemoryError("CUDA out of memory.")
+        self.batches.append(batch)
+        return np.array([[len(text.split())] for text in batch], dtype=np.float32)
+
+
+def _texts(lengths: list[int]) -> list[str]:
+    return [" ".join(["word"] * length) for length in lengths]
+
+
+def test_batches_by_token_count():
+    lengths = [2] * 8 + [10, 10]
+    texts = _texts(lengths)
+    model = Model()
+    embeddings = AdaptiveBatcher(model, token_budget=20).encode(
+        texts, lengths, model.encode_batch
+    )
+    # the long texts are batched first, then 10 short texts fit in the budget
+    assert [len(batch) for batch in model.batches] == [2, 8]
+    np.testing.assert_array_equal(embeddings[:, 0], lengths)
+
+
+def test_backs_off_and_remembers_budget():
+    lengths = [1, 50, 3, 50, 7] * 20
+    texts = _texts(lengths)
+    model = Model(max_tokens=500)
+    batcher = AdaptiveBatcher(model, token_budget=4096)
+    embeddings = batcher.encode(texts, lengths, model.encode_batch)
+
+    np.testing.assert_array_equal(embeddings[:, 0], lengths)
+    assert batcher.token_budget < 4096
+    assert _safe_token_budgets[model] == batcher.token_budget
+    assert AdaptiveBatcher(model).token_budget == batcher.token_budget
+
+
+def test_raises_if_a_single_text_does_not_fit():
+    model = Model(max_tokens=5)
+    with pytest.raises(MemoryError):
+        AdaptiveBatcher(model, token_budget=64).encode(
+            _texts([10]), [10], model.encode_batch
+        )
+
+
+def test_reduces_budget_over_memory_budget():
+    lengths = [4] * 64
+    model = Model()
+    batcher = AdaptiveBatcher(model, token_budget=64, memory_budget_mb=0)
+    batcher.encode(_texts(lengths), lengths, model.encode_batch)
+    # halved after every batch down to a single text
+    assert [len(batch) for batch in model.batches][:5] == [16, 8, 4, 2, 1]
+    assert batcher.token_budget == 4
+
+
+def test_encode_sentences_auto_batch_size():
+    model = MockWordEmbeddingSentenceTransformer()
+    sentences = _texts([1, 5, 2, 9, 3]) + ["the model", "query of the document"]
+    expected = model.encode(sentences, batch_size=2)
+    embeddings = encode_sentences(model, sentences, batch_size="auto", token_budget=8)
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-5)
+
+
+def test_run_with_auto_batch_size(tmp_path):
+    model = SentenceTransformerWrapper(MockWordEmbeddingSentenceTransformer())
+    results = mteb.MTEB(tasks=[MockRetrievalTask()]).run(
+        model,
+        output_folder=tmp_path.as_posix(),
+        co2_tracker=False,
+        encode_kwargs={"batch_size": "auto"},
+    )
+    assert results[0].get_score() is not None
+
+
+class StaticBatchEncoder(MockNumpyEncoder):
+    """Batches the texts itself with the given batch size, as the wrappers of API and custom models do."""
+
+    def __init__(self):
+        self.encode_kwargs: list[dict] = []
+
+    def encode(self, inputs, *, batch_size: int = 16, **kwargs):
+        self.encode_kwargs.append({"batch_size": batch_size, **kwargs})
+        texts = [text for batch in inputs for text in batch["text"]]
+        rng = np.random.default_rng(0)
+        return np.concatenate(
+            [
+                rng.random((len(texts[start : start + batch_size]), 10))
+                for start in range(0, len(texts), batch_size)
+            ]
+        )
+
+
+def test_run_with_auto_batch_size_without_adaptive_batching(tmp_path):
+    model = StaticBatchEncoder()
+    results = mteb.MTEB(tasks=[MockRetrievalTask()]).run(
+        model,
+        output_folder=tmp_path.as_posix(),
+        co2_tracker=False,
+        encode_kwargs={"batch_size": "auto", "memory_budget_mb": 1000},
+    )
+
+    assert results[0].get_score() is not None
+    assert model.encode_kwargs
+    for encode_kwargs in model.encode_kwargs:
+        assert encode_kwargs["batch_size"] == DEFAULT_BATCH_SIZE
+        assert "memory_budget_mb" not in encode_kwargs
+
+
+def test_rerank_with_auto_batch_size(tmp_path):
+    model = MockBertCrossEncoder(tmp_path / "model")
+    results = mteb.MTEB(tasks=[MockRerankingTask()]).run(
+        model,
+        output_folder=(tmp_path / "results").as_posix(),
+        co2_tracker=False,
+        encode_kwargs={"batch_size": "auto"},
+        raise_error=True,
+    )
+
+    assert results[0].get_score() is not None
+    # cross-encoders predict with a static batch size
+    assert not supports_adaptive_batching(SentenceTransformerWrapper(model))
+
+
+def test_wrappers_support_adaptive_batching_of_wrapped_model():
+    model = SentenceTransformerWrapper(MockWordEmbeddingSentenceTransformer())
+    assert supports_adaptive_batching(ProfiledEncoderWrapper(model))
+    assert not supports_adaptive_batching(ProfiledEncoderWrapper(StaticBatchEncoder()))
+
+
+class AdaptiveCLIPEncoder(MockCLIPEncoder):
+    """Declares adaptive batching, as the Sentence Transformers wrappers, and records the batch sizes it is given."""
+
+    supports_adaptive_batching = True
+
+    def __init__(self):
+        self.batch_sizes: list = []
+
+    def encode(self, inputs, **kwargs):
+        assert "token_budget" not in kwargs
+        self.batch_sizes += [inputs.batch_size, kwargs.get("batch_size")]
+        return super().encode(inputs, **kwargs)
+
+
+def test_image_tasks_with_auto_batch_size(tmp_path):
+    tasks = [
+        MockImageClusteringTask(),
+        MockImageClassificationTask(),
+        MockVisualSTSTask(),
+        MockAny2AnyRetrievalI2TTask(),
+        MockImageTextPairClassificationTask(),
+    ]
+    model = AdaptiveCLIPEncoder()
+    results = mteb.MTEB(tasks=tasks).run(
+        model,
+        output_folder=tmp_path.as_posix(),
+        co2_tracker=False,
+        encode_kwargs={"batch_size": "auto", "token_budget": 1024},
+        raise_error=True,
+    )
+
+    assert len(results) == len(tasks)
+    # the images are batched by dataloaders, with a static batch size
+    assert "auto" not in model.batch_sizes
+    assert DEFAULT_BATCH_SIZE in model.batch_sizes
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mteb.models.api_request_engine import (
+    APIRequestEngine,
+    TokenBucket,
+    is_retryable_error,
+)
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    """A local embedding API returning the length of every text as its embedding.
+
+    The first `n_rate_limited` requests are answered with a 429 and texts containing "invalid" with a 400.
+    """
+
+    def __init__(self, n_rate_limited: int = 0, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), StubEmbeddingHandler)
+        self.n_rate_limited = n_rate_limited
+        self.delay = delay
+        self.n_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/embed"
+
+
+class StubEmbeddingHandler(BaseHTTPRequestHandler):
+    server: StubEmbeddingServer
+
+    def do_POST(self):
+        texts = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.n_requests += 1
+            rate_limited = self.server.n_requests <= self.server.n_rate_limited
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        if rate_limited:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+        elif any("invalid" in text for text in texts):
+            self.send_response(400)
+            self.end_headers()
+        else:
+            body = json.dumps([[len(text)] for text in texts]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(request):
+    server = StubEmbeddingServer(**getattr(request, "param", {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(url: str, texts: list[str]) -> list[list[int]]:
+    request = urllib.request.Request(
+        url, data=json.dumps(texts).encode(), method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+
+@pytest.mark.parametrize("stub_server", [{"delay": 0.05}], indirect=True)
+def test_requests_are_concurrent_and_ordered(stub_server: StubEmbeddingServer):
+    engine = APIRequestEngine(max_concurrency=4)
+    batches = [[f"{'x' * i}", f"{'y' * (i + 1)}"] for i in range(20)]
+
+    results = engine.run(lambda batch: post(stub_server.url, batch), batches)
+
+    assert results == [[[i], [i + 1]] for i in range(20)]
+    assert stub_server.max_in_flight <= 4
+
+
+@pytest.mark.parametrize("stub_server", [{"n_rate_limited": 3}], indirect=True)
+def test_rate_limited_requests_are_retried(stub_server: StubEmbeddingServer):
+    engine = APIRequestEngine(max_concurrency=1, initial_backoff=0.01)
+
+    results = engine.run(lambda batch: post(stub_server.url, batch), [["a", "bb"]])
+
+    assert results == [[[1], [2]]]
+    assert stub_server.n_requests == 4
+
+
+def test_client_errors_are_not_retried(stub_server: StubEmbeddingServer):
+    engine = APIRequestEngine(initial_backoff=0.01)
+
+    with pytest.raises(urllib.error.HTTPError):
+        engine.run(lambda batch: post(stub_server.url, batch), [["invalid"]])
+    assert stub_server.n_requests == 1
+
+
+@pytest.mark.parametrize("stub_server", [{"n_rate_limited": 10}], indirect=True)
+def test_retries_are_limited(stub_server: StubEmbeddingServer):
+    engine = APIRequestEngine(max_retries=2, initial_backoff=0.01)
+
+    with pytest.raises(urllib.error.HTTPError):
+        engine.run(lambda batch: post(stub_server.url, batch), [["a"]])
+    assert stub_server.n_requests == 3
+
+
+def test_token_bucket():
+    now = 0.0
+    bucket = TokenBucket(capacity=10, interval=1, clock=lambda: now)
+    assert bucket.wait_time(10) == 0
+    bucket.consume(10)
+    assert bucket.wait_time(5) == pytest.approx(0.5)
+    # requests larger than the capacity only wait for a full bucket
+    assert bucket.wait_time(100) == pytest.approx(1.0)
+    now = 0.25
+    assert bucket.wait_time(5) == pytest.approx(0.25)
+
+
+def test_tokens_per_minute_are_limited():
+    # 1200 tokens per minute, i.e. 20 tokens per second
+    engine = APIRequestEngine(max_tpm=1200)
+    start = time.monotonic()
+    engine.run(lambda batch: batch, [1, 2, 3], n_tokens=[1200, 4, 4])
+    # the first request empties the bucket, the two others wait for 4 tokens each
+    assert time.monotonic() - start >= 0.4 - 0.01
+
+
+def test_coroutine_requests_inside_running_loop():
+    async def request(batch: list[str]) -> list[int]:
+        await asyncio.sleep(0.01)
+        return [len(text) for text in batch]
+
+    async def main() -> list[list[int]]:
+        return APIRequestEngine().run(request, [["a"], ["bb", "ccc"]])
+
+    assert asyncio.run(main()) == [[1], [2, 3]]
+
+
+def test_is_retryable_error():
+    assert is_retryable_error(ConnectionError())
+    assert is_retryable_error(TimeoutError())
+    assert is_retryable_error(urllib.error.URLError("connection refused"))
+    # the errors of the SDKs are matched by name
+    assert is_retryable_error(type("APIConnectionError", (Exception,), {})())
+    # bugs, e.g. when parsing the response, are not retried
+    for error in [ValueError(), KeyError("data"), AttributeError(), IndexError()]:
+        assert not is_retryable_error(error)
+    assert is_retryable_error(
+        urllib.error.HTTPError("url", 503, "unavailable", {}, None)
+    )
+    assert not is_retryable_error(
+        urllib.error.HTTPError("url", 401, "unauthorized", {}, None)
+    )
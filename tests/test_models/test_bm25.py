@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import mteb
+from mteb import MTEB
+from mteb.models.bm25 import BM25Search, BM25Tokenizer, SparseBM25Index
+from tests.test_benchmark.mock_tasks import MockRetrievalTask
+
+corpus = {
+    "d1": {"title": "Cats", "text": "The cat sat on the mat"},
+    "d2": {"title": "Dogs", "text": "A dog chased the cat around the garden"},
+    "d3": {"title": "", "text": "Stock markets fell sharply on Monday"},
+}
+queries = {"q1": "cat on a mat", "q2": "markets", "q3": "unrelated words"}
+
+
+def test_tokenizer_removes_stopwords():
+    tokenizer = BM25Tokenizer(stemmer_language=None)
+    assert tokenizer(["The Cat and the hat, 42 a"]) == [["cat", "hat", "42"]]
+
+
+def test_sparse_bm25_ranking():
+    tokenizer = BM25Tokenizer(stemmer_language=None)
+    index = SparseBM25Index.build(
+        tokenizer(BM25Search._corpus_texts(corpus)), list(corpus)
+    )
+    results = index.search(tokenizer(list(queries.values())), top_k=2)
+
+    assert set(results[0]) == {"d1", "d2"}
+    assert results[0]["d1"] > results[0]["d2"] > 0
+    assert list(results[1]) == ["d3"]
+    assert results[2] == {}
+
+
+def test_bm25_index_is_persisted(tmp_path: Path):
+    model = BM25Search(cache_dir=tmp_path, stemmer_language=None)
+    task = MockRetrievalTask()
+    results = model.search(
+        corpus, queries, top_k=10, task_metadata=task.metadata, hf_split="test"
+    )
+
+    index_dirs = list((tmp_path / task.metadata.name).iterdir())
+    assert len(index_dirs) == 1
+    assert (index_dirs[0] / "index_meta.json").exists()
+
+    reloaded = BM25Search(cache_dir=tmp_path, stemmer_language=None)
+    assert (
+        reloaded.search(
+            corpus, queries, top_k=10, task_metadata=task.metadata, hf_split="test"
+        )
+        == results
+    )
+    # a different split gets its own index
+    reloaded.search(
+        corpus, queries, top_k=10, task_metadata=task.metadata, hf_split="val"
+    )
+    assert len(list((tmp_path / task.metadata.name).iterdir())) == 2
+
+
+def test_only_the_last_bm25_index_is_kept_in_memory(tmp_path: Path):
+    model = BM25Search(cache_dir=tmp_path, stemmer_language=None)
+    task = MockRetrievalTask()
+    index = model.get_index(corpus, task.metadata, hf_split="test")
+    assert model.get_index(corpus, task.metadata, hf_split="test") is index
+
+    model.get_index(corpus, task.metadata, hf_split="val")
+    # loaded from disk, as the index of the val split replaced it in memory
+    reloaded = model.get_index(corpus, task.metadata, hf_split="test")
+    assert reloaded is not index
+    assert reloaded.corpus_ids == index.corpus_ids
+
+
+def test_bm25_index_is_rebuilt_when_the_texts_change(tmp_path: Path):
+    task = MockRetrievalTask()
+    BM25Search(cache_dir=tmp_path, stemmer_language=None).search(
+        corpus, queries, top_k=10, task_metadata=task.metadata, hf_split="test"
+    )
+    # same ids, e.g. after a dataset_transform which edits the texts
+    edited_corpus = {**corpus, "d3": {"title": "", "text": "A cat on a mat"}}
+    results = BM25Search(cache_dir=tmp_path, stemmer_language=None).search(
+        edited_corpus, queries, top_k=10, task_metadata=task.metadata, hf_split="test"
+    )
+
+    assert len(list((tmp_path / task.metadata.name).iterdir())) == 2
+    assert "d3" in results["q1"]
+    assert "d3" not in results["q2"]
+
+
+def test_bm25_e2e_without_bm25s(tmp_path: Path):
+    model = mteb.get_model("mteb/bm25-sparse", cache_dir=tmp_path / "bm25")
+    assert model.backend == "sparse"
+    results = MTEB(tasks=[MockRetrievalTask()]).run(
+        model, output_folder=(tmp_path / "results").as_posix(), co2_tracker=False
+    )
+    assert results[0].scores["test"][0]["main_score"] > 0
+    # the results are not saved with the ones of the bm25s package
+    assert (tmp_path / "results" / "mteb__bm25-sparse" / "1").is_dir()
+
+
+def test_bm25s_model_uses_the_bm25s_backend():
+    assert mteb.get_model_meta("bm25s").loader_kwargs == {"backend": "bm25s"}
+
+
+def test_stemming_requires_pystemmer(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        "mteb.requires_package._is_package_available", lambda name: False
+    )
+    with pytest.raises(ImportError):
+        BM25Tokenizer(stemmer_language="english")
+    assert BM25Tokenizer(stemmer_language=None).stemmer is None
+
+
+def test_sparse_model_runs_without_pystemmer(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        "mteb.requires_package._is_package_available", lambda name: False
+    )
+    model = mteb.get_model("mteb/bm25-sparse")
+    assert model.tokenizer.stemmer is None
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        BM25Search(backend="lucene")
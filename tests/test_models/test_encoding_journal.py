@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from datasets import Dataset
+from torch.utils.data import DataLoader
+
+from mteb.create_dataloaders import create_dataloader_from_texts
+from mteb.models.encoding_journal import JournaledEncoderWrapper
+from mteb.types import Array, BatchedInput, PromptType
+from tests.test_benchmark.mock_models import AbsMockEncoder, MockCrossEncoder
+from tests.test_benchmark.mock_tasks import MockRetrievalTask
+
+
+class FlakyEncoder(AbsMockEncoder):
+    """Embeds a text as its length and fails once after encoding `fail_after` texts."""
+
+    mteb_model_meta = MockCrossEncoder.mteb_model_meta.model_copy(
+        update={"name": "mock/FlakyEncoder", "is_cross_encoder": None}
+    )
+
+    def __init__(self, fail_after: int | None = None):
+        self.fail_after = fail_after
+        self.encoded_texts: list[str] = []
+
+    def encode(
+        self, inputs: DataLoader[BatchedInput], *, prompt_type=None, **kwargs: Any
+    ) -> Array:
+        if self.fail_after is not None and len(self.encoded_texts) >= self.fail_after:
+            self.fail_after = None
+            raise ConnectionError("API unavailable")
+        texts = [text for batch in inputs for text in batch["text"]]
+        self.encoded_texts.extend(texts)
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+@pytest.fixture
+def texts() -> list[str]:
+    return [f"text {'x' * i}" for i in range(10)]
+
+
+class MultiVectorEncoder(FlakyEncoder):
+    """Embeds a text as one vector per word, padded to the largest number of words of the batch."""
+
+    def encode(self, inputs: DataLoader[BatchedInput], **kwargs: Any) -> Array:
+        texts = [text for batch in inputs for text in batch["text"]]
+        self.encoded_texts.extend(texts)
+        n_tokens = max(len(text.split()) for text in texts)
+        embeddings = np.zeros((len(texts), n_tokens, 2))
+        for i, text in enumerate(texts):
+            embeddings[i, : len(text.split())] = [i + 1, 1.0]
+        return embeddings
+
+
+def encode(
+    model,
+    texts: list[str],
+    prompt_type=PromptType.passage,
+    split="test",
+    dataloader: DataLoader | None = None,
+    **kwargs: Any,
+):
+    return model.encode(
+        dataloader or create_dataloader_from_texts(texts, batch_size=2),
+        task_metadata=MockRetrievalTask.metadata,
+        hf_split=split,
+        hf_subset="default",
+        prompt_type=prompt_type,
+        **kwargs,
+    )
+
+
+def test_encoding_resumes_from_journal(tmp_path: Path, texts: list[str]):
+    flaky_model = FlakyEncoder(fail_after=6)
+    model = JournaledEncoderWrapper(flaky_model, tmp_path, chunk_size=3)
+    with pytest.raises(ConnectionError):
+        encode(model, texts)
+    # the first two chunks were journaled before the failure
+    assert flaky_model.encoded_texts == texts[:6]
+
+    embeddings = encode(model, texts)
+
+    assert flaky_model.encoded_texts == texts
+    np.testing.assert_array_equal(embeddings, [[len(text), 1.0] for text in texts])
+
+
+def test_journal_is_keyed_by_inputs_and_prompt_type(tmp_path: Path, texts: list[str]):
+    flaky_model = FlakyEncoder()
+    model = JournaledEncoderWrapper(flaky_model, tmp_path, chunk_size=4)
+    encode(model, texts)
+    encode(model, texts)
+    assert len(flaky_model.encoded_texts) == len(texts)
+
+    encode(model, texts, prompt_type=PromptType.query)
+    encode(model, texts, split="val")
+    encode(model, texts[:5])
+    assert len(flaky_model.encoded_texts) == 3 * len(texts) + 5
+
+    journals = list((tmp_path / "mock__FlakyEncoder").glob("*/MockRetrievalTask/*"))
+    assert len(journals) == 4
+
+
+def test_journal_is_keyed_by_encode_kwargs(tmp_path: Path, texts: list[str]):
+    flaky_model = FlakyEncoder()
+    model = JournaledEncoderWrapper(flaky_model, tmp_path, chunk_size=4)
+    encode(model, texts, batch_size=2)
+    encode(model, texts, batch_size=8, show_progress_bar=False)
+    assert len(flaky_model.encoded_texts) == len(texts)
+
+    encode(model, texts, batch_size=2, normalize_embeddings=True)
+    encode(model, texts, batch_size=2, prompt_name="query")
+    assert len(flaky_model.encoded_texts) == 3 * len(texts)
+
+
+def test_journal_is_keyed_by_every_input_column(tmp_path: Path):
+    flaky_model = FlakyEncoder()
+    model = JournaledEncoderWrapper(flaky_model, tmp_path, chunk_size=4)
+
+    def image_dataloader(image_bytes: list[bytes]) -> DataLoader:
+        dataset = Dataset.from_dict(
+            {
+                "text": [""] * len(image_bytes),
+                "image": [{"bytes": b, "path": None} for b in image_bytes],
+            }
+        )
+        return DataLoader(
+            dataset,
+            batch_size=2,
+            collate_fn=lambda rows: {"text": [row["text"] for row in rows]},
+        )
+
+    encode(model, [], dataloader=image_dataloader([b"a", b"b"]))
+    encode(model, [], dataloader=image_dataloader([b"a", b"b"]))
+    encode(model, [], dataloader=image_dataloader([b"a", b"c"]))
+    assert len(flaky_model.encoded_texts) == 4
+
+
+def test_journal_pads_multi_vector_chunks(tmp_path: Path):
+    texts = ["a", "a b c", "a b", "a"]
+    model = JournaledEncoderWrapper(MultiVectorEncoder(), tmp_path, chunk_size=2)
+
+    embeddings = encode(model, texts)
+    resumed_embeddings = encode(model, texts)
+
+    assert embeddings.shape == (4, 3, 2)
+    np.testing.assert_array_equal(embeddings, resumed_embeddings)
+    # the embeddings of the second chunk are padded from 2 to 3 tokens
+    np.testing.assert_array_equal(embeddings[2], [[1, 1], [1, 1], [0, 0]])
+
+
+def test_journal_forwards_model_attributes(tmp_path: Path):
+    model = JournaledEncoderWrapper(FlakyEncoder(), tmp_path)
+    assert model.mteb_model_meta.name == "mock/FlakyEncoder"
+    assert model.fail_after is None
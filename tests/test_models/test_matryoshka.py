@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from mteb import MTEB
+from mteb.models.matryoshka import MatryoshkaEncoderWrapper, truncate_embeddings
+from tests.test_benchmark.mock_models import AbsMockEncoder
+from tests.test_benchmark.mock_tasks import (
+    MockClassificationTask,
+    MockClusteringTask,
+    MockRetrievalTask,
+    MockSTSTask,
+)
+
+
+class HashEncoder(AbsMockEncoder):
+    """Embeds a text as a random vector seeded by the text, optionally truncated to `dimension`."""
+
+    def __init__(self, dimension: int | None = None):
+        self.dimension = dimension
+        self.n_encoded = 0
+
+    def encode(self, inputs, **kwargs):
+        texts = [text for batch in inputs for text in batch["text"]]
+        self.n_encoded += len(texts)
+        embeddings = np.stack(
+            [
+                np.random.default_rng(zlib.crc32(text.encode())).normal(size=16)
+                for text in texts
+            ]
+        )
+        if self.dimension is not None:
+            return truncate_embeddings(embeddings, self.dimension)
+        return embeddings
+
+
+def test_truncate_embeddings():
+    embeddings = np.array([[3.0, 4.0, 1.0], [0.0, 0.0, 2.0]])
+    np.testing.assert_allclose(
+        truncate_embeddings(embeddings, 2), [[0.6, 0.8], [0.0, 0.0]]
+    )
+    with pytest.raises(ValueError):
+        MatryoshkaEncoderWrapper(HashEncoder(), [0, 8])
+
+
+def test_matryoshka_evaluation(tmp_path: Path):
+    tasks = [
+        MockRetrievalTask(),
+        MockSTSTask(),
+        MockClassificationTask(),
+        MockClusteringTask(),
+    ]
+    encoder = HashEncoder()
+    model = MatryoshkaEncoderWrapper(encoder, [4, 8, 32])
+    results = MTEB(tasks=tasks).run(
+        model, output_folder=(tmp_path / "matryoshka").as_posix(), co2_tracker=False
+    )
+
+    full_encoder = HashEncoder()
+    MTEB(tasks=tasks).run(
+        full_encoder, output_folder=(tmp_path / "full").as_posix(), co2_tracker=False
+    )
+    # the inputs are encoded once for all dimensions (repeated inputs, e.g. the classification experiments, only once)
+    assert encoder.n_encoded <= full_encoder.n_encoded
+    assert model._cache == {}
+
+    for dimension in [4, 8]:
+        truncated_results = MTEB(tasks=tasks).run(
+            HashEncoder(dimension),
+            output_folder=(tmp_path / str(dimension)).as_posix(),
+            co2_tracker=False,
+        )
+        for result, truncated_result in zip(results, truncated_results):
+            scores = result.get_matryoshka_scores()
+            assert list(scores) == [4, 8, 32]
+            assert scores[dimension] == pytest.approx(
+                truncated_result.get_score(), abs=1e-6
+            )
+
+    # dimensions larger than the embeddings are evaluated at the full dimension
+    for result in results:
+        assert result.get_matryoshka_scores()[32] == pytest.approx(
+            result.get_score(), abs=1e-6
+        )
+
+
+def test_evaluation_time_excludes_truncated_dimensions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    model = MatryoshkaEncoderWrapper(HashEncoder(), [4, 8])
+    evaluate_dimensions = model.evaluate_dimensions
+    clock = {"now": 0.0}
+
+    def slow_evaluate_dimensions(evaluate):
+        # every call to the clock after the full dimension is evaluated is an hour later
+        clock["now"] += 3600.0
+        return evaluate_dimensions(evaluate)
+
+    monkeypatch.setattr(model, "evaluate_dimensions", slow_evaluate_dimensions)
+    monkeypatch.setattr(
+        sys.modules["mteb.evaluation.MTEB"], "time", lambda: clock["now"]
+    )
+    results = MTEB(tasks=[MockSTSTask()]).run(
+        model, output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+
+    assert results[0].evaluation_time == 0.0
+    assert list(results[0].get_matryoshka_scores()) == [4, 8]
+    assert model._cache == {}
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+from mteb import MTEB
+from mteb.create_dataloaders import create_dataloader_from_texts
+from mteb.models.quantization import (
+    QuantizedEncoderWrapper,
+    calibrate_int8_ranges,
+    dequantize_int8_embeddings,
+    hamming_similarity,
+    pairwise_hamming_similarity,
+    quantize_embeddings,
+)
+from mteb.types import PromptType
+from tests.test_benchmark.mock_models import MockNumpyEncoder, MockTorchEncoder
+from tests.test_benchmark.mock_tasks import (
+    MockPairClassificationTask,
+    MockRetrievalTask,
+)
+
+
+@pytest.fixture
+def embeddings() -> np.ndarray:
+    return np.random.default_rng(42).normal(size=(30, 100)).astype(np.float32)
+
+
+def test_hamming_similarity_is_binary_dot_product(embeddings):
+    binary = quantize_embeddings(embeddings, "binary")
+    expected = binary.astype(np.int64) @ binary[:7].T.astype(np.int64)
+
+    np.testing.assert_array_equal(hamming_similarity(binary, binary[:7]), expected)
+    np.testing.assert_array_equal(
+        pairwise_hamming_similarity(binary[:7], binary[:7]), np.full(7, 100)
+    )
+
+
+def test_int8_quantization(embeddings):
+    ranges = calibrate_int8_ranges(embeddings)
+    quantized = quantize_embeddings(embeddings, "int8", ranges)
+
+    assert quantized.dtype == np.int8
+    assert quantized.min() == -128 and quantized.max() == 127
+    step = (ranges[1] - ranges[0]) / 255
+    assert np.all(
+        np.abs(dequantize_int8_embeddings(quantized, ranges) - embeddings)
+        <= step / 2 + 1e-6
+    )
+    with pytest.raises(ValueError):
+        quantize_embeddings(embeddings, "int8")
+
+
+def encode(model, prompt_type: PromptType, hf_split: str = "test"):
+    return model.encode(
+        create_dataloader_from_texts(["text"] * 30),
+        task_metadata=MockRetrievalTask.metadata,
+        hf_split=hf_split,
+        hf_subset="default",
+        prompt_type=prompt_type,
+    )
+
+
+class FixedEncoder(MockNumpyEncoder):
+    """Encodes the queries as the first 5 embeddings and the documents as all the embeddings."""
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+
+    def encode(self, inputs, *, prompt_type=None, **kwargs):
+        if prompt_type == PromptType.query:
+            return self.embeddings[:5]
+        return self.embeddings
+
+
+def test_int8_ranges_are_calibrated_on_documents_per_split(embeddings):
+    model = QuantizedEncoderWrapper(FixedEncoder(embeddings), "int8")
+    # the queries are encoded first, and returned in full precision
+    queries = encode(model, PromptType.query)
+    np.testing.assert_array_equal(queries, embeddings[:5])
+    documents = encode(model, PromptType.passage)
+
+    ranges = calibrate_int8_ranges(embeddings)
+    np.testing.assert_array_equal(model._get_ranges(), ranges)
+    np.testing.assert_array_equal(
+        documents, quantize_embeddings(embeddings, "int8", ranges)
+    )
+    # the queries are quantized with the ranges of the documents when they are scored
+    np.testing.assert_array_equal(
+        model.similarity(queries, documents),
+        model._quantized_similarity(
+            quantize_embeddings(queries, "int8", ranges), documents
+        ),
+    )
+
+    model._model.embeddings = embeddings * 2
+    encode(model, PromptType.passage, hf_split="dev")
+    np.testing.assert_array_equal(model._get_ranges(), ranges * 2)
+
+
+def test_integer_valued_queries_are_quantized():
+    embeddings = np.random.default_rng(0).integers(-3, 4, size=(30, 16))
+    model = QuantizedEncoderWrapper(
+        FixedEncoder(embeddings.astype(np.float32)), "binary"
+    )
+    queries = encode(model, PromptType.query)
+    documents = encode(model, PromptType.passage)
+
+    np.testing.assert_array_equal(
+        model.similarity(queries, documents),
+        hamming_similarity(quantize_embeddings(queries, "binary"), documents),
+    )
+
+
+@pytest.mark.parametrize("precision", ["int8", "binary"])
+def test_rescoring_keeps_top_documents_first(embeddings, precision):
+    model = QuantizedEncoderWrapper(
+        FixedEncoder(embeddings), precision, rescore_top_k=10
+    )
+    queries = encode(model, PromptType.query)
+    documents = encode(model, PromptType.passage)
+    np.testing.assert_array_equal(queries, embeddings[:5])
+
+    quantized_scores = model._quantized_similarity(
+        model._quantize_queries(queries), documents
+    )
+    scores = model.similarity(queries, documents)
+
+    for query_scores, query_quantized_scores in zip(scores, quantized_scores):
+        candidates = set(torch.topk(query_quantized_scores, 10).indices.tolist())
+        # the rescored documents are ranked first, the others keep their quantized order
+        assert set(torch.topk(query_scores, 10).indices.tolist()) == candidates
+        others = [i for i in range(len(embeddings)) if i not in candidates]
+        assert torch.equal(
+            torch.argsort(query_scores[others], stable=True),
+            torch.argsort(query_quantized_scores[others], stable=True),
+        )
+
+
+@pytest.mark.parametrize("precision", ["float16", "int8", "binary"])
+def test_quantized_evaluation(tmp_path: Path, precision):
+    model = QuantizedEncoderWrapper(MockTorchEncoder(), precision)
+    results = MTEB(tasks=[MockRetrievalTask(), MockPairClassificationTask()]).run(
+        model, output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+
+    # the 10 dimensions of the binary embeddings are packed in 2 bytes
+    expected_ratio = {"float16": 2, "int8": 4, "binary": 20}[precision]
+    for result in results:
+        statistics = result.quantization["test"]["default"]
+        assert statistics["compression_ratio"] == expected_ratio
+        assert statistics["scoring_time"] >= 0
+        # the statistics are stored beside the scores
+        assert "compression_ratio" not in result.scores["test"][0]
+        assert "quantization" in result.to_dict()
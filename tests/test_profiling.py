@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from mteb import MTEB
+from mteb.load_results.task_results import TaskResult
+from mteb.profiling import NO_CONTEXT, Profiler, get_profiler, profile_span
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import (
+    MockClassificationTask,
+    MockMultilingualRetrievalTask,
+    MockRetrievalTask,
+)
+
+
+def test_profile_span_without_profiler():
+    assert get_profiler() is None
+    with profile_span("encode", n_inputs=3) as counters:
+        counters["n_characters"] = 10
+    assert counters == {"n_inputs": 3, "n_characters": 10}
+
+
+def test_profiler_summary():
+    profiler = Profiler()
+    with profiler.activate("task"):
+        with profile_span("load_data"):
+            pass
+        profiler.set_context("task", "test", "en")
+        for _ in range(2):
+            with profile_span("encode", n_inputs=5) as counters:
+                counters["n_characters"] = 20
+    with profile_span("encode", n_inputs=5):
+        pass  # not recorded, the profiler is not active
+
+    summary = profiler.summary("task")
+    assert set(summary) == {NO_CONTEXT, "test"}
+    assert summary[NO_CONTEXT][NO_CONTEXT]["load_data"]["count"] == 1
+    encode = summary["test"]["en"]["encode"]
+    assert encode["count"] == 2
+    assert encode["n_inputs"] == 10
+    assert encode["n_characters"] == 40
+    assert encode["n_inputs_per_second"] > 0
+    assert summary["test"]["en"]["peak_rss_mb"] > 0
+
+    trace = profiler.to_chrome_trace()
+    assert [event["name"] for event in trace["traceEvents"]] == [
+        "load_data",
+        "encode",
+        "encode",
+    ]
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+    assert trace["traceEvents"][1]["args"]["hf_subset"] == "en"
+
+
+def test_profiled_run(tmp_path: Path):
+    tasks = [MockRetrievalTask(), MockClassificationTask()]
+    results = MTEB(tasks=tasks).run(
+        MockNumpyEncoder(),
+        output_folder=tmp_path.as_posix(),
+        co2_tracker=False,
+        profile=True,
+    )
+
+    retrieval_profiling = results[0].profiling
+    assert "load_data" in retrieval_profiling[NO_CONTEXT][NO_CONTEXT]
+    stages = retrieval_profiling["test"]["default"]
+    for stage in ["encode_query", "encode_passage", "search", "metrics"]:
+        assert stages[stage]["count"] >= 1
+    assert stages["encode_passage"]["n_inputs"] == 2
+    assert "n_characters_per_second" in stages["encode_passage"]
+    assert "classifier" in results[1].profiling["test"]["default"]
+
+    result_path = next(tmp_path.rglob("MockRetrievalTask.json"))
+    assert TaskResult.from_disk(result_path).profiling == retrieval_profiling
+    trace_path = result_path.parent / "profiling" / "MockRetrievalTask.trace.json"
+    with trace_path.open() as f:
+        trace = json.load(f)
+    assert {event["name"] for event in trace["traceEvents"]} >= {
+        "encode_query",
+        "search",
+    }
+
+
+def test_run_without_profile(tmp_path: Path):
+    results = MTEB(tasks=[MockRetrievalTask()]).run(
+        MockNumpyEncoder(), output_folder=tmp_path.as_posix(), co2_tracker=False
+    )
+    assert results[0].profiling is None
+    assert "profiling" not in results[0].to_dict()
+
+
+def test_resumed_run_merges_profiling_by_subset(tmp_path: Path):
+    evaluation = MTEB(tasks=[MockMultilingualRetrievalTask()])
+    for eval_subsets in [["eng"], ["eng", "fra"]]:
+        results = evaluation.run(
+            MockNumpyEncoder(),
+            eval_splits=["test"],
+            eval_subsets=eval_subsets,
+            output_folder=tmp_path.as_posix(),
+            co2_tracker=False,
+            profile=True,
+        )
+
+    # the profiling of the subset evaluated first is kept beside the one of the resumed subset
+    assert {"eng", "fra"} <= results[0].profiling["test"].keys()
+    assert "encode_passage" in results[0].profiling["test"]["eng"]
+    assert "encode_passage" in results[0].profiling["test"]["fra"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+
+from mteb.model_meta import ScoringFunction
+from mteb.models.encoding_journal import JournaledEncoderWrapper
+from mteb.models.matryoshka import MatryoshkaEncoderWrapper
+from mteb.models.profiling_wrapper import ProfiledEncoderWrapper
+from mteb.models.quantization import QuantizedEncoderWrapper
+from mteb.similarity_functions import (
+    PreNormalizedEmbeddings,
+    convert_to_tensor,
+    cos_sim,
+    dot_score,
+    get_similarity_kernel,
+    matmul_similarity_fn_name,
+    topk_similarity,
+)
+from tests.test_benchmark.mock_models import MockCrossEncoder, MockNumpyEncoder
+
+
+@pytest.fixture
+def embeddings() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(42)
+    return (
+        rng.normal(size=(20, 8)).astype(np.float32),
+        rng.normal(size=(50, 8)).astype(np.float32),
+    )
+
+
+def test_convert_to_tensor_does_not_copy_numpy_arrays(embeddings):
+    queries, _ = embeddings
+    assert convert_to_tensor(queries).data_ptr() == queries.ctypes.data
+    assert convert_to_tensor(queries.astype(np.float64)).dtype == torch.float32
+
+
+def test_kernels_are_cached():
+    kernel = get_similarity_kernel("dot_score", torch.float32, torch.device("cpu"))
+    assert kernel is get_similarity_kernel("dot_score", torch.float32, "cpu")
+
+
+def test_pre_normalized_embeddings(embeddings):
+    queries, corpus = embeddings
+    expected = cos_sim(queries, corpus)
+
+    normalized_corpus = PreNormalizedEmbeddings(corpus)
+    torch.testing.assert_close(cos_sim(queries, normalized_corpus), expected)
+    torch.testing.assert_close(
+        cos_sim(PreNormalizedEmbeddings(queries)[:5], normalized_corpus[10:]),
+        expected[:5, 10:],
+    )
+    torch.testing.assert_close(cos_sim(queries[0], corpus), expected[:1])
+
+
+@pytest.mark.parametrize(
+    "similarity_fn_name, similarity_fn", [("cosine", cos_sim), ("dot", dot_score)]
+)
+def test_topk_similarity(embeddings, similarity_fn_name, similarity_fn):
+    queries, corpus = embeddings
+    expected_values, expected_indices = torch.topk(similarity_fn(queries, corpus), 5)
+
+    values, indices = topk_similarity(
+        queries, corpus, 5, similarity_fn_name, query_chunk_size=3
+    )
+
+    torch.testing.assert_close(values, expected_values)
+    torch.testing.assert_close(indices, expected_indices)
+
+
+@pytest.mark.parametrize(
+    "model_similarity_fn_name, expected",
+    [
+        (None, ScoringFunction.COSINE),
+        (ScoringFunction.DOT_PRODUCT, ScoringFunction.DOT_PRODUCT),
+        (ScoringFunction.MAX_SIM, None),
+    ],
+)
+def test_matmul_similarity_fn_name(model_similarity_fn_name, expected):
+    model = MockNumpyEncoder()
+    model.mteb_model_meta = MockCrossEncoder.mteb_model_meta.model_copy(
+        update={"similarity_fn_name": model_similarity_fn_name}
+    )
+    assert matmul_similarity_fn_name(model) is expected
+
+
+def test_matmul_similarity_fn_name_custom_similarity():
+    class CustomSimilarityEncoder(MockNumpyEncoder):
+        def similarity(self, embeddings1, embeddings2):
+            return -torch.cdist(
+                convert_to_tensor(embeddings1), convert_to_tensor(embeddings2)
+            )
+
+    assert matmul_similarity_fn_name(CustomSimilarityEncoder()) is None
+
+
+def test_matmul_similarity_fn_name_forwarding_wrapper(tmp_path):
+    model = MockNumpyEncoder()
+    model.mteb_model_meta = MockCrossEncoder.mteb_model_meta.model_copy(
+        update={"similarity_fn_name": ScoringFunction.DOT_PRODUCT}
+    )
+    wrapper = MatryoshkaEncoderWrapper(
+        JournaledEncoderWrapper(model, tmp_path), dimensions=[4]
+    )
+    assert matmul_similarity_fn_name(wrapper) is ScoringFunction.DOT_PRODUCT
+    assert (
+        matmul_similarity_fn_name(ProfiledEncoderWrapper(wrapper))
+        is ScoringFunction.DOT_PRODUCT
+    )
+    # the quantized embeddings are scored by the wrapper
+    assert matmul_similarity_fn_name(QuantizedEncoderWrapper(model, "int8")) is None
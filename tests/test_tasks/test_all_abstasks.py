@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import inspect
 import logging
 from unittest.mock import Mock, patch
 
@@ -77,6 +78,16 @@ def test_load_data(
             mock_dataset_transform.assert_called_once()
 
 
+@pytest.mark.parametrize("task_name", sorted(TASKS_REGISTRY))
+def test_load_data_accepts_kwargs(task_name: str):
+    # MTEB.run passes the arguments of the run, e.g. subsets_to_load, to load_data
+    parameters = inspect.signature(TASKS_REGISTRY[task_name].load_data).parameters
+    assert any(
+        parameter.kind == inspect.Parameter.VAR_KEYWORD
+        for parameter in parameters.values()
+    ), f"{task_name}.load_data does not accept **kwargs"
+
+
 @pytest.mark.test_datasets
 @pytest.mark.flaky(
     reruns=3,
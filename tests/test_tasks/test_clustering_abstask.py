@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from datasets import Dataset, DatasetDict
+
+from mteb import MTEB
+from mteb.create_dataloaders import DEFAULT_BATCH_SIZE
+from tests.test_benchmark.mock_models import MockNumpyEncoder
+from tests.test_benchmark.mock_tasks import MockClusteringTask
+
+
+class RecordingEncoder(MockNumpyEncoder):
+    def __init__(self):
+        self.encoded: list[list[str]] = []
+
+    def encode(self, inputs, **kwargs: Any) -> np.ndarray:
+        texts = [text for batch in inputs for text in batch["text"]]
+        self.encoded.append(texts)
+        return super().encode(inputs, **kwargs)
+
+
+class OverlappingClusteringTask(MockClusteringTask):
+    def load_data(self, **kwargs):
+        sentences = [["a", "b", "c", "d"], ["c", "d", "e"], ["a", "e"]]
+        labels = [[0, 0, 1, 1], [0, 0, 1], [0, 1]]
+        self.dataset = DatasetDict(
+            {"test": Dataset.from_dict({"sentences": sentences, "labels": labels})}
+        )
+        self.data_loaded = True
+
+
+def test_cluster_sets_are_encoded_once():
+    model = RecordingEncoder()
+    results = MTEB(tasks=[OverlappingClusteringTask()]).run(
+        model,
+        output_folder=None,
+        co2_tracker=False,
+        encode_kwargs={"batch_size": 2},
+    )
+
+    assert model.encoded == [["a", "b", "c", "d", "e"]]
+    assert len(results[0].scores["test"][0]["v_measures"]) == 3
+
+
+class AdaptiveRecordingEncoder(RecordingEncoder):
+    supports_adaptive_batching = True
+
+    def encode(self, inputs, **kwargs: Any) -> np.ndarray:
+        self.batch_sizes = (inputs.batch_size, kwargs["batch_size"])
+        return super().encode(inputs, **kwargs)
+
+
+def test_cluster_sets_with_auto_batch_size():
+    model = AdaptiveRecordingEncoder()
+    MTEB(tasks=[OverlappingClusteringTask()]).run(
+        model,
+        output_folder=None,
+        co2_tracker=False,
+        encode_kwargs={"batch_size": "auto"},
+    )
+
+    # the model batches the texts itself, the dataloader has a static batch size
+    assert model.batch_sizes == (DEFAULT_BATCH_SIZE, "auto")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from mteb.abstasks.sampling import bootstrap_indices, group_ranks, undersample_indices
+from mteb.abstasks.stratification import (
+    IterativeStratification,
+    _fold_tie_break,
+    _iterative_train_test_split,
+)
+
+
+def test_group_ranks():
+    assert group_ranks(["a", "b", "a", "a", "b"]).tolist() == [0, 0, 1, 2, 1]
+    assert group_ranks([]).tolist() == []
+
+
+@pytest.mark.parametrize("samples_per_label", [0, 1, 3, 100])
+def test_undersample_indices_matches_loop(samples_per_label: int):
+    labels = np.random.default_rng(0).integers(0, 5, size=200).tolist()
+    idxs = list(range(len(labels)))
+    np.random.default_rng(1).shuffle(idxs)
+
+    label_counter = defaultdict(int)
+    expected = []
+    for i in idxs:
+        if label_counter[labels[i]] < samples_per_label:
+            expected.append(i)
+            label_counter[labels[i]] += 1
+
+    assert undersample_indices(labels, idxs, samples_per_label) == expected
+
+
+def test_bootstrap_indices_matches_choices():
+    rng_state, expected_rng_state = random.Random(42), random.Random(42)
+    samples = bootstrap_indices(rng_state, n=37, n_samples=4, sample_size=10)
+
+    expected = [expected_rng_state.choices(range(37), k=10) for _ in range(4)]
+    assert samples.tolist() == expected
+    # the random state is advanced as by the draws
+    assert rng_state.random() == expected_rng_state.random()
+
+
+def test_iterative_stratification_is_deterministic():
+    rng = np.random.default_rng(0)
+    y = (rng.random((300, 6)) < 0.3).astype(int)
+    X = np.arange(len(y)).reshape(-1, 1)
+
+    train, test = _iterative_train_test_split(X, y, 0.3, random_state=42)
+    train_2, test_2 = _iterative_train_test_split(X, y, 0.3, random_state=42)
+
+    assert sorted(train.tolist() + test.tolist()) == list(range(300))
+    assert train.tolist() == train_2.tolist()
+    assert test.tolist() == test_2.tolist()
+
+
+def _legacy_most_desired_combination(samples_with_combination: dict):
+    currently_chosen = None
+    best_number_of_combinations, best_support_size = None, None
+    for combination, evidence in samples_with_combination.items():
+        number_of_combinations, support_size = (len(set(combination)), len(evidence))
+        if support_size == 0:
+            continue
+        if currently_chosen is None or (
+            best_number_of_combinations < number_of_combinations
+            and best_support_size > support_size
+        ):
+            currently_chosen = combination
+            best_number_of_combinations, best_support_size = (
+                number_of_combinations,
+                support_size,
+            )
+    return currently_chosen
+
+
+class LegacyIterativeStratification(IterativeStratification):
+    """A frozen copy of the list-based distribution of the positive evidence, before it was vectorized."""
+
+    def _prepare_stratification(self, y):
+        *prepared, samples_with_combination, folds = super()._prepare_stratification(y)
+        samples_with_combination = {
+            combination: list(evidence)
+            for combination, evidence in samples_with_combination.items()
+        }
+        return (*prepared, samples_with_combination, folds)
+
+    def _distribute_positive_evidence(
+        self, rows_used, folds, samples_with_combination, per_row_combinations
+    ):
+        l = _legacy_most_desired_combination(samples_with_combination)
+        while l is not None:
+            while len(samples_with_combination[l]) > 0:
+                row = samples_with_combination[l].pop()
+                if rows_used[row]:
+                    continue
+
+                max_val = max(self.desired_samples_per_combination_per_fold[l])
+                M = np.where(
+                    np.array(self.desired_samples_per_combination_per_fold[l])
+                    == max_val
+                )[0]
+                m = _fold_tie_break(
+                    self.desired_samples_per_combination_per_fold[l], M, self._rng_state
+                )
+                folds[m].append(row)
+                rows_used[row] = True
+                for i in per_row_combinations[row]:
+                    if row in samples_with_combination[i]:
+                        samples_with_combination[i].remove(row)
+                    self.desired_samples_per_combination_per_fold[i][m] -= 1
+                self.desired_samples_per_fold[m] -= 1
+
+            l = _legacy_most_desired_combination(samples_with_combination)
+
+
+@pytest.mark.parametrize("order", [1, 2, 3])
+@pytest.mark.parametrize("n_splits", [2, 3])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_iterative_stratification_matches_legacy(order: int, n_splits: int, seed: int):
+    rng = np.random.default_rng(seed)
+    y = (rng.random((200, 8)) < rng.uniform(0.05, 0.5, size=8)).astype(int)
+    X = np.arange(len(y)).reshape(-1, 1)
+    kwargs = dict(n_splits=n_splits, order=order, random_state=seed)
+
+    splits = [
+        (train.tolist(), test.tolist())
+        for train, test in IterativeStratification(**kwargs).split(X, y)
+    ]
+    legacy_splits = [
+        (train.tolist(), test.tolist())
+        for train, test in LegacyIterativeStratification(**kwargs).split(X, y)
+    ]
+    assert splits == legacy_splits
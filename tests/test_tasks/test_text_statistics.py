@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datasets import Dataset
+
+from mteb.abstasks.text_statistics import (
+    intersection_sizes,
+    label_statistics,
+    subsets_frame,
+    text_statistics,
+    to_series,
+)
+
+
+def _frame(subsets: dict[str, dict[str, list]]):
+    return subsets_frame(
+        {
+            hf_subset: {
+                column: to_series(Dataset.from_dict(columns), column)
+                for column in columns
+            }
+            for hf_subset, columns in subsets.items()
+        }
+    )
+
+
+def test_text_statistics():
+    frame = _frame({"eng": {"text": ["a", "bb", "a"]}, "fra": {"text": ["été", "a"]}})
+    per_subset, overall = text_statistics(frame, "text")
+
+    assert per_subset["eng"] == {
+        "num_texts": 3,
+        "total_length": 4,
+        "min_length": 1,
+        "max_length": 2,
+        "unique_texts": 2,
+    }
+    assert per_subset["fra"]["total_length"] == 4
+    assert overall == {
+        "num_texts": 5,
+        "total_length": 8,
+        "min_length": 1,
+        "max_length": 3,
+        "unique_texts": 3,
+    }
+
+
+def test_label_statistics():
+    frame = _frame(
+        {
+            "eng": {"label": [[2, 1], [], [1]]},
+            "fra": {"label": [[3], [1]]},
+        }
+    )
+    per_subset, overall = label_statistics(frame, "label")
+
+    assert per_subset["eng"] == {
+        "num_labels": 3,
+        "min_labels": 0,
+        "max_labels": 2,
+        "labels": {2: 1, 1: 2, None: 1},
+    }
+    # the labels are in the order of their first occurrence
+    assert list(overall["labels"].items()) == [(2, 1), (1, 3), (None, 1), (3, 1)]
+    assert (overall["num_labels"], overall["min_labels"]) == (5, 0)
+
+    _, overall = label_statistics(_frame({"eng": {"label": [0, 1, 0]}}), "label")
+    assert overall == {
+        "num_labels": 3,
+        "min_labels": 1,
+        "max_labels": 1,
+        "labels": {0: 2, 1: 1},
+    }
+
+
+def test_intersection_sizes():
+    frame = _frame({"eng": {"text": ["a", "b", "b"]}, "fra": {"text": ["a", "c"]}})
+    train_frame = _frame({"eng": {"text": ["b", "c"]}, "fra": {"text": ["d"]}})
+    per_subset, overall = intersection_sizes(frame, train_frame, "text")
+
+    assert per_subset == {"eng": 1, "fra": 0}
+    # "b" and "c" are training texts of any subset
+    assert overall == 2